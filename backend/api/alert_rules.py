@@ -2,11 +2,21 @@
 from fastapi import APIRouter, HTTPException, Query
 from sqlalchemy import text
 from backend.db.database import async_session
+from backend.db.writer import db_writer
 from backend.db.schemas import AlertRuleCreate, AlertRuleUpdate, MessageResponse
+from backend.core.http_cache import change_tracker
 
 router = APIRouter(prefix="/api/v1/alert-rules", tags=["alert-rules"])
 
 
+def _check_condition(condition_type: str, window_sec, percentile):
+    """윈도우 조건 필수 값 확인 (value 외에는 window_sec, percentile 은 percentile 값 필요)"""
+    if condition_type != 'value' and not window_sec:
+        raise HTTPException(status_code=400, detail="윈도우 조건에는 window_sec 가 필요합니다")
+    if condition_type == 'percentile' and percentile is None:
+        raise HTTPException(status_code=400, detail="percentile 조건에는 percentile 값이 필요합니다")
+
+
 @router.get("")
 async def list_alert_rules(
     server_id: int = None,
@@ -39,7 +49,7 @@ async def list_alert_rules(
                 text(f"""SELECT rule_id, rule_name, description, server_id, group_name,
                     metric_name, condition_op, warning_value, critical_value,
                     duration_sec, cooldown_sec, is_enabled, sort_order,
-                    created_at, updated_at
+                    created_at, updated_at, condition_type, window_sec, percentile
                     FROM alert_rules
                     WHERE {where}
                     ORDER BY sort_order, rule_name"""),
@@ -64,7 +74,10 @@ async def list_alert_rules(
                 "is_enabled": bool(r[11]),
                 "sort_order": r[12],
                 "created_at": r[13],
-                "updated_at": r[14]
+                "updated_at": r[14],
+                "condition_type": r[15],
+                "window_sec": r[16],
+                "percentile": r[17]
             })
 
         return rules
@@ -81,7 +94,7 @@ async def get_alert_rule(rule_id: int):
                 text("""SELECT rule_id, rule_name, description, server_id, group_name,
                     metric_name, condition_op, warning_value, critical_value,
                     duration_sec, cooldown_sec, is_enabled, sort_order,
-                    created_at, updated_at
+                    created_at, updated_at, condition_type, window_sec, percentile
                     FROM alert_rules WHERE rule_id=:rid"""),
                 {"rid": rule_id}
             )
@@ -105,7 +118,10 @@ async def get_alert_rule(rule_id: int):
             "is_enabled": bool(r[11]),
             "sort_order": r[12],
             "created_at": r[13],
-            "updated_at": r[14]
+            "updated_at": r[14],
+            "condition_type": r[15],
+            "window_sec": r[16],
+            "percentile": r[17]
         }
     except HTTPException:
         raise
@@ -117,6 +133,7 @@ async def get_alert_rule(rule_id: int):
 async def create_alert_rule(request: AlertRuleCreate):
     """알림 규칙 생성"""
     try:
+        _check_condition(request.condition_type, request.window_sec, request.percentile)
         async with async_session() as session:
             # 동일 이름 규칙 중복 체크
             existing = await session.execute(
@@ -126,12 +143,14 @@ async def create_alert_rule(request: AlertRuleCreate):
             if existing.fetchone():
                 raise HTTPException(status_code=400, detail="동일한 이름의 규칙이 이미 존재합니다")
 
-            await session.execute(
+            result = await db_writer.execute(
                 text("""INSERT INTO alert_rules
                     (rule_name, description, server_id, group_name,
                      metric_name, condition_op, warning_value, critical_value,
-                     duration_sec, cooldown_sec, is_enabled, sort_order)
-                    VALUES (:rn, :desc, :sid, :gn, :mn, :co, :wv, :cv, :ds, :cs, :ie, :so)"""),
+                     duration_sec, cooldown_sec, is_enabled, sort_order,
+                     condition_type, window_sec, percentile)
+                    VALUES (:rn, :desc, :sid, :gn, :mn, :co, :wv, :cv, :ds, :cs, :ie, :so,
+                            :ct, :ws, :pc)"""),
                 {
                     "rn": request.rule_name,
                     "desc": request.description,
@@ -144,12 +163,14 @@ async def create_alert_rule(request: AlertRuleCreate):
                     "ds": request.duration_sec,
                     "cs": request.cooldown_sec,
                     "ie": 1 if request.is_enabled else 0,
-                    "so": request.sort_order
+                    "so": request.sort_order,
+                    "ct": request.condition_type,
+                    "ws": request.window_sec,
+                    "pc": request.percentile
                 }
             )
-            await session.commit()
-            result = await session.execute(text("SELECT last_insert_rowid()"))
-            rule_id = result.scalar()
+            rule_id = result.lastrowid
+        change_tracker.bump('rules')
 
         return await get_alert_rule(rule_id)
     except HTTPException:
@@ -187,6 +208,12 @@ async def update_alert_rule(rule_id: int, request: AlertRuleUpdate):
             updates["is_enabled"] = 1 if request.is_enabled else 0
         if request.sort_order is not None:
             updates["sort_order"] = request.sort_order
+        if request.condition_type is not None:
+            updates["condition_type"] = request.condition_type
+        if request.window_sec is not None:
+            updates["window_sec"] = request.window_sec
+        if request.percentile is not None:
+            updates["percentile"] = request.percentile
 
         if not updates:
             raise HTTPException(status_code=400, detail="변경할 항목이 없습니다")
@@ -194,22 +221,28 @@ async def update_alert_rule(rule_id: int, request: AlertRuleUpdate):
         async with async_session() as session:
             # 규칙 존재 여부 확인
             existing = await session.execute(
-                text("SELECT rule_id FROM alert_rules WHERE rule_id=:rid"),
+                text("SELECT condition_type, window_sec, percentile FROM alert_rules WHERE rule_id=:rid"),
                 {"rid": rule_id}
             )
-            if not existing.fetchone():
+            current = existing.fetchone()
+            if not current:
                 raise HTTPException(status_code=404, detail="알림 규칙을 찾을 수 없습니다")
+            _check_condition(
+                updates.get("condition_type", current[0]),
+                updates.get("window_sec", current[1]),
+                updates.get("percentile", current[2])
+            )
 
             set_clause = ", ".join(f"{k}=:{k}" for k in updates)
             updates["rid"] = rule_id
 
-            await session.execute(
+            await db_writer.execute(
                 text(f"""UPDATE alert_rules
                      SET {set_clause}, updated_at=datetime('now','localtime')
                      WHERE rule_id=:rid"""),
                 updates
             )
-            await session.commit()
+        change_tracker.bump('rules')
 
         return await get_alert_rule(rule_id)
     except HTTPException:
@@ -230,11 +263,11 @@ async def delete_alert_rule(rule_id: int):
             if not existing.fetchone():
                 raise HTTPException(status_code=404, detail="알림 규칙을 찾을 수 없습니다")
 
-            await session.execute(
+            await db_writer.execute(
                 text("DELETE FROM alert_rules WHERE rule_id=:rid"),
                 {"rid": rule_id}
             )
-            await session.commit()
+        change_tracker.bump('rules')
 
         return MessageResponse(message="알림 규칙이 삭제되었습니다")
     except HTTPException:
@@ -252,25 +285,30 @@ async def reset_default_rules():
             ('메모리 부족', None, None, 'mem_usage_pct', '>=', 80, 95, 60, 300),
             ('디스크 부족', None, None, 'disk_usage_pct', '>=', 80, 95, 0, 300),
             ('수집 실패', None, None, 'collect_timeout', '>=', 15, 60, 0, 300),
+            ('에러 로그 급증', None, None, 'error_log_rate', '>=', 10, 50, 0, 300),
         ]
 
-        async with async_session() as session:
+        async def reset(conn):
             # 기존 규칙 삭제
-            await session.execute(text("DELETE FROM alert_rules"))
+            await conn.execute(text("DELETE FROM alert_rules"))
 
             # 기본 규칙 재생성
-            for r in default_rules:
-                await session.execute(
-                    text("""INSERT INTO alert_rules
-                        (rule_name, server_id, group_name, metric_name, condition_op,
-                         warning_value, critical_value, duration_sec, cooldown_sec)
-                        VALUES (:rn, :sid, :gn, :mn, :co, :wv, :cv, :ds, :cs)"""),
+            await conn.execute(
+                text("""INSERT INTO alert_rules
+                    (rule_name, server_id, group_name, metric_name, condition_op,
+                     warning_value, critical_value, duration_sec, cooldown_sec)
+                    VALUES (:rn, :sid, :gn, :mn, :co, :wv, :cv, :ds, :cs)"""),
+                [
                     {
                         "rn": r[0], "sid": r[1], "gn": r[2], "mn": r[3], "co": r[4],
                         "wv": r[5], "cv": r[6], "ds": r[7], "cs": r[8]
                     }
-                )
-            await session.commit()
+                    for r in default_rules
+                ]
+            )
+
+        await db_writer.run(reset)
+        change_tracker.bump('rules')
 
         return MessageResponse(message="기본 알림 규칙으로 초기화되었습니다")
     except Exception as e:
@@ -1,23 +1,54 @@
 """알림 이력 API 라우터"""
-from fastapi import APIRouter, HTTPException, Query
+import base64
+from datetime import datetime
+from fastapi import APIRouter, HTTPException, Query, Request, Response
 from sqlalchemy import text
+from backend.config import ALERT_APPROX_COUNT_CAP
+from backend.core.alert_grouper import alert_grouper
+from backend.core.http_cache import change_tracker, validators_for
 from backend.db.database import async_session
+from backend.db.incidents import close_resolved_incidents
+from backend.db.latest import refresh_active_alerts
+from backend.db.writer import db_writer
 from backend.db.schemas import ActiveAlert, PaginatedResponse, MessageResponse
 
 router = APIRouter(prefix="/api/v1/alerts", tags=["alerts"])
 
 
+def _encode_cursor(created_at: str, alert_id: int) -> str:
+    return base64.urlsafe_b64encode(f"{created_at}|{alert_id}".encode('utf-8')).decode('ascii')
+
+
+def _decode_cursor(cursor: str) -> tuple[str, int]:
+    created_at, alert_id = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8').rsplit('|', 1)
+    return created_at, int(alert_id)
+
+
 @router.get("")
 async def list_alerts(
+    request: Request,
+    response: Response,
     severity: str = None,
     server_id: int = None,
     acknowledged: int = Query(None, description="0=미확인, 1=확인"),
     date_from: str = Query(None, alias="from"),
     date_to: str = Query(None, alias="to"),
     page: int = Query(1, ge=1),
-    size: int = Query(50, ge=1, le=200)
+    size: int = Query(50, ge=1, le=200),
+    cursor: str = Query(None, description="이전 응답의 next_cursor (지정 시 page 무시)"),
+    count: str = Query("exact", description="exact|approx|none (전체 건수 계산 방식)")
 ):
-    """알림 이력 조회 (필터/페이징)"""
+    """알림 이력 조회 (필터/페이징)
+
+    (created_at, alert_id) 내림차순이며, cursor 를 넘기면 OFFSET 없이 그 다음 행부터 읽는다.
+    count=approx 는 필터가 없으면 alert_id 범위로, 있으면 ALERT_APPROX_COUNT_CAP 건까지만 센다.
+    """
+    if count not in ("exact", "approx", "none"):
+        raise HTTPException(status_code=400, detail="count는 exact, approx, none 중 하나여야 합니다")
+    # duration_seconds 가 '지금' 기준이므로 ETag 는 1분 단위로도 바뀜
+    validators = validators_for(request, 'alerts', 'servers', time_slot_sec=60)
+    if validators.matches(request):
+        return validators.not_modified()
     try:
         conditions = []
         params = {}
@@ -39,15 +70,41 @@ async def list_alerts(
             params["dt"] = date_to
 
         where = " AND ".join(conditions) if conditions else "1=1"
-        offset = (page - 1) * size
+        page_where = where
         params["limit"] = size
-        params["offset"] = offset
+        params["offset"] = 0
+        if cursor:
+            try:
+                params["cc"], params["ci"] = _decode_cursor(cursor)
+            except (ValueError, UnicodeDecodeError):
+                raise HTTPException(status_code=400, detail="잘못된 cursor 입니다")
+            page_where += " AND (a.created_at, a.alert_id) < (:cc, :ci)"
+        else:
+            params["offset"] = (page - 1) * size
 
         async with async_session() as session:
-            count_result = await session.execute(
-                text(f"SELECT COUNT(*) FROM alert_history a WHERE {where}"), params
-            )
-            total = count_result.scalar()
+            total = None
+            approximate = False
+            if count == "exact":
+                count_result = await session.execute(
+                    text(f"SELECT COUNT(*) FROM alert_history a WHERE {where}"), params
+                )
+                total = count_result.scalar()
+            elif count == "approx" and not conditions:
+                # 보존 정리는 오래된 알림부터 지우므로 alert_id 범위가 건수에 근접
+                count_result = await session.execute(
+                    text("SELECT COALESCE(MAX(alert_id) - MIN(alert_id) + 1, 0) FROM alert_history")
+                )
+                total = count_result.scalar()
+                approximate = True
+            elif count == "approx":
+                count_result = await session.execute(
+                    text(f"""SELECT COUNT(*) FROM (
+                        SELECT 1 FROM alert_history a WHERE {where} LIMIT :cap)"""),
+                    {**params, "cap": ALERT_APPROX_COUNT_CAP}
+                )
+                total = count_result.scalar()
+                approximate = total >= ALERT_APPROX_COUNT_CAP
 
             result = await session.execute(
                 text(f"""SELECT a.alert_id, a.server_id, s.display_name,
@@ -60,8 +117,8 @@ async def list_alerts(
                     END as duration_seconds
                     FROM alert_history a
                     JOIN servers s ON a.server_id=s.server_id
-                    WHERE {where}
-                    ORDER BY a.created_at DESC
+                    WHERE {page_where}
+                    ORDER BY a.created_at DESC, a.alert_id DESC
                     LIMIT :limit OFFSET :offset"""),
                 params
             )
@@ -87,14 +144,22 @@ async def list_alerts(
                 "duration_seconds": r[14] or 0
             })
 
-        return {"items": items, "total": total, "page": page, "size": size}
+        next_cursor = _encode_cursor(rows[-1][13], rows[-1][0]) if len(rows) == size else None
+        validators.apply(response)
+        return {"items": items, "total": total, "total_approximate": approximate,
+                "page": page, "size": size, "next_cursor": next_cursor}
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"알림 이력 조회 실패: {str(e)}")
 
 
 @router.get("/active", response_model=list[ActiveAlert])
-async def get_active_alerts():
+async def get_active_alerts(request: Request, response: Response):
     """활성(미해결) 알림 목록"""
+    validators = validators_for(request, 'alerts', 'servers', time_slot_sec=60)
+    if validators.matches(request):
+        return validators.not_modified()
     try:
         async with async_session() as session:
             result = await session.execute(
@@ -126,11 +191,102 @@ async def get_active_alerts():
                 created_at=r[9],
                 duration_seconds=r[10] or 0
             ))
+        validators.apply(response)
         return alerts
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"활성 알림 조회 실패: {str(e)}")
 
 
+def _incident_dict(r) -> dict:
+    return {
+        "incident_id": r[0],
+        "group_name": r[1],
+        "metric_name": r[2],
+        "rule_id": r[3],
+        "severity": r[4],
+        "title": r[5],
+        "alert_count": r[6],
+        "server_count": r[7],
+        "created_at": r[8],
+        "resolved_at": r[9],
+    }
+
+
+_INCIDENT_COLUMNS = """incident_id, group_name, metric_name, rule_id, severity, title,
+    alert_count, server_count, created_at, resolved_at"""
+
+
+@router.get("/incidents")
+async def list_incidents(
+    request: Request,
+    response: Response,
+    active: bool = Query(False, description="미해결 인시던트만"),
+    limit: int = Query(50, ge=1, le=200)
+):
+    """묶음 알림(인시던트) 목록 (최신순)"""
+    validators = validators_for(request, 'alerts')
+    if validators.matches(request):
+        return validators.not_modified()
+    try:
+        where = "WHERE resolved_at IS NULL" if active else ""
+        async with async_session() as session:
+            result = await session.execute(
+                text(f"""SELECT {_INCIDENT_COLUMNS} FROM alert_incidents {where}
+                     ORDER BY created_at DESC, incident_id DESC LIMIT :limit"""),
+                {"limit": limit}
+            )
+            items = [_incident_dict(r) for r in result.fetchall()]
+        validators.apply(response)
+        return items
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"인시던트 조회 실패: {str(e)}")
+
+
+@router.get("/incidents/{incident_id}")
+async def get_incident(incident_id: int):
+    """인시던트 상세 (묶인 서버별 알림 포함)"""
+    try:
+        async with async_session() as session:
+            result = await session.execute(
+                text(f"SELECT {_INCIDENT_COLUMNS} FROM alert_incidents WHERE incident_id=:iid"),
+                {"iid": incident_id}
+            )
+            row = result.fetchone()
+            if not row:
+                raise HTTPException(status_code=404, detail="인시던트를 찾을 수 없습니다")
+            result = await session.execute(
+                text("""SELECT a.alert_id, a.server_id, s.display_name, a.severity,
+                    a.metric_name, a.metric_value, a.threshold_value, a.message,
+                    a.acknowledged, a.created_at, a.resolved_at
+                    FROM alert_history a
+                    LEFT JOIN servers s ON a.server_id=s.server_id
+                    WHERE a.incident_id=:iid
+                    ORDER BY a.alert_id"""),
+                {"iid": incident_id}
+            )
+            alerts = [{
+                "alert_id": r[0],
+                "server_id": r[1],
+                "server_name": r[2] or f"Server {r[1]}",
+                "severity": r[3],
+                "metric_name": r[4],
+                "metric_value": r[5],
+                "threshold_value": r[6],
+                "message": r[7],
+                "acknowledged": bool(r[8]),
+                "created_at": r[9],
+                "resolved_at": r[10],
+            } for r in result.fetchall()]
+
+        incident = _incident_dict(row)
+        incident["alerts"] = alerts
+        return incident
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"인시던트 조회 실패: {str(e)}")
+
+
 @router.put("/{alert_id}/acknowledge", response_model=MessageResponse)
 async def acknowledge_alert(alert_id: int, username: str = "admin"):
     """알림 확인 처리"""
@@ -146,14 +302,14 @@ async def acknowledge_alert(alert_id: int, username: str = "admin"):
             if row[1]:
                 raise HTTPException(status_code=400, detail="이미 확인된 알림입니다")
 
-            await session.execute(
+            await db_writer.execute(
                 text("""UPDATE alert_history
                      SET acknowledged=1, acknowledged_by=:by,
                          acknowledged_at=datetime('now','localtime')
                      WHERE alert_id=:aid"""),
                 {"aid": alert_id, "by": username}
             )
-            await session.commit()
+            change_tracker.bump('alerts')
 
         return MessageResponse(message="알림이 확인 처리되었습니다")
     except HTTPException:
@@ -168,7 +324,7 @@ async def resolve_alert(alert_id: int):
     try:
         async with async_session() as session:
             result = await session.execute(
-                text("SELECT alert_id, resolved_at FROM alert_history WHERE alert_id=:aid"),
+                text("SELECT alert_id, resolved_at, server_id FROM alert_history WHERE alert_id=:aid"),
                 {"aid": alert_id}
             )
             row = result.fetchone()
@@ -177,13 +333,21 @@ async def resolve_alert(alert_id: int):
             if row[1]:
                 raise HTTPException(status_code=400, detail="이미 해결된 알림입니다")
 
-            await session.execute(
-                text("""UPDATE alert_history
-                     SET resolved_at=datetime('now','localtime')
-                     WHERE alert_id=:aid"""),
-                {"aid": alert_id}
-            )
-            await session.commit()
+            now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+            async def resolve(conn):
+                await conn.execute(
+                    text("""UPDATE alert_history
+                         SET resolved_at=:ra
+                         WHERE alert_id=:aid"""),
+                    {"aid": alert_id, "ra": now}
+                )
+                await refresh_active_alerts(conn, row[2])
+                await close_resolved_incidents(conn, [alert_id])
+
+            await db_writer.run(resolve)
+            change_tracker.bump('alerts')
+            alert_grouper.mark_resolved([alert_id], now)
 
         return MessageResponse(message="알림이 해결 처리되었습니다")
     except HTTPException:
@@ -206,14 +370,14 @@ async def acknowledge_all_alerts(username: str = "admin"):
             if count == 0:
                 return MessageResponse(message="확인할 알림이 없습니다")
 
-            await session.execute(
+            await db_writer.execute(
                 text("""UPDATE alert_history
                      SET acknowledged=1, acknowledged_by=:by,
                          acknowledged_at=datetime('now','localtime')
                      WHERE resolved_at IS NULL AND acknowledged=0"""),
                 {"by": username}
             )
-            await session.commit()
+            change_tracker.bump('alerts')
 
         return MessageResponse(message=f"{count}건의 알림이 일괄 확인 처리되었습니다")
     except Exception as e:
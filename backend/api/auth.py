@@ -7,6 +7,7 @@ from passlib.hash import bcrypt
 from sqlalchemy import text
 from backend.config import SECRET_KEY, ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES
 from backend.db.database import async_session, get_db, AsyncSession
+from backend.db.writer import db_writer
 from backend.db.schemas import LoginRequest, TokenResponse, UserInfo
 
 router = APIRouter(prefix="/api/v1/auth", tags=["auth"])
@@ -74,12 +75,10 @@ async def login(request: LoginRequest):
         raise HTTPException(status_code=401, detail="아이디 또는 비밀번호가 올바르지 않습니다")
 
     # 마지막 로그인 시간 업데이트
-    async with async_session() as session:
-        await session.execute(
-            text("UPDATE users SET last_login=datetime('now','localtime') WHERE user_id=:uid"),
-            {"uid": user[0]}
-        )
-        await session.commit()
+    await db_writer.execute(
+        text("UPDATE users SET last_login=datetime('now','localtime') WHERE user_id=:uid"),
+        {"uid": user[0]}
+    )
 
     token = create_access_token({"sub": user[1]})
     return TokenResponse(access_token=token)
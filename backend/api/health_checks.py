@@ -2,6 +2,7 @@
 from fastapi import APIRouter, HTTPException, Query
 from sqlalchemy import text
 from backend.db.database import async_session
+from backend.db.writer import db_writer
 from backend.db.schemas import HealthCheckCreate, HealthCheckUpdate, MessageResponse
 from backend.core.health_checker import execute_health_check
 
@@ -83,7 +84,7 @@ async def create_health_check(server_id: int, request: HealthCheckCreate):
             if not srv.fetchone():
                 raise HTTPException(status_code=404, detail="서버를 찾을 수 없습니다")
 
-            await session.execute(
+            result = await db_writer.execute(
                 text("""INSERT INTO health_checks
                     (server_id, check_type, check_name, target,
                      interval_sec, timeout_sec, expected_status, is_enabled)
@@ -99,9 +100,7 @@ async def create_health_check(server_id: int, request: HealthCheckCreate):
                     "ie": 1 if request.is_enabled else 0
                 }
             )
-            await session.commit()
-            result = await session.execute(text("SELECT last_insert_rowid()"))
-            check_id = result.scalar()
+            check_id = result.lastrowid
 
         return await _get_health_check(check_id)
     except HTTPException:
@@ -150,11 +149,10 @@ async def update_health_check(check_id: int, request: HealthCheckUpdate):
             set_clause = ", ".join(f"{k}=:{k}" for k in updates)
             updates["cid"] = check_id
 
-            await session.execute(
+            await db_writer.execute(
                 text(f"UPDATE health_checks SET {set_clause} WHERE check_id=:cid"),
                 updates
             )
-            await session.commit()
 
         return await _get_health_check(check_id)
     except HTTPException:
@@ -175,16 +173,18 @@ async def delete_health_check(check_id: int):
             if not existing.fetchone():
                 raise HTTPException(status_code=404, detail="헬스체크를 찾을 수 없습니다")
 
+        async def delete_check(conn):
             # 관련 결과도 삭제
-            await session.execute(
+            await conn.execute(
                 text("DELETE FROM health_check_results WHERE check_id=:cid"),
                 {"cid": check_id}
             )
-            await session.execute(
+            await conn.execute(
                 text("DELETE FROM health_checks WHERE check_id=:cid"),
                 {"cid": check_id}
             )
-            await session.commit()
+
+        await db_writer.run(delete_check)
 
         return MessageResponse(message="헬스체크가 삭제되었습니다")
     except HTTPException:
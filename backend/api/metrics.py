@@ -1,12 +1,73 @@
 """메트릭 및 프로세스/서비스/로그 API 라우터"""
+import csv
+import io
 import json
-from fastapi import APIRouter, HTTPException, Query
+from datetime import datetime
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import Response, StreamingResponse
 from sqlalchemy import text
+from backend.core.collector import collector_engine
+from backend.core.columnar import BINARY_MEDIA_TYPE, encode_binary, negotiate_encoding, to_columns
+from backend.core.downsample import downsample_rows
+from backend.core.http_cache import Validators, validators_for
+from backend.core.tsblock import parse_time_bound, to_epoch
+from backend.db.archive import fetch_raw_metrics
+from backend.db.blocks import fetch_5min_metrics, fetch_latest_block_rows
+from backend.config import EXPORT_FETCH_SIZE
 from backend.db.database import async_session
-from backend.db.schemas import MetricLatest, ServerLogEntry
+from backend.db.export import DEVICE_COLUMNS, export_columns, iter_device_rows, iter_metric_rows
+from backend.db.partitions import partition_view, partitions_for_range, union_source
+from backend.db.log_patterns import fetch_log_patterns
+from backend.db.log_rate import BUCKET_SEC, LOG_LEVELS, fetch_log_rate
+from backend.db.log_search import search_logs
+from backend.db.schemas import (
+    LogPatternEntry, LogSearchHit, LogSearchResponse, MetricLatest, ServerLogEntry
+)
 
 router = APIRouter(prefix="/api/v1/servers", tags=["metrics"])
 
+# 최신 메트릭 응답 컬럼 (MetricLatest 필드와 같은 이름)
+LATEST_COLUMNS = [
+    'server_id', 'collected_at',
+    'cpu_usage_pct', 'cpu_load_1m', 'cpu_load_5m', 'cpu_load_15m',
+    'mem_total_mb', 'mem_used_mb', 'mem_usage_pct',
+    'swap_total_mb', 'swap_used_mb',
+    'disk_json', 'disk_read_mbps', 'disk_write_mbps',
+    'net_json', 'net_connections', 'process_count', 'uptime_seconds',
+]
+
+# Raw 이력 응답 컬럼 (metrics_raw 컬럼 → 응답 키)
+RAW_HISTORY_COLUMNS = {
+    "collected_at": "time",
+    "cpu_usage_pct": "cpu",
+    "mem_usage_pct": "mem",
+    "disk_read_mbps": "disk_read",
+    "disk_write_mbps": "disk_write",
+    "net_connections": "net_connections",
+    "process_count": "process_count",
+}
+
+# 5분 집계 이력 응답 컬럼 (metrics_5min 컬럼 → 응답 키)
+FIVE_MIN_HISTORY_COLUMNS = {
+    "bucket_time": "time",
+    "cpu_avg": "cpu",
+    "cpu_max": "cpu_max",
+    "cpu_min": "cpu_min",
+    "mem_avg_pct": "mem",
+    "mem_max_pct": "mem_max_pct",
+    "disk_read_avg": "disk_read",
+    "disk_write_avg": "disk_write",
+    "net_in_avg": "net_in_avg",
+    "net_out_avg": "net_out_avg",
+    "sample_count": "sample_count",
+}
+
+# 내보내기 형식 → Content-Type
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
 
 @router.get("/{server_id}/metrics/latest", response_model=MetricLatest)
 async def get_latest_metrics(server_id: int):
@@ -21,59 +82,91 @@ async def get_latest_metrics(server_id: int):
             if not srv.fetchone():
                 raise HTTPException(status_code=404, detail="서버를 찾을 수 없습니다")
 
-            result = await session.execute(
-                text("""SELECT server_id, collected_at,
-                    cpu_usage_pct, cpu_load_1m, cpu_load_5m, cpu_load_15m,
-                    mem_total_mb, mem_used_mb, mem_usage_pct,
-                    swap_total_mb, swap_used_mb,
-                    disk_json, disk_read_mbps, disk_write_mbps,
-                    net_json, net_connections, process_count, uptime_seconds
-                    FROM metrics_raw
-                    WHERE server_id=:sid
-                    ORDER BY collected_at DESC LIMIT 1"""),
-                {"sid": server_id}
-            )
-            row = result.fetchone()
-
-        if not row:
+            # 수집기 링 버퍼에 있으면 DB 조회 없이 반환
+            latest = collector_engine.recent.latest(server_id)
+            if latest:
+                return MetricLatest(**latest)
+
+            # 최신 파티션부터 역순으로 조회 (대부분 오늘 파티션에서 종료)
+            latest = None
+            for partition in reversed(partitions_for_range('metrics_raw')):
+                result = await session.execute(
+                    text(f"""SELECT {', '.join(LATEST_COLUMNS)}
+                        FROM {partition}
+                        WHERE server_id=:sid
+                        ORDER BY collected_at DESC LIMIT 1"""),
+                    {"sid": server_id}
+                )
+                row = result.fetchone()
+                if row:
+                    latest = dict(zip(LATEST_COLUMNS, row))
+                    break
+
+        if latest is None:
+            # 행이 모두 블록으로 옮겨진 서버(블록 저장 모드)는 마지막 블록의 마지막 샘플
+            latest = (await fetch_latest_block_rows('raw', LATEST_COLUMNS, [server_id])).get(server_id)
+
+        if not latest:
             # 메트릭이 없으면 빈 응답
             return MetricLatest(server_id=server_id)
 
-        return MetricLatest(
-            server_id=row[0],
-            collected_at=row[1],
-            cpu_usage_pct=row[2],
-            cpu_load_1m=row[3],
-            cpu_load_5m=row[4],
-            cpu_load_15m=row[5],
-            mem_total_mb=row[6],
-            mem_used_mb=row[7],
-            mem_usage_pct=row[8],
-            swap_total_mb=row[9],
-            swap_used_mb=row[10],
-            disk_json=row[11],
-            disk_read_mbps=row[12],
-            disk_write_mbps=row[13],
-            net_json=row[14],
-            net_connections=row[15],
-            process_count=row[16],
-            uptime_seconds=row[17]
-        )
+        return MetricLatest(**latest)
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"최신 메트릭 조회 실패: {str(e)}")
 
 
+# 이력 계층별 ETag 주제 (서버 비활성화 시 404 로 바뀌므로 servers 포함)
+HISTORY_TOPICS = {
+    "raw": lambda sid: ("raw", f"raw:{sid}", "servers"),
+    "5min": lambda sid: ("5min", "servers"),
+    "hourly": lambda sid: ("hourly", "servers"),
+}
+
+
+def _history_response(server_id: int, interval: str, data: list[dict], response: Response,
+                      validators: Validators, max_points: int = None, encoding: str = "rows"):
+    """이력 응답 (total 은 다운샘플링 전 행 수, encoding 에 따라 행/컬럼/바이너리)"""
+    total = len(data)
+    data = downsample_rows(data, max_points)
+    meta = {"server_id": server_id, "interval": interval, "count": len(data), "total": total}
+    if encoding == "binary":
+        return validators.apply(
+            Response(encode_binary({"data": data}, meta), media_type=BINARY_MEDIA_TYPE)
+        )
+    validators.apply(response)
+    if encoding == "columns":
+        return {**meta, "columns": to_columns(data)}
+    return {**meta, "data": data}
+
+
 @router.get("/{server_id}/metrics/history")
 async def get_metrics_history(
+    request: Request,
+    response: Response,
     server_id: int,
     date_from: str = Query(None, alias="from"),
     date_to: str = Query(None, alias="to"),
-    interval: str = Query("5min", description="raw|5min|hourly")
+    interval: str = Query("5min", description="raw|5min|hourly"),
+    max_points: int = Query(None, ge=3, le=20000, description="LTTB 다운샘플링 최대 점 수"),
+    encoding: str = Query(None, description="rows|columns|binary (없으면 Accept 헤더 기준)")
 ):
-    """서버 메트릭 이력 조회"""
+    """서버 메트릭 이력 조회 (max_points 지정 시 차트 모양을 유지하며 점 수 축소)
+
+    해당 계층에 새 데이터가 없으면 If-None-Match / If-Modified-Since 에 304 로 응답한다.
+    """
     try:
+        encoding = negotiate_encoding(encoding, request.headers.get("accept"))
+        if encoding is None:
+            raise HTTPException(status_code=400, detail="encoding은 rows, columns, binary 중 하나여야 합니다")
+        if interval not in HISTORY_TOPICS:
+            raise HTTPException(status_code=400, detail="interval은 raw, 5min, hourly 중 하나여야 합니다")
+
+        validators = validators_for(request, *HISTORY_TOPICS[interval](server_id))
+        if validators.matches(request):
+            return validators.not_modified()
+
         async with async_session() as session:
             # 서버 존재 여부 확인
             srv = await session.execute(
@@ -83,9 +176,6 @@ async def get_metrics_history(
             if not srv.fetchone():
                 raise HTTPException(status_code=404, detail="서버를 찾을 수 없습니다")
 
-        if interval not in ("raw", "5min", "hourly"):
-            raise HTTPException(status_code=400, detail="interval은 raw, 5min, hourly 중 하나여야 합니다")
-
         params = {"sid": server_id}
         time_filter = ""
         if date_from:
@@ -96,27 +186,36 @@ async def get_metrics_history(
             params["dt"] = date_to
 
         if interval == "raw":
-            time_col = "collected_at"
-            query = f"""SELECT collected_at as time,
-                cpu_usage_pct as cpu, mem_usage_pct as mem,
-                disk_read_mbps as disk_read, disk_write_mbps as disk_write,
-                net_connections, process_count
-                FROM metrics_raw
-                WHERE server_id=:sid {time_filter.format(time_col=time_col)}
-                ORDER BY collected_at"""
-        elif interval == "5min":
-            time_col = "bucket_time"
-            query = f"""SELECT bucket_time as time,
-                cpu_avg as cpu, cpu_max, cpu_min,
-                mem_avg_pct as mem, mem_max_pct,
-                disk_read_avg as disk_read, disk_write_avg as disk_write,
-                net_in_avg, net_out_avg, sample_count
-                FROM metrics_5min
-                WHERE server_id=:sid {time_filter.format(time_col=time_col)}
-                ORDER BY bucket_time"""
-        else:  # hourly
-            time_col = "bucket_time"
-            query = f"""SELECT bucket_time as time,
+            # 최근 구간은 수집기 링 버퍼, 그 외는 일별 파티션 + 블록 + 압축 아카이브를 합쳐 조회
+            rows = collector_engine.recent.window(
+                server_id, date_from, date_to, list(RAW_HISTORY_COLUMNS)
+            )
+            if rows is None:
+                rows = await fetch_raw_metrics(
+                    list(RAW_HISTORY_COLUMNS), [server_id], date_from, date_to
+                )
+            data = [
+                {alias: row[col] for col, alias in RAW_HISTORY_COLUMNS.items()}
+                for row in rows
+            ]
+            return _history_response(server_id, interval, data, response, validators,
+                                     max_points, encoding)
+
+        if interval == "5min":
+            # metrics_5min 행 + 블록 저장분을 합쳐 조회
+            rows = await fetch_5min_metrics(
+                list(FIVE_MIN_HISTORY_COLUMNS), [server_id], date_from, date_to
+            )
+            data = [
+                {alias: row[col] for col, alias in FIVE_MIN_HISTORY_COLUMNS.items()}
+                for row in rows
+            ]
+            return _history_response(server_id, interval, data, response, validators,
+                                     max_points, encoding)
+
+        # hourly
+        time_col = "bucket_time"
+        query = f"""SELECT bucket_time as time,
                 cpu_avg as cpu, cpu_max, cpu_p95,
                 mem_avg_pct as mem, mem_max_pct,
                 disk_read_avg as disk_read, disk_write_avg as disk_write,
@@ -138,13 +237,83 @@ async def get_metrics_history(
                 item[col] = row[idx]
             data.append(item)
 
-        return {"server_id": server_id, "interval": interval, "count": len(data), "data": data}
+        return _history_response(server_id, interval, data, response, validators,
+                                 max_points, encoding)
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"메트릭 이력 조회 실패: {str(e)}")
 
 
+async def _encode_export(rows, columns: list[str], fmt: str):
+    """행 스트림을 NDJSON/CSV 텍스트 청크로 변환 (EXPORT_FETCH_SIZE 행마다 전송)"""
+    buf = io.StringIO()
+    writer = csv.writer(buf, lineterminator='\n')
+    if fmt == "csv":
+        writer.writerow(columns)
+    n = 0
+    async for row in rows:
+        if fmt == "csv":
+            writer.writerow([row.get(c) for c in columns])
+        else:
+            buf.write(json.dumps({c: row.get(c) for c in columns}, ensure_ascii=False))
+            buf.write('\n')
+        n += 1
+        if n % EXPORT_FETCH_SIZE == 0:
+            yield buf.getvalue()
+            buf.seek(0)
+            buf.truncate()
+    if buf.tell():
+        yield buf.getvalue()
+
+
+@router.get("/{server_id}/metrics/export")
+async def export_metrics_history(
+    server_id: int,
+    date_from: str = Query(None, alias="from"),
+    date_to: str = Query(None, alias="to"),
+    interval: str = Query("raw", description="raw|5min|hourly"),
+    breakdown: str = Query(None, description="disk|net (Raw 디스크/인터페이스별 행)"),
+    fmt: str = Query("ndjson", alias="format", description="ndjson|csv")
+):
+    """서버 메트릭 이력 스트리밍 내보내기 (구간 길이와 무관하게 일정한 메모리로 전송)"""
+    try:
+        async with async_session() as session:
+            srv = await session.execute(
+                text("SELECT server_id FROM servers WHERE server_id=:sid AND is_active=1"),
+                {"sid": server_id}
+            )
+            if not srv.fetchone():
+                raise HTTPException(status_code=404, detail="서버를 찾을 수 없습니다")
+
+        if interval not in ("raw", "5min", "hourly"):
+            raise HTTPException(status_code=400, detail="interval은 raw, 5min, hourly 중 하나여야 합니다")
+        if fmt not in EXPORT_MEDIA_TYPES:
+            raise HTTPException(status_code=400, detail="format은 ndjson, csv 중 하나여야 합니다")
+        if breakdown is not None:
+            if breakdown not in DEVICE_COLUMNS:
+                raise HTTPException(status_code=400, detail="breakdown은 disk, net 중 하나여야 합니다")
+            if interval != "raw":
+                raise HTTPException(status_code=400, detail="디스크/인터페이스별 내보내기는 raw 만 지원합니다")
+            columns = DEVICE_COLUMNS[breakdown]
+            rows = iter_device_rows(breakdown, server_id, date_from, date_to)
+            name = f"server{server_id}_{breakdown}"
+        else:
+            columns = export_columns(interval)
+            rows = iter_metric_rows(interval, server_id, date_from, date_to)
+            name = f"server{server_id}_{interval}"
+
+        return StreamingResponse(
+            _encode_export(rows, columns, fmt),
+            media_type=EXPORT_MEDIA_TYPES[fmt],
+            headers={"Content-Disposition": f'attachment; filename="{name}.{fmt}"'}
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"메트릭 내보내기 실패: {str(e)}")
+
+
 @router.get("/{server_id}/processes")
 async def get_processes(
     server_id: int,
@@ -259,13 +428,54 @@ async def get_services(
         raise HTTPException(status_code=500, detail=f"서비스 목록 조회 실패: {str(e)}")
 
 
+def _log_hit(hit: dict) -> dict:
+    """검색 결과 행 (NULL 텍스트 컬럼은 빈 문자열)"""
+    return {**hit, **{k: hit[k] or '' for k in ("log_source", "log_level", "message")}}
+
+
+@router.get("/logs/search", response_model=LogSearchResponse)
+async def search_all_logs(
+    q: str = Query(..., min_length=1, description="검색어 (공백 구분 단어 모두 포함, 끝 * 는 접두어)"),
+    ids: str = Query(None, description="서버 ID 목록 (쉼표 구분, 없으면 전체 서버)"),
+    level: str = Query(None, description="error|warning|info|debug"),
+    date_from: str = Query(None, alias="from"),
+    date_to: str = Query(None, alias="to"),
+    limit: int = Query(100, ge=1, le=500)
+):
+    """전체(또는 지정) 서버 로그 전문 검색 (관련도 순, 발췌문 포함)"""
+    try:
+        server_ids = [int(x) for x in ids.split(',') if x.strip()] if ids else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="ids는 쉼표로 구분한 서버 ID여야 합니다")
+    try:
+        hits = await search_logs(q, server_ids, level, date_from, date_to, limit)
+        names = {}
+        if hits:
+            async with async_session() as session:
+                result = await session.execute(
+                    text(f"""SELECT server_id, display_name FROM servers
+                         WHERE server_id IN ({','.join(str(s) for s in {h['server_id'] for h in hits})})""")
+                )
+                names = {r[0]: r[1] for r in result.fetchall()}
+
+        items = [
+            LogSearchHit(**_log_hit(h),
+                         server_name=names.get(h["server_id"]) or f"Server {h['server_id']}")
+            for h in hits
+        ]
+        return LogSearchResponse(query=q, count=len(items), items=items)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"로그 검색 실패: {str(e)}")
+
+
 @router.get("/{server_id}/logs", response_model=list[ServerLogEntry])
 async def get_logs(
     server_id: int,
     level: str = Query(None, description="error|warning|info|debug"),
     date_from: str = Query(None, alias="from"),
     date_to: str = Query(None, alias="to"),
-    limit: int = Query(200, ge=1, le=1000)
+    limit: int = Query(200, ge=1, le=1000),
+    q: str = Query(None, description="전문 검색어 (지정 시 관련도 순, snippet 포함)")
 ):
     """서버 로그 조회"""
     try:
@@ -277,6 +487,11 @@ async def get_logs(
             if not srv.fetchone():
                 raise HTTPException(status_code=404, detail="서버를 찾을 수 없습니다")
 
+        if q and q.strip():
+            hits = await search_logs(q, [server_id], level, date_from, date_to, limit)
+            return [ServerLogEntry(**_log_hit(h)) for h in hits]
+
+        async with async_session() as session:
             conditions = ["server_id=:sid"]
             params: dict = {"sid": server_id, "lim": limit}
 
@@ -292,11 +507,16 @@ async def get_logs(
 
             where = " AND ".join(conditions)
 
+            # 로그는 발생 이후에 수집되므로 하한(from)으로만 파티션을 좁힌다
+            # 조회 뷰: 템플릿화된 로그도 원문 message 로 복원
+            source = union_source(
+                'server_logs',
+                [partition_view('server_logs', t) for t in partitions_for_range('server_logs', date_from)],
+                "id, server_id, log_source, log_level, message, event_id, occurred_at",
+                where
+            )
             result = await session.execute(
-                text(f"""SELECT id, server_id, log_source, log_level,
-                    message, event_id, occurred_at
-                    FROM server_logs
-                    WHERE {where}
+                text(f"""SELECT * FROM {source}
                     ORDER BY occurred_at DESC
                     LIMIT :lim"""),
                 params
@@ -320,3 +540,78 @@ async def get_logs(
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"로그 조회 실패: {str(e)}")
+
+
+@router.get("/{server_id}/logs/rate")
+async def get_log_rate(
+    request: Request,
+    response: Response,
+    server_id: int,
+    date_from: str = Query(None, alias="from"),
+    date_to: str = Query(None, alias="to"),
+    group_by: str = Query("level", description="level|source"),
+    level: str = Query(None, description="정규화 수준 필터: " + "|".join(LOG_LEVELS))
+):
+    """로그 건수 5분 이력 (수준별 또는 소스별, 기본 구간은 최근 24시간)"""
+    if group_by not in ("level", "source"):
+        raise HTTPException(status_code=400, detail="group_by는 level, source 중 하나여야 합니다")
+    if level and level not in LOG_LEVELS:
+        raise HTTPException(status_code=400, detail=f"level은 {', '.join(LOG_LEVELS)} 중 하나여야 합니다")
+
+    hi = parse_time_bound(date_to)
+    if hi is None:
+        hi = to_epoch(datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+    lo = parse_time_bound(date_from)
+    if lo is None:
+        lo = hi - 86400
+    if lo > hi:
+        raise HTTPException(status_code=400, detail="조회 시작 시각이 종료 시각보다 늦습니다")
+
+    # 구간이 '지금' 기준이면 격자가 한 칸씩 이동하므로 버킷 단위로도 ETag 갱신
+    relative = not (date_from and date_to)
+    validators = validators_for(request, 'lograte', time_slot_sec=BUCKET_SEC if relative else None)
+    if validators.matches(request):
+        return validators.not_modified()
+
+    try:
+        async with async_session() as session:
+            srv = await session.execute(
+                text("SELECT server_id FROM servers WHERE server_id=:sid AND is_active=1"),
+                {"sid": server_id}
+            )
+            if not srv.fetchone():
+                raise HTTPException(status_code=404, detail="서버를 찾을 수 없습니다")
+
+        result = await fetch_log_rate(server_id, lo, hi, group_by, level)
+        validators.apply(response)
+        return {"server_id": server_id, "group_by": group_by, "step": BUCKET_SEC, **result}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"로그 건수 이력 조회 실패: {str(e)}")
+
+
+@router.get("/{server_id}/logs/patterns", response_model=list[LogPatternEntry])
+async def get_log_patterns(
+    server_id: int,
+    level: str = Query(None, description="error|warning|info|debug"),
+    date_from: str = Query(None, alias="from"),
+    date_to: str = Query(None, alias="to"),
+    limit: int = Query(100, ge=1, le=1000)
+):
+    """서버 로그 패턴별 건수 (같은 템플릿의 로그를 묶어 많은 순)"""
+    try:
+        async with async_session() as session:
+            srv = await session.execute(
+                text("SELECT server_id FROM servers WHERE server_id=:sid AND is_active=1"),
+                {"sid": server_id}
+            )
+            if not srv.fetchone():
+                raise HTTPException(status_code=404, detail="서버를 찾을 수 없습니다")
+
+        patterns = await fetch_log_patterns([server_id], level, date_from, date_to, limit)
+        return [LogPatternEntry(**p) for p in patterns]
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"로그 패턴 조회 실패: {str(e)}")
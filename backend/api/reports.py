@@ -1,9 +1,11 @@
 """리포트 API 라우터"""
 import os
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, Request, Response
 from fastapi.responses import FileResponse
 from sqlalchemy import text
+from backend.core.http_cache import change_tracker, validators_for
 from backend.db.database import async_session
+from backend.db.writer import db_writer
 from backend.db.schemas import GenerateReportRequest, MessageResponse
 from backend.core.report_gen import generate_report
 
@@ -61,10 +63,15 @@ async def create_report(request: GenerateReportRequest):
 
 @router.get("")
 async def list_reports(
+    request: Request,
+    response: Response,
     page: int = Query(1, ge=1),
     size: int = Query(20, ge=1, le=100)
 ):
     """리포트 이력 조회"""
+    validators = validators_for(request, 'reports')
+    if validators.matches(request):
+        return validators.not_modified()
     try:
         offset = (page - 1) * size
         params = {"limit": size, "offset": offset}
@@ -104,6 +111,7 @@ async def list_reports(
                 "file_exists": file_exists
             })
 
+        validators.apply(response)
         return {"items": reports, "total": total, "page": page, "size": size}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"리포트 목록 조회 실패: {str(e)}")
@@ -163,12 +171,11 @@ async def delete_report(report_id: int):
                 pass  # 파일 삭제 실패는 무시
 
         # DB 레코드 삭제
-        async with async_session() as session:
-            await session.execute(
-                text("DELETE FROM report_history WHERE report_id=:rid"),
-                {"rid": report_id}
-            )
-            await session.commit()
+        await db_writer.execute(
+            text("DELETE FROM report_history WHERE report_id=:rid"),
+            {"rid": report_id}
+        )
+        change_tracker.bump('reports')
 
         return MessageResponse(message="리포트가 삭제되었습니다")
     except HTTPException:
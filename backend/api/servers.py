@@ -1,8 +1,12 @@
 """서버 관리 API 라우터"""
 import json
-from fastapi import APIRouter, HTTPException, Query
+from datetime import datetime
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import Response
 from sqlalchemy import text
+from backend.config import COMPARE_MAX_SERVERS
 from backend.db.database import async_session
+from backend.db.writer import db_writer
 from backend.db.schemas import (
     CreateServerRequest, UpdateServerRequest, ServerDetail,
     ServerSummary, ServerListResponse, TestConnectionRequest,
@@ -10,6 +14,12 @@ from backend.db.schemas import (
 )
 from backend.core.crypto import encrypt
 from backend.core.collector import collector_engine
+from backend.core.columnar import BINARY_MEDIA_TYPE, encode_binary, negotiate_encoding
+from backend.core.compare import (
+    COMPARE_METRICS, COMPARE_TIERS, choose_grid, fetch_compare, series_values
+)
+from backend.core.http_cache import change_tracker, validators_for
+from backend.core.tsblock import parse_time_bound, to_epoch
 
 router = APIRouter(prefix="/api/v1/servers", tags=["servers"])
 
@@ -55,15 +65,11 @@ async def list_servers(
         result = await session.execute(
             text(f"""SELECT s.server_id, s.display_name, s.ip_address, s.os_type,
                 s.group_name, s.status, s.last_collected_at,
-                (SELECT cpu_usage_pct FROM metrics_raw
-                 WHERE server_id=s.server_id ORDER BY collected_at DESC LIMIT 1) as cpu,
-                (SELECT mem_usage_pct FROM metrics_raw
-                 WHERE server_id=s.server_id ORDER BY collected_at DESC LIMIT 1) as mem,
-                (SELECT COUNT(*) FROM alert_history
-                 WHERE server_id=s.server_id AND resolved_at IS NULL) as alerts
+                l.cpu_usage_pct, l.mem_usage_pct, l.active_alerts, l.disk_max_pct
                 FROM servers s
+                LEFT JOIN server_latest l ON l.server_id=s.server_id
                 WHERE {where}
-                ORDER BY {sort}
+                ORDER BY s.{sort}
                 LIMIT :limit OFFSET :offset"""),
             params
         )
@@ -75,7 +81,7 @@ async def list_servers(
             server_id=r[0], display_name=r[1], ip_address=r[2],
             os_type=r[3], group_name=r[4], status=r[5],
             cpu_usage_pct=r[7], mem_usage_pct=r[8],
-            disk_max_pct=None, last_collected_at=r[6],
+            disk_max_pct=r[10], last_collected_at=r[6],
             active_alerts=r[9] or 0
         ))
 
@@ -97,7 +103,7 @@ async def create_server(request: CreateServerRequest):
         if existing.fetchone():
             raise HTTPException(status_code=400, detail="이미 등록된 IP 주소입니다")
 
-        await session.execute(
+        result = await db_writer.execute(
             text("""INSERT INTO servers
                 (hostname, display_name, ip_address, domain, os_type,
                  credential_user, credential_pass, ssh_port, winrm_port, use_ssl,
@@ -114,9 +120,8 @@ async def create_server(request: CreateServerRequest):
                 "desc": request.description, "tags": tags_json
             }
         )
-        await session.commit()
-        result = await session.execute(text("SELECT last_insert_rowid()"))
-        server_id = result.scalar()
+        server_id = result.lastrowid
+    change_tracker.bump('servers')
 
     # 수집 시작
     await collector_engine.start_server(server_id)
@@ -167,56 +172,89 @@ async def import_servers(servers: list[CreateServerRequest]):
 
 @router.get("/compare")
 async def compare_servers(
-    ids: str = Query(...),
-    metric: str = Query("cpu"),
+    request: Request,
+    response: Response,
+    ids: str = Query(..., description=f"서버 ID 목록 (쉼표 구분, 최대 {COMPARE_MAX_SERVERS}대)"),
+    metric: str = Query("cpu", description="메트릭 목록 (쉼표 구분): " + ", ".join(COMPARE_METRICS)),
     date_from: str = None,
-    date_to: str = None
+    date_to: str = None,
+    interval: str = Query("auto", description="auto|raw|5min|hourly"),
+    encoding: str = Query(None, description="rows|columns|binary (없으면 Accept 헤더 기준)")
 ):
-    """서버 비교"""
-    server_ids = [int(x) for x in ids.split(',')]
-    if len(server_ids) > 4:
-        raise HTTPException(status_code=400, detail="최대 4대까지 비교 가능합니다")
+    """서버 비교 (전체 서버를 한 번에 조회해 공통 시간 격자에 정렬, 기본 구간은 최근 24시간)"""
+    encoding = negotiate_encoding(encoding, request.headers.get("accept"))
+    if encoding is None:
+        raise HTTPException(status_code=400, detail="encoding은 rows, columns, binary 중 하나여야 합니다")
+    try:
+        server_ids = list(dict.fromkeys(int(x) for x in ids.split(',') if x.strip()))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="ids는 쉼표로 구분한 서버 ID여야 합니다")
+    if not server_ids:
+        raise HTTPException(status_code=400, detail="비교할 서버를 지정하세요")
+    if len(server_ids) > COMPARE_MAX_SERVERS:
+        raise HTTPException(status_code=400,
+                            detail=f"한 번에 비교할 수 있는 서버는 최대 {COMPARE_MAX_SERVERS}대입니다")
+    metrics = list(dict.fromkeys(m.strip() for m in metric.split(',') if m.strip()))
+    unknown = [m for m in metrics if m not in COMPARE_METRICS]
+    if not metrics or unknown:
+        raise HTTPException(status_code=400, detail=f"지원하지 않는 메트릭입니다: {', '.join(unknown)}")
+    if interval != "auto" and interval not in COMPARE_TIERS:
+        raise HTTPException(status_code=400, detail="interval은 auto, raw, 5min, hourly 중 하나여야 합니다")
+
+    hi = parse_time_bound(date_to)
+    if hi is None:
+        hi = to_epoch(datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+    lo = parse_time_bound(date_from)
+    if lo is None:
+        lo = hi - 86400
+    if lo > hi:
+        raise HTTPException(status_code=400, detail="조회 시작 시각이 종료 시각보다 늦습니다")
+    try:
+        tier, step = choose_grid(lo, hi, metrics, interval)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-    time_filter = ""
-    params = {}
-    if date_from:
-        time_filter += " AND bucket_time >= :df"
-        params["df"] = date_from
-    if date_to:
-        time_filter += " AND bucket_time <= :dt"
-        params["dt"] = date_to
-
-    metric_col = {
-        "cpu": "cpu_avg",
-        "mem": "mem_avg_pct",
-        "disk_read": "disk_read_avg",
-        "disk_write": "disk_write_avg"
-    }.get(metric, "cpu_avg")
-
-    result_data = {}
-    async with async_session() as session:
-        for sid in server_ids:
-            params["sid"] = sid
-            result = await session.execute(
-                text(f"""SELECT bucket_time, {metric_col}
-                     FROM metrics_5min
-                     WHERE server_id=:sid {time_filter}
-                     ORDER BY bucket_time"""),
-                params
-            )
-            rows = result.fetchall()
-
-            srv_result = await session.execute(
-                text("SELECT display_name FROM servers WHERE server_id=:sid"),
-                {"sid": sid}
-            )
-            name = srv_result.scalar() or f"Server {sid}"
-
-            result_data[name] = [
-                {"time": r[0], "value": r[1]} for r in rows
-            ]
-
-    return result_data
+    # 구간이 '지금' 기준이면 격자가 한 칸씩 이동하므로 간격 단위로도 ETag 갱신
+    topics = [tier, 'servers'] + ([f"raw:{sid}" for sid in server_ids] if tier == 'raw' else [])
+    relative = not (date_from and date_to)
+    validators = validators_for(request, *topics, time_slot_sec=step if relative else None)
+    if validators.matches(request):
+        return validators.not_modified()
+
+    try:
+        result = await fetch_compare(server_ids, metrics, lo, hi, tier)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"서버 비교 조회 실패: {str(e)}")
+
+    meta = {"interval": result["interval"], "step": result["step"], "metrics": metrics}
+    series = {
+        sid: {m: series_values(result["values"][i, j]) for j, m in enumerate(metrics)}
+        for i, sid in enumerate(server_ids)
+    }
+    if encoding == "columns":
+        validators.apply(response)
+        return {**meta, "time": result["time"], "servers": [
+            {"server_id": sid, "name": result["names"][sid], "columns": series[sid]}
+            for sid in server_ids
+        ]}
+
+    def rows(sid):
+        return [
+            {"time": t, **{m: series[sid][m][k] for m in metrics}}
+            for k, t in enumerate(result["time"])
+        ]
+
+    if encoding == "binary":
+        meta["servers"] = [{"server_id": sid, "name": result["names"][sid]} for sid in server_ids]
+        return validators.apply(Response(
+            encode_binary({str(sid): rows(sid) for sid in server_ids}, meta),
+            media_type=BINARY_MEDIA_TYPE
+        ))
+    validators.apply(response)
+    return {**meta, "servers": [
+        {"server_id": sid, "name": result["names"][sid], "data": rows(sid)}
+        for sid in server_ids
+    ]}
 
 
 @router.get("/{server_id}", response_model=ServerDetail)
@@ -299,12 +337,11 @@ async def update_server(server_id: int, request: UpdateServerRequest):
     set_clause = ", ".join(f"{k}=:{k}" for k in updates)
     updates["sid"] = server_id
 
-    async with async_session() as session:
-        await session.execute(
-            text(f"UPDATE servers SET {set_clause}, updated_at=datetime('now','localtime') WHERE server_id=:sid"),
-            updates
-        )
-        await session.commit()
+    await db_writer.execute(
+        text(f"UPDATE servers SET {set_clause}, updated_at=datetime('now','localtime') WHERE server_id=:sid"),
+        updates
+    )
+    change_tracker.bump('servers')
 
     # 수집 재시작
     await collector_engine.restart_server(server_id)
@@ -323,11 +360,11 @@ async def delete_server(server_id: int):
         if not result.fetchone():
             raise HTTPException(status_code=404, detail="서버를 찾을 수 없습니다")
 
-        await session.execute(
+        await db_writer.execute(
             text("UPDATE servers SET is_active=0, updated_at=datetime('now','localtime') WHERE server_id=:sid"),
             {"sid": server_id}
         )
-        await session.commit()
+    change_tracker.bump('servers')
 
     await collector_engine.stop_server(server_id)
     return MessageResponse(message="서버가 비활성화되었습니다")
@@ -377,16 +414,15 @@ async def test_connection(request: TestConnectionRequest):
 @router.post("/{server_id}/maintenance", response_model=MessageResponse)
 async def set_maintenance(server_id: int, request: MaintenanceRequest):
     """유지보수 모드 전환"""
-    async with async_session() as session:
-        await session.execute(
-            text("""UPDATE servers SET is_maintenance=:im, maintenance_until=:mu,
-                 status=CASE WHEN :im=1 THEN 'maintenance' ELSE 'unknown' END,
-                 updated_at=datetime('now','localtime')
-                 WHERE server_id=:sid"""),
-            {"im": 1 if request.is_maintenance else 0,
-             "mu": request.maintenance_until, "sid": server_id}
-        )
-        await session.commit()
+    await db_writer.execute(
+        text("""UPDATE servers SET is_maintenance=:im, maintenance_until=:mu,
+             status=CASE WHEN :im=1 THEN 'maintenance' ELSE 'unknown' END,
+             updated_at=datetime('now','localtime')
+             WHERE server_id=:sid"""),
+        {"im": 1 if request.is_maintenance else 0,
+         "mu": request.maintenance_until, "sid": server_id}
+    )
+    change_tracker.bump('servers')
 
     if request.is_maintenance:
         await collector_engine.stop_server(server_id)
@@ -2,6 +2,7 @@
 from fastapi import APIRouter, HTTPException, Query
 from sqlalchemy import text
 from backend.db.database import async_session
+from backend.db.writer import db_writer
 from backend.db.schemas import SettingsUpdateRequest, WebhookTestRequest, MessageResponse
 from backend.core.notifier import notifier
 
@@ -63,9 +64,8 @@ async def update_settings(request: SettingsUpdateRequest):
         if not request.settings:
             raise HTTPException(status_code=400, detail="변경할 설정이 없습니다")
 
-        updated_count = 0
         async with async_session() as session:
-            for key, value in request.settings.items():
+            for key in request.settings:
                 # 설정 키 존재 여부 확인
                 existing = await session.execute(
                     text("SELECT key FROM app_settings WHERE key=:k"),
@@ -74,15 +74,13 @@ async def update_settings(request: SettingsUpdateRequest):
                 if not existing.fetchone():
                     raise HTTPException(status_code=400, detail=f"존재하지 않는 설정 키: {key}")
 
-                await session.execute(
-                    text("""UPDATE app_settings
-                         SET value=:v, updated_at=datetime('now','localtime')
-                         WHERE key=:k"""),
-                    {"k": key, "v": value}
-                )
-                updated_count += 1
-
-            await session.commit()
+        # 모든 키를 한 트랜잭션으로 저장
+        updated_count = await db_writer.executemany(
+            text("""UPDATE app_settings
+                 SET value=:v, updated_at=datetime('now','localtime')
+                 WHERE key=:k"""),
+            [{"k": key, "v": value} for key, value in request.settings.items()]
+        )
 
         return MessageResponse(message=f"{updated_count}개 설정이 저장되었습니다")
     except HTTPException:
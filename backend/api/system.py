@@ -0,0 +1,32 @@
+"""시스템 상태 API 라우터"""
+from fastapi import APIRouter, HTTPException
+from backend.db.archive import archive_summary
+from backend.db.schemas import ArchiveStats, DatabaseStats, DbWriterStats
+from backend.db.maintenance import DB_FILES, get_db_stats
+from backend.db.writer import db_writer
+
+router = APIRouter(prefix="/api/v1/system", tags=["system"])
+
+
+@router.get("/database", response_model=list[DatabaseStats])
+async def get_database_stats():
+    """DB 파일(설정/시계열)별 크기, WAL 및 freelist 현황 조회"""
+    try:
+        return [DatabaseStats(**await get_db_stats(schema)) for schema in DB_FILES]
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"DB 상태 조회 실패: {str(e)}")
+
+
+@router.get("/db-writer", response_model=DbWriterStats)
+async def get_db_writer_stats():
+    """쓰기 큐 깊이, 배치 크기, 쓰기 지연(큐 대기 + 커밋) 통계"""
+    return DbWriterStats(**db_writer.get_stats())
+
+
+@router.get("/archive", response_model=ArchiveStats)
+async def get_archive_stats():
+    """Raw 메트릭 압축 아카이브 파일 수/용량/기간 조회"""
+    try:
+        return ArchiveStats(**archive_summary())
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"아카이브 상태 조회 실패: {str(e)}")
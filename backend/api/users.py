@@ -3,6 +3,7 @@ from fastapi import APIRouter, HTTPException, Query
 from passlib.hash import bcrypt
 from sqlalchemy import text
 from backend.db.database import async_session
+from backend.db.writer import db_writer
 from backend.db.schemas import CreateUserRequest, UpdateUserRequest, MessageResponse
 
 router = APIRouter(prefix="/api/v1/users", tags=["users"])
@@ -120,7 +121,7 @@ async def create_user(request: CreateUserRequest):
 
             password_hash = bcrypt.hash(request.password)
 
-            await session.execute(
+            result = await db_writer.execute(
                 text("""INSERT INTO users
                     (username, password_hash, display_name, role)
                     VALUES (:u, :ph, :dn, :r)"""),
@@ -131,9 +132,7 @@ async def create_user(request: CreateUserRequest):
                     "r": request.role
                 }
             )
-            await session.commit()
-            result = await session.execute(text("SELECT last_insert_rowid()"))
-            user_id = result.scalar()
+            user_id = result.lastrowid
 
         return await get_user(user_id)
     except HTTPException:
@@ -184,11 +183,10 @@ async def update_user(user_id: int, request: UpdateUserRequest):
             set_clause = ", ".join(f"{k}=:{k}" for k in updates)
             updates["uid"] = user_id
 
-            await session.execute(
+            await db_writer.execute(
                 text(f"UPDATE users SET {set_clause} WHERE user_id=:uid"),
                 updates
             )
-            await session.commit()
 
         return await get_user(user_id)
     except HTTPException:
@@ -214,11 +212,10 @@ async def delete_user(user_id: int):
             if row[1] == "admin":
                 raise HTTPException(status_code=400, detail="기본 관리자 계정은 삭제할 수 없습니다")
 
-            await session.execute(
+            await db_writer.execute(
                 text("UPDATE users SET is_active=0 WHERE user_id=:uid"),
                 {"uid": user_id}
             )
-            await session.commit()
 
         return MessageResponse(message="사용자가 비활성화되었습니다")
     except HTTPException:
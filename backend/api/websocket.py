@@ -1,6 +1,8 @@
 """WebSocket API 라우터"""
 import logging
+from datetime import datetime
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from backend.core.dashboard_summary import dashboard_summary
 from backend.core.ws_manager import ws_manager
 
 logger = logging.getLogger(__name__)
@@ -12,6 +14,12 @@ async def websocket_dashboard(websocket: WebSocket):
     """대시보드 실시간 데이터 WebSocket"""
     await ws_manager.connect_dashboard(websocket)
     try:
+        # 접속 즉시 현재 요약 전송 (이후 변경분은 스케줄러가 브로드캐스트)
+        await websocket.send_json({
+            "type": "summary",
+            "data": await dashboard_summary.get(),
+            "timestamp": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        })
         while True:
             # 클라이언트로부터 메시지 수신 대기 (keepalive)
             data = await websocket.receive_text()
@@ -0,0 +1,123 @@
+"""차트 응답 인코딩 벤치마크 (행 JSON vs 컬럼 JSON vs 바이너리)
+
+이력 API 와 같은 형태의 합성 응답을 만들어 인코딩별 크기(원본/gzip)와
+인코딩·디코딩 시간을 비교한다. 디코딩은 행/컬럼 JSON 은 json.loads,
+바이너리는 헤더 파싱 + numpy.frombuffer (브라우저의 typed array 생성에 해당) 로 잰다.
+
+    python -m backend.bench.columnar_bench
+"""
+import argparse
+import gzip
+import json
+import random
+import statistics
+import struct
+import time
+from datetime import datetime, timedelta
+import numpy as np
+from backend.api.metrics import FIVE_MIN_HISTORY_COLUMNS, RAW_HISTORY_COLUMNS
+from backend.core.columnar import encode_binary, to_columns
+
+# (이름, 행 수, 간격(초), 응답 키)
+HOURLY_KEYS = ['time', 'cpu', 'cpu_max', 'cpu_p95', 'mem', 'mem_max_pct', 'disk_read',
+               'disk_write', 'net_in_avg', 'net_out_avg', 'alert_count', 'downtime_sec',
+               'sample_count']
+SCENARIOS = [
+    ('1d raw', 86400 // 3, 3, list(RAW_HISTORY_COLUMNS.values())),
+    ('1d 5min', 288, 300, list(FIVE_MIN_HISTORY_COLUMNS.values())),
+    ('30d 5min', 288 * 30, 300, list(FIVE_MIN_HISTORY_COLUMNS.values())),
+    ('30d hourly', 24 * 30, 3600, HOURLY_KEYS),
+]
+
+
+def _rows(count: int, interval: int, keys: list[str]) -> list[dict]:
+    rng = random.Random(7)
+    t = datetime(2024, 1, 1)
+    state = {k: rng.uniform(5, 60) for k in keys}
+    rows = []
+    for _ in range(count):
+        t += timedelta(seconds=interval)
+        row = {}
+        for k in keys:
+            if k == 'time':
+                row[k] = t.strftime('%Y-%m-%d %H:%M:%S')
+            elif k in ('net_in_avg', 'net_out_avg'):
+                row[k] = None
+            elif k in ('net_connections', 'process_count', 'sample_count', 'alert_count',
+                       'downtime_sec'):
+                row[k] = int(state[k])
+            else:
+                state[k] = min(100.0, max(0.0, state[k] + rng.gauss(0, 1.5)))
+                row[k] = round(state[k], 1 if k in ('cpu', 'mem') else 2)
+        rows.append(row)
+    return rows
+
+
+def _dumps(obj) -> bytes:
+    # FastAPI JSONResponse 와 같은 직렬화
+    return json.dumps(obj, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode('utf-8')
+
+
+def _decode_binary(payload: bytes):
+    header_len = struct.unpack_from('<I', payload, 4)[0]
+    header = json.loads(payload[8:8 + header_len])
+    base = -(-(8 + header_len) // 8) * 8
+    out = {}
+    for s in header["series"]:
+        for col in s["columns"]:
+            if col["type"] == 'json':
+                out[col["name"]] = col["values"]
+            elif col["type"] == 'i32':
+                ints = np.frombuffer(payload, dtype='<i4', count=s["count"],
+                                     offset=base + col["offset"])
+                out[col["name"]] = np.where(ints == -2 ** 31, np.nan, ints / 10 ** col["scale"])
+            else:
+                dtype = '<u4' if col["type"] == 'time' else '<f8'
+                out[col["name"]] = np.frombuffer(payload, dtype=dtype, count=s["count"],
+                                                 offset=base + col["offset"])
+    return out
+
+
+def _timed(fn, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - started) * 1000)
+    return round(statistics.median(times), 2)
+
+
+def run(repeat: int) -> list[dict]:
+    results = []
+    for name, count, interval, keys in SCENARIOS:
+        data = _rows(count, interval, keys)
+        meta = {"server_id": 1, "interval": name.split()[1], "count": count, "total": count}
+        encoders = {
+            "rows": lambda: _dumps({**meta, "data": data}),
+            "columns": lambda: _dumps({**meta, "columns": to_columns(data)}),
+            "binary": lambda: encode_binary({"data": data}, meta),
+        }
+        decoders = {"rows": json.loads, "columns": json.loads, "binary": _decode_binary}
+        entry = {"scenario": name, "points": count}
+        for enc, encode in encoders.items():
+            payload = encode()
+            entry[enc] = {
+                "bytes": len(payload),
+                "gzip_bytes": len(gzip.compress(payload, 6)),
+                "encode_ms": _timed(encode, repeat),
+                "decode_ms": _timed(lambda: decoders[enc](payload), repeat),
+            }
+        entry["binary_vs_rows"] = round(entry["rows"]["bytes"] / entry["binary"]["bytes"], 2)
+        results.append(entry)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="차트 응답 인코딩 벤치마크")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    print(json.dumps(run(args.repeat), indent=2, ensure_ascii=False))
+
+
+if __name__ == '__main__':
+    main()
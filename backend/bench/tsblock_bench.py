@@ -0,0 +1,198 @@
+"""행 저장 vs 블록 저장 벤치마크 (샘플당 바이트, 조회 시간)
+
+합성 메트릭을 임시 SQLite 파일 두 개에 각각 행(일별 파티션과 같은 DDL/인덱스)과
+블록(backend.db.blocks 와 같은 변환)으로 저장한 뒤 파일 크기와 서버 1대 구간 조회 시간을 비교한다.
+
+    python -m backend.bench.tsblock_bench --tier raw --servers 10 --hours 24
+"""
+import argparse
+import json
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+from sqlalchemy.dialects import sqlite
+from sqlalchemy.schema import CreateIndex, CreateTable
+from backend.config import TS_SCHEMA
+from backend.core.tsblock import parse_time_bound
+from backend.db.blocks import BLOCK_TIERS, TIER_COLUMNS, _build_blocks, iter_block_rows
+from backend.db.models import Base
+from backend.db.partitions import _PARTITION_DDL, _partition_ddl, partition_name
+
+DEFAULT_INTERVAL_SEC = {'raw': 3, '5min': 300}
+
+
+def _generate(tier_name: str, servers: int, hours: int, interval: int, start: datetime):
+    """서버별 (시각, 컬럼...) 행 생성: 실수는 랜덤 워크, 정수는 가끔 변화, 문자열은 작은 JSON"""
+    kinds = TIER_COLUMNS[tier_name]
+    rng = random.Random(42)
+    count = hours * 3600 // interval
+    data = {}
+    for sid in range(1, servers + 1):
+        state = {c: rng.uniform(5, 60) if k == 'f' else rng.randint(100, 16000)
+                 for c, k in kinds.items()}
+        rows = []
+        t = start
+        for _ in range(count):
+            # 수집 지연으로 가끔 1초씩 밀림
+            t += timedelta(seconds=interval + (1 if rng.random() < 0.05 else 0))
+            values = []
+            for c, k in kinds.items():
+                if k == 'f':
+                    state[c] = min(100.0, max(0.0, state[c] + rng.gauss(0, 1.5)))
+                    values.append(round(state[c], 1))
+                elif k == 'i':
+                    if rng.random() < 0.1:
+                        state[c] += rng.randint(-3, 3)
+                    values.append(state[c])
+                else:
+                    values.append(json.dumps({"C:": round(state.get('mem_usage_pct', 50.0), 1)}))
+            rows.append((t.strftime('%Y-%m-%d %H:%M:%S'), *values))
+        data[sid] = rows
+    return data
+
+
+def _open(path: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(':memory:')
+    conn.execute(f"ATTACH DATABASE ? AS {TS_SCHEMA}", (path,))
+    return conn
+
+
+def _db_size(conn) -> int:
+    conn.commit()
+    conn.execute(f"VACUUM {TS_SCHEMA}")
+    page_size = conn.execute(f"PRAGMA {TS_SCHEMA}.page_size").fetchone()[0]
+    page_count = conn.execute(f"PRAGMA {TS_SCHEMA}.page_count").fetchone()[0]
+    return page_size * page_count
+
+
+def _build_rows_db(tier_name: str, path: str, data: dict, day) -> tuple[sqlite3.Connection, str]:
+    tier = BLOCK_TIERS[tier_name]
+    kinds = TIER_COLUMNS[tier_name]
+    conn = _open(path)
+    if tier.source == 'metrics_raw':
+        table = partition_name(tier.source, day)
+        conn.execute(_partition_ddl(tier.source, table))
+        for ddl in _PARTITION_DDL[tier.source]:
+            conn.execute(ddl.format(schema=TS_SCHEMA, name=table))
+    else:
+        table = tier.source
+        src = Base.metadata.tables[f"{TS_SCHEMA}.{table}"]
+        conn.execute(str(CreateTable(src).compile(dialect=sqlite.dialect())))
+        for index in src.indexes:
+            conn.execute(str(CreateIndex(index).compile(dialect=sqlite.dialect())))
+    cols = ", ".join(['server_id', tier.time_col, *kinds])
+    marks = ", ".join('?' * (len(kinds) + 2))
+    for sid, rows in data.items():
+        conn.executemany(f"INSERT INTO {TS_SCHEMA}.{table} ({cols}) VALUES ({marks})",
+                         [(sid, *r) for r in rows])
+    return conn, table
+
+
+def _build_blocks_db(tier_name: str, path: str, data: dict) -> sqlite3.Connection:
+    tier = BLOCK_TIERS[tier_name]
+    kinds = TIER_COLUMNS[tier_name]
+    conn = _open(path)
+    src = Base.metadata.tables[f"{TS_SCHEMA}.{tier.table}"]
+    conn.execute(str(CreateTable(src).compile(dialect=sqlite.dialect())))
+    for index in src.indexes:
+        conn.execute(str(CreateIndex(index).compile(dialect=sqlite.dialect())))
+    for sid, rows in data.items():
+        blocks = _build_blocks(tier, kinds, sid, rows)
+        conn.executemany(
+            f"""INSERT INTO {TS_SCHEMA}.{tier.table}
+                (server_id, metric, block_start, block_end, sample_count, data)
+                VALUES (:sid, :metric, :start, :end, :count, :data)""",
+            blocks
+        )
+    return conn
+
+
+def _timed(fn, repeat: int) -> tuple[float, int]:
+    """fn() 반복 실행 → (중앙값 ms, 결과 행 수)"""
+    times = []
+    n = 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        n = len(fn())
+        times.append((time.perf_counter() - started) * 1000)
+    return statistics.median(times), n
+
+
+def run(tier_name: str, servers: int, hours: int, interval: int,
+        query_hours: int, repeat: int) -> dict:
+    tier = BLOCK_TIERS[tier_name]
+    kinds = TIER_COLUMNS[tier_name]
+    start = datetime(2024, 1, 1)
+    data = _generate(tier_name, servers, hours, interval, start)
+    samples = sum(len(rows) for rows in data.values())
+    values = samples * len(kinds)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        rows_conn, table = _build_rows_db(tier_name, os.path.join(tmp, 'rows.db'), data, start.date())
+        blocks_conn = _build_blocks_db(tier_name, os.path.join(tmp, 'blocks.db'), data)
+        rows_size = _db_size(rows_conn)
+        blocks_size = _db_size(blocks_conn)
+
+        # 서버 1대, 앞쪽 query_hours 구간의 이력 조회 (행 → dict 변환까지 포함)
+        columns = [tier.time_col, *kinds]
+        df = start.strftime('%Y-%m-%d %H:%M:%S')
+        dt = (start + timedelta(hours=query_hours)).strftime('%Y-%m-%d %H:%M:%S')
+
+        def query_rows():
+            cur = rows_conn.execute(
+                f"""SELECT {', '.join(columns)} FROM {TS_SCHEMA}.{table}
+                    WHERE server_id=1 AND {tier.time_col} >= ? AND {tier.time_col} <= ?
+                    ORDER BY {tier.time_col}""", (df, dt)
+            )
+            return [dict(zip(columns, r)) for r in cur.fetchall()]
+
+        def query_blocks():
+            cur = blocks_conn.execute(
+                f"""SELECT server_id, block_start, metric, data FROM {TS_SCHEMA}.{tier.table}
+                    WHERE server_id=1 AND block_end >= ? AND block_start <= ?
+                    ORDER BY server_id, block_start""", (df, dt)
+            )
+            return list(iter_block_rows(tier_name, cur.fetchall(), columns,
+                                        parse_time_bound(df), parse_time_bound(dt)))
+
+        rows_ms, rows_n = _timed(query_rows, repeat)
+        blocks_ms, blocks_n = _timed(query_blocks, repeat)
+        rows_conn.close()
+        blocks_conn.close()
+
+    return {
+        "tier": tier_name,
+        "servers": servers,
+        "samples": samples,
+        "values": values,
+        "rows": {"bytes": rows_size, "bytes_per_sample": round(rows_size / samples, 2),
+                 "bytes_per_value": round(rows_size / values, 2),
+                 "query_ms": round(rows_ms, 2), "query_rows": rows_n},
+        "blocks": {"bytes": blocks_size, "bytes_per_sample": round(blocks_size / samples, 2),
+                   "bytes_per_value": round(blocks_size / values, 2),
+                   "query_ms": round(blocks_ms, 2), "query_rows": blocks_n},
+        "ratio": round(rows_size / blocks_size, 2) if blocks_size else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="행 저장 vs 블록 저장 벤치마크")
+    parser.add_argument("--tier", choices=list(BLOCK_TIERS), default="raw")
+    parser.add_argument("--servers", type=int, default=10)
+    parser.add_argument("--hours", type=int, default=24, help="서버당 생성할 데이터 기간")
+    parser.add_argument("--interval", type=int, default=None, help="샘플 간격(초)")
+    parser.add_argument("--query-hours", type=int, default=6, help="조회 구간 길이")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    interval = args.interval or DEFAULT_INTERVAL_SEC[args.tier]
+    result = run(args.tier, args.servers, args.hours, interval, args.query_hours, args.repeat)
+    print(json.dumps(result, indent=2, ensure_ascii=False))
+
+
+if __name__ == '__main__':
+    main()
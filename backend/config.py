@@ -25,12 +25,63 @@ def get_app_dir() -> Path:
 DATA_DIR = get_data_dir()
 APP_DIR = get_app_dir()
 DB_PATH = DATA_DIR / 'servereye.db'
+# 시계열 데이터(메트릭/로그/프로세스/서비스)는 별도 파일에 두고 같은 엔진에 ATTACH
+TS_DB_PATH = DATA_DIR / 'servereye_ts.db'
+TS_SCHEMA = 'ts'
 LOG_PATH = DATA_DIR / 'servereye.log'
 REPORTS_DIR = DATA_DIR / 'reports'
 REPORTS_DIR.mkdir(parents=True, exist_ok=True)
+# 보존 기간이 지난 Raw 메트릭 파티션의 압축 아카이브
+ARCHIVE_DIR = DATA_DIR / 'archive'
+ARCHIVE_DIR.mkdir(parents=True, exist_ok=True)
 
 # DB
 DATABASE_URL = f"sqlite+aiosqlite:///{DB_PATH}"
+# 읽기 전용 커넥션 풀 크기 (쓰기는 단일 쓰기 태스크가 전담)
+DB_READ_POOL_SIZE = 8
+# 쓰기 태스크가 한 트랜잭션으로 묶을 최대 작업 수
+DB_WRITE_BATCH_MAX = 200
+# 이력 내보내기 스트리밍 시 커서에서 한 번에 가져올 행 수
+EXPORT_FETCH_SIZE = 1000
+
+# 알림 이력 count=approx 에서 필터가 있을 때 셀 최대 건수
+ALERT_APPROX_COUNT_CAP = 10000
+
+# 알림 일괄 평가: 수집 시 값만 모아 두고 ALERT_BATCH_INTERVAL_SEC(수집 틱)마다
+# 전체 서버 × 규칙을 한 번에 판단 (False 면 샘플마다 서버 단위로 바로 평가)
+ALERT_BATCH_EVALUATION = True
+ALERT_BATCH_INTERVAL_SEC = 3
+
+# 알림 묶음: 같은 키(ALERT_GROUP_BY 필드 값)의 첫 알림은 바로 보내고, 그 뒤 ALERT_GROUP_WINDOW_SEC 동안
+# 들어온 후속 알림을 모아 WebSocket/Webhook 을 한 번만 보냄 (group_name, metric_name, rule_id, severity 중 선택,
+# 0 이면 묶지 않고 모두 바로 보냄)
+ALERT_GROUP_WINDOW_SEC = 30
+ALERT_GROUP_BY = ('group_name', 'metric_name', 'severity')
+
+# 알림 엔진 상태(지속 시간/쿨다운/발생 여부) 스냅샷 저장 주기 (종료 시에도 저장)
+ALERT_STATE_SAVE_SEC = 30
+
+# collect_timeout 알림: 수집 마감 타이머 휠을 COLLECT_DEADLINE_TICK_SEC 마다 진행 (판단은 마감보다 최대 2틱 늦음)
+COLLECT_DEADLINE_TICK_SEC = 1
+
+# 서버 비교 응답의 시리즈당 최대 격자 점 수 (계층 자동 선택 기준)
+COMPARE_MAX_POINTS = 720
+# 서버 비교 한 요청의 최대 서버 수 (응답 크기 = 서버 × 메트릭 × COMPARE_MAX_POINTS 칸 이하)
+COMPARE_MAX_SERVERS = 50
+
+# 대시보드 요약 재계산/WebSocket 전송 주기 (수집 주기와 같은 틱)
+DASHBOARD_SUMMARY_INTERVAL_SEC = 3
+
+# 로그 템플릿 마이닝 (Drain): 유사도 임계값, 분류 트리 접두 토큰 수, 노드당 최대 자식 수,
+# 템플릿으로 저장할 메시지의 최대 토큰 수 (초과하면 원문 저장)
+LOG_TEMPLATE_SIM_THRESHOLD = 0.4
+LOG_TEMPLATE_PREFIX_TOKENS = 2
+LOG_TEMPLATE_MAX_CHILDREN = 100
+LOG_TEMPLATE_MAX_TOKENS = 256
+
+# 수집기 메모리 링 버퍼 (서버별 최근 Raw 메트릭, 수집 주기 3초 기준 용량 산정)
+RING_BUFFER_MINUTES = 60
+RING_BUFFER_MIN_INTERVAL_SEC = 3
 
 # 서버 설정
 DEFAULT_PORT = 52800
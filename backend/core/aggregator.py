@@ -1,72 +1,126 @@
 """데이터 집계 모듈 (raw → 5min → hourly)"""
+import asyncio
 import logging
+import time
+from datetime import datetime, timedelta
 from sqlalchemy import text
 from backend.db.database import async_session
+from backend.db.partitions import (
+    drop_partitions_before, has_partition, parse_partition_name, partition_name,
+    partitions_for_range, union_source
+)
+from backend.db.archive import archive_partition, drop_archives_before
+from backend.db.blocks import delete_blocks_before
+from backend.db.latest import refresh_active_alerts
+from backend.db.log_rate import BUCKET_SEC, bucket_case, bucket_start, level_case
+from backend.db.writer import db_writer
+from backend.core.http_cache import change_tracker
+from backend.core.log_templates import log_miner
 
 logger = logging.getLogger(__name__)
 
+# 보존 정리 시 한 트랜잭션에서 삭제할 최대 행 수 (쓰기 잠금 점유 시간 제한)
+CLEANUP_BATCH_SIZE = 2000
+# 청크 사이 양보 시간(초)
+CLEANUP_YIELD_SEC = 0.05
+
+# 보존 정리 대상 테이블 → 조건부 GET 변경 주제
+_CHANGE_TOPICS = {'metrics_5min': '5min', 'metrics_hourly': 'hourly', 'alert_history': 'alerts',
+                  'alert_incidents': 'alerts', 'log_rate_5min': 'lograte'}
+
 
 async def aggregate_5min():
     """5분 집계 수행"""
-    async with async_session() as session:
-        await session.execute(text("""
-            INSERT OR REPLACE INTO metrics_5min
-                (server_id, bucket_time, cpu_avg, cpu_max, cpu_min,
-                 mem_avg_pct, mem_max_pct, disk_read_avg, disk_write_avg,
-                 net_in_avg, net_out_avg, sample_count)
-            SELECT
-                server_id,
-                strftime('%Y-%m-%d %H:', collected_at) ||
-                    CAST((CAST(strftime('%M', collected_at) AS INTEGER) / 5) * 5 AS TEXT) ||
-                    ':00' AS bucket_time,
-                ROUND(AVG(cpu_usage_pct), 1),
-                ROUND(MAX(cpu_usage_pct), 1),
-                ROUND(MIN(cpu_usage_pct), 1),
-                ROUND(AVG(mem_usage_pct), 1),
-                ROUND(MAX(mem_usage_pct), 1),
-                ROUND(AVG(disk_read_mbps), 2),
-                ROUND(AVG(disk_write_mbps), 2),
-                NULL, NULL,
-                COUNT(*)
-            FROM metrics_raw
-            WHERE collected_at >= datetime('now', '-10 minutes', 'localtime')
-            GROUP BY server_id, bucket_time
-        """))
-        await session.commit()
-        logger.debug("5min aggregation completed")
+    since = datetime.now() - timedelta(minutes=10)
+    source = union_source(
+        'metrics_raw', partitions_for_range('metrics_raw', since),
+        "server_id, collected_at, cpu_usage_pct, mem_usage_pct, disk_read_mbps, disk_write_mbps",
+        "collected_at >= :since"
+    )
+    await db_writer.execute(text(f"""
+        INSERT OR REPLACE INTO metrics_5min
+            (server_id, bucket_time, cpu_avg, cpu_max, cpu_min,
+             mem_avg_pct, mem_max_pct, disk_read_avg, disk_write_avg,
+             net_in_avg, net_out_avg, sample_count)
+        SELECT
+            server_id,
+            strftime('%Y-%m-%d %H:', collected_at) ||
+                CAST((CAST(strftime('%M', collected_at) AS INTEGER) / 5) * 5 AS TEXT) ||
+                '\\:00' AS bucket_time,
+            ROUND(AVG(cpu_usage_pct), 1),
+            ROUND(MAX(cpu_usage_pct), 1),
+            ROUND(MIN(cpu_usage_pct), 1),
+            ROUND(AVG(mem_usage_pct), 1),
+            ROUND(MAX(mem_usage_pct), 1),
+            ROUND(AVG(disk_read_mbps), 2),
+            ROUND(AVG(disk_write_mbps), 2),
+            NULL, NULL,
+            COUNT(*)
+        FROM {source}
+        GROUP BY server_id, bucket_time
+    """), {"since": since.strftime('%Y-%m-%d %H:%M:%S')})
+    change_tracker.bump('5min')
+    logger.debug("5min aggregation completed")
+
+
+async def aggregate_log_rate_5min():
+    """로그 건수 5분 집계 (서버 × 수준 × 소스, 수집 시각 기준)
+
+    직전 버킷과 진행 중인 버킷을 통째로 다시 세어 교체하므로 매분 실행해도 결과가 같고,
+    error_log_rate 알림은 진행 중인 버킷까지 반영된 건수를 본다.
+    """
+    since = bucket_start(datetime.now()) - timedelta(seconds=BUCKET_SEC)
+    source = union_source(
+        'server_logs', partitions_for_range('server_logs', since),
+        "server_id, log_level, log_source, collected_at",
+        "collected_at >= :since"
+    )
+    await db_writer.execute(text(f"""
+        INSERT OR REPLACE INTO log_rate_5min
+            (server_id, bucket_time, log_level, log_source, log_count)
+        SELECT
+            server_id,
+            {bucket_case('collected_at')} AS bucket,
+            {level_case('log_level')} AS level,
+            COALESCE(log_source, '') AS source,
+            COUNT(*)
+        FROM {source}
+        GROUP BY server_id, bucket, level, source
+    """), {"since": since.strftime('%Y-%m-%d %H:%M:%S')})
+    change_tracker.bump('lograte')
+    logger.debug("Log rate aggregation completed")
 
 
 async def aggregate_hourly():
     """1시간 집계 수행"""
-    async with async_session() as session:
-        await session.execute(text("""
-            INSERT OR REPLACE INTO metrics_hourly
-                (server_id, bucket_time, cpu_avg, cpu_max, cpu_p95,
-                 mem_avg_pct, mem_max_pct, disk_read_avg, disk_write_avg,
-                 net_in_avg, net_out_avg, sample_count)
-            SELECT
-                server_id,
-                strftime('%Y-%m-%d %H:00:00', bucket_time) AS bucket_time,
-                ROUND(AVG(cpu_avg), 1),
-                ROUND(MAX(cpu_max), 1),
-                ROUND(MAX(cpu_max), 1),
-                ROUND(AVG(mem_avg_pct), 1),
-                ROUND(MAX(mem_max_pct), 1),
-                ROUND(AVG(disk_read_avg), 2),
-                ROUND(AVG(disk_write_avg), 2),
-                ROUND(AVG(net_in_avg), 2),
-                ROUND(AVG(net_out_avg), 2),
-                SUM(sample_count)
-            FROM metrics_5min
-            WHERE bucket_time >= datetime('now', '-2 hours', 'localtime')
-            GROUP BY server_id, strftime('%Y-%m-%d %H:00:00', bucket_time)
-        """))
-        await session.commit()
-        logger.debug("Hourly aggregation completed")
-
-
-async def cleanup_old_data():
-    """보존 기간 초과 데이터 삭제"""
+    await db_writer.execute(text("""
+        INSERT OR REPLACE INTO metrics_hourly
+            (server_id, bucket_time, cpu_avg, cpu_max, cpu_p95,
+             mem_avg_pct, mem_max_pct, disk_read_avg, disk_write_avg,
+             net_in_avg, net_out_avg, sample_count)
+        SELECT
+            server_id,
+            strftime('%Y-%m-%d %H:00:00', bucket_time) AS bucket_time,
+            ROUND(AVG(cpu_avg), 1),
+            ROUND(MAX(cpu_max), 1),
+            ROUND(MAX(cpu_max), 1),
+            ROUND(AVG(mem_avg_pct), 1),
+            ROUND(MAX(mem_max_pct), 1),
+            ROUND(AVG(disk_read_avg), 2),
+            ROUND(AVG(disk_write_avg), 2),
+            ROUND(AVG(net_in_avg), 2),
+            ROUND(AVG(net_out_avg), 2),
+            SUM(sample_count)
+        FROM metrics_5min
+        WHERE bucket_time >= datetime('now', '-2 hours', 'localtime')
+        GROUP BY server_id, strftime('%Y-%m-%d %H:00:00', bucket_time)
+    """))
+    change_tracker.bump('hourly')
+    logger.debug("Hourly aggregation completed")
+
+
+async def cleanup_old_data() -> dict:
+    """보존 기간 초과 데이터 삭제 (테이블별 청크 단위)"""
     async with async_session() as session:
         # 설정에서 보존 기간 가져오기
         result = await session.execute(
@@ -74,29 +128,147 @@ async def cleanup_old_data():
         )
         retention = {row[0]: int(row[1]) for row in result.fetchall()}
 
-        raw_hours = retention.get('retention_raw_hours', 24)
-        min5_days = retention.get('retention_5min_days', 30)
-        hourly_days = retention.get('retention_hourly_days', 365)
-        log_days = retention.get('retention_log_days', 7)
-        alert_days = retention.get('retention_alert_days', 90)
+    raw_hours = retention.get('retention_raw_hours', 24)
+    archive_days = retention.get('retention_archive_days', 30)
+    min5_days = retention.get('retention_5min_days', 30)
+    hourly_days = retention.get('retention_hourly_days', 365)
+    log_days = retention.get('retention_log_days', 7)
+    alert_days = retention.get('retention_alert_days', 90)
 
-        await session.execute(
-            text(f"DELETE FROM metrics_raw WHERE collected_at < datetime('now', '-{raw_hours} hours', 'localtime')")
-        )
-        await session.execute(
-            text(f"DELETE FROM metrics_5min WHERE bucket_time < datetime('now', '-{min5_days} days', 'localtime')")
-        )
-        await session.execute(
-            text(f"DELETE FROM metrics_hourly WHERE bucket_time < datetime('now', '-{hourly_days} days', 'localtime')")
-        )
-        await session.execute(
-            text(f"DELETE FROM server_logs WHERE collected_at < datetime('now', '-{log_days} days', 'localtime')")
+    now = datetime.now()
+    report = {}
+
+    # 일별 파티션: 만료된 일자는 DROP, 경계 일자 파티션만 행 단위로 정리
+    partitioned = [
+        ('metrics_raw', 'collected_at', now - timedelta(hours=raw_hours)),
+        ('server_logs', 'collected_at', now - timedelta(days=log_days)),
+    ]
+    for base, time_col, cutoff in partitioned:
+        started = time.monotonic()
+        archiving = base == 'metrics_raw' and archive_days > 0
+        if archiving:
+            # DROP 전에 압축 아카이브로 이동 (실패 시 해당 일자는 DROP 하지 않음)
+            cutoff = await _archive_expired_raw(cutoff)
+        dropped = await db_writer.run(
+            lambda conn: drop_partitions_before(conn, base, cutoff)
         )
-        await session.execute(
-            text(f"DELETE FROM alert_history WHERE created_at < datetime('now', '-{alert_days} days', 'localtime')")
+        deleted = 0
+        if base == 'metrics_raw':
+            # 아카이브 시 블록은 DROP 된 일자까지만 삭제 (경계 일자 블록은 파티션과 함께 유지)
+            block_cutoff = datetime.combine(cutoff.date(), datetime.min.time()) if archiving else cutoff
+            report['metrics_raw_blocks'] = {"deleted": await delete_blocks_before(
+                'raw', block_cutoff.strftime('%Y-%m-%d %H:%M:%S')
+            )}
+        # 아카이브는 일 단위이므로 경계 일자 파티션은 하루가 통째로 만료될 때까지 유지
+        if not archiving and has_partition(base, cutoff.date()):
+            deleted = await _delete_expired_chunked(
+                partition_name(base, cutoff.date()), time_col,
+                cutoff.strftime('%Y-%m-%d %H:%M:%S')
+            )
+        if base == 'server_logs':
+            # 참조하던 로그 행이 모두 정리된 템플릿 삭제 (행 삭제 트리거가 원문 복원에 쓰므로 행 정리 후)
+            report['log_templates'] = {"deleted": await db_writer.run(
+                lambda conn: log_miner.prune(conn, cutoff.strftime('%Y-%m-%d %H:%M:%S'))
+            )}
+        elapsed_ms = int((time.monotonic() - started) * 1000)
+        report[base] = {"deleted": deleted, "dropped_partitions": dropped, "elapsed_ms": elapsed_ms}
+        change_tracker.bump('raw')
+        logger.info(f"Cleanup {base}: dropped {len(dropped)} partitions, "
+                    f"{deleted} rows deleted in {elapsed_ms}ms")
+        await _checkpoint_passive()
+
+    if archive_days > 0:
+        removed = drop_archives_before((now - timedelta(days=archive_days)).date())
+        report['archive'] = {"removed_files": removed}
+        if removed:
+            logger.info(f"Cleanup archive: removed {len(removed)} files")
+
+    targets = [
+        ('metrics_5min', 'bucket_time', now - timedelta(days=min5_days)),
+        ('metrics_hourly', 'bucket_time', now - timedelta(days=hourly_days)),
+        ('log_rate_5min', 'bucket_time', now - timedelta(days=min5_days)),
+        ('alert_history', 'created_at', now - timedelta(days=alert_days)),
+        ('alert_incidents', 'created_at', now - timedelta(days=alert_days)),
+        ('health_check_results', 'checked_at', now - timedelta(days=30)),
+    ]
+    for table, time_col, cutoff in targets:
+        started = time.monotonic()
+        deleted = await _delete_expired_chunked(
+            table, time_col, cutoff.strftime('%Y-%m-%d %H:%M:%S')
         )
-        await session.execute(
-            text("DELETE FROM health_check_results WHERE checked_at < datetime('now', '-30 days', 'localtime')")
+        elapsed_ms = int((time.monotonic() - started) * 1000)
+        report[table] = {"deleted": deleted, "elapsed_ms": elapsed_ms}
+        if table in _CHANGE_TOPICS:
+            change_tracker.bump(_CHANGE_TOPICS[table])
+        if table == 'alert_history':
+            await db_writer.run(refresh_active_alerts)
+        if table == 'metrics_5min':
+            report['metrics_5min_blocks'] = {"deleted": await delete_blocks_before(
+                '5min', cutoff.strftime('%Y-%m-%d %H:%M:%S')
+            )}
+        logger.info(f"Cleanup {table}: {deleted} rows deleted in {elapsed_ms}ms")
+
+        await _checkpoint_passive()
+
+    logger.info("Old data cleanup completed")
+    return report
+
+
+async def _archive_expired_raw(cutoff: datetime) -> datetime:
+    """만료된 metrics_raw 파티션을 아카이브, DROP 해도 되는 경계 시각 반환
+
+    아카이브에 실패한 일자가 있으면 그 일자부터는 DROP 하지 않도록 경계를 앞당긴다.
+    """
+    for name in partitions_for_range('metrics_raw'):
+        day = parse_partition_name(name)[1]
+        if day >= cutoff.date():
+            break
+        try:
+            await archive_partition(day)
+        except Exception as e:
+            logger.error(f"Archive {name} failed: {e}")
+            return datetime.combine(day, datetime.min.time())
+    return cutoff
+
+
+async def _checkpoint_passive():
+    """테이블 단위로 WAL을 되감아 정리 중 WAL 파일이 한없이 커지지 않게 함"""
+    await db_writer.run_raw(lambda raw: raw.execute("PRAGMA wal_checkpoint(PASSIVE)"))
+
+
+async def _delete_expired_chunked(table: str, time_col: str, cutoff: str) -> int:
+    """rowid 순으로 CLEANUP_BATCH_SIZE 행씩 짧은 트랜잭션으로 삭제
+
+    시간 컬럼 단독 인덱스가 없으므로 rowid 범위로 청크를 잘라 스캔 비용을 제한한다.
+    rowid는 삽입 순서와 같이 증가하므로, 만료 행이 하나도 없는 청크를 만나면
+    보존 경계에 도달한 것으로 보고 중단한다.
+    """
+    total = 0
+    last_rowid = 0
+    while True:
+        async with async_session() as session:
+            result = await session.execute(
+                text(f"""SELECT MAX(rowid) FROM (
+                        SELECT rowid FROM {table}
+                        WHERE rowid > :last ORDER BY rowid LIMIT :n)"""),
+                {"last": last_rowid, "n": CLEANUP_BATCH_SIZE}
+            )
+            chunk_end = result.scalar()
+        if chunk_end is None:
+            break
+
+        result = await db_writer.execute(
+            text(f"""DELETE FROM {table}
+                 WHERE rowid > :last AND rowid <= :end AND {time_col} < :cutoff"""),
+            {"last": last_rowid, "end": chunk_end, "cutoff": cutoff}
         )
-        await session.commit()
-        logger.info("Old data cleanup completed")
+        deleted = result.rowcount or 0
+        if deleted == 0:
+            break
+        total += deleted
+        last_rowid = chunk_end
+
+        # 수집기/API 쓰기 작업이 쓰기 큐에서 밀리지 않도록 양보
+        await asyncio.sleep(CLEANUP_YIELD_SEC)
+
+    return total
@@ -0,0 +1,110 @@
+"""알림 규칙 일괄 평가 (틱마다 전체 서버 × 규칙을 numpy 로 한 번에 판단)
+
+수집기는 샘플을 받으면 알림 대상 메트릭 값만 엔진에 넘기고, 틱마다 한 번
+(서버 × 메트릭) 값 행렬을 만들어 모든 (서버, 규칙) 쌍의 임계치를 한 번에 비교한다.
+- 규칙 집합이 바뀔 때(rule_cache 서명)만 쌍 배열을 다시 만든다.
+  비교 연산은 '값 - 임계치' 의 부호(+, 0, -)별 충족 여부 마스크로 바꿔 두므로 연산자별 분기가 없다.
+- 쌍마다 단계(0 정상, 1 warning, 2 critical)를 계산하고, 단계가 바뀌었거나 아직 상태가
+  확정되지 않은 쌍(지속 시간/쿨다운 대기)만 파이썬 상태 기계(_check_rule)로 넘긴다.
+- 이번 틱에 값이 없는 쌍(수집되지 않은 서버, 값이 없는 메트릭)은 건너뛴다.
+- 윈도우 조건 규칙(condition_type != 'value')의 쌍은 행렬 값 대신 윈도우 집계값으로 바꿔 비교한다.
+"""
+from typing import Optional
+import numpy as np
+from backend.core.rule_cache import CompiledRule
+
+# 일괄 평가 대상 메트릭 (collect_timeout 은 알림 엔진의 수집 마감 타이머에서 별도 처리)
+ALERT_METRICS = ('cpu_usage_pct', 'mem_usage_pct', 'disk_usage_pct', 'error_log_rate')
+METRIC_POS = {m: i for i, m in enumerate(ALERT_METRICS)}
+
+# 연산자 → (값 - 임계치 가 양수, 0, 음수일 때 충족 여부)
+_OP_SIGNS = {
+    '>=': (True, True, False),
+    '>': (True, False, False),
+    '<=': (False, True, True),
+    '<': (False, False, True),
+    '==': (False, True, False),
+}
+
+
+def _threshold(value: Optional[float]) -> float:
+    return np.nan if value is None else float(value)
+
+
+class RuleMatrix:
+    """규칙 집합 한 벌에 대한 (서버, 규칙) 쌍 배열과 쌍별 마지막 판단 단계"""
+
+    def __init__(self, signature: tuple, fleet: list[tuple[int, str, tuple[CompiledRule, ...]]]):
+        self.signature = signature
+        self.server_ids = [sid for sid, _, _ in fleet]
+        self.server_names = [name for _, name, _ in fleet]
+        self.server_row = {sid: i for i, sid in enumerate(self.server_ids)}
+
+        rows, cols, signs, warn, crit, windowed = [], [], [], [], [], []
+        self.rules: list[CompiledRule] = []
+        for row, (_, _, rules) in enumerate(fleet):
+            for rule in rules:
+                col = METRIC_POS.get(rule.metric_name)
+                op = _OP_SIGNS.get(rule.condition_op)
+                if col is None or op is None:
+                    continue
+                rows.append(row)
+                cols.append(col)
+                signs.append(op)
+                warn.append(_threshold(rule.warning_value))
+                crit.append(_threshold(rule.critical_value))
+                if rule.condition_type != 'value':
+                    windowed.append(len(self.rules))
+                self.rules.append(rule)
+
+        self.pair_row = np.array(rows, dtype=np.intp)
+        self.pair_col = np.array(cols, dtype=np.intp)
+        signs = np.array(signs, dtype=bool).reshape(-1, 3)
+        self.pos, self.zero, self.neg = signs[:, 0], signs[:, 1], signs[:, 2]
+        self.warn = np.array(warn, dtype=np.float64)
+        self.crit = np.array(crit, dtype=np.float64)
+        # 윈도우 집계값으로 바꿔 넣을 쌍 번호
+        self.windowed = windowed
+        # -1: 아직 판단 전 (처음 값이 들어오면 반드시 상태 기계를 거침)
+        self.last_level = np.full(len(self.rules), -1, dtype=np.int8)
+        self.settled = np.zeros(len(self.rules), dtype=bool)
+
+    @property
+    def size(self) -> int:
+        return len(self.rules)
+
+    def new_values(self) -> np.ndarray:
+        """이번 틱 값 행렬 (서버 × 메트릭, 값이 없으면 NaN)"""
+        return np.full((len(self.server_ids), len(ALERT_METRICS)), np.nan)
+
+    def _hit(self, diff: np.ndarray) -> np.ndarray:
+        # NaN(값 또는 임계치 없음)은 세 비교 모두 거짓
+        return (self.pos & (diff > 0)) | (self.zero & (diff == 0)) | (self.neg & (diff < 0))
+
+    def window_keys(self) -> set[tuple[int, str, int]]:
+        """윈도우 조건 쌍이 쓰는 (server_id, metric_name, window_sec)"""
+        return {
+            (self.server_ids[self.pair_row[i]], self.rules[i].metric_name, self.rules[i].window_sec)
+            for i in self.windowed
+        }
+
+    def pair_values(self, values: np.ndarray) -> np.ndarray:
+        """값 행렬 → 쌍별 값 (윈도우 조건 쌍은 호출 측이 집계값으로 바꿔 넣음)"""
+        return values[self.pair_row, self.pair_col]
+
+    def evaluate(self, pair_values: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """(쌍별 단계, 상태 기계로 넘길 쌍 번호)"""
+        level = np.where(self._hit(pair_values - self.crit), 2,
+                         np.where(self._hit(pair_values - self.warn), 1, 0)).astype(np.int8)
+        present = ~np.isnan(pair_values)
+        changed = present & ((level != self.last_level) | ~self.settled)
+        return level, np.flatnonzero(changed)
+
+    def settle(self, i: int, level: int, state: dict):
+        """상태 기계 처리 후 기록: 같은 단계가 계속되는 동안 다시 처리할 필요가 없는지"""
+        self.last_level[i] = level
+        self.settled[i] = (
+            level == 0 or
+            (level == 2 and state["alerted_critical"]) or
+            (level == 1 and state["alerted_warning"])
+        )
@@ -1,14 +1,52 @@
-"""알림 엔진 — 임계치 판단 + 알림 생성 + 자동 해제"""
+"""알림 엔진 — 임계치 판단 + 알림 생성 + 자동 해제
+
+판단 상태(초과 시작 시각, 단계별 발생 여부, 마지막 발생 시각)는 메모리에 두고
+ALERT_STATE_SAVE_SEC 마다, 그리고 종료 시 alert_state 에 바뀐 항목만 저장한다.
+시작 시 스냅샷과 미해결 알림(alert_history)으로 상태를 복원하므로 재시작 후에도
+지속 시간/쿨다운이 이어지고, 같은 알림을 다시 발생시키지 않으며, 정상 복귀 시 자동 해제된다.
+
+ALERT_BATCH_EVALUATION 이면 수집 시 값만 모아 두고 틱마다 전체 서버를 한 번에 평가한다 (alert_batch).
+윈도우 조건 규칙(평균/최소/최대/변화량/증가율/백분위)은 샘플마다 윈도우에 값을 넣고 집계값으로 판단한다
+(alert_windows).
+발생한 알림은 즉시 기록하고, WebSocket/Webhook 전달은 alert_grouper 가 묶어서 한다.
+
+collect_timeout(마지막 수집 성공 후 경과 초)은 값이 들어오지 않을 때 판단해야 하므로, 수집에 성공할
+때마다 서버별 마감(마지막 성공 + 가장 작은 임계치)을 타이머 휠에 다시 걸고, 마감이 지났을 때만
+규칙을 평가한다. 샘플당 O(1)이고 DB 를 주기적으로 조회하지 않는다.
+"""
 import json
 import logging
+import time
 from datetime import datetime
 from typing import Optional
+import numpy as np
 from sqlalchemy import text
+from backend.config import ALERT_BATCH_EVALUATION, COLLECT_DEADLINE_TICK_SEC
 from backend.db.database import async_session
+from backend.db.incidents import close_resolved_incidents
+from backend.db.latest import refresh_active_alerts
+from backend.db.log_rate import error_log_rates
+from backend.db.writer import db_writer
+from backend.core.alert_batch import ALERT_METRICS, METRIC_POS, RuleMatrix
+from backend.core.alert_grouper import alert_grouper
+from backend.core.alert_windows import WindowStore, condition_label
+from backend.core.http_cache import change_tracker
+from backend.core.rule_cache import CompiledRule, rule_cache
+from backend.core.timer_wheel import TimerWheel
 from backend.core.ws_manager import ws_manager
 
 logger = logging.getLogger(__name__)
 
+_TIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+def _format_time(value: Optional[datetime]) -> Optional[str]:
+    return value.strftime(_TIME_FORMAT) if value else None
+
+
+def _parse_time(value: Optional[str]) -> Optional[datetime]:
+    return datetime.strptime(value[:19], _TIME_FORMAT) if value else None
+
 
 class AlertEngine:
     """임계치 판단 및 알림 생성 엔진"""
@@ -16,44 +54,289 @@ class AlertEngine:
     def __init__(self):
         # server_id -> {metric_name: {"exceed_since": datetime, "alerted": bool, "last_alert_at": datetime}}
         self._state: dict[int, dict] = {}
-        self.notifier = None
+        # 마지막으로 alert_state 에 저장한 행 ((server_id, rule_id, metric_name) -> 값)
+        self._saved: dict[tuple, tuple] = {}
+        # 일괄 평가: 이번 틱에 들어온 값 (server_id -> {metric_name: value})
+        self._pending: dict[int, dict[str, float]] = {}
+        self._matrix: Optional[RuleMatrix] = None
+        self._windows = WindowStore()
+        # 수집 마감: server_id -> 마지막 수집 성공(단조 시계), 마감 타이머,
+        # 마지막 성공 이후 collect_timeout 을 평가한 서버 (다음 성공 시 정상 복귀 처리)
+        self._last_collect: dict[int, float] = {}
+        self._collect_wheel = TimerWheel(time.monotonic(), COLLECT_DEADLINE_TICK_SEC)
+        self._collect_stale: set[int] = set()
+
+    def _snapshot(self) -> dict[tuple, tuple]:
+        """저장할 상태 행 (초기 상태와 같은 항목은 제외)"""
+        rows = {}
+        for server_id, states in self._state.items():
+            for state_key, state in states.items():
+                row = (
+                    _format_time(state["exceed_since"]),
+                    int(bool(state["alerted_warning"])),
+                    int(bool(state["alerted_critical"])),
+                    _format_time(state["last_alert_at"]),
+                )
+                if row == (None, 0, 0, None):
+                    continue
+                rule_id, metric_name = state_key.split('_', 1)
+                rows[(server_id, int(rule_id), metric_name)] = row
+        return rows
+
+    async def save_state(self):
+        """판단 상태 스냅샷 저장 (마지막 저장 이후 바뀐 항목만)"""
+        rows = self._snapshot()
+        changed = [
+            {"sid": k[0], "rid": k[1], "mn": k[2], "es": v[0], "aw": v[1], "ac": v[2], "la": v[3]}
+            for k, v in rows.items() if self._saved.get(k) != v
+        ]
+        removed = [{"sid": k[0], "rid": k[1], "mn": k[2]} for k in self._saved.keys() - rows.keys()]
+        if not changed and not removed:
+            return
+
+        async def save(conn):
+            if removed:
+                await conn.execute(
+                    text("""DELETE FROM alert_state
+                         WHERE server_id=:sid AND rule_id=:rid AND metric_name=:mn"""),
+                    removed
+                )
+            if changed:
+                await conn.execute(
+                    text("""INSERT OR REPLACE INTO alert_state
+                        (server_id, rule_id, metric_name, exceed_since,
+                         alerted_warning, alerted_critical, last_alert_at)
+                        VALUES (:sid, :rid, :mn, :es, :aw, :ac, :la)"""),
+                    changed
+                )
 
-    async def evaluate(self, server_id: int, server_name: str, metrics: dict):
-        """메트릭 수신 시 알림 규칙 평가"""
+        await db_writer.run(save)
+        self._saved = rows
+
+    async def load_state(self):
+        """시작 시 상태 복원: alert_state 스냅샷 + 미해결 알림
+
+        스냅샷 이후(마지막 저장 ~ 종료 사이)에 발생한 알림도 미해결 알림으로 발생 여부를 채운다.
+        삭제된 규칙의 상태와 알림은 평가 대상이 아니므로 건너뛴다.
+        """
         async with async_session() as session:
             result = await session.execute(
-                text("""SELECT * FROM alert_rules WHERE is_enabled=1
-                     AND (server_id IS NULL OR server_id=:sid)
-                     ORDER BY sort_order"""),
-                {"sid": server_id}
+                text("""SELECT server_id, rule_id, metric_name, exceed_since,
+                        alerted_warning, alerted_critical, last_alert_at
+                     FROM alert_state
+                     WHERE rule_id IN (SELECT rule_id FROM alert_rules)""")
             )
-            rules = [dict(r._mapping) for r in result.fetchall()]
-
-            # 서버의 그룹명 조회
-            srv_result = await session.execute(
-                text("SELECT group_name FROM servers WHERE server_id=:sid"),
-                {"sid": server_id}
+            saved = result.fetchall()
+            result = await session.execute(
+                text("""SELECT server_id, rule_id, metric_name, severity,
+                        MIN(created_at), MAX(created_at)
+                     FROM alert_history
+                     WHERE resolved_at IS NULL
+                     AND rule_id IN (SELECT rule_id FROM alert_rules)
+                     GROUP BY server_id, rule_id, metric_name, severity""")
             )
-            srv_row = srv_result.fetchone()
-            server_group = srv_row[0] if srv_row else None
+            open_alerts = result.fetchall()
+
+        self._state = {}
+        for server_id, rule_id, metric_name, exceed_since, warned, critical, last_alert_at in saved:
+            self._state.setdefault(server_id, {})[f"{rule_id}_{metric_name}"] = {
+                "exceed_since": _parse_time(exceed_since),
+                "alerted_warning": bool(warned),
+                "alerted_critical": bool(critical),
+                "last_alert_at": _parse_time(last_alert_at),
+            }
+        self._saved = self._snapshot()
 
-        for rule in rules:
-            # 그룹 필터 체크
-            if rule['group_name'] and rule['group_name'] != server_group:
-                continue
-            if rule['server_id'] and rule['server_id'] != server_id:
-                continue
+        for server_id, rule_id, metric_name, severity, first_at, last_at in open_alerts:
+            state = self._state.setdefault(server_id, {}).setdefault(f"{rule_id}_{metric_name}", {
+                "exceed_since": None,
+                "alerted_warning": False,
+                "alerted_critical": False,
+                "last_alert_at": None
+            })
+            state["alerted_critical" if severity == 'critical' else "alerted_warning"] = True
+            first_at, last_at = _parse_time(first_at), _parse_time(last_at)
+            if state["exceed_since"] is None or first_at < state["exceed_since"]:
+                state["exceed_since"] = first_at
+            if state["last_alert_at"] is None or last_at > state["last_alert_at"]:
+                state["last_alert_at"] = last_at
+
+        # 복원된 수집 타임아웃 상태는 첫 수집 성공 때 정상 복귀 처리
+        self._collect_stale = {
+            server_id for server_id, states in self._state.items()
+            if any(key.endswith('_collect_timeout') for key in states)
+        }
+
+        logger.info(f"Alert state restored: {len(saved)} saved, {len(open_alerts)} open alert groups")
+
+    async def evaluate(self, server_id: int, server_name: str, metrics: dict):
+        """메트릭 수신 시 알림 규칙 평가 (규칙은 rule_cache 에서, DB 조회 없음)"""
+        rules = await rule_cache.rules_for(server_id)
+        values = self._alert_values(metrics)
+        self._windows.push(server_id, rules, values, time.monotonic())
 
-            metric_name = rule['metric_name']
-            metric_value = self._get_metric_value(metrics, metric_name)
+        for rule in rules:
+            metric_name = rule.metric_name
+            metric_value = values.get(metric_name)
 
             if metric_value is None:
                 continue
+            if rule.condition_type != 'value':
+                metric_value = self._windows.value(server_id, rule)
+                if metric_value is None:
+                    continue
 
             await self._check_rule(
                 server_id, server_name, rule, metric_name, metric_value
             )
 
+    def _alert_values(self, metrics: dict) -> dict[str, float]:
+        """수집 결과 → 알림 대상 메트릭 값 (값이 없는 메트릭은 제외)"""
+        values = {}
+        for metric_name in ALERT_METRICS:
+            value = self._get_metric_value(metrics, metric_name)
+            if value is not None:
+                values[metric_name] = value
+        return values
+
+    async def observe(self, server_id: int, server_name: str, metrics: dict):
+        """수집 결과 전달: 일괄 평가면 알림 대상 값만 모아 두고(윈도우에는 바로 반영), 아니면 바로 평가"""
+        if not ALERT_BATCH_EVALUATION:
+            await self.evaluate(server_id, server_name, metrics)
+            return
+        values = self._alert_values(metrics)
+        self._windows.push(server_id, await rule_cache.rules_for(server_id), values, time.monotonic())
+        self._pending.setdefault(server_id, {}).update(values)
+
+    async def evaluate_batch(self):
+        """틱마다 호출: 모아 둔 값으로 전체 (서버, 규칙) 쌍을 한 번에 판단하고,
+        단계가 바뀌었거나 대기 중인 쌍만 상태 기계로 처리"""
+        pending, self._pending = self._pending, {}
+        if not pending:
+            return
+
+        signature, fleet = await rule_cache.fleet()
+        if self._matrix is None or self._matrix.signature != signature:
+            self._matrix = RuleMatrix(signature, fleet)
+            self._windows.retain(self._matrix.window_keys())
+        matrix = self._matrix
+        if not matrix.size:
+            return
+
+        values = matrix.new_values()
+        for server_id, metrics in pending.items():
+            row = matrix.server_row.get(server_id)
+            if row is None:
+                continue
+            for metric_name, value in metrics.items():
+                values[row, METRIC_POS[metric_name]] = value
+
+        pair_values = matrix.pair_values(values)
+        for i in matrix.windowed:
+            if not np.isnan(pair_values[i]):  # 이번 틱에 값이 들어온 쌍만
+                value = self._windows.value(matrix.server_ids[matrix.pair_row[i]], matrix.rules[i])
+                pair_values[i] = np.nan if value is None else value
+        levels, changed = matrix.evaluate(pair_values)
+        for i in changed:
+            rule = matrix.rules[i]
+            row = matrix.pair_row[i]
+            server_id = matrix.server_ids[row]
+            await self._check_rule(
+                server_id, matrix.server_names[row], rule, rule.metric_name, float(pair_values[i])
+            )
+            matrix.settle(i, levels[i], self._state[server_id][f"{rule.rule_id}_{rule.metric_name}"])
+
+    async def evaluate_log_rates(self):
+        """로그 건수 집계 직후 호출: 활성 서버마다 error_log_rate 규칙 평가 (에러가 없으면 0)"""
+        if not await rule_cache.has_metric('error_log_rate'):
+            return
+
+        rates = await error_log_rates()
+        for server_id, server_name in await rule_cache.active_servers():
+            await self.observe(server_id, server_name, {"error_log_rate": rates.get(server_id, 0.0)})
+
+    @staticmethod
+    def _collect_rules(rules) -> list[CompiledRule]:
+        return [rule for rule in rules if rule.metric_name == 'collect_timeout']
+
+    @staticmethod
+    def _collect_deadlines(rules: list[CompiledRule]) -> list[float]:
+        """마지막 수집 성공 기준 마감(초) 목록"""
+        return sorted(
+            value for rule in rules
+            for value in (rule.warning_value, rule.critical_value)
+            if value is not None and value > 0
+        )
+
+    async def collect_started(self, server_id: int):
+        """수집 시작: 아직 성공한 적이 없으면 지금을 기준으로 마감을 건다 (처음부터 수집이 안 되는 서버)"""
+        if server_id not in self._last_collect:
+            await self._arm_collect_deadline(server_id, time.monotonic())
+
+    async def collect_succeeded(self, server_id: int):
+        """수집 성공: 마감을 다시 걸고, 타임아웃 판단 중이었으면 정상 복귀 처리"""
+        await self._arm_collect_deadline(server_id, time.monotonic())
+        if server_id not in self._collect_stale:
+            return
+        self._collect_stale.discard(server_id)
+        info = rule_cache.server_info(server_id)
+        server_name = info.display_name if info else f"Server {server_id}"
+        for rule in self._collect_rules(await rule_cache.rules_for(server_id)):
+            await self._check_rule(server_id, server_name, rule, 'collect_timeout', 0.0)
+
+    def collect_stopped(self, server_id: int):
+        """수집 중지(서버 비활성/삭제/점검): 마감 해제"""
+        self._collect_wheel.cancel(server_id)
+        self._last_collect.pop(server_id, None)
+
+    async def _arm_collect_deadline(self, server_id: int, now: float):
+        self._last_collect[server_id] = now
+        deadlines = self._collect_deadlines(self._collect_rules(await rule_cache.rules_for(server_id)))
+        if deadlines:
+            self._collect_wheel.schedule(server_id, now + deadlines[0])
+        else:
+            self._collect_wheel.cancel(server_id)
+
+    async def check_collect_deadlines(self):
+        """틱마다 호출: 마감이 지난 서버만 collect_timeout 규칙 평가"""
+        now = time.monotonic()
+        for server_id in self._collect_wheel.advance(now):
+            last = self._last_collect.get(server_id)
+            if last is None:
+                continue
+            rules = self._collect_rules(await rule_cache.rules_for(server_id))
+            info = rule_cache.server_info(server_id)
+            if not rules or info is None or not info.is_active:
+                continue
+
+            elapsed = now - last
+            self._collect_stale.add(server_id)
+            for rule in rules:
+                await self._check_rule(server_id, info.display_name, rule, 'collect_timeout', elapsed)
+
+            next_check = self._next_collect_check(server_id, rules, last, elapsed)
+            if next_check is not None:
+                self._collect_wheel.schedule(server_id, next_check)
+
+    def _next_collect_check(self, server_id: int, rules: list[CompiledRule],
+                            last: float, elapsed: float) -> Optional[float]:
+        """다음 평가 시각: 아직 지나지 않은 임계치, 또는 지속 시간/쿨다운 때문에 미뤄진 알림"""
+        candidates = [last + d for d in self._collect_deadlines(rules) if d > elapsed]
+        now = datetime.now()
+        states = self._state.get(server_id, {})
+        for rule in rules:
+            state = states.get(f"{rule.rule_id}_collect_timeout")
+            if not state or state["exceed_since"] is None:
+                continue
+            is_critical = rule.critical_value is not None and rule.compare(elapsed, rule.critical_value)
+            if state["alerted_critical"] or (state["alerted_warning"] and not is_critical):
+                continue
+            wait = rule.duration_sec - (now - state["exceed_since"]).total_seconds()
+            if state["last_alert_at"]:
+                wait = max(wait, rule.cooldown_sec - (now - state["last_alert_at"]).total_seconds())
+            candidates.append(last + elapsed + max(wait, 0))
+        return min(candidates) if candidates else None
+
     def _get_metric_value(self, metrics: dict, metric_name: str) -> Optional[float]:
         """메트릭에서 특정 값 추출"""
         if metric_name == 'cpu_usage_pct':
@@ -73,14 +356,16 @@ class AlertEngine:
                     pass
             return None
         elif metric_name == 'collect_timeout':
-            return None  # 수집 타임아웃은 collector에서 별도 처리
+            return None  # 수집 타임아웃은 수집 마감 타이머(check_collect_deadlines)에서 처리
+        elif metric_name == 'error_log_rate':
+            return metrics.get('error_log_rate')  # evaluate_log_rates 에서만 전달
         return None
 
     async def _check_rule(self, server_id: int, server_name: str,
-                          rule: dict, metric_name: str, metric_value: float):
+                          rule: CompiledRule, metric_name: str, metric_value: float):
         """규칙 조건 판단"""
         now = datetime.now()
-        state_key = f"{rule['rule_id']}_{metric_name}"
+        state_key = f"{rule.rule_id}_{metric_name}"
 
         if server_id not in self._state:
             self._state[server_id] = {}
@@ -92,15 +377,14 @@ class AlertEngine:
             "last_alert_at": None
         })
 
-        op = rule['condition_op']
-        critical_val = rule.get('critical_value')
-        warning_val = rule.get('warning_value')
-        duration_sec = rule.get('duration_sec', 0)
-        cooldown_sec = rule.get('cooldown_sec', 300)
+        critical_val = rule.critical_value
+        warning_val = rule.warning_value
+        duration_sec = rule.duration_sec
+        cooldown_sec = rule.cooldown_sec
 
         # 임계치 초과 여부 확인
-        is_critical = critical_val is not None and self._compare(metric_value, op, critical_val)
-        is_warning = warning_val is not None and self._compare(metric_value, op, warning_val)
+        is_critical = critical_val is not None and rule.compare(metric_value, critical_val)
+        is_warning = warning_val is not None and rule.compare(metric_value, warning_val)
 
         if is_critical or is_warning:
             if state["exceed_since"] is None:
@@ -136,7 +420,7 @@ class AlertEngine:
         else:
             # 정상 복귀
             if state.get("alerted_warning") or state.get("alerted_critical"):
-                await self._resolve_alerts(server_id, server_name, metric_name, metric_value)
+                await self._resolve_alerts(server_id, server_name, metric_name, metric_value, rule)
 
             state = {
                 "exceed_since": None,
@@ -147,48 +431,37 @@ class AlertEngine:
 
         self._state[server_id][state_key] = state
 
-    def _compare(self, value: float, op: str, threshold: float) -> bool:
-        """비교 연산"""
-        if op == '>=':
-            return value >= threshold
-        elif op == '>':
-            return value > threshold
-        elif op == '<=':
-            return value <= threshold
-        elif op == '<':
-            return value < threshold
-        elif op == '==':
-            return value == threshold
-        return False
-
     async def _fire_alert(self, server_id: int, server_name: str,
-                          rule: dict, severity: str,
+                          rule: CompiledRule, severity: str,
                           metric_name: str, metric_value: float):
         """알림 발생"""
-        threshold = rule['critical_value'] if severity == 'critical' else rule['warning_value']
-        message = (f"{self._metric_label(metric_name)} {metric_value:.1f}% "
-                   f"— 임계치 {threshold}% 초과"
-                   f" ({rule.get('duration_sec', 0)}초 지속)")
+        threshold = rule.critical_value if severity == 'critical' else rule.warning_value
+        unit = self._metric_unit(metric_name, rule)
+        message = (f"{self._metric_label(metric_name)}{condition_label(rule)} {metric_value:.1f}{unit} "
+                   f"— 임계치 {threshold}{unit} 초과"
+                   f" ({rule.duration_sec}초 지속)")
 
         now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
 
-        async with async_session() as session:
-            await session.execute(
+        async def fire(conn):
+            result = await conn.execute(
                 text("""INSERT INTO alert_history
                     (server_id, rule_id, severity, metric_name, metric_value,
-                     threshold_value, message)
-                    VALUES (:sid, :rid, :sev, :mn, :mv, :tv, :msg)"""),
+                     threshold_value, message, acknowledged, webhook_sent)
+                    VALUES (:sid, :rid, :sev, :mn, :mv, :tv, :msg, 0, 0)"""),
                 {
-                    "sid": server_id, "rid": rule['rule_id'],
+                    "sid": server_id, "rid": rule.rule_id,
                     "sev": severity, "mn": metric_name,
                     "mv": metric_value, "tv": threshold, "msg": message
                 }
             )
-            result = await session.execute(text("SELECT last_insert_rowid()"))
-            alert_id = result.scalar()
-            await session.commit()
+            await refresh_active_alerts(conn, server_id)
+            return result.lastrowid
+
+        alert_id = await db_writer.run(fire)
+        change_tracker.bump('alerts')
 
-        # WebSocket 알림 브로드캐스트
+        # WebSocket/Webhook 은 알림 묶음 단계에서 모아서 전달
         alert_data = {
             "type": "alert_fired",
             "alert_id": alert_id,
@@ -197,53 +470,62 @@ class AlertEngine:
             "severity": severity,
             "message": message,
             "metric_name": metric_name,
+            "metric_label": self._metric_label(metric_name),
             "metric_value": metric_value,
             "threshold_value": threshold,
+            "rule_id": rule.rule_id,
+            "group_name": rule_cache.server_group(server_id),
             "timestamp": now
         }
-        await ws_manager.broadcast_alert(alert_data)
         logger.warning(f"Alert fired: [{severity.upper()}] {server_name} — {message}")
-
-        # Webhook 발송
-        if self.notifier:
-            await self.notifier.send_alert(alert_data)
+        await alert_grouper.add(alert_data)
 
     async def _resolve_alerts(self, server_id: int, server_name: str,
-                              metric_name: str, metric_value: float):
-        """알림 자동 해제"""
+                              metric_name: str, metric_value: float,
+                              rule: Optional[CompiledRule] = None):
+        """알림 자동 해제 (rule 이 있으면 그 규칙이 낸 알림만)"""
         now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-
-        async with async_session() as session:
-            result = await session.execute(
-                text("""SELECT alert_id FROM alert_history
-                     WHERE server_id=:sid AND metric_name=:mn
-                     AND resolved_at IS NULL"""),
-                {"sid": server_id, "mn": metric_name}
+        # 같은 메트릭을 보는 다른 규칙(현재값/윈도우 규칙 병행)의 알림은 그 규칙이 해제
+        where = "server_id=:sid AND metric_name=:mn AND resolved_at IS NULL"
+        params = {"sid": server_id, "mn": metric_name}
+        if rule is not None:
+            where += " AND rule_id=:rid"
+            params["rid"] = rule.rule_id
+
+        async def resolve(conn):
+            result = await conn.execute(
+                text(f"SELECT alert_id FROM alert_history WHERE {where}"), params
             )
             alert_ids = [row[0] for row in result.fetchall()]
-
             if alert_ids:
-                await session.execute(
-                    text("""UPDATE alert_history SET resolved_at=:ra
-                         WHERE server_id=:sid AND metric_name=:mn
-                         AND resolved_at IS NULL"""),
-                    {"ra": now, "sid": server_id, "mn": metric_name}
+                await conn.execute(
+                    text(f"UPDATE alert_history SET resolved_at=:ra WHERE {where}"),
+                    {**params, "ra": now}
                 )
-                await session.commit()
-
-                message = f"{self._metric_label(metric_name)} 정상 복귀 (현재 {metric_value:.1f}%)"
-
-                for aid in alert_ids:
-                    await ws_manager.broadcast_alert({
-                        "type": "alert_resolved",
-                        "alert_id": aid,
-                        "server_id": server_id,
-                        "server_name": server_name,
-                        "message": message,
-                        "timestamp": now
-                    })
-
-                logger.info(f"Alert resolved: {server_name} — {message}")
+                await refresh_active_alerts(conn, server_id)
+                await close_resolved_incidents(conn, alert_ids)
+            return alert_ids
+
+        alert_ids = await db_writer.run(resolve)
+        if alert_ids:
+            change_tracker.bump('alerts')
+            # 아직 전달 전인 알림은 묶음 전달 때 해결된 알림으로 함께 보냄
+            alert_grouper.mark_resolved(alert_ids, now)
+            message = (f"{self._metric_label(metric_name)} 정상 복귀 "
+                       f"(현재{condition_label(rule) if rule else ''} "
+                       f"{metric_value:.1f}{self._metric_unit(metric_name, rule)})")
+
+            for aid in alert_ids:
+                await ws_manager.broadcast_alert({
+                    "type": "alert_resolved",
+                    "alert_id": aid,
+                    "server_id": server_id,
+                    "server_name": server_name,
+                    "message": message,
+                    "timestamp": now
+                })
+
+            logger.info(f"Alert resolved: {server_name} — {message}")
 
     def _metric_label(self, metric_name: str) -> str:
         """메트릭 한글 라벨"""
@@ -251,9 +533,15 @@ class AlertEngine:
             'cpu_usage_pct': 'CPU 사용률',
             'mem_usage_pct': '메모리 사용률',
             'disk_usage_pct': '디스크 사용률',
-            'collect_timeout': '수집 타임아웃'
+            'collect_timeout': '수집 타임아웃',
+            'error_log_rate': '에러 로그 발생률'
         }
         return labels.get(metric_name, metric_name)
 
+    def _metric_unit(self, metric_name: str, rule: Optional[CompiledRule] = None) -> str:
+        """메트릭 값 단위 (rate 조건은 시간당)"""
+        unit = {'error_log_rate': '건/분', 'collect_timeout': '초'}.get(metric_name, '%')
+        return f"{unit}/시간" if rule and rule.condition_type == 'rate' else unit
+
 
 alert_engine = AlertEngine()
@@ -0,0 +1,169 @@
+"""알림 묶음 (장애 시 알림 폭주 억제)
+
+스위치 하나가 죽으면 수십 대 서버 알림이 한꺼번에 발생한다. 알림 행(alert_history)은 발생 즉시
+서버별로 기록하고, WebSocket/Webhook 전달만 이 단계에서 모아 보낸다.
+- 알림의 ALERT_GROUP_BY 필드 값(그룹/메트릭/원인 규칙/심각도)이 묶음 키다.
+- 키의 첫 알림은 기다리지 않고 기존과 같은 alert_fired 로 바로 보내고, 그때부터
+  ALERT_GROUP_WINDOW_SEC 동안 같은 키로 들어온 후속 알림만 모은다.
+- 창이 닫힐 때 후속 알림이 한 건이면 alert_fired 로, 여러 건이면 첫 알림까지 묶은 인시던트
+  (alert_incidents) 하나를 만들어 대시보드에 alert_grouped 한 번, Webhook 한 번만 보낸다.
+  서버 상세 채널에는 서버별 알림을 그대로 보낸다. 창이 닫힌 뒤의 알림은 다시 첫 알림이 된다.
+- 창이 닫히기 전에 해결된 후속 알림도 빼지 않고 해결 시각(resolved_at)을 붙여 함께 보낸다
+  (장애 중에 잠깐 넘었다 돌아온 서버도 묶음 알림에는 남는다).
+전달은 타이머가 띄운 별도 태스크에서 실행되어 수집 경로를 막지 않는다.
+"""
+import asyncio
+import logging
+from backend.config import ALERT_GROUP_BY, ALERT_GROUP_WINDOW_SEC
+from backend.core.http_cache import change_tracker
+from backend.core.ws_manager import ws_manager
+from backend.db.incidents import create_incident
+from backend.db.writer import db_writer
+
+logger = logging.getLogger(__name__)
+
+# 묶음 메시지에 이름을 나열할 최대 서버 수
+GROUP_LIST_SERVERS = 5
+
+
+class AlertGrouper:
+    """알림 묶음 전달"""
+
+    def __init__(self, window_sec: float = ALERT_GROUP_WINDOW_SEC, group_by: tuple = ALERT_GROUP_BY):
+        self.window_sec = window_sec
+        self.group_by = group_by
+        self.notifier = None
+        # 키 -> [이미 보낸 첫 알림, 후속 알림...]
+        self._buckets: dict[tuple, list[dict]] = {}
+        self._timers: dict[tuple, asyncio.TimerHandle] = {}
+        self._tasks: set[asyncio.Task] = set()
+
+    async def add(self, alert: dict):
+        """발생한 알림 전달 요청 (키의 첫 알림은 바로 전달 태스크로, 창 안의 후속 알림은 모음)"""
+        if self.window_sec <= 0:
+            self._spawn(self._deliver_first(alert))
+            return
+        key = tuple(alert.get(field) for field in self.group_by)
+        bucket = self._buckets.get(key)
+        if bucket is not None:
+            bucket.append(alert)
+            return
+        self._buckets[key] = [alert]
+        self._timers[key] = asyncio.get_running_loop().call_later(
+            self.window_sec, self._start_flush, key
+        )
+        self._spawn(self._deliver_first(alert))
+
+    def mark_resolved(self, alert_ids: list[int], resolved_at: str):
+        """전달 전에 해결된 후속 알림에 해결 시각 표시 (묶음 전달 때 해결된 알림으로 보냄)"""
+        ids = set(alert_ids)
+        for bucket in self._buckets.values():
+            for alert in bucket[1:]:
+                if alert["alert_id"] in ids:
+                    alert["resolved_at"] = resolved_at
+
+    def _spawn(self, coro):
+        """전달 작업을 별도 태스크로 실행 (종료 시 flush_all 이 기다림)"""
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def _start_flush(self, key: tuple):
+        self._spawn(self._flush(key))
+
+    async def _deliver_first(self, alert: dict):
+        try:
+            await self._deliver_single(alert)
+        except Exception as e:
+            logger.error(f"Alert delivery failed (alert {alert.get('alert_id')}): {e}")
+
+    async def _flush(self, key: tuple):
+        self._timers.pop(key, None)
+        bucket = self._buckets.pop(key, None)
+        if not bucket or len(bucket) < 2:
+            return
+        try:
+            if len(bucket) == 2:
+                alert = bucket[1]
+                if alert.get("resolved_at"):
+                    alert = {**alert, "message": f"{alert['message']} — {alert['resolved_at']} 정상 복귀"}
+                await self._deliver_single(alert)
+            else:
+                await self._deliver_group(bucket, key)
+        except Exception as e:
+            logger.error(f"Alert delivery failed ({len(bucket) - 1} alerts): {e}")
+
+    async def flush_all(self):
+        """종료 시 대기 중인 후속 알림을 모두 전달"""
+        for timer in self._timers.values():
+            timer.cancel()
+        for key in list(self._buckets):
+            await self._flush(key)
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def _deliver_single(self, alert: dict):
+        await ws_manager.broadcast_alert(alert)
+        if self.notifier:
+            await self.notifier.send_alert(alert)
+
+    async def _deliver_group(self, alerts: list[dict], key: tuple):
+        """첫 알림(이미 보냄) + 후속 알림 → 인시던트, 후속 알림만 새로 알림"""
+        first, followups = alerts[0], alerts[1:]
+        server_names = list(dict.fromkeys(a["server_name"] for a in alerts))
+        severity = 'critical' if any(a["severity"] == 'critical' for a in alerts) else 'warning'
+        group_name = first.get("group_name") if 'group_name' in self.group_by else None
+        metric_name = first["metric_name"] if 'metric_name' in self.group_by else None
+        rule_id = first.get("rule_id") if 'rule_id' in self.group_by else None
+
+        title = f"{first['metric_label'] if metric_name else '알림'} 임계치 초과 — 서버 {len(server_names)}대"
+        if group_name:
+            title = f"[{group_name}] {title}"
+        shown = ", ".join(server_names[:GROUP_LIST_SERVERS])
+        rest = len(server_names) - GROUP_LIST_SERVERS
+        message = f"{title}: {shown}" + (f" 외 {rest}대" if rest > 0 else "")
+        resolved_count = sum(1 for a in followups if a.get("resolved_at"))
+        if resolved_count:
+            message += f" (정상 복귀 {resolved_count}건)"
+
+        alert_ids = [a["alert_id"] for a in alerts]
+        group_key = ",".join(f"{field}={value}" for field, value in zip(self.group_by, key))
+        incident_id = await db_writer.run(lambda conn: create_incident(
+            conn, group_key, group_name, metric_name, rule_id, severity, title,
+            alert_ids, len(server_names)
+        ))
+        change_tracker.bump('alerts')
+
+        grouped = {
+            "type": "alert_grouped",
+            "incident_id": incident_id,
+            "severity": severity,
+            "title": title,
+            "message": message,
+            "server_name": f"서버 {len(server_names)}대",
+            "group_name": group_name,
+            "metric_name": metric_name,
+            "alert_count": len(alerts),
+            "server_count": len(server_names),
+            "alert_ids": alert_ids,
+            "resolved_count": resolved_count,
+            # 새로 알리는 알림 (첫 알림은 이미 alert_fired 로 보냄, 창 안에서 해결된 알림은 resolved_at 표시)
+            "alerts": [
+                {**{k: a[k] for k in ("alert_id", "server_id", "server_name", "severity", "message",
+                                      "metric_name", "metric_value", "threshold_value", "timestamp")},
+                 "resolved_at": a.get("resolved_at")}
+                for a in followups
+            ],
+            "timestamp": first["timestamp"],
+        }
+        await ws_manager.broadcast_dashboard(grouped)
+        for alert in followups:
+            await ws_manager.broadcast_server(alert["server_id"], alert)
+        logger.warning(f"Alert incident #{incident_id}: [{severity.upper()}] {message}")
+
+        if self.notifier:
+            # webhook_sent 는 이번에 알린 후속 알림만 표시 (첫 알림은 따로 보냄)
+            await self.notifier.send_alert({**grouped, "alert_ids": [a["alert_id"] for a in followups]})
+
+
+alert_grouper = AlertGrouper()
@@ -0,0 +1,148 @@
+"""알림 규칙용 슬라이딩 윈도우 집계 (서버 × 메트릭 × 윈도우 길이별)
+
+condition_type 이 'value' 가 아닌 규칙은 최근 window_sec 초 동안의 샘플을 집계한 값으로 판단한다.
+- avg: 누적 합, min/max: 단조 덱 — 샘플 추가/만료가 모두 분할 상환 O(1)
+- delta: 윈도우 첫 샘플 대비 마지막 샘플 변화량, rate: 그 변화량의 시간당 환산
+- percentile: 정렬 목록을 이분 탐색으로 유지 (O(log w) 탐색 + 작은 메모리 이동), 이 규칙이 있을 때만 유지
+같은 (서버, 메트릭, 윈도우 길이)를 보는 규칙은 윈도우 하나를 공유한다.
+샘플 시각은 단조 시계(time.monotonic)를 써서 시스템 시각 변경에 영향받지 않는다.
+윈도우는 재시작 후 다시 채워지며, delta/rate 는 윈도우 길이의 절반 이상 쌓인 뒤부터 판단한다.
+"""
+from bisect import bisect_left, insort
+from collections import deque
+from typing import Optional
+from backend.core.rule_cache import CompiledRule
+
+_TYPE_LABELS = {
+    'avg': '평균', 'min': '최소', 'max': '최대', 'delta': '변화량', 'rate': '증가율',
+}
+
+
+def window_label(window_sec: int) -> str:
+    if window_sec % 3600 == 0:
+        return f"{window_sec // 3600}시간"
+    if window_sec % 60 == 0:
+        return f"{window_sec // 60}분"
+    return f"{window_sec}초"
+
+
+def condition_label(rule: CompiledRule) -> str:
+    """메시지용 조건 설명 (예: ' 5분 평균', ' 1시간 p95'), 현재값 규칙은 빈 문자열"""
+    if rule.condition_type == 'value':
+        return ''
+    kind = (f"p{rule.percentile:g}" if rule.condition_type == 'percentile'
+            else _TYPE_LABELS[rule.condition_type])
+    return f" {window_label(rule.window_sec)} {kind}"
+
+
+class SlidingWindow:
+    """최근 window_sec 초 샘플과 증분 집계"""
+
+    def __init__(self, window_sec: int, track_sorted: bool = False):
+        self.window_sec = window_sec
+        self._samples: deque[tuple[float, float]] = deque()
+        self._sum = 0.0
+        self._min: deque[tuple[float, float]] = deque()  # 값 오름차순 (앞이 최솟값)
+        self._max: deque[tuple[float, float]] = deque()  # 값 내림차순 (앞이 최댓값)
+        self._sorted: Optional[list[float]] = [] if track_sorted else None
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def track_sorted(self):
+        """percentile 규칙이 생기면 정렬 목록 유지 시작 (현재 샘플로 채움)"""
+        if self._sorted is None:
+            self._sorted = sorted(v for _, v in self._samples)
+
+    def push(self, ts: float, value: float):
+        # 같은 샘플을 여러 규칙이 밀어 넣어도 한 번만 반영
+        if self._samples and ts <= self._samples[-1][0]:
+            return
+        # 새 샘플을 넣기 전에 만료해야 윈도우가 비었을 때 누적 합이 초기화됨
+        self._expire(ts - self.window_sec)
+        self._samples.append((ts, value))
+        self._sum += value
+        while self._min and self._min[-1][1] >= value:
+            self._min.pop()
+        self._min.append((ts, value))
+        while self._max and self._max[-1][1] <= value:
+            self._max.pop()
+        self._max.append((ts, value))
+        if self._sorted is not None:
+            insort(self._sorted, value)
+
+    def _expire(self, cutoff: float):
+        samples = self._samples
+        while samples and samples[0][0] <= cutoff:
+            ts, value = samples.popleft()
+            self._sum -= value
+            if self._min[0][0] == ts:
+                self._min.popleft()
+            if self._max[0][0] == ts:
+                self._max.popleft()
+            if self._sorted is not None:
+                del self._sorted[bisect_left(self._sorted, value)]
+        if not samples:
+            self._sum = 0.0  # 누적 오차 초기화
+
+    def _span(self) -> float:
+        return self._samples[-1][0] - self._samples[0][0]
+
+    def aggregate(self, condition_type: str, percentile: Optional[float] = None) -> Optional[float]:
+        """집계값, 판단할 만큼 샘플이 없으면 None"""
+        samples = self._samples
+        if not samples:
+            return None
+        if condition_type == 'avg':
+            return self._sum / len(samples)
+        if condition_type == 'min':
+            return self._min[0][1]
+        if condition_type == 'max':
+            return self._max[0][1]
+        if condition_type in ('delta', 'rate'):
+            span = self._span()
+            if len(samples) < 2 or span < self.window_sec / 2:
+                return None
+            delta = samples[-1][1] - samples[0][1]
+            return delta if condition_type == 'delta' else delta / span * 3600
+        if condition_type == 'percentile' and self._sorted and percentile is not None:
+            # 선형 보간 (numpy percentile 기본 방식과 같음)
+            pos = (len(self._sorted) - 1) * percentile / 100
+            lo = int(pos)
+            hi = min(lo + 1, len(self._sorted) - 1)
+            return self._sorted[lo] + (self._sorted[hi] - self._sorted[lo]) * (pos - lo)
+        return None
+
+
+class WindowStore:
+    """(server_id, metric_name, window_sec) → SlidingWindow"""
+
+    def __init__(self):
+        self._windows: dict[tuple[int, str, int], SlidingWindow] = {}
+
+    def _get(self, server_id: int, rule: CompiledRule) -> SlidingWindow:
+        key = (server_id, rule.metric_name, rule.window_sec)
+        window = self._windows.get(key)
+        if window is None:
+            window = self._windows[key] = SlidingWindow(rule.window_sec)
+        if rule.condition_type == 'percentile':
+            window.track_sorted()
+        return window
+
+    def push(self, server_id: int, rules, values: dict[str, float], ts: float):
+        """서버의 윈도우 규칙이 보는 메트릭 값 추가"""
+        for rule in rules:
+            if rule.condition_type == 'value':
+                continue
+            value = values.get(rule.metric_name)
+            if value is not None:
+                self._get(server_id, rule).push(ts, value)
+
+    def value(self, server_id: int, rule: CompiledRule) -> Optional[float]:
+        window = self._windows.get((server_id, rule.metric_name, rule.window_sec))
+        return window.aggregate(rule.condition_type, rule.percentile) if window else None
+
+    def retain(self, keys: set[tuple[int, str, int]]):
+        """규칙이 바뀐 뒤 더 이상 쓰지 않는 윈도우 정리"""
+        for key in self._windows.keys() - keys:
+            del self._windows[key]
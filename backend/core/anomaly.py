@@ -1,9 +1,12 @@
 """AI 이상탐지 모듈 (Isolation Forest)"""
 import logging
 import numpy as np
+from datetime import datetime, timedelta
 from typing import Optional
 from sqlalchemy import text
+from backend.core.collector import collector_engine
 from backend.db.database import async_session
+from backend.db.partitions import partitions_for_range, union_source
 
 logger = logging.getLogger(__name__)
 
@@ -13,18 +16,34 @@ async def detect_anomalies(server_id: int) -> list[dict]:
     try:
         from sklearn.ensemble import IsolationForest
 
-        async with async_session() as session:
-            result = await session.execute(
-                text("""SELECT cpu_usage_pct, mem_usage_pct
-                     FROM metrics_raw
-                     WHERE server_id=:sid
-                     AND collected_at >= datetime('now', '-1 hour', 'localtime')
-                     AND cpu_usage_pct IS NOT NULL
-                     AND mem_usage_pct IS NOT NULL
-                     ORDER BY collected_at"""),
-                {"sid": server_id}
+        since = datetime.now() - timedelta(hours=1)
+        since_str = since.strftime('%Y-%m-%d %H:%M:%S')
+        # 최근 1시간은 보통 수집기 링 버퍼에 있으므로 DB는 버퍼가 없을 때만 조회
+        recent = collector_engine.recent.window(
+            server_id, since_str, None, ['cpu_usage_pct', 'mem_usage_pct']
+        )
+        if recent is not None:
+            rows = [
+                (r['cpu_usage_pct'], r['mem_usage_pct']) for r in recent
+                if r['cpu_usage_pct'] is not None and r['mem_usage_pct'] is not None
+            ]
+        else:
+            source = union_source(
+                'metrics_raw', partitions_for_range('metrics_raw', since),
+                "collected_at, cpu_usage_pct, mem_usage_pct",
+                """server_id=:sid
+                         AND collected_at >= :since
+                         AND cpu_usage_pct IS NOT NULL
+                         AND mem_usage_pct IS NOT NULL"""
             )
-            rows = result.fetchall()
+            async with async_session() as session:
+                result = await session.execute(
+                    text(f"""SELECT cpu_usage_pct, mem_usage_pct
+                         FROM {source}
+                         ORDER BY collected_at"""),
+                    {"sid": server_id, "since": since_str}
+                )
+                rows = result.fetchall()
 
         if len(rows) < 30:
             return []
@@ -1,11 +1,14 @@
 """수집 오케스트레이터 — 서버별 asyncio 태스크 관리"""
 import asyncio
-import json
 import logging
 from datetime import datetime
-from typing import Optional
 from sqlalchemy import text
 from backend.db.database import async_session
+from backend.db.latest import disk_max_pct, upsert_latest_metrics
+from backend.db.partitions import ensure_partition
+from backend.db.writer import db_writer
+from backend.core.http_cache import change_tracker
+from backend.core.log_templates import log_miner
 from backend.core.collector_winrm import (
     collect_winrm_metrics, collect_winrm_processes,
     collect_winrm_services, collect_winrm_logs, collect_winrm_sysinfo
@@ -14,6 +17,7 @@ from backend.core.collector_ssh import (
     collect_ssh_metrics, collect_ssh_processes,
     collect_ssh_services, collect_ssh_logs, collect_ssh_sysinfo
 )
+from backend.core.ring_buffer import RecentMetrics
 from backend.core.ws_manager import ws_manager
 from backend.core.connection_pool import ssh_pool, winrm_pool
 
@@ -28,6 +32,8 @@ class CollectorEngine:
         self.running = False
         self._fail_counts: dict[int, int] = {}
         self.alert_engine = None
+        # 서버별 최근 Raw 메트릭 (최신값/최근 이력 조회용)
+        self.recent = RecentMetrics()
 
     async def start(self):
         """수집 엔진 시작"""
@@ -53,6 +59,8 @@ class CollectorEngine:
             )
             server_ids = [row[0] for row in result.fetchall()]
 
+        await self._warm_recent([sid for sid in server_ids if sid not in self.recent])
+
         for sid in server_ids:
             if sid not in self.tasks:
                 self.tasks[sid] = asyncio.create_task(self._collect_loop(sid))
@@ -62,6 +70,8 @@ class CollectorEngine:
         """특정 서버 수집 시작"""
         if server_id in self.tasks:
             self.tasks[server_id].cancel()
+        if server_id not in self.recent:
+            await self._warm_recent([server_id])
         self.tasks[server_id] = asyncio.create_task(self._collect_loop(server_id))
 
     async def stop_server(self, server_id: int):
@@ -69,8 +79,18 @@ class CollectorEngine:
         task = self.tasks.pop(server_id, None)
         if task:
             task.cancel()
+        if self.alert_engine:
+            self.alert_engine.collect_stopped(server_id)
         ssh_pool.remove(server_id)
         winrm_pool.remove(server_id)
+        self.recent.drop(server_id)
+
+    async def _warm_recent(self, server_ids: list[int]):
+        """링 버퍼를 DB의 최근 데이터로 채움 (실패해도 수집은 계속)"""
+        try:
+            await self.recent.warm(server_ids)
+        except Exception as e:
+            logger.error(f"Ring buffer warm-up failed: {e}")
 
     async def restart_server(self, server_id: int):
         """특정 서버 수집 재시작"""
@@ -81,6 +101,8 @@ class CollectorEngine:
         """서버 수집 루프"""
         metrics_counter = 0
         try:
+            if self.alert_engine:
+                await self.alert_engine.collect_started(server_id)
             while self.running:
                 metrics_counter += 1
 
@@ -139,11 +161,17 @@ class CollectorEngine:
 
             if metrics:
                 self._fail_counts[server_id] = 0
-                now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+                collected_at = datetime.now()
+                now = collected_at.strftime('%Y-%m-%d %H:%M:%S')
 
-                async with async_session() as session:
-                    await session.execute(
-                        text("""INSERT INTO metrics_raw
+                # 서버 상태 업데이트
+                new_status = self._determine_status(metrics, server_id)
+                old_status = server['status']
+
+                async def write_metrics(conn):
+                    partition = await ensure_partition(conn, 'metrics_raw', collected_at)
+                    await conn.execute(
+                        text(f"""INSERT INTO {partition}
                             (server_id, collected_at, cpu_usage_pct, cpu_load_1m, cpu_load_5m, cpu_load_15m,
                              mem_total_mb, mem_used_mb, mem_usage_pct, swap_total_mb, swap_used_mb,
                              disk_json, disk_read_mbps, disk_write_mbps, net_json, net_connections,
@@ -170,16 +198,17 @@ class CollectorEngine:
                             "us": metrics.get('uptime_seconds'),
                         }
                     )
-                    # 서버 상태 업데이트
-                    new_status = self._determine_status(metrics, server_id)
-                    old_status = server['status']
-                    await session.execute(
+                    await upsert_latest_metrics(conn, server_id, now, metrics)
+                    await conn.execute(
                         text("""UPDATE servers SET status=:status,
                              last_collected_at=:lca, collect_error=NULL
                              WHERE server_id=:sid"""),
                         {"status": new_status, "lca": now, "sid": server_id}
                     )
-                    await session.commit()
+
+                await db_writer.run(write_metrics)
+                self.recent.append(server_id, now, metrics)
+                change_tracker.bump(f"raw:{server_id}", "latest")
 
                 # 상태 변경 WebSocket 알림
                 if old_status != new_status:
@@ -193,7 +222,7 @@ class CollectorEngine:
                     })
 
                 # 메트릭 WebSocket 브로드캐스트
-                disk_max = self._get_disk_max_pct(metrics.get('disk_json'))
+                disk_max = disk_max_pct(metrics.get('disk_json'))
                 await ws_manager.broadcast_dashboard({
                     "type": "metrics",
                     "server_id": server_id,
@@ -216,9 +245,10 @@ class CollectorEngine:
                     "timestamp": now
                 })
 
-                # 알림 엔진 평가
+                # 알림 엔진 평가 (수집 마감 재설정 후 메트릭 평가)
                 if self.alert_engine:
-                    await self.alert_engine.evaluate(server_id, server['display_name'], metrics)
+                    await self.alert_engine.collect_succeeded(server_id)
+                    await self.alert_engine.observe(server_id, server['display_name'], metrics)
 
             else:
                 await self._handle_collect_failure(server_id, server, "수집 결과 없음")
@@ -232,14 +262,14 @@ class CollectorEngine:
         self._fail_counts[server_id] = self._fail_counts.get(server_id, 0) + 1
         now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
 
-        async with async_session() as session:
-            new_status = 'offline' if self._fail_counts[server_id] >= 3 else server['status']
-            await session.execute(
-                text("""UPDATE servers SET status=:status,
-                     collect_error=:error WHERE server_id=:sid"""),
-                {"status": new_status, "error": error_msg, "sid": server_id}
-            )
-            await session.commit()
+        new_status = 'offline' if self._fail_counts[server_id] >= 3 else server['status']
+        await db_writer.execute(
+            text("""UPDATE servers SET status=:status,
+                 collect_error=:error WHERE server_id=:sid"""),
+            {"status": new_status, "error": error_msg, "sid": server_id}
+        )
+        if new_status != server['status']:
+            change_tracker.bump("latest")
 
         if self._fail_counts[server_id] == 3:
             await ws_manager.broadcast_dashboard({
@@ -262,20 +292,6 @@ class CollectorEngine:
             return 'warning'
         return 'online'
 
-    def _get_disk_max_pct(self, disk_json: Optional[str]) -> Optional[float]:
-        """디스크 JSON에서 최대 사용률 추출"""
-        if not disk_json:
-            return None
-        try:
-            disks = json.loads(disk_json)
-            if isinstance(disks, dict):
-                disks = [disks]
-            if disks:
-                return max(d.get('usage_pct', 0) for d in disks)
-        except (json.JSONDecodeError, TypeError):
-            pass
-        return None
-
     async def _collect_processes(self, server_id: int):
         """프로세스 수집"""
         server = await self._get_server(server_id)
@@ -291,32 +307,37 @@ class CollectorEngine:
                 processes = await loop.run_in_executor(None, collect_ssh_processes, server_obj)
 
             if processes:
-                async with async_session() as session:
-                    await session.execute(
+                rows = [
+                    {
+                        "sid": server_id,
+                        "pid": p.get('pid') or p.get('Id'),
+                        "name": p.get('name') or p.get('ProcessName', ''),
+                        "user": p.get('username', ''),
+                        "cpu": p.get('cpu_pct') or p.get('CPU', 0),
+                        "mem": p.get('mem_mb', 0),
+                        "memp": p.get('mem_pct', 0),
+                        "threads": p.get('thread_count') or p.get('threads', 0),
+                        "status": p.get('status', 'running'),
+                        "cmd": p.get('command_line', '')
+                    }
+                    for p in processes
+                ]
+
+                async def write_processes(conn):
+                    await conn.execute(
                         text("DELETE FROM process_snapshot WHERE server_id=:sid"),
                         {"sid": server_id}
                     )
-                    for p in processes:
-                        await session.execute(
-                            text("""INSERT INTO process_snapshot
-                                (server_id, pid, name, username, cpu_pct, mem_mb, mem_pct,
-                                 thread_count, status, command_line)
-                                VALUES (:sid, :pid, :name, :user, :cpu, :mem, :memp,
-                                        :threads, :status, :cmd)"""),
-                            {
-                                "sid": server_id,
-                                "pid": p.get('pid') or p.get('Id'),
-                                "name": p.get('name') or p.get('ProcessName', ''),
-                                "user": p.get('username', ''),
-                                "cpu": p.get('cpu_pct') or p.get('CPU', 0),
-                                "mem": p.get('mem_mb', 0),
-                                "memp": p.get('mem_pct', 0),
-                                "threads": p.get('thread_count') or p.get('threads', 0),
-                                "status": p.get('status', 'running'),
-                                "cmd": p.get('command_line', '')
-                            }
-                        )
-                    await session.commit()
+                    await conn.execute(
+                        text("""INSERT INTO process_snapshot
+                            (server_id, pid, name, username, cpu_pct, mem_mb, mem_pct,
+                             thread_count, status, command_line)
+                            VALUES (:sid, :pid, :name, :user, :cpu, :mem, :memp,
+                                    :threads, :status, :cmd)"""),
+                        rows
+                    )
+
+                await db_writer.run(write_processes)
 
                 await ws_manager.broadcast_server(server_id, {
                     "type": "processes_update",
@@ -342,26 +363,30 @@ class CollectorEngine:
                 services = await loop.run_in_executor(None, collect_ssh_services, server_obj)
 
             if services:
-                async with async_session() as session:
-                    await session.execute(
+                rows = []
+                for s in services:
+                    svc_name = s.get('service_name') or s.get('ServiceName', '')
+                    rows.append({
+                        "sid": server_id,
+                        "sn": svc_name,
+                        "dn": s.get('display_name') or s.get('DisplayName', svc_name),
+                        "st": str(s.get('status') or s.get('Status', 'unknown')).lower(),
+                        "stype": str(s.get('start_type') or s.get('StartType', 'auto')).lower()
+                    })
+
+                async def write_services(conn):
+                    await conn.execute(
                         text("DELETE FROM service_status WHERE server_id=:sid"),
                         {"sid": server_id}
                     )
-                    for s in services:
-                        svc_name = s.get('service_name') or s.get('ServiceName', '')
-                        await session.execute(
-                            text("""INSERT INTO service_status
-                                (server_id, service_name, display_name, status, start_type)
-                                VALUES (:sid, :sn, :dn, :st, :stype)"""),
-                            {
-                                "sid": server_id,
-                                "sn": svc_name,
-                                "dn": s.get('display_name') or s.get('DisplayName', svc_name),
-                                "st": str(s.get('status') or s.get('Status', 'unknown')).lower(),
-                                "stype": str(s.get('start_type') or s.get('StartType', 'auto')).lower()
-                            }
-                        )
-                    await session.commit()
+                    await conn.execute(
+                        text("""INSERT INTO service_status
+                            (server_id, service_name, display_name, status, start_type)
+                            VALUES (:sid, :sn, :dn, :st, :stype)"""),
+                        rows
+                    )
+
+                await db_writer.run(write_services)
         except Exception as e:
             logger.error(f"Service collect error for server {server_id}: {e}")
 
@@ -380,25 +405,46 @@ class CollectorEngine:
                 logs = await loop.run_in_executor(None, collect_ssh_logs, server_obj)
 
             if logs:
-                async with async_session() as session:
-                    for log in logs:
-                        occurred_at = log.get('occurred_at') or log.get('TimeGenerated', '')
-                        if not occurred_at:
-                            occurred_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                        await session.execute(
-                            text("""INSERT INTO server_logs
-                                (server_id, log_source, log_level, message, event_id, occurred_at)
-                                VALUES (:sid, :src, :level, :msg, :eid, :oat)"""),
-                            {
-                                "sid": server_id,
-                                "src": log.get('log_source') or log.get('Source', 'system'),
-                                "level": log.get('log_level') or log.get('EntryType', 'INFO'),
-                                "msg": log.get('message') or log.get('Message', ''),
-                                "eid": log.get('event_id') or log.get('EventID'),
-                                "oat": occurred_at
-                            }
-                        )
-                    await session.commit()
+                collected_at = datetime.now()
+                rows = []
+                for log in logs:
+                    occurred_at = log.get('occurred_at') or log.get('TimeGenerated', '')
+                    if not occurred_at:
+                        occurred_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+                    rows.append({
+                        "sid": server_id,
+                        "src": log.get('log_source') or log.get('Source', 'system'),
+                        "level": log.get('log_level') or log.get('EntryType', 'INFO'),
+                        "msg": log.get('message') or log.get('Message', ''),
+                        "eid": log.get('event_id') or log.get('EventID'),
+                        "oat": occurred_at,
+                        "cat": collected_at.strftime('%Y-%m-%d %H:%M:%S')
+                    })
+
+                async def write_logs(conn):
+                    # 템플릿 분류는 쓰기 태스크 안에서 (템플릿 정리와 직렬화)
+                    mined_rows = []
+                    for row in rows:
+                        mined = log_miner.add(row["src"], row["msg"])
+                        if mined:
+                            row = {**row, "msg": None, "tid": mined[0], "params": mined[1]}
+                        else:
+                            row = {**row, "tid": None, "params": None}
+                        mined_rows.append(row)
+                    await log_miner.save(
+                        conn, [r["tid"] for r in mined_rows if r["tid"]],
+                        collected_at.strftime('%Y-%m-%d %H:%M:%S')
+                    )
+                    partition = await ensure_partition(conn, 'server_logs', collected_at)
+                    await conn.execute(
+                        text(f"""INSERT INTO {partition}
+                            (server_id, log_source, log_level, message, event_id,
+                             occurred_at, collected_at, template_id, params)
+                            VALUES (:sid, :src, :level, :msg, :eid, :oat, :cat, :tid, :params)"""),
+                        mined_rows
+                    )
+
+                await db_writer.run(write_logs)
         except Exception as e:
             logger.error(f"Log collect error for server {server_id}: {e}")
 
@@ -417,20 +463,18 @@ class CollectorEngine:
                 info = await loop.run_in_executor(None, collect_ssh_sysinfo, server_obj)
 
             if info:
-                async with async_session() as session:
-                    await session.execute(
-                        text("""UPDATE servers SET
-                            os_version=:ov, cpu_model=:cm, cpu_cores=:cc, total_memory_mb=:tm
-                            WHERE server_id=:sid"""),
-                        {
-                            "ov": info.get('os_version'),
-                            "cm": info.get('cpu_model'),
-                            "cc": info.get('cpu_cores'),
-                            "tm": info.get('total_memory_mb'),
-                            "sid": server_id
-                        }
-                    )
-                    await session.commit()
+                await db_writer.execute(
+                    text("""UPDATE servers SET
+                        os_version=:ov, cpu_model=:cm, cpu_cores=:cc, total_memory_mb=:tm
+                        WHERE server_id=:sid"""),
+                    {
+                        "ov": info.get('os_version'),
+                        "cm": info.get('cpu_model'),
+                        "cc": info.get('cpu_cores'),
+                        "tm": info.get('total_memory_mb'),
+                        "sid": server_id
+                    }
+                )
         except Exception as e:
             logger.error(f"Sysinfo collect error for server {server_id}: {e}")
 
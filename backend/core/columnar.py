@@ -0,0 +1,111 @@
+"""차트 데이터 컬럼형 인코딩 (JSON 컬럼 배열 / 바이너리 typed array)
+
+이력/비교 응답은 기본적으로 행마다 키 이름이 반복되는 dict 배열이다.
+차트용으로는 같은 데이터를 컬럼별 배열로 보내는 편이 작고, 바이너리는 브라우저가
+Float64Array/Uint32Array 로 바로 감싸 쓸 수 있어 JSON 파싱이 필요 없다.
+
+바이너리 구조 (리틀 엔디언):
+    MAGIC(4) | 헤더 길이(uint32) | 헤더 JSON | 0 패딩(8바이트 정렬) | 컬럼 데이터...
+    헤더: {"version", "meta": {...}, "series": [{"name", "count", "columns": [
+           {"name", "type", "offset"}]}]}
+    type 'time' 은 uint32 초(로컬 시각을 UTC 로 간주한 epoch),
+    'i32' 는 값 × 10^scale 을 int32 로 기록(NULL=INT32_MIN, 헤더에 "scale"),
+    'f64' 는 정수로 맞아떨어지지 않는 값의 float64(NULL=NaN),
+    'json' 은 숫자가 아닌 컬럼으로 값 배열이 헤더의 "values" 에 들어간다.
+    수집값은 대부분 소수 1~2자리라 i32 로 들어가므로 값당 4바이트다.
+    offset 은 컬럼 데이터 영역 시작 기준이며 항상 8의 배수다.
+"""
+import json
+import struct
+from typing import Optional
+import numpy as np
+from backend.core.tsblock import MAX_DECIMAL_SCALE, to_epoch
+
+MAGIC = b'SEC1'
+COLUMNS_MEDIA_TYPE = 'application/vnd.servereye.columns+json'
+BINARY_MEDIA_TYPE = 'application/vnd.servereye.columns'
+ENCODINGS = ('rows', 'columns', 'binary')
+
+_ALIGN = 8
+_I32_NULL_ABS = 2 ** 31  # NULL 은 INT32_MIN
+
+
+def negotiate_encoding(encoding: Optional[str], accept: Optional[str]) -> Optional[str]:
+    """쿼리 파라미터 우선, 없으면 Accept 헤더로 응답 인코딩 결정 (잘못된 값이면 None)"""
+    if encoding:
+        return encoding if encoding in ENCODINGS else None
+    accept = accept or ''
+    if BINARY_MEDIA_TYPE in accept.replace(COLUMNS_MEDIA_TYPE, ''):
+        return 'binary'
+    if COLUMNS_MEDIA_TYPE in accept:
+        return 'columns'
+    return 'rows'
+
+
+def to_columns(rows: list[dict]) -> dict[str, list]:
+    """행 dict 목록 → 컬럼별 배열 (키 순서는 첫 행 기준)"""
+    if not rows:
+        return {}
+    return {key: [r.get(key) for r in rows] for key in rows[0]}
+
+
+def epoch_array(times: list[str]) -> np.ndarray:
+    """시각 문자열 목록 → 초 단위 int64 배열"""
+    try:
+        return np.array(times, dtype='datetime64[s]').astype(np.int64)
+    except ValueError:
+        # 분이 0 채움되지 않은 5분 집계 bucket_time 등
+        return np.array([to_epoch(t) for t in times], dtype=np.int64)
+
+
+def _is_numeric(values: list) -> bool:
+    return all(v is None or (isinstance(v, (int, float)) and not isinstance(v, bool))
+               for v in values)
+
+
+def _encode_numeric(name: str, values: list) -> tuple[bytes, dict]:
+    """숫자 컬럼: 10^k 배(k ≤ MAX_DECIMAL_SCALE) 해서 int32 에 정확히 들어가면 i32, 아니면 f64"""
+    arr = np.array(values, dtype=np.float64)
+    present = arr[~np.isnan(arr)]
+    for scale in range(MAX_DECIMAL_SCALE + 1):
+        divisor = 10 ** scale
+        scaled = np.round(present * divisor)
+        if not np.array_equal(scaled / divisor, present):
+            continue
+        if present.size and np.abs(scaled).max() >= _I32_NULL_ABS:
+            break
+        ints = np.full(arr.shape, -_I32_NULL_ABS, dtype='<i4')
+        ints[~np.isnan(arr)] = scaled
+        return ints.tobytes(), {"name": name, "type": "i32", "scale": scale}
+    return arr.astype('<f8').tobytes(), {"name": name, "type": "f64"}
+
+
+def encode_binary(series: dict[str, list[dict]], meta: Optional[dict] = None,
+                  time_key: str = 'time') -> bytes:
+    """시리즈 이름 → 행 목록을 바이너리 컬럼형 페이로드로 인코딩"""
+    header_series = []
+    chunks = []
+    offset = 0
+    for name, rows in series.items():
+        columns = []
+        for key, values in to_columns(rows).items():
+            if key == time_key:
+                data = epoch_array(values).astype('<u4').tobytes()
+                col = {"name": key, "type": "time"}
+            elif _is_numeric(values):
+                data, col = _encode_numeric(key, values)
+            else:
+                columns.append({"name": key, "type": "json", "values": values})
+                continue
+            col["offset"] = offset
+            pad = -len(data) % _ALIGN
+            chunks.append(data + b'\0' * pad)
+            offset += len(data) + pad
+            columns.append(col)
+        header_series.append({"name": name, "count": len(rows), "columns": columns})
+
+    header = json.dumps({
+        "version": 1, "meta": meta or {}, "series": header_series,
+    }, ensure_ascii=False).encode('utf-8')
+    prefix = MAGIC + struct.pack('<I', len(header)) + header
+    return prefix + b'\0' * (-len(prefix) % _ALIGN) + b''.join(chunks)
@@ -0,0 +1,140 @@
+"""다중 서버/다중 메트릭 비교
+
+서버 수와 상관없이 계층별로 한 번의 IN (...) 조회로 전체 서버의 이력을 읽고,
+모든 시리즈를 같은 버킷 격자(grid)에 맞춰 NumPy 로 정렬한다.
+격자 한 칸에 여러 샘플이 들어가면 평균, 없으면 NULL 이다.
+
+계층 자동 선택: 요청한 메트릭을 모두 가진 계층 중 격자 점 수가 COMPARE_MAX_POINTS 이하가
+되는 가장 세밀한 계층을 고른다. 어느 계층도 맞지 않으면 hourly 에서 간격을 배수로 늘린다.
+"""
+import math
+from typing import Optional
+import numpy as np
+from sqlalchemy import text
+from backend.config import COMPARE_MAX_POINTS
+from backend.core.columnar import epoch_array
+from backend.core.tsblock import from_epoch
+from backend.db.archive import fetch_raw_metrics
+from backend.db.blocks import fetch_5min_metrics
+from backend.db.database import async_session
+
+# 비교 메트릭 → 계층별 컬럼 (계층에 없는 메트릭은 그 계층을 선택하지 않음)
+COMPARE_METRICS = {
+    "cpu": {"raw": "cpu_usage_pct", "5min": "cpu_avg", "hourly": "cpu_avg"},
+    "cpu_max": {"raw": "cpu_usage_pct", "5min": "cpu_max", "hourly": "cpu_max"},
+    "mem": {"raw": "mem_usage_pct", "5min": "mem_avg_pct", "hourly": "mem_avg_pct"},
+    "mem_max": {"raw": "mem_usage_pct", "5min": "mem_max_pct", "hourly": "mem_max_pct"},
+    "disk_read": {"raw": "disk_read_mbps", "5min": "disk_read_avg", "hourly": "disk_read_avg"},
+    "disk_write": {"raw": "disk_write_mbps", "5min": "disk_write_avg", "hourly": "disk_write_avg"},
+    "net_in": {"5min": "net_in_avg", "hourly": "net_in_avg"},
+    "net_out": {"5min": "net_out_avg", "hourly": "net_out_avg"},
+}
+
+# 계층 → 기본 격자 간격(초), 세밀한 순 (Raw 는 3초 수집을 15초 평균으로)
+COMPARE_TIERS = {"raw": 15, "5min": 300, "hourly": 3600}
+
+# 계층 → 시각 컬럼
+_TIME_COLUMNS = {"raw": "collected_at", "5min": "bucket_time", "hourly": "bucket_time"}
+
+
+def choose_grid(lo: int, hi: int, metrics: list[str],
+                interval: str = "auto") -> tuple[str, int]:
+    """(계층, 격자 간격) 결정. interval 을 지정하면 그 계층에서 간격만 조정"""
+    span = max(hi - lo, 0)
+    tiers = [t for t in COMPARE_TIERS if all(t in COMPARE_METRICS[m] for m in metrics)]
+    if interval != "auto":
+        tiers = [interval] if interval in tiers else []
+    if not tiers:
+        raise ValueError(f"{interval} 계층에서 조회할 수 없는 메트릭이 있습니다")
+    for tier in tiers:
+        if span // COMPARE_TIERS[tier] + 1 <= COMPARE_MAX_POINTS:
+            return tier, COMPARE_TIERS[tier]
+    tier = tiers[-1]
+    base = COMPARE_TIERS[tier]
+    return tier, base * math.ceil((span // base + 1) / COMPARE_MAX_POINTS)
+
+
+def align_to_grid(rows: list[dict], time_key: str, columns: list[str],
+                  server_ids: list[int], start: int, step: int, n: int) -> np.ndarray:
+    """행 목록을 (서버, 컬럼, 격자) 평균 배열로 정렬 (샘플이 없는 칸은 NaN)"""
+    out = np.full((len(server_ids), len(columns), n), np.nan)
+    if not rows:
+        return out
+    pos = {sid: i for i, sid in enumerate(server_ids)}
+    sid_idx = np.array([pos.get(r["server_id"], -1) for r in rows], dtype=np.int64)
+    slot = (epoch_array([r[time_key] for r in rows]) - start) // step
+    keep = (sid_idx >= 0) & (slot >= 0) & (slot < n)
+    key = sid_idx[keep] * n + slot[keep]
+    size = len(server_ids) * n
+
+    for c, col in enumerate(columns):
+        values = np.array([r[col] for r in rows], dtype=np.float64)[keep]
+        valid = ~np.isnan(values)
+        sums = np.bincount(key[valid], weights=values[valid], minlength=size)
+        counts = np.bincount(key[valid], minlength=size)
+        mean = np.divide(sums, counts, out=np.full(size, np.nan), where=counts > 0)
+        out[:, c, :] = mean.reshape(len(server_ids), n)
+    return out
+
+
+async def _fetch_rows(tier: str, columns: list[str], server_ids: list[int],
+                      lo: int, hi: int) -> list[dict]:
+    """계층별 한 번의 IN 조회 (Raw/5분은 파티션·블록·아카이브 포함)"""
+    if tier == "raw":
+        return await fetch_raw_metrics(
+            ["server_id", "collected_at", *columns], server_ids, from_epoch(lo), from_epoch(hi)
+        )
+    if tier == "5min":
+        # bucket_time 은 분이 0 채움되지 않아 문자열 비교가 시 단위까지만 맞으므로 시 경계로 넓혀 조회
+        return await fetch_5min_metrics(
+            ["server_id", "bucket_time", *columns], server_ids,
+            from_epoch(lo // 3600 * 3600), from_epoch(hi // 3600 * 3600 + 3600)
+        )
+    select = ["server_id", "bucket_time", *columns]
+    async with async_session() as session:
+        result = await session.execute(
+            text(f"""SELECT {', '.join(select)} FROM metrics_hourly
+                 WHERE server_id IN ({','.join(str(int(s)) for s in server_ids)})
+                   AND bucket_time >= :df AND bucket_time <= :dt
+                 ORDER BY bucket_time"""),
+            {"df": from_epoch(lo), "dt": from_epoch(hi)}
+        )
+        return [dict(zip(select, r)) for r in result.fetchall()]
+
+
+async def fetch_compare(server_ids: list[int], metrics: list[str], lo: int, hi: int,
+                        interval: str = "auto") -> dict:
+    """비교 데이터: 공통 격자 시각과 서버별·메트릭별 값 배열
+
+    반환: {"interval", "step", "time": [시각 문자열], "names": {server_id: 표시 이름},
+           "values": ndarray (서버, 메트릭, 격자)}
+    """
+    tier, step = choose_grid(lo, hi, metrics, interval)
+    start = lo // step * step
+    n = (hi - start) // step + 1
+    columns = list(dict.fromkeys(COMPARE_METRICS[m][tier] for m in metrics))
+
+    rows = await _fetch_rows(tier, columns, server_ids, start, hi)
+    grid = align_to_grid(rows, _TIME_COLUMNS[tier], columns, server_ids, start, step, n)
+    # 같은 컬럼을 쓰는 메트릭(Raw 의 cpu/cpu_max 등)은 결과를 공유
+    values = grid[:, [columns.index(COMPARE_METRICS[m][tier]) for m in metrics], :]
+
+    async with async_session() as session:
+        result = await session.execute(
+            text(f"""SELECT server_id, display_name FROM servers
+                 WHERE server_id IN ({','.join(str(int(s)) for s in server_ids)})""")
+        )
+        names = {r[0]: r[1] for r in result.fetchall()}
+
+    return {
+        "interval": tier,
+        "step": step,
+        "time": [from_epoch(start + i * step) for i in range(n)],
+        "names": {sid: names.get(sid) or f"Server {sid}" for sid in server_ids},
+        "values": values,
+    }
+
+
+def series_values(values: np.ndarray) -> list[Optional[float]]:
+    """NaN → None 인 JSON 용 목록"""
+    return [None if math.isnan(v) else round(v, 2) for v in values.tolist()]
@@ -0,0 +1,127 @@
+"""대시보드 요약 캐시 (수집 틱당 한 번 계산, 모든 클라이언트가 공유)
+
+요약은 접속한 브라우저 수만큼 같은 집계를 반복하던 것을 메모리에 한 벌만 둔다.
+- 서버 상태/최신 메트릭(latest), 알림(alerts), 서버 등록 정보(servers) 변경 카운터와
+  날짜(오늘 알림 수)로 서명을 만들고, 서명이 그대로면 캐시를 그대로 돌려준다.
+- 서명이 바뀌어도 마지막 계산 후 DASHBOARD_SUMMARY_INTERVAL_SEC 안이면 캐시를 쓴다.
+  수집이 서버마다 따로 끝나도 재계산은 틱당 최대 한 번이다.
+- 스케줄러가 틱마다 refresh() 를 호출해 값이 바뀌었으면 /ws/dashboard 로 'summary' 메시지를 보낸다.
+"""
+import asyncio
+import time
+from datetime import date, datetime
+from typing import Optional
+from sqlalchemy import text
+from backend.config import DASHBOARD_SUMMARY_INTERVAL_SEC
+from backend.core.http_cache import change_tracker
+from backend.core.ws_manager import ws_manager
+from backend.db.database import async_session
+
+SUMMARY_TOPICS = ('latest', 'alerts', 'servers')
+
+
+async def compute_summary() -> dict:
+    """DB 에서 요약 계산 (서버 상태별 집계 1회 + 알림 집계 1회)"""
+    async with async_session() as session:
+        # 상태별 서버 수와 최신 CPU/MEM 합계 (server_latest)
+        result = await session.execute(
+            text("""SELECT s.status, COUNT(*),
+                    SUM(l.cpu_usage_pct), COUNT(l.cpu_usage_pct),
+                    SUM(l.mem_usage_pct), COUNT(l.mem_usage_pct)
+                 FROM servers s
+                 LEFT JOIN server_latest l ON l.server_id=s.server_id
+                 WHERE s.is_active=1
+                 GROUP BY s.status""")
+        )
+        status_counts = {}
+        total_servers = 0
+        cpu_sum = cpu_n = mem_sum = mem_n = 0
+        for r in result.fetchall():
+            status = r[0] or "unknown"
+            status_counts[status] = status_counts.get(status, 0) + r[1]
+            total_servers += r[1]
+            cpu_sum += r[2] or 0
+            cpu_n += r[3]
+            mem_sum += r[4] or 0
+            mem_n += r[5]
+
+        # 활성/미확인/오늘 알림 수 (각각 부분 인덱스·created_at 인덱스 범위만 읽음)
+        result = await session.execute(
+            text("""SELECT
+                    (SELECT COUNT(*) FROM alert_history WHERE resolved_at IS NULL),
+                    (SELECT COUNT(*) FROM alert_history
+                     WHERE resolved_at IS NULL AND acknowledged=0),
+                    (SELECT COUNT(*) FROM alert_history
+                     WHERE created_at >= DATE('now','localtime'))""")
+        )
+        alert_row = result.fetchone()
+
+    online_count = status_counts.get("online", 0)
+    return {
+        "total_servers": total_servers,
+        "status_counts": status_counts,
+        "avg_cpu": round(cpu_sum / cpu_n, 1) if cpu_n else 0.0,
+        "avg_mem": round(mem_sum / mem_n, 1) if mem_n else 0.0,
+        "active_alerts": alert_row[0] or 0,
+        "unacknowledged_alerts": alert_row[1] or 0,
+        "today_alert_count": alert_row[2] or 0,
+        # 가동률 (online 서버 비율)
+        "uptime_pct": round((online_count / total_servers * 100), 1) if total_servers > 0 else 0.0,
+    }
+
+
+class DashboardSummaryCache:
+    """대시보드 요약 캐시"""
+
+    def __init__(self):
+        self._summary: Optional[dict] = None
+        self._signature: Optional[tuple] = None
+        self._computed_at = 0.0
+        self._sent: Optional[dict] = None
+        self._lock = asyncio.Lock()
+
+    @staticmethod
+    def _current_signature() -> tuple:
+        return (date.today(), *(change_tracker.version(t) for t in SUMMARY_TOPICS))
+
+    def _usable(self) -> bool:
+        if self._summary is None:
+            return False
+        if self._signature == self._current_signature():
+            return True
+        return time.monotonic() - self._computed_at < DASHBOARD_SUMMARY_INTERVAL_SEC
+
+    async def _recompute(self) -> dict:
+        # 계산 중에 들어온 변경은 다음 호출에서 다시 반영되도록 서명을 먼저 읽음
+        signature = self._current_signature()
+        self._summary = await compute_summary()
+        self._signature = signature
+        self._computed_at = time.monotonic()
+        return self._summary
+
+    async def get(self) -> dict:
+        """캐시된 요약 (동시 요청은 한 번의 계산을 함께 기다림)"""
+        if self._usable():
+            return self._summary
+        async with self._lock:
+            if self._usable():
+                return self._summary
+            return await self._recompute()
+
+    async def refresh(self):
+        """틱마다 호출: 변경이 있으면 재계산하고, 마지막 전송값과 다르면 브로드캐스트"""
+        if not ws_manager.dashboard_connections:
+            return  # 구독자가 없으면 다음 GET 에서 계산
+        async with self._lock:
+            if self._summary is None or self._signature != self._current_signature():
+                await self._recompute()
+        if self._summary != self._sent:
+            self._sent = self._summary
+            await ws_manager.broadcast_dashboard({
+                "type": "summary",
+                "data": self._summary,
+                "timestamp": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            })
+
+
+dashboard_summary = DashboardSummaryCache()
@@ -0,0 +1,74 @@
+"""메트릭 이력 다운샘플링 (Largest-Triangle-Three-Buckets)
+
+차트는 화면 폭 이상의 점을 그려도 모양이 달라지지 않으므로, 이력 응답을 max_points 개로 줄인다.
+LTTB 는 첫/마지막 점을 유지하고 사이 구간을 버킷으로 나눈 뒤, 각 버킷에서
+(직전 선택점, 버킷 점, 다음 버킷 평균점) 삼각형 넓이가 가장 큰 점을 고르므로 스파이크가 보존된다.
+
+한 행에 여러 시리즈(cpu, mem, ...)가 함께 있으므로 시리즈별로 0~1 정규화한 넓이의 합으로
+점을 고른다. 어느 시리즈든 튀는 값이 있으면 그 행이 선택되고, 응답 행 구조는 그대로 유지된다.
+"""
+from typing import Optional
+import numpy as np
+from backend.core.tsblock import to_epoch
+
+
+def lttb_indices(x: np.ndarray, ys: np.ndarray, n_out: int) -> np.ndarray:
+    """선택된 행 인덱스 (오름차순)
+
+    x: (n,) 시각, ys: (n, k) 시리즈 값 (NaN 허용), n_out: 남길 점 수 (3 이상)
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    # 시리즈별 0~1 정규화 (값 범위가 다른 시리즈가 넓이를 독점하지 않도록), NaN 은 넓이 0
+    lo = np.nanmin(np.where(np.isnan(ys), np.inf, ys), axis=0)
+    hi = np.nanmax(np.where(np.isnan(ys), -np.inf, ys), axis=0)
+    span = np.where(np.isfinite(hi - lo) & (hi > lo), hi - lo, 1.0)
+    norm = (ys - np.where(np.isfinite(lo), lo, 0.0)) / span
+    valid = ~np.isnan(norm)
+    filled = np.where(valid, norm, 0.0)
+
+    # 버킷 경계: 첫 점(0)과 마지막 점(n-1)을 뺀 구간을 n_out-2 개로 분할, 마지막 경계 뒤에 n
+    every = (n - 2) / (n_out - 2)
+    edges = np.append((np.arange(n_out - 1) * every).astype(np.int64) + 1, n)
+    edges[n_out - 2] = n - 1
+
+    # 버킷별 평균점 (다음 버킷 평균 계산용, reduceat 으로 한 번에)
+    starts = edges[:-1]
+    counts = np.diff(edges)
+    avg_x = np.add.reduceat(x, starts) / counts
+    sums = np.add.reduceat(filled, starts, axis=0)
+    nvalid = np.add.reduceat(valid.astype(np.int64), starts, axis=0)
+    avg_y = np.divide(sums, nvalid, out=np.zeros_like(sums), where=nvalid > 0)
+
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        b_lo, b_hi = edges[i], edges[i + 1]
+        ax, ay = x[a], filled[a]
+        # 삼각형 넓이 ×2 = |(ax - cx)(by - ay) - (ax - bx)(cy - ay)|, 시리즈별 넓이 합산
+        area = np.abs((ax - avg_x[i + 1]) * (filled[b_lo:b_hi] - ay)
+                      - (ax - x[b_lo:b_hi, None]) * (avg_y[i + 1] - ay))
+        area = np.where(valid[b_lo:b_hi] & valid[a], area, 0.0).sum(axis=1)
+        a = b_lo + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+def downsample_rows(rows: list[dict], max_points: Optional[int],
+                    time_key: str = 'time') -> list[dict]:
+    """이력 행 목록을 max_points 개 이하로 축소 (숫자 시리즈 전체 기준 LTTB)"""
+    if not max_points or len(rows) <= max_points:
+        return rows
+
+    series = [k for k, v in rows[0].items()
+              if k != time_key and (v is None or isinstance(v, (int, float)))]
+    x = np.array([to_epoch(r[time_key]) for r in rows], dtype=np.float64)
+    if series:
+        ys = np.array([[np.nan if r[k] is None else r[k] for k in series] for r in rows],
+                      dtype=np.float64)
+    else:
+        ys = np.zeros((len(rows), 1))
+    return [rows[i] for i in lttb_indices(x, ys, max_points).tolist()]
@@ -7,6 +7,7 @@ from typing import Optional
 import httpx
 from sqlalchemy import text
 from backend.db.database import async_session
+from backend.db.writer import db_writer
 
 logger = logging.getLogger(__name__)
 
@@ -115,20 +116,18 @@ async def execute_health_check(check_id: int) -> dict:
 
     hc_result = await run_health_check(check_dict)
 
-    async with async_session() as session:
-        await session.execute(
-            text("""INSERT INTO health_check_results
-                (check_id, server_id, is_healthy, response_ms, status_code, error_message)
-                VALUES (:cid, :sid, :ih, :rm, :sc, :em)"""),
-            {
-                "cid": check_id,
-                "sid": check_dict['server_id'],
-                "ih": 1 if hc_result.get('is_healthy') else 0,
-                "rm": hc_result.get('response_ms'),
-                "sc": hc_result.get('status_code'),
-                "em": hc_result.get('error_message')
-            }
-        )
-        await session.commit()
+    await db_writer.execute(
+        text("""INSERT INTO health_check_results
+            (check_id, server_id, is_healthy, response_ms, status_code, error_message)
+            VALUES (:cid, :sid, :ih, :rm, :sc, :em)"""),
+        {
+            "cid": check_id,
+            "sid": check_dict['server_id'],
+            "ih": 1 if hc_result.get('is_healthy') else 0,
+            "rm": hc_result.get('response_ms'),
+            "sc": hc_result.get('status_code'),
+            "em": hc_result.get('error_message')
+        }
+    )
 
     return hc_result
@@ -0,0 +1,108 @@
+"""조건부 GET (ETag / Last-Modified → 304 Not Modified)
+
+집계/알림/리포트 목록은 새 버킷이 닫히거나 알림이 발생할 때만 바뀌는데, 키오스크 모드처럼
+계속 열려 있는 대시보드는 같은 URL 을 반복 조회한다. 쓰기 지점에서 주제(topic)별 변경
+카운터를 올리고(change_tracker.bump), 조회 API 는 관련 주제들의 버전과 요청 URL 로 ETag 를 만든다.
+클라이언트가 보낸 If-None-Match / If-Modified-Since 가 일치하면 DB 조회 없이 304 를 돌려준다.
+
+카운터는 메모리에만 있으므로 프로세스가 재시작되면 부팅 토큰이 바뀌어 기존 ETag 는 모두 무효가 된다.
+
+주제:
+    raw:{server_id}  수집기 Raw 샘플 기록
+    latest           수집기의 server_latest / 서버 상태 갱신 (대시보드 요약)
+    5min / hourly    집계 작업, 보존 정리
+    lograte          로그 건수 5분 집계, 보존 정리
+    alerts           알림 발생/해제/확인, Webhook 발송 표시, 보존 정리
+    reports          리포트 생성/삭제
+    servers          서버 등록/수정/삭제 (목록에 표시 이름이 들어가는 응답용)
+"""
+import hashlib
+import os
+import time
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Optional
+from fastapi import Request
+from fastapi.responses import Response
+
+
+class ChangeTracker:
+    """주제별 변경 카운터와 마지막 변경 시각"""
+
+    def __init__(self):
+        self.boot = os.urandom(4).hex()
+        self._started = time.time()
+        self._versions: dict[str, int] = {}
+        self._modified: dict[str, float] = {}
+
+    def bump(self, *topics: str):
+        now = time.time()
+        for topic in topics:
+            self._versions[topic] = self._versions.get(topic, 0) + 1
+            self._modified[topic] = now
+
+    def version(self, topic: str) -> int:
+        return self._versions.get(topic, 0)
+
+    def modified(self, topic: str) -> float:
+        """마지막 변경 시각 (재시작 후 변경이 없으면 프로세스 시작 시각)"""
+        return self._modified.get(topic, self._started)
+
+
+change_tracker = ChangeTracker()
+
+
+class Validators:
+    """한 응답의 ETag / Last-Modified"""
+
+    def __init__(self, etag: str, last_modified: float):
+        self.etag = etag
+        self.last_modified = last_modified
+
+    def headers(self) -> dict[str, str]:
+        return {
+            "ETag": self.etag,
+            "Last-Modified": formatdate(self.last_modified, usegmt=True),
+            # 캐시는 허용하되 매번 재검증
+            "Cache-Control": "no-cache",
+            "Vary": "Accept",
+        }
+
+    def matches(self, request: Request) -> bool:
+        """요청의 조건부 헤더가 현재 상태와 일치하는지 (If-None-Match 우선)"""
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None:
+            tags = [t.strip() for t in if_none_match.split(",")]
+            return "*" in tags or self.etag in tags or self.etag.removeprefix("W/") in tags
+        if_modified_since = request.headers.get("if-modified-since")
+        if if_modified_since:
+            try:
+                since = parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+            return int(self.last_modified) <= since
+        return False
+
+    def not_modified(self) -> Response:
+        return Response(status_code=304, headers=self.headers())
+
+    def apply(self, response: Response) -> Response:
+        """응답(또는 FastAPI 가 주입한 Response 파라미터)에 검증 헤더 설정"""
+        response.headers.update(self.headers())
+        return response
+
+
+def validators_for(request: Request, *topics: str, time_slot_sec: Optional[int] = None) -> Validators:
+    """주제 버전 + 요청 URL/Accept 로 ETag 생성
+
+    응답에 '지금' 기준 값(알림 지속 시간 등)이 들어가면 time_slot_sec 단위로 ETag 가 바뀌게 한다.
+    """
+    parts = [change_tracker.boot, str(request.url.path), str(request.url.query),
+             request.headers.get("accept", "")]
+    parts.extend(f"{t}={change_tracker.version(t)}" for t in topics)
+    last_modified = max(change_tracker.modified(t) for t in topics)
+    if time_slot_sec:
+        slot = int(time.time() // time_slot_sec)
+        parts.append(f"slot={slot}")
+        last_modified = max(last_modified, slot * time_slot_sec)
+    digest = hashlib.blake2b("|".join(parts).encode('utf-8'), digest_size=12).hexdigest()
+    return Validators(f'W/"{digest}"', last_modified)
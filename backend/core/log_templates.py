@@ -0,0 +1,208 @@
+"""로그 템플릿 마이닝 (Drain 방식 온라인 클러스터링)
+
+Windows 이벤트 로그/journald 는 같은 문장이 값만 바뀌어 수천 번 반복된다.
+수집 시 메시지를 템플릿으로 분류해 템플릿은 log_templates 에 한 번만 저장하고,
+로그 행에는 template_id 와 변수 자리의 값(params, JSON 배열)만 남긴다 (message 는 NULL).
+
+- 토큰: 메시지를 공백 한 칸 기준으로 나눈다. ' '.join 으로 항상 원문이 복원된다.
+- 분류 트리: (로그 소스, 토큰 수) → 앞쪽 LOG_TEMPLATE_PREFIX_TOKENS 개 토큰 → 후보 클러스터 목록.
+  숫자가 들어간 토큰은 처음부터 변수(<*>)로 본다.
+- 유사도: 템플릿의 고정 토큰 중 메시지와 같은 토큰 비율. 임계값 이상인 가장 비슷한 클러스터에
+  합치고, 다른 자리는 <*> 로 일반화한다.
+- 템플릿이 일반화되면 새 버전(template_id)을 만든다. 기존 행의 params 는 옛 버전 기준이므로
+  버전은 바꾸지 않고, 같은 클러스터(cluster_id)의 최신 버전을 대표 패턴으로 보여준다.
+- 메시지에 '<*>' 토큰이 그대로 있거나 토큰이 너무 많으면 템플릿화하지 않고 원문을 저장한다.
+
+원문 복원은 SQLite 함수 log_render(template, params) 로 등록해 파티션 조회 뷰와 FTS 트리거에서 쓴다.
+마이닝/저장/정리는 모두 단일 쓰기 태스크 안에서 실행되므로 별도 잠금이 없다.
+"""
+import json
+import logging
+import re
+from dataclasses import dataclass
+from typing import Optional
+from sqlalchemy import text
+from backend.config import (
+    LOG_TEMPLATE_MAX_CHILDREN, LOG_TEMPLATE_MAX_TOKENS, LOG_TEMPLATE_PREFIX_TOKENS,
+    LOG_TEMPLATE_SIM_THRESHOLD, TS_SCHEMA
+)
+
+logger = logging.getLogger(__name__)
+
+WILDCARD = '<*>'
+
+_DIGIT_RE = re.compile(r'\d')
+
+
+def render_template(template: Optional[str], params: Optional[str]) -> Optional[str]:
+    """템플릿 + 변수 값(JSON 배열) → 원문 메시지"""
+    if template is None:
+        return None
+    values = iter(json.loads(params) if params else ())
+    return ' '.join(next(values, '') if t == WILDCARD else t for t in template.split(' '))
+
+
+@dataclass
+class _Cluster:
+    cluster_id: int
+    template_id: int
+    log_source: str
+    tokens: list[str]
+    leaf: list  # 클러스터가 속한 트리 말단 목록 (정리 시 제거용)
+
+
+class TemplateMiner:
+    """Drain 방식 템플릿 분류기 (메모리 트리 + log_templates 영속화)"""
+
+    def __init__(self, sim_threshold: float = LOG_TEMPLATE_SIM_THRESHOLD,
+                 prefix_tokens: int = LOG_TEMPLATE_PREFIX_TOKENS,
+                 max_children: int = LOG_TEMPLATE_MAX_CHILDREN,
+                 max_tokens: int = LOG_TEMPLATE_MAX_TOKENS):
+        self.sim_threshold = sim_threshold
+        self.prefix_tokens = prefix_tokens
+        self.max_children = max_children
+        self.max_tokens = max_tokens
+        self._root: dict[tuple[str, int], dict] = {}
+        self._clusters: dict[int, _Cluster] = {}
+        # template_id → (cluster_id, log_source, template) (옛 버전 포함)
+        self._versions: dict[int, tuple[int, str, str]] = {}
+        self._next_id = 1
+
+    @property
+    def cluster_count(self) -> int:
+        return len(self._clusters)
+
+    @staticmethod
+    def _key(token: str) -> str:
+        return WILDCARD if _DIGIT_RE.search(token) else token
+
+    def _search_leaf(self, source: str, tokens: list[str]) -> Optional[list]:
+        node = self._root.get((source, len(tokens)))
+        for token in tokens[:self.prefix_tokens]:
+            if node is None:
+                return None
+            node = node.get(self._key(token), node.get(WILDCARD))
+        return node
+
+    def _add_leaf(self, source: str, tokens: list[str]) -> list:
+        node = self._root.setdefault((source, len(tokens)), {})
+        prefix = tokens[:self.prefix_tokens]
+        for i, token in enumerate(prefix):
+            key = self._key(token)
+            # 자식이 가득 차면 새 토큰은 모두 <*> 가지로 (값이 다양한 앞 토큰이 트리를 키우지 않게)
+            if key not in node and len(node) >= self.max_children - 1:
+                key = WILDCARD
+            node = node.setdefault(key, [] if i == len(prefix) - 1 else {})
+        return node
+
+    def _similarity(self, template: list[str], tokens: list[str]) -> tuple[float, int]:
+        """(고정 토큰 일치 비율, 변수 자리 수)"""
+        fixed = same = 0
+        for t, tok in zip(template, tokens):
+            if t == WILDCARD:
+                continue
+            fixed += 1
+            same += t == tok
+        return (same / fixed if fixed else 1.0), len(template) - fixed
+
+    def _new_version(self, cluster: _Cluster) -> int:
+        template_id = self._next_id
+        self._next_id += 1
+        cluster.template_id = template_id
+        self._versions[template_id] = (cluster.cluster_id, cluster.log_source, ' '.join(cluster.tokens))
+        return template_id
+
+    def add(self, log_source: str, message: Optional[str]) -> Optional[tuple[int, str]]:
+        """메시지 분류 → (template_id, params JSON), 템플릿화하지 않으면 None"""
+        if not message:
+            return None
+        tokens = message.split(' ')
+        if len(tokens) > self.max_tokens or WILDCARD in tokens:
+            return None
+        source = log_source or ''
+
+        best, best_key = None, (-1.0, -1)
+        for cluster in self._search_leaf(source, tokens) or ():
+            key = self._similarity(cluster.tokens, tokens)
+            if key > best_key:
+                best, best_key = cluster, key
+
+        if best is not None and best_key[0] >= self.sim_threshold:
+            merged = [t if t == tok else WILDCARD for t, tok in zip(best.tokens, tokens)]
+            if merged != best.tokens:
+                best.tokens = merged
+                self._new_version(best)
+            cluster = best
+        else:
+            leaf = self._add_leaf(source, tokens)
+            cluster = _Cluster(self._next_id, 0, source, [self._key(t) for t in tokens], leaf)
+            leaf.append(cluster)
+            self._clusters[cluster.cluster_id] = cluster
+            self._new_version(cluster)
+
+        params = [tok for t, tok in zip(cluster.tokens, tokens) if t == WILDCARD]
+        return cluster.template_id, json.dumps(params, ensure_ascii=False, separators=(',', ':'))
+
+    async def load(self, conn):
+        """log_templates 에서 템플릿 버전과 클러스터 트리 복원 (앱 시작 시)"""
+        result = await conn.execute(
+            text(f"""SELECT template_id, cluster_id, log_source, template
+                 FROM {TS_SCHEMA}.log_templates ORDER BY template_id""")
+        )
+        self._root.clear()
+        self._clusters.clear()
+        self._versions.clear()
+        latest: dict[int, int] = {}
+        for template_id, cluster_id, source, template in result.fetchall():
+            self._versions[template_id] = (cluster_id, source or '', template)
+            latest[cluster_id] = template_id
+            self._next_id = max(self._next_id, template_id + 1)
+        for cluster_id, template_id in latest.items():
+            _, source, template = self._versions[template_id]
+            tokens = template.split(' ')
+            leaf = self._add_leaf(source, tokens)
+            cluster = _Cluster(cluster_id, template_id, source, tokens, leaf)
+            leaf.append(cluster)
+            self._clusters[cluster_id] = cluster
+        logger.info(f"Log templates loaded: {len(self._clusters)} clusters, "
+                    f"{len(self._versions)} versions")
+
+    async def save(self, conn, template_ids, seen_at: str):
+        """이번 쓰기에서 사용한 템플릿 기록 (없으면 추가, 있으면 last_seen 갱신)
+
+        로그 행과 같은 트랜잭션에서 먼저 실행해야 FTS 트리거가 원문을 복원할 수 있다.
+        쓰기가 실패해 롤백되어도 다음 쓰기에서 다시 기록되므로 별도 상태를 두지 않는다.
+        """
+        rows = [
+            {"tid": tid, "cid": self._versions[tid][0], "src": self._versions[tid][1],
+             "tpl": self._versions[tid][2], "seen": seen_at}
+            for tid in sorted(set(template_ids))
+        ]
+        if not rows:
+            return
+        await conn.execute(
+            text(f"""INSERT INTO {TS_SCHEMA}.log_templates
+                (template_id, cluster_id, log_source, template, first_seen, last_seen)
+                VALUES (:tid, :cid, :src, :tpl, :seen, :seen)
+                ON CONFLICT(template_id) DO UPDATE SET
+                    last_seen=MAX(last_seen, excluded.last_seen)"""),
+            rows
+        )
+
+    async def prune(self, conn, cutoff: str) -> int:
+        """last_seen 이 보존 기한 이전인 템플릿 삭제 (해당 로그 행이 정리된 뒤 호출)"""
+        result = await conn.execute(
+            text(f"DELETE FROM {TS_SCHEMA}.log_templates WHERE last_seen < :cutoff RETURNING template_id"),
+            {"cutoff": cutoff}
+        )
+        removed = [r[0] for r in result.fetchall()]
+        for template_id in removed:
+            version = self._versions.pop(template_id, None)
+            cluster = self._clusters.get(version[0]) if version else None
+            if cluster and cluster.template_id == template_id:
+                cluster.leaf.remove(cluster)
+                del self._clusters[cluster.cluster_id]
+        return len(removed)
+
+
+log_miner = TemplateMiner()
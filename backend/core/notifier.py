@@ -4,6 +4,8 @@ import httpx
 from datetime import datetime
 from sqlalchemy import text
 from backend.db.database import async_session
+from backend.db.writer import db_writer
+from backend.core.http_cache import change_tracker
 
 logger = logging.getLogger(__name__)
 
@@ -57,15 +59,15 @@ class Notifier:
         if settings.get('webhook_webex_enabled') == 'true' and settings.get('webhook_webex_url'):
             await self._send_webex(settings['webhook_webex_url'], alert_data)
 
-        # webhook_sent 업데이트
-        alert_id = alert_data.get('alert_id')
-        if alert_id:
-            async with async_session() as session:
-                await session.execute(
-                    text("UPDATE alert_history SET webhook_sent=1 WHERE alert_id=:aid"),
-                    {"aid": alert_id}
-                )
-                await session.commit()
+        # webhook_sent 업데이트 (묶음 알림은 alert_ids 전체)
+        alert_ids = alert_data.get('alert_ids') or [alert_data.get('alert_id')]
+        alert_ids = [int(a) for a in alert_ids if a]
+        if alert_ids:
+            await db_writer.execute(
+                text(f"""UPDATE alert_history SET webhook_sent=1
+                     WHERE alert_id IN ({','.join(str(a) for a in alert_ids)})""")
+            )
+            change_tracker.bump('alerts')
 
     async def _send_slack(self, url: str, alert_data: dict):
         """Slack Webhook 발송"""
@@ -8,11 +8,17 @@ from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
 from openpyxl.chart import LineChart, Reference
 from openpyxl.utils import get_column_letter
 from sqlalchemy import text
+from backend.db.archive import fetch_raw_metrics
 from backend.db.database import async_session
+from backend.db.writer import db_writer
+from backend.core.http_cache import change_tracker
 from backend.config import REPORTS_DIR
 
 logger = logging.getLogger(__name__)
 
+# 엑셀 시트 최대 행(1,048,576)을 넘지 않도록 Raw 시트 행 수 제한
+RAW_SHEET_MAX_ROWS = 1_000_000
+
 HEADER_FILL = PatternFill(start_color="4F46E5", end_color="4F46E5", fill_type="solid")
 HEADER_FONT = Font(bold=True, color="FFFFFF", size=11)
 THIN_BORDER = Border(
@@ -41,6 +47,10 @@ async def generate_report(date_from: str, date_to: str,
         # 시계열 데이터 시트
         await _create_timeseries_sheet(wb, date_from, date_to, server_ids)
 
+    if report_type == 'detail':
+        # 원본 해상도 데이터 시트 (아카이브 포함)
+        await _create_raw_sheet(wb, date_from, date_to, server_ids)
+
     # 알림 이력 시트
     await _create_alert_sheet(wb, date_from, date_to, server_ids)
 
@@ -56,22 +66,20 @@ async def generate_report(date_from: str, date_to: str,
     file_size_kb = os.path.getsize(filepath) // 1024
 
     # 리포트 이력 저장
-    async with async_session() as session:
-        await session.execute(
-            text("""INSERT INTO report_history
-                (report_name, report_type, server_ids, date_from, date_to,
-                 file_path, file_size_kb, created_by)
-                VALUES (:rn, :rt, :si, :df, :dt, :fp, :fs, :cb)"""),
-            {
-                "rn": filename, "rt": report_type,
-                "si": str(server_ids) if server_ids else None,
-                "df": date_from, "dt": date_to,
-                "fp": filepath, "fs": file_size_kb, "cb": created_by
-            }
-        )
-        await session.commit()
-        result = await session.execute(text("SELECT last_insert_rowid()"))
-        report_id = result.scalar()
+    result = await db_writer.execute(
+        text("""INSERT INTO report_history
+            (report_name, report_type, server_ids, date_from, date_to,
+             file_path, file_size_kb, created_by)
+            VALUES (:rn, :rt, :si, :df, :dt, :fp, :fs, :cb)"""),
+        {
+            "rn": filename, "rt": report_type,
+            "si": str(server_ids) if server_ids else None,
+            "df": date_from, "dt": date_to,
+            "fp": filepath, "fs": file_size_kb, "cb": created_by
+        }
+    )
+    report_id = result.lastrowid
+    change_tracker.bump('reports')
 
     return {
         "report_id": report_id,
@@ -206,6 +214,36 @@ async def _create_timeseries_sheet(wb, date_from, date_to, server_ids):
         ws.column_dimensions[get_column_letter(col)].width = 18
 
 
+async def _create_raw_sheet(wb, date_from, date_to, server_ids):
+    """Raw 데이터 시트 (수집 원본, 보존 기간이 지난 구간은 아카이브에서 조회)"""
+    ws = wb.create_sheet("Raw 데이터")
+    columns = ['수집시각', '서버', 'CPU%', 'MEM%', 'DISK_READ', 'DISK_WRITE', '연결수', '프로세스수']
+    _set_header(ws, 1, columns)
+
+    async with async_session() as session:
+        result = await session.execute(text("SELECT server_id, display_name FROM servers"))
+        names = {row[0]: row[1] for row in result.fetchall()}
+
+    rows = await fetch_raw_metrics(
+        ['collected_at', 'server_id', 'cpu_usage_pct', 'mem_usage_pct',
+         'disk_read_mbps', 'disk_write_mbps', 'net_connections', 'process_count'],
+        server_ids, date_from, date_to
+    )
+    if len(rows) > RAW_SHEET_MAX_ROWS:
+        logger.warning(f"Raw sheet truncated: {len(rows)} -> {RAW_SHEET_MAX_ROWS} rows")
+        rows = rows[:RAW_SHEET_MAX_ROWS]
+
+    for row_idx, r in enumerate(rows, 2):
+        values = [r['collected_at'], names.get(r['server_id'], r['server_id']),
+                  r['cpu_usage_pct'], r['mem_usage_pct'], r['disk_read_mbps'],
+                  r['disk_write_mbps'], r['net_connections'], r['process_count']]
+        for col_idx, val in enumerate(values, 1):
+            ws.cell(row=row_idx, column=col_idx, value=val)
+
+    for col in range(1, len(columns) + 1):
+        ws.column_dimensions[get_column_letter(col)].width = 18
+
+
 async def _create_alert_sheet(wb, date_from, date_to, server_ids):
     """알림 이력 시트"""
     ws = wb.create_sheet("알림 이력")
@@ -0,0 +1,167 @@
+"""서버별 최근 Raw 메트릭 링 버퍼
+
+수집기가 방금 기록한 샘플을 최신값/최근 이력/이상탐지가 다시 DB에서
+읽지 않도록, 서버마다 고정 크기 numpy 배열에 최근 RING_BUFFER_MINUTES 분의 샘플을 보관한다.
+배열이 가득 차면 가장 오래된 슬롯을 덮어쓰므로 추가는 O(1) 이다.
+
+각 버퍼는 covered_from(초 단위 시각) 이후의 샘플을 DB와 동일하게 모두 가지고 있음을 보장한다.
+시작 시 DB에서 최근 구간을 읽어 채우고(warm), 그 이전 범위를 요구하는 조회는 None 을 돌려
+호출 측이 DB로 조회하게 한다.
+"""
+import logging
+from datetime import datetime, timedelta
+from typing import Optional
+import numpy as np
+from sqlalchemy import Float, Integer
+from backend.config import RING_BUFFER_MIN_INTERVAL_SEC, RING_BUFFER_MINUTES, TS_SCHEMA
+from backend.core.tsblock import from_epoch, parse_time_bound, to_epoch
+from backend.db.archive import fetch_raw_metrics
+from backend.db.models import Base
+
+logger = logging.getLogger(__name__)
+
+
+def _column_kinds() -> dict[str, str]:
+    """버퍼에 담을 metrics_raw 컬럼 → 종류 ('f' 실수, 'i' 정수, 't' 문자열)"""
+    kinds = {}
+    for c in Base.metadata.tables[f"{TS_SCHEMA}.metrics_raw"].columns:
+        if c.name in ('id', 'server_id', 'collected_at'):
+            continue
+        if isinstance(c.type, Float):
+            kinds[c.name] = 'f'
+        elif isinstance(c.type, Integer):
+            kinds[c.name] = 'i'
+        else:
+            kinds[c.name] = 't'
+    return kinds
+
+
+RING_COLUMNS = _column_kinds()
+_NUMERIC = [c for c, k in RING_COLUMNS.items() if k != 't']
+_TEXT = [c for c, k in RING_COLUMNS.items() if k == 't']
+_NUMERIC_POS = {c: i for i, c in enumerate(_NUMERIC)}
+_TEXT_POS = {c: i for i, c in enumerate(_TEXT)}
+
+
+class MetricRing:
+    """한 서버의 최근 샘플 (고정 크기 배열, 가득 차면 가장 오래된 슬롯을 덮어씀)"""
+
+    def __init__(self, capacity: int, covered_from: int):
+        self.capacity = capacity
+        self.covered_from = covered_from
+        self.size = 0
+        self._head = 0  # 다음에 쓸 슬롯
+        self._times = np.zeros(capacity, dtype=np.int64)
+        self._numeric = np.full((capacity, len(_NUMERIC)), np.nan)
+        self._text = np.empty((capacity, len(_TEXT)), dtype=object)
+
+    def append(self, ts: int, values: dict):
+        i = self._head
+        if self.size == self.capacity:
+            # 덮어쓰는 샘플 시각까지는 더 이상 메모리에 없음
+            self.covered_from = max(self.covered_from, int(self._times[i]) + 1)
+        else:
+            self.size += 1
+        self._times[i] = ts
+        self._numeric[i] = [np.nan if values.get(c) is None else values[c] for c in _NUMERIC]
+        self._text[i] = [values.get(c) for c in _TEXT]
+        self._head = (i + 1) % self.capacity
+
+    def covers(self, lo: int) -> bool:
+        return lo >= self.covered_from
+
+    def _ordered(self) -> np.ndarray:
+        """오래된 순 슬롯 인덱스"""
+        return np.arange(self._head - self.size, self._head) % self.capacity
+
+    def rows(self, slots: np.ndarray, columns: list[str], server_id: int) -> list[dict]:
+        """슬롯들을 metrics_raw 컬럼명 키의 dict 목록으로 변환"""
+        out = {}
+        for col in columns:
+            if col == 'collected_at':
+                out[col] = [from_epoch(t) for t in self._times[slots].tolist()]
+            elif col == 'server_id':
+                out[col] = [server_id] * len(slots)
+            elif col in _NUMERIC_POS:
+                as_int = RING_COLUMNS[col] == 'i'
+                out[col] = [
+                    None if v != v else (int(v) if as_int else v)
+                    for v in self._numeric[slots, _NUMERIC_POS[col]].tolist()
+                ]
+            elif col in _TEXT_POS:
+                out[col] = self._text[slots, _TEXT_POS[col]].tolist()
+            else:
+                out[col] = [None] * len(slots)
+        return [dict(zip(columns, values)) for values in zip(*(out[c] for c in columns))]
+
+    def latest(self, columns: list[str], server_id: int) -> Optional[dict]:
+        if not self.size:
+            return None
+        slot = np.array([(self._head - 1) % self.capacity])
+        return self.rows(slot, columns, server_id)[0]
+
+    def window(self, lo: int, hi: Optional[int], columns: list[str],
+               server_id: int) -> list[dict]:
+        slots = self._ordered()
+        times = self._times[slots]
+        mask = times >= lo
+        if hi is not None:
+            mask &= times <= hi
+        return self.rows(slots[mask], columns, server_id)
+
+
+class RecentMetrics:
+    """서버별 링 버퍼 모음 (CollectorEngine 소유)"""
+
+    def __init__(self, minutes: int = RING_BUFFER_MINUTES,
+                 min_interval_sec: int = RING_BUFFER_MIN_INTERVAL_SEC):
+        self.window_sec = minutes * 60
+        # 정확히 window_sec 전부터 조회해도 버퍼가 보장하도록 10% 여유
+        self.capacity = self.window_sec * 11 // 10 // min_interval_sec
+        self._rings: dict[int, MetricRing] = {}
+
+    def __contains__(self, server_id: int) -> bool:
+        return server_id in self._rings
+
+    async def warm(self, server_ids: list[int]):
+        """DB의 최근 window_sec 구간으로 버퍼 초기화 (재시작 직후 1회 조회)"""
+        if not server_ids:
+            return
+        since = datetime.now() - timedelta(seconds=self.window_sec)
+        since_str = since.strftime('%Y-%m-%d %H:%M:%S')
+        rows = await fetch_raw_metrics(
+            ['server_id', 'collected_at', *RING_COLUMNS], server_ids, since_str
+        )
+        for sid in server_ids:
+            self._rings[sid] = MetricRing(self.capacity, to_epoch(since_str))
+        for row in rows:
+            self._rings[row['server_id']].append(to_epoch(row['collected_at']), row)
+        logger.info(f"Ring buffer warmed: {len(server_ids)} servers, {len(rows)} samples")
+
+    def append(self, server_id: int, collected_at: str, metrics: dict):
+        """수집 직후 샘플 추가 (DB 기록이 끝난 뒤 호출)"""
+        ts = to_epoch(collected_at)
+        ring = self._rings.get(server_id)
+        if ring is None:
+            # warm 되지 않은 서버는 첫 샘플부터만 보장
+            ring = self._rings[server_id] = MetricRing(self.capacity, ts)
+        ring.append(ts, metrics)
+
+    def drop(self, server_id: int):
+        self._rings.pop(server_id, None)
+
+    def latest(self, server_id: int, columns: Optional[list[str]] = None) -> Optional[dict]:
+        """서버 최신 샘플 (없으면 None)"""
+        ring = self._rings.get(server_id)
+        if ring is None:
+            return None
+        return ring.latest(columns or ['server_id', 'collected_at', *RING_COLUMNS], server_id)
+
+    def window(self, server_id: int, date_from, date_to,
+               columns: list[str]) -> Optional[list[dict]]:
+        """구간 샘플 (collected_at 순), 버퍼가 구간 시작을 보장하지 못하면 None"""
+        ring = self._rings.get(server_id)
+        lo = parse_time_bound(date_from)
+        if ring is None or lo is None or not ring.covers(lo):
+            return None
+        return ring.window(lo, parse_time_bound(date_to), columns, server_id)
@@ -0,0 +1,198 @@
+"""알림 규칙 메모리 캐시 (서버별로 적용 규칙을 미리 골라 둔 규칙 집합)
+
+메트릭 수신마다 alert_rules 와 서버 그룹을 조회하던 것을 메모리에 한 벌만 둔다.
+- 활성 규칙과 서버 정보(그룹, 표시명, 활성 여부)를 한 번에 읽어 전체/그룹별/서버별 규칙으로 나누고,
+  각 규칙의 비교 연산은 operator 함수로 미리 바꿔 둔다.
+- 서버별 규칙 집합(전체 + 그룹 + 서버 지정, sort_order 순)은 처음 평가할 때 만들어 재사용한다.
+- 규칙 변경(rules)과 서버 등록 정보 변경(servers) 카운터로 서명을 만들고, 서명이 바뀌면 다시 읽는다.
+  알림 규칙 API 의 생성/수정/삭제/기본값 초기화가 'rules' 를 올려 캐시를 무효화한다.
+서명이 그대로인 동안 평가 경로에서는 DB 를 읽지 않는다.
+"""
+import asyncio
+import logging
+import operator
+from dataclasses import dataclass
+from typing import Callable, Optional
+from sqlalchemy import text
+from backend.core.http_cache import change_tracker
+from backend.db.database import async_session
+
+logger = logging.getLogger(__name__)
+
+RULE_TOPICS = ('rules', 'servers')
+
+_OPERATORS: dict[str, Callable[[float, float], bool]] = {
+    '>=': operator.ge,
+    '>': operator.gt,
+    '<=': operator.le,
+    '<': operator.lt,
+    '==': operator.eq,
+}
+
+
+def _never(value: float, threshold: float) -> bool:
+    return False
+
+
+@dataclass(frozen=True)
+class CompiledRule:
+    """평가용 규칙 (비교 함수와 기본값이 정해진 상태)"""
+    rule_id: int
+    rule_name: str
+    server_id: Optional[int]
+    group_name: Optional[str]
+    metric_name: str
+    condition_op: str
+    warning_value: Optional[float]
+    critical_value: Optional[float]
+    duration_sec: int
+    cooldown_sec: int
+    compare: Callable[[float, float], bool]
+    # 'value' 는 현재값, 나머지는 window_sec 초 윈도우 집계값으로 판단 (alert_windows)
+    condition_type: str = 'value'
+    window_sec: int = 0
+    percentile: Optional[float] = None
+
+    @classmethod
+    def from_row(cls, row: dict) -> 'CompiledRule':
+        op = row['condition_op'] or '>='
+        condition_type = row.get('condition_type') or 'value'
+        window_sec = row.get('window_sec') or 0
+        if window_sec <= 0:
+            condition_type = 'value'
+        return cls(
+            rule_id=row['rule_id'],
+            rule_name=row['rule_name'],
+            server_id=row['server_id'],
+            group_name=row['group_name'] or None,
+            metric_name=row['metric_name'],
+            condition_op=op,
+            warning_value=row['warning_value'],
+            critical_value=row['critical_value'],
+            duration_sec=row['duration_sec'] or 0,
+            cooldown_sec=row['cooldown_sec'] if row['cooldown_sec'] is not None else 300,
+            compare=_OPERATORS.get(op, _never),
+            condition_type=condition_type,
+            window_sec=window_sec,
+            percentile=row.get('percentile'),
+        )
+
+
+@dataclass(frozen=True)
+class ServerInfo:
+    group_name: Optional[str]
+    display_name: str
+    is_active: bool
+
+
+class RuleCache:
+    """알림 규칙 캐시"""
+
+    def __init__(self):
+        self._signature: Optional[tuple] = None
+        self._global: list[tuple[int, CompiledRule]] = []
+        self._by_group: dict[str, list[tuple[int, CompiledRule]]] = {}
+        self._by_server: dict[int, list[tuple[int, CompiledRule]]] = {}
+        self._servers: dict[int, ServerInfo] = {}
+        self._compiled: dict[int, tuple[CompiledRule, ...]] = {}
+        self._metrics: set[str] = set()
+        self._fleet: Optional[list[tuple[int, str, tuple[CompiledRule, ...]]]] = None
+        self._lock = asyncio.Lock()
+
+    @staticmethod
+    def _current_signature() -> tuple:
+        return tuple(change_tracker.version(t) for t in RULE_TOPICS)
+
+    async def _load(self):
+        # 읽는 중에 들어온 변경은 다음 호출에서 다시 반영되도록 서명을 먼저 읽음
+        signature = self._current_signature()
+        async with async_session() as session:
+            result = await session.execute(
+                text("SELECT * FROM alert_rules WHERE is_enabled=1 ORDER BY sort_order, rule_id")
+            )
+            rows = [dict(r._mapping) for r in result.fetchall()]
+            result = await session.execute(
+                text("SELECT server_id, group_name, display_name, hostname, is_active FROM servers")
+            )
+            servers = {
+                r[0]: ServerInfo(r[1] or None, r[2] or r[3], bool(r[4]))
+                for r in result.fetchall()
+            }
+
+        global_rules, by_group, by_server = [], {}, {}
+        for position, row in enumerate(rows):
+            rule = CompiledRule.from_row(row)
+            entry = (position, rule)
+            # 서버 지정 규칙에 그룹도 있으면 서버가 그 그룹일 때만 적용 (서버별 집합을 만들 때 확인)
+            if rule.server_id:
+                by_server.setdefault(rule.server_id, []).append(entry)
+            elif rule.group_name:
+                by_group.setdefault(rule.group_name, []).append(entry)
+            else:
+                global_rules.append(entry)
+
+        self._global, self._by_group, self._by_server = global_rules, by_group, by_server
+        self._servers = servers
+        self._compiled = {}
+        self._fleet = None
+        self._metrics = {row['metric_name'] for row in rows}
+        self._signature = signature
+        logger.debug(f"Alert rules loaded: {len(rows)} rules, {len(servers)} servers")
+
+    async def _ensure(self):
+        if self._signature == self._current_signature():
+            return
+        async with self._lock:
+            if self._signature != self._current_signature():
+                await self._load()
+
+    def _compile(self, server_id: int) -> tuple[CompiledRule, ...]:
+        info = self._servers.get(server_id)
+        group = info.group_name if info else None
+        entries = [*self._global, *self._by_group.get(group, ())] if group else list(self._global)
+        entries.extend(
+            e for e in self._by_server.get(server_id, ())
+            if not e[1].group_name or e[1].group_name == group
+        )
+        entries.sort(key=lambda e: e[0])
+        rules = tuple(rule for _, rule in entries)
+        self._compiled[server_id] = rules
+        return rules
+
+    async def rules_for(self, server_id: int) -> tuple[CompiledRule, ...]:
+        """서버에 적용되는 활성 규칙 (sort_order 순)"""
+        await self._ensure()
+        rules = self._compiled.get(server_id)
+        return rules if rules is not None else self._compile(server_id)
+
+    async def has_metric(self, metric_name: str) -> bool:
+        """해당 메트릭을 보는 활성 규칙이 하나라도 있는지"""
+        await self._ensure()
+        return metric_name in self._metrics
+
+    def server_info(self, server_id: int) -> Optional[ServerInfo]:
+        """서버 정보 (마지막으로 읽은 서버 정보 기준)"""
+        return self._servers.get(server_id)
+
+    def server_group(self, server_id: int) -> Optional[str]:
+        """서버 그룹명 (마지막으로 읽은 서버 정보 기준)"""
+        info = self._servers.get(server_id)
+        return info.group_name if info else None
+
+    async def active_servers(self) -> list[tuple[int, str]]:
+        """활성 서버 (server_id, 표시명)"""
+        await self._ensure()
+        return [(sid, info.display_name) for sid, info in self._servers.items() if info.is_active]
+
+    async def fleet(self) -> tuple[tuple, list[tuple[int, str, tuple[CompiledRule, ...]]]]:
+        """(서명, 활성 서버별 (server_id, 표시명, 규칙 집합)) — 서명이 같으면 같은 목록 객체"""
+        await self._ensure()
+        if self._fleet is None:
+            self._fleet = [
+                (sid, info.display_name, self._compiled.get(sid) or self._compile(sid))
+                for sid, info in self._servers.items() if info.is_active
+            ]
+        return self._signature, self._fleet
+
+
+rule_cache = RuleCache()
@@ -0,0 +1,61 @@
+"""해시 타이머 휠 (키마다 마감 시각 하나)
+
+슬롯 배열을 tick_sec 단위로 돌며, 마감 틱 % 슬롯 수 자리에 키를 둔다.
+- 등록/재등록/취소는 키 → 슬롯 색인으로 O(1)
+- advance 는 지난 틱의 슬롯만 훑는다. 한 바퀴(tick_sec × slots)보다 먼 마감은
+  같은 슬롯에서 마감 틱이 될 때까지 남아 있다.
+마감은 틱 단위로 올림하므로 마감 시각보다 일찍 만료되지 않는다 (최대 tick_sec 늦음).
+시각은 호출 측이 정한 단조 시계(time.monotonic) 값을 쓴다.
+"""
+import math
+from typing import Hashable
+
+
+class TimerWheel:
+    """키별 마감 타이머"""
+
+    def __init__(self, start: float, tick_sec: float = 1.0, slots: int = 512):
+        self.tick_sec = tick_sec
+        self._slots: list[dict[Hashable, int]] = [{} for _ in range(slots)]
+        self._where: dict[Hashable, int] = {}
+        self._tick = math.floor(start / tick_sec)  # 처리가 끝난 마지막 틱
+
+    def __len__(self) -> int:
+        return len(self._where)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._where
+
+    def schedule(self, key: Hashable, deadline: float):
+        """마감 등록 (이미 있으면 옮김)"""
+        self.cancel(key)
+        tick = max(math.ceil(deadline / self.tick_sec), self._tick + 1)
+        slot = tick % len(self._slots)
+        self._slots[slot][key] = tick
+        self._where[key] = slot
+
+    def cancel(self, key: Hashable):
+        slot = self._where.pop(key, None)
+        if slot is not None:
+            del self._slots[slot][key]
+
+    def advance(self, now: float) -> list[Hashable]:
+        """now 까지 마감된 키를 꺼내 반환 (마감 순서는 보장하지 않음)"""
+        target = math.floor(now / self.tick_sec)
+        if target <= self._tick:
+            return []
+        # 한 바퀴 이상 밀렸으면 모든 슬롯을 한 번씩만 훑음
+        ticks = range(max(self._tick + 1, target - len(self._slots) + 1), target + 1)
+        self._tick = target
+
+        expired = []
+        for tick in ticks:
+            slot = self._slots[tick % len(self._slots)]
+            if not slot:
+                continue
+            due = [key for key, key_tick in slot.items() if key_tick <= target]
+            for key in due:
+                del slot[key]
+                del self._where[key]
+            expired.extend(due)
+        return expired
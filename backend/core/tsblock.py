@@ -0,0 +1,295 @@
+"""시계열 블록 코덱 (delta-of-delta 타임스탬프 + XOR 실수 인코딩)
+
+한 서버/한 메트릭의 고정 구간 샘플을 하나의 BLOB 으로 묶는다.
+타임스탬프는 초 단위 정수의 delta-of-delta, 값은 직전 값과의 XOR 로 기록하므로
+수집 주기가 일정하고 값이 천천히 변하는 메트릭은 샘플당 수 비트로 줄어든다.
+NULL 은 NaN 으로 기록한다. 문자열 컬럼(disk_json 등)은 값 부분만 zlib JSON 으로 저장한다.
+
+수집값은 대부분 소수 1~2자리로 반올림되어 있는데, 0.1 같은 십진 소수는 이진 가수부가
+꽉 차 있어 XOR 결과의 유효 비트가 길다. 블록의 모든 값이 10^k 배 해서 정확히 정수가 되면
+(k ≤ MAX_DECIMAL_SCALE) 정수 값으로 바꿔 XOR 하고 헤더에 k 를 기록한다.
+
+블록 구조:
+    헤더(struct '<BBBI': 버전, 코덱, 십진 배율 k, 샘플 수) | 타임스탬프 스트림 길이(uint32) |
+    타임스탬프 비트스트림 | 값 스트림(XOR 비트스트림 또는 zlib JSON)
+"""
+import json
+import math
+import struct
+import zlib
+from datetime import datetime, timedelta
+from typing import Iterator, Optional
+
+BLOCK_VERSION = 1
+CODEC_FLOAT = 1
+CODEC_JSON = 2
+
+MAX_DECIMAL_SCALE = 4
+
+_HEADER = struct.Struct('<BBBI')
+_LEN = struct.Struct('<I')
+_EPOCH = datetime(1970, 1, 1)
+_NAN_BITS = 0x7FF8000000000000
+
+# delta-of-delta 구간: (접두 비트, 접두 길이, 값 비트 수, 최소값)
+_DOD_BUCKETS = [
+    (0b10, 2, 7, -63),
+    (0b110, 3, 9, -255),
+    (0b1110, 4, 12, -2047),
+]
+
+
+# ── 시각 변환 (로컬 시각 문자열 ↔ 초 단위 정수) ──
+
+def to_epoch(value: str) -> int:
+    """'YYYY-MM-DD HH:MM:SS' → 초 단위 정수"""
+    dt = datetime.strptime(value[:19], '%Y-%m-%d %H:%M:%S')
+    return int((dt - _EPOCH).total_seconds())
+
+
+def from_epoch(seconds: int) -> str:
+    """초 단위 정수 → 'YYYY-MM-DD HH:MM:SS'"""
+    return (_EPOCH + timedelta(seconds=seconds)).strftime('%Y-%m-%d %H:%M:%S')
+
+
+def parse_time_bound(value) -> Optional[int]:
+    """조회 경계('YYYY-MM-DD[ HH:MM:SS]' / ISO) → 초 단위 정수, 해석 불가 시 None"""
+    if not value:
+        return None
+    s = str(value)[:19].replace('T', ' ')
+    if len(s) == 10:
+        s += ' 00:00:00'
+    try:
+        return to_epoch(s)
+    except ValueError:
+        return None
+
+
+# ── 비트 입출력 ──
+
+class BitWriter:
+    """MSB 우선 비트 기록기"""
+
+    def __init__(self):
+        self._buf = bytearray()
+        self._acc = 0
+        self._nbits = 0
+
+    def write(self, value: int, nbits: int):
+        self._acc = (self._acc << nbits) | (value & ((1 << nbits) - 1))
+        self._nbits += nbits
+        while self._nbits >= 8:
+            self._nbits -= 8
+            self._buf.append((self._acc >> self._nbits) & 0xFF)
+        self._acc &= (1 << self._nbits) - 1
+
+    def getvalue(self) -> bytes:
+        if self._nbits:
+            return bytes(self._buf) + bytes([(self._acc << (8 - self._nbits)) & 0xFF])
+        return bytes(self._buf)
+
+
+class BitReader:
+    """MSB 우선 비트 판독기"""
+
+    def __init__(self, data: bytes):
+        self._data = data
+        self._pos = 0
+        self._acc = 0
+        self._nbits = 0
+
+    def read(self, nbits: int) -> int:
+        while self._nbits < nbits:
+            self._acc = (self._acc << 8) | self._data[self._pos]
+            self._pos += 1
+            self._nbits += 8
+        self._nbits -= nbits
+        value = self._acc >> self._nbits
+        self._acc &= (1 << self._nbits) - 1
+        return value
+
+    def read_bit(self) -> int:
+        return self.read(1)
+
+
+# ── 타임스탬프 (delta-of-delta) ──
+
+def _encode_timestamps(timestamps: list[int]) -> bytes:
+    w = BitWriter()
+    w.write(timestamps[0], 64)
+    prev, prev_delta = timestamps[0], 0
+    for ts in timestamps[1:]:
+        delta = ts - prev
+        dod = delta - prev_delta
+        if dod == 0:
+            w.write(0, 1)
+        else:
+            for prefix, plen, vbits, low in _DOD_BUCKETS:
+                if low <= dod <= low + (1 << vbits) - 1:
+                    w.write(prefix, plen)
+                    w.write(dod - low, vbits)
+                    break
+            else:
+                w.write(0b1111, 4)
+                w.write(dod, 32)
+        prev, prev_delta = ts, delta
+    return w.getvalue()
+
+
+def _iter_timestamps(data: bytes, count: int) -> Iterator[int]:
+    r = BitReader(data)
+    ts = r.read(64)
+    yield ts
+    delta = 0
+    for _ in range(count - 1):
+        if r.read_bit() == 0:
+            dod = 0
+        else:
+            for _prefix, _plen, vbits, low in _DOD_BUCKETS:
+                if r.read_bit() == 0:
+                    dod = r.read(vbits) + low
+                    break
+            else:
+                dod = r.read(32)
+                if dod >= 1 << 31:
+                    dod -= 1 << 32
+        delta += dod
+        ts += delta
+        yield ts
+
+
+# ── 실수 (XOR) ──
+
+def _float_bits(value: Optional[float]) -> int:
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return _NAN_BITS
+    return struct.unpack('<Q', struct.pack('<d', float(value)))[0]
+
+
+def _encode_floats(values: list) -> bytes:
+    w = BitWriter()
+    prev = _float_bits(values[0])
+    w.write(prev, 64)
+    prev_lead, prev_trail = -1, -1
+    for value in values[1:]:
+        bits = _float_bits(value)
+        xor = bits ^ prev
+        if xor == 0:
+            w.write(0, 1)
+        else:
+            w.write(1, 1)
+            lead = min(64 - xor.bit_length(), 31)
+            trail = (xor & -xor).bit_length() - 1
+            if prev_lead >= 0 and lead >= prev_lead and trail >= prev_trail:
+                # 직전 유효 비트 구간 안에 들어가면 구간 정보 생략
+                w.write(0, 1)
+                w.write(xor >> prev_trail, 64 - prev_lead - prev_trail)
+            else:
+                meaningful = 64 - lead - trail
+                w.write(1, 1)
+                w.write(lead, 5)
+                w.write(meaningful & 0x3F, 6)  # 64 는 0 으로 기록
+                w.write(xor >> trail, meaningful)
+                prev_lead, prev_trail = lead, trail
+        prev = bits
+    return w.getvalue()
+
+
+def _iter_floats(data: bytes, count: int, scale: int = 0) -> Iterator[Optional[float]]:
+    read = BitReader(data).read
+    unpack, pack = struct.unpack, struct.pack
+    divisor = 10 ** scale
+    bits = read(64)
+    lead, trail = 0, 0
+    for i in range(count):
+        if i:
+            if read(1):
+                if read(1):
+                    lead = read(5)
+                    meaningful = read(6) or 64
+                    trail = 64 - lead - meaningful
+                bits ^= read(64 - lead - trail) << trail
+        value = unpack('<d', pack('<Q', bits))[0]
+        if value != value:
+            yield None
+        elif scale:
+            yield value / divisor
+        else:
+            yield value
+
+
+def _decimal_scale(values: list) -> int:
+    """모든 값을 정수로 만드는 최소 십진 배율 k (이미 정수이거나 해당 없으면 0)"""
+    present = [v for v in values if v is not None]
+    # NaN/무한대, 정수 변환 시 2^53 을 넘는 값, -0.0 은 그대로 XOR
+    if not all(math.isfinite(v) and abs(v) < 2 ** 39 and (v or math.copysign(1, v) > 0)
+               for v in present):
+        return 0
+    for scale in range(MAX_DECIMAL_SCALE + 1):
+        divisor = 10 ** scale
+        if all(round(v * divisor) / divisor == v for v in present):
+            return scale
+    return 0
+
+
+# ── 블록 ──
+
+def encode_block(timestamps: list[int], values: list, codec: int = CODEC_FLOAT) -> bytes:
+    """샘플(초 단위 시각, 값) 목록을 블록 BLOB 으로 인코딩 (시각 오름차순)"""
+    if not timestamps or len(timestamps) != len(values):
+        raise ValueError("timestamps and values must be non-empty and of equal length")
+    ts_stream = _encode_timestamps(timestamps)
+    scale = 0
+    if codec == CODEC_FLOAT:
+        scale = _decimal_scale(values)
+        if scale:
+            divisor = 10 ** scale
+            values = [None if v is None else float(round(v * divisor)) for v in values]
+        value_stream = _encode_floats(values)
+    else:
+        value_stream = zlib.compress(json.dumps(values, ensure_ascii=False).encode('utf-8'))
+    return (_HEADER.pack(BLOCK_VERSION, codec, scale, len(timestamps))
+            + _LEN.pack(len(ts_stream)) + ts_stream + value_stream)
+
+
+def block_count(data: bytes) -> int:
+    """블록의 샘플 수"""
+    return _HEADER.unpack_from(data)[3]
+
+
+def _split(data: bytes):
+    version, codec, scale, count = _HEADER.unpack_from(data)
+    if version != BLOCK_VERSION:
+        raise ValueError(f"Unsupported block version: {version}")
+    offset = _HEADER.size
+    ts_len = _LEN.unpack_from(data, offset)[0]
+    offset += _LEN.size
+    return codec, scale, count, data[offset:offset + ts_len], data[offset + ts_len:]
+
+
+def iter_block_times(data: bytes) -> Iterator[int]:
+    """블록의 샘플 시각(초 단위)만 순서대로 디코딩"""
+    _codec, _scale, count, ts_stream, _values = _split(data)
+    return _iter_timestamps(ts_stream, count)
+
+
+def iter_block_values(data: bytes) -> Iterator[object]:
+    """블록의 값만 순서대로 디코딩 (같은 구간 여러 메트릭은 시각을 한 번만 풀면 됨)"""
+    codec, scale, count, _ts, value_stream = _split(data)
+    if codec == CODEC_FLOAT:
+        return _iter_floats(value_stream, count, scale)
+    return iter(json.loads(zlib.decompress(value_stream).decode('utf-8')))
+
+
+def iter_block(data: bytes) -> Iterator[tuple[int, object]]:
+    """블록을 (초 단위 시각, 값) 순으로 풀어내는 스트리밍 디코더"""
+    return zip(iter_block_times(data), iter_block_values(data))
+
+
+def decode_block(data: bytes) -> tuple[list[int], list]:
+    """블록 전체를 (시각 목록, 값 목록) 으로 디코딩"""
+    timestamps, values = [], []
+    for ts, value in iter_block(data):
+        timestamps.append(ts)
+        values.append(value)
+    return timestamps, values
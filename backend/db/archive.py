@@ -0,0 +1,337 @@
+"""Raw 메트릭 콜드 아카이브 (압축 컬럼형 파일)
+
+보존 기간이 지난 metrics_raw 일별 파티션은 DROP 하기 전에 ARCHIVE_DIR 의
+일자별 파일(metrics_raw_YYYYMMDD.sea)로 옮긴다. 파일 안에는 서버별로 컬럼마다
+numpy 배열을 zlib 으로 압축한 청크가 들어 있고, 조회 시 파일을 mmap 해서
+필요한 서버/컬럼의 청크만 풀어 읽는다.
+
+파일 구조:
+    MAGIC(8) | 헤더 길이(uint32 LE) | 헤더 JSON | 청크...
+    헤더: {"version", "day", "columns": {컬럼: 종류}, "servers": {server_id: {
+           "rows", "first", "last", "chunks": {컬럼: [오프셋, 길이]}}}}
+    오프셋은 청크 영역 시작 기준. 종류 'i'/'f' 는 float64(NULL=NaN, 바이트 셔플),
+    'ts' 는 초 단위 int64 델타, 't' 는 JSON 문자열 배열.
+"""
+import asyncio
+import json
+import logging
+import mmap
+import os
+import re
+import struct
+import zlib
+from datetime import date, datetime, timedelta
+from typing import Optional
+import numpy as np
+from sqlalchemy import Float, Integer, text
+from backend.config import ARCHIVE_DIR, TS_SCHEMA
+from backend.core.tsblock import parse_time_bound
+from backend.db.blocks import fetch_block_rows
+from backend.db.database import async_session
+from backend.db.models import Base
+from backend.db.partitions import (
+    parse_partition_name, partition_name, partitions_for_range, union_source
+)
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_BASE = 'metrics_raw'
+_MAGIC = b'SEARCV01'
+_SUFFIX = '.sea'
+_COMPRESS_LEVEL = 6
+_FILE_RE = re.compile(rf'^{ARCHIVE_BASE}_(?P<day>\d{{8}}){re.escape(_SUFFIX)}$')
+_EPOCH = datetime(1970, 1, 1)
+
+
+def _column_kinds() -> dict[str, str]:
+    """아카이브 대상 컬럼 → 저장 종류 (id/server_id 제외, collected_at 은 'ts')"""
+    kinds = {}
+    for c in Base.metadata.tables[f"{TS_SCHEMA}.{ARCHIVE_BASE}"].columns:
+        if c.name == 'server_id':
+            continue
+        if c.name == 'collected_at':
+            kinds[c.name] = 'ts'
+        elif isinstance(c.type, Float):
+            kinds[c.name] = 'f'
+        elif isinstance(c.type, Integer):
+            kinds[c.name] = 'i'
+        else:
+            kinds[c.name] = 't'
+    return kinds
+
+
+ARCHIVE_COLUMNS = _column_kinds()
+
+
+def archive_path(day: date):
+    return ARCHIVE_DIR / f"{ARCHIVE_BASE}_{day.strftime('%Y%m%d')}{_SUFFIX}"
+
+
+def archived_days() -> list[date]:
+    """아카이브 파일이 있는 일자 (오래된 순)"""
+    days = []
+    for entry in os.scandir(ARCHIVE_DIR):
+        m = _FILE_RE.match(entry.name)
+        if m:
+            days.append(datetime.strptime(m.group('day'), '%Y%m%d').date())
+    return sorted(days)
+
+
+# ── 인코딩 ──
+
+def _encode(kind: str, values: list) -> bytes:
+    if kind == 'ts':
+        arr = np.array(values, dtype='datetime64[s]').astype(np.int64)
+        raw = np.diff(arr, prepend=np.int64(0)).astype('<i8').tobytes()
+    elif kind in ('f', 'i'):
+        arr = np.array([np.nan if v is None else v for v in values], dtype='<f8')
+        # 같은 자리 바이트끼리 모으면(셔플) 지수부가 연속되어 압축률이 높아짐
+        raw = arr.view(np.uint8).reshape(-1, 8).T.tobytes()
+    else:
+        raw = json.dumps(values, ensure_ascii=False).encode('utf-8')
+    return zlib.compress(raw, _COMPRESS_LEVEL)
+
+
+def _decode(kind: str, data: bytes, rows: int):
+    raw = zlib.decompress(data)
+    if kind == 'ts':
+        return np.cumsum(np.frombuffer(raw, dtype='<i8'))
+    if kind in ('f', 'i'):
+        return np.frombuffer(raw, dtype=np.uint8).reshape(8, rows).T.copy().view('<f8').ravel()
+    return json.loads(raw.decode('utf-8'))
+
+
+def _write_file(path, day: date, servers: dict[int, dict[str, list]]):
+    """서버별 컬럼 데이터를 아카이브 파일로 기록 (임시 파일 → rename)"""
+    chunks = []
+    offset = 0
+    index = {}
+    for sid, cols in servers.items():
+        entry = {"rows": len(cols['collected_at']),
+                 "first": cols['collected_at'][0], "last": cols['collected_at'][-1],
+                 "chunks": {}}
+        for name, kind in ARCHIVE_COLUMNS.items():
+            blob = _encode(kind, cols[name])
+            entry["chunks"][name] = [offset, len(blob)]
+            chunks.append(blob)
+            offset += len(blob)
+        index[str(sid)] = entry
+
+    header = json.dumps({
+        "version": 1,
+        "day": day.isoformat(),
+        "columns": ARCHIVE_COLUMNS,
+        "servers": index,
+    }).encode('utf-8')
+
+    tmp = f"{path}.tmp"
+    with open(tmp, 'wb') as f:
+        f.write(_MAGIC)
+        f.write(struct.pack('<I', len(header)))
+        f.write(header)
+        for blob in chunks:
+            f.write(blob)
+    os.replace(tmp, path)
+
+
+def _read_file(path, server_ids: Optional[set[int]], columns: list[str],
+               lo: Optional[int], hi: Optional[int]) -> list[dict]:
+    """아카이브 파일에서 서버/컬럼/시간 범위에 해당하는 행 추출"""
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        if mm[:len(_MAGIC)] != _MAGIC:
+            raise ValueError(f"Not an archive file: {path}")
+        header_len = struct.unpack('<I', mm[8:12])[0]
+        header = json.loads(mm[12:12 + header_len])
+        base = 12 + header_len
+        kinds = header["columns"]
+
+        rows = []
+        for sid_key, entry in header["servers"].items():
+            sid = int(sid_key)
+            if server_ids is not None and sid not in server_ids:
+                continue
+            n = entry["rows"]
+
+            def column(name):
+                off, length = entry["chunks"][name]
+                return _decode(kinds[name], mm[base + off:base + off + length], n)
+
+            ts = column('collected_at')
+            mask = np.ones(n, dtype=bool)
+            if lo is not None:
+                mask &= ts >= lo
+            if hi is not None:
+                mask &= ts <= hi
+            idx = np.flatnonzero(mask)
+            if idx.size == 0:
+                continue
+
+            times = np.char.replace(
+                np.datetime_as_string(ts[idx].astype('datetime64[s]')), 'T', ' '
+            ).tolist()
+            values = {}
+            for name in columns:
+                if name in ('collected_at', 'server_id') or name not in kinds:
+                    continue
+                arr = column(name)
+                if kinds[name] == 't':
+                    values[name] = [arr[i] for i in idx]
+                else:
+                    picked = arr[idx]
+                    as_int = kinds[name] == 'i'
+                    values[name] = [
+                        None if v != v else (int(v) if as_int else float(v))
+                        for v in picked.tolist()
+                    ]
+
+            for pos in range(idx.size):
+                row = {}
+                for name in columns:
+                    if name == 'collected_at':
+                        row[name] = times[pos]
+                    elif name == 'server_id':
+                        row[name] = sid
+                    else:
+                        row[name] = values[name][pos] if name in values else None
+                rows.append(row)
+    return rows
+
+
+# ── 아카이브 생성/삭제 ──
+
+async def archive_partition(day: date) -> Optional[dict]:
+    """metrics_raw 일별 파티션을 아카이브 파일로 기록 (이미 있으면 건너뜀)"""
+    path = archive_path(day)
+    if path.exists():
+        return None
+
+    name = partition_name(ARCHIVE_BASE, day)
+    columns = list(ARCHIVE_COLUMNS)
+    async with async_session() as session:
+        result = await session.execute(
+            text(f"""SELECT server_id, {', '.join(columns)} FROM {name}
+                 ORDER BY server_id, collected_at, id""")
+        )
+        rows = result.fetchall()
+
+    # 블록 저장 모드로 옮겨진 행도 함께 아카이브
+    block_rows = await fetch_block_rows(
+        'raw', columns + ['server_id'], None,
+        f"{day.isoformat()} 00:00:00", f"{day.isoformat()} 23:59:59"
+    )
+    if block_rows:
+        rows = [tuple(r) for r in rows]
+        rows.extend((r['server_id'], *(r[c] for c in columns)) for r in block_rows)
+        t = columns.index('collected_at') + 1
+        rows.sort(key=lambda r: (r[0], r[t]))
+
+    servers: dict[int, dict[str, list]] = {}
+    for row in rows:
+        cols = servers.get(row[0])
+        if cols is None:
+            cols = servers[row[0]] = {c: [] for c in columns}
+        for i, c in enumerate(columns, 1):
+            cols[c].append(row[i])
+
+    if servers:
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, _write_file, path, day, servers)
+    size = path.stat().st_size if path.exists() else 0
+    logger.info(f"Archived {name}: {len(rows)} rows, {len(servers)} servers, {size} bytes")
+    return {"partition": name, "rows": len(rows), "servers": len(servers), "bytes": size}
+
+
+def drop_archives_before(cutoff: date) -> list[str]:
+    """cutoff 일자 이전 아카이브 파일 삭제"""
+    removed = []
+    for day in archived_days():
+        if day >= cutoff:
+            break
+        path = archive_path(day)
+        path.unlink(missing_ok=True)
+        removed.append(path.name)
+    return removed
+
+
+def archive_summary() -> dict:
+    """아카이브 파일 수/용량/기간"""
+    days = archived_days()
+    total = sum(archive_path(d).stat().st_size for d in days)
+    return {
+        "files": len(days),
+        "total_bytes": total,
+        "first_day": days[0].isoformat() if days else None,
+        "last_day": days[-1].isoformat() if days else None,
+    }
+
+
+# ── 조회 (파티션 + 아카이브 통합) ──
+
+def raw_day_sources(date_from=None, date_to=None) -> tuple[dict[date, str], list[date]]:
+    """Raw 조회 구간의 일자별 출처 → ({일자: 살아 있는 파티션}, [아카이브 파일만 있는 일자])
+
+    경계 문자열이 UTC ISO 인 경우를 고려해 아카이브 일자는 하루씩 넓게 선택한다.
+    """
+    live = {parse_partition_name(t)[1]: t
+            for t in partitions_for_range(ARCHIVE_BASE, date_from, date_to)}
+    lo, hi = parse_time_bound(date_from), parse_time_bound(date_to)
+    day_lo = (_EPOCH + timedelta(seconds=lo - 86400)).date() if lo is not None else None
+    day_hi = (_EPOCH + timedelta(seconds=hi + 86400)).date() if hi is not None else None
+    cold = [
+        d for d in archived_days()
+        if d not in live
+        and (day_lo is None or d >= day_lo) and (day_hi is None or d <= day_hi)
+    ]
+    return live, cold
+
+
+async def read_archive_day(day: date, server_ids: Optional[set[int]], columns: list[str],
+                           lo: Optional[int], hi: Optional[int]) -> list[dict]:
+    """하루치 아카이브 파일에서 서버/컬럼/시간 범위에 해당하는 행 조회 (파일 읽기는 스레드에서)"""
+    return await asyncio.get_running_loop().run_in_executor(
+        None, _read_file, archive_path(day), server_ids, columns, lo, hi
+    )
+
+
+async def fetch_raw_metrics(columns: list[str], server_ids: Optional[list[int]] = None,
+                            date_from=None, date_to=None) -> list[dict]:
+    """Raw 메트릭 조회: 살아 있는 파티션, 블록, 아카이브 파일을 합쳐 collected_at 순으로 반환
+
+    columns 는 metrics_raw 컬럼명이며 결과 dict 의 키도 같다.
+    """
+    live, cold_days = raw_day_sources(date_from, date_to)
+    live_tables = list(live.values())
+    lo, hi = parse_time_bound(date_from), parse_time_bound(date_to)
+
+    rows: list[dict] = []
+    if cold_days:
+        sid_set = set(server_ids) if server_ids is not None else None
+        for day in cold_days:
+            rows.extend(await read_archive_day(day, sid_set, columns, lo, hi))
+
+    if live_tables:
+        conditions = []
+        params = {}
+        if server_ids is not None:
+            conditions.append(f"server_id IN ({','.join(str(int(s)) for s in server_ids) or 'NULL'})")
+        if date_from:
+            conditions.append("collected_at >= :df")
+            params["df"] = date_from
+        if date_to:
+            conditions.append("collected_at <= :dt")
+            params["dt"] = date_to
+        select_cols = ", ".join(dict.fromkeys(columns + ['collected_at']))
+        source = union_source(ARCHIVE_BASE, live_tables, select_cols, " AND ".join(conditions))
+        async with async_session() as session:
+            result = await session.execute(
+                text(f"SELECT {', '.join(columns)} FROM {source} ORDER BY collected_at"), params
+            )
+            rows.extend(dict(zip(columns, r)) for r in result.fetchall())
+
+    # 블록 저장 모드로 옮겨진 구간
+    block_rows = await fetch_block_rows('raw', columns, server_ids, date_from, date_to)
+    rows.extend(block_rows)
+
+    if (cold_days or block_rows) and 'collected_at' in columns:
+        rows.sort(key=lambda r: r['collected_at'])
+    return rows
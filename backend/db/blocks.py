@@ -0,0 +1,372 @@
+"""시계열 블록 저장 모드 (raw / 5min)
+
+저장 방식 설정(storage_mode_raw, storage_mode_5min)이 'blocks' 인 계층은 주기적으로
+닫힌 구간의 행을 서버/메트릭별 블록(backend.core.tsblock)으로 묶어 블록 테이블에 넣고
+원본 행을 삭제한다. 최근 구간은 집계/알림/최신값 조회가 행을 직접 읽으므로
+계층별 지연(lag_sec)만큼은 행으로 남겨 둔다.
+
+조회 함수는 행과 블록을 합쳐 같은 형태의 dict 목록으로 돌려준다.
+블록에는 행 id 가 저장되지 않으므로 블록에서 나온 행의 id 는 None 이다.
+"""
+import asyncio
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Iterator, Optional
+from sqlalchemy import Float, Integer, text
+from backend.config import TS_SCHEMA
+from backend.core.tsblock import (
+    CODEC_FLOAT, CODEC_JSON, encode_block, from_epoch, iter_block, iter_block_times,
+    iter_block_values, parse_time_bound, to_epoch
+)
+from backend.db.database import async_session
+from backend.db.models import Base
+from backend.db.partitions import PARTITIONED_TABLES, partitions_for_range
+from backend.db.writer import db_writer
+
+logger = logging.getLogger(__name__)
+
+STORAGE_MODES = ('rows', 'blocks')
+
+
+@dataclass(frozen=True)
+class BlockTier:
+    source: str        # 원본 테이블 (일별 파티션이면 기준 테이블명)
+    table: str         # 블록 테이블
+    time_col: str
+    window_sec: int    # 블록 구간 길이
+    lag_sec: int       # 이 시간 이내의 행은 블록으로 옮기지 않음
+    setting_key: str
+
+
+BLOCK_TIERS = {
+    # 5분 집계가 최근 10분 raw 를 다시 읽으므로 2시간 여유
+    'raw': BlockTier('metrics_raw', 'metrics_raw_blocks', 'collected_at',
+                     3600, 2 * 3600, 'storage_mode_raw'),
+    # 1시간 집계가 최근 2시간 5분 집계를 다시 읽으므로 3시간 여유
+    '5min': BlockTier('metrics_5min', 'metrics_5min_blocks', 'bucket_time',
+                      86400, 3 * 3600, 'storage_mode_5min'),
+}
+
+
+def _column_kinds(source: str, time_col: str) -> dict[str, str]:
+    """블록으로 저장할 컬럼 → 종류 ('f' 실수, 'i' 정수, 't' 문자열)"""
+    kinds = {}
+    for c in Base.metadata.tables[f"{TS_SCHEMA}.{source}"].columns:
+        if c.name in ('id', 'server_id', time_col):
+            continue
+        if isinstance(c.type, Float):
+            kinds[c.name] = 'f'
+        elif isinstance(c.type, Integer):
+            kinds[c.name] = 'i'
+        else:
+            kinds[c.name] = 't'
+    return kinds
+
+
+TIER_COLUMNS = {name: _column_kinds(t.source, t.time_col) for name, t in BLOCK_TIERS.items()}
+
+
+async def get_storage_modes() -> dict[str, str]:
+    """계층별 저장 방식 설정 (알 수 없는 값은 'rows')"""
+    keys = {t.setting_key: name for name, t in BLOCK_TIERS.items()}
+    modes = {name: 'rows' for name in BLOCK_TIERS}
+    async with async_session() as session:
+        result = await session.execute(
+            text(f"SELECT key, value FROM app_settings WHERE key IN "
+                 f"({', '.join(repr(k) for k in keys)})")
+        )
+        for key, value in result.fetchall():
+            if value in STORAGE_MODES:
+                modes[keys[key]] = value
+    return modes
+
+
+# ── 블록 변환 ──
+
+def _build_blocks(tier: BlockTier, kinds: dict[str, str], server_id: int,
+                  rows: list) -> list[dict]:
+    """(시각, 컬럼...) 행 목록을 구간/메트릭별 블록 레코드로 변환"""
+    windows: dict[int, list] = {}
+    for row in rows:
+        ts = to_epoch(row[0])
+        windows.setdefault(ts - ts % tier.window_sec, []).append((ts, row[1:]))
+
+    blocks = []
+    for start, samples in windows.items():
+        samples.sort(key=lambda s: s[0])
+        timestamps = [s[0] for s in samples]
+        for i, (metric, kind) in enumerate(kinds.items()):
+            values = [s[1][i] for s in samples]
+            blocks.append({
+                "sid": server_id,
+                "metric": metric,
+                "start": from_epoch(start),
+                "end": from_epoch(timestamps[-1]),
+                "count": len(samples),
+                "data": encode_block(timestamps, values,
+                                     CODEC_JSON if kind == 't' else CODEC_FLOAT),
+            })
+    return blocks
+
+
+def _merge_block(existing: bytes, new: bytes, codec: int) -> tuple[bytes, int, int]:
+    """같은 구간 기존 블록과 새 블록을 시각 기준으로 합침 → (데이터, 샘플 수, 마지막 시각)"""
+    merged = dict(iter_block(existing))
+    merged.update(iter_block(new))
+    timestamps = sorted(merged)
+    data = encode_block(timestamps, [merged[t] for t in timestamps], codec)
+    return data, len(timestamps), timestamps[-1]
+
+
+# ── 압축 (행 → 블록) ──
+
+async def compact_tier(name: str, now: Optional[datetime] = None) -> dict:
+    """지연 시간이 지난 닫힌 구간의 행을 블록으로 옮김"""
+    tier = BLOCK_TIERS[name]
+    kinds = TIER_COLUMNS[name]
+    now_ts = to_epoch((now or datetime.now()).strftime('%Y-%m-%d %H:%M:%S'))
+    boundary_ts = now_ts - tier.lag_sec
+    boundary = from_epoch(boundary_ts - boundary_ts % tier.window_sec)
+
+    if tier.source in PARTITIONED_TABLES:
+        sources = partitions_for_range(tier.source, None, boundary)
+    else:
+        sources = [tier.source]
+
+    moved_rows = 0
+    written_blocks = 0
+    columns = ", ".join([tier.time_col, *kinds])
+    for source in sources:
+        async with async_session() as session:
+            result = await session.execute(
+                text(f"SELECT DISTINCT server_id FROM {source} WHERE {tier.time_col} < :b"),
+                {"b": boundary}
+            )
+            server_ids = [r[0] for r in result.fetchall()]
+
+        for sid in server_ids:
+            async with async_session() as session:
+                result = await session.execute(
+                    text(f"""SELECT {columns} FROM {source}
+                         WHERE server_id=:sid AND {tier.time_col} < :b
+                         ORDER BY {tier.time_col}"""),
+                    {"sid": sid, "b": boundary}
+                )
+                rows = result.fetchall()
+            if not rows:
+                continue
+
+            loop = asyncio.get_running_loop()
+            blocks = await loop.run_in_executor(None, _build_blocks, tier, kinds, sid, rows)
+            last_time = rows[-1][0]
+            deleted = await db_writer.run(
+                lambda conn, s=source, sid=sid, b=blocks, last=last_time:
+                    _store_blocks(conn, tier, kinds, s, sid, b, last)
+            )
+            moved_rows += deleted
+            written_blocks += len(blocks)
+
+    if moved_rows:
+        logger.info(f"Compacted {moved_rows} {tier.source} rows into {written_blocks} blocks")
+    return {"tier": name, "rows": moved_rows, "blocks": written_blocks, "boundary": boundary}
+
+
+async def _store_blocks(conn, tier: BlockTier, kinds: dict[str, str], source: str,
+                        server_id: int, blocks: list[dict], last_time: str) -> int:
+    """블록 저장과 원본 행 삭제를 한 작업으로 수행 (같은 구간 블록이 있으면 병합)"""
+    starts = sorted({b["start"] for b in blocks})
+    result = await conn.execute(
+        text(f"""SELECT block_start, metric, data FROM {tier.table}
+             WHERE server_id=:sid AND block_start IN ({', '.join(f':s{i}' for i in range(len(starts)))})"""),
+        {"sid": server_id, **{f"s{i}": s for i, s in enumerate(starts)}}
+    )
+    existing = {(r[0], r[1]): r[2] for r in result.fetchall()}
+    for b in blocks:
+        old = existing.get((b["start"], b["metric"]))
+        if old is not None:
+            codec = CODEC_JSON if kinds[b["metric"]] == 't' else CODEC_FLOAT
+            b["data"], b["count"], last_ts = _merge_block(old, b["data"], codec)
+            b["end"] = from_epoch(last_ts)
+
+    await conn.execute(
+        text(f"""INSERT OR REPLACE INTO {tier.table}
+             (server_id, metric, block_start, block_end, sample_count, data)
+             VALUES (:sid, :metric, :start, :end, :count, :data)"""),
+        blocks
+    )
+    result = await conn.execute(
+        text(f"DELETE FROM {source} WHERE server_id=:sid AND {tier.time_col} <= :last"),
+        {"sid": server_id, "last": last_time}
+    )
+    return result.rowcount or 0
+
+
+async def compact_blocks() -> dict:
+    """저장 방식이 'blocks' 인 계층 압축"""
+    modes = await get_storage_modes()
+    report = {}
+    for name, mode in modes.items():
+        if mode == 'blocks':
+            report[name] = await compact_tier(name)
+    return report
+
+
+async def delete_blocks_before(name: str, cutoff: str) -> int:
+    """마지막 샘플이 cutoff 이전인 블록 삭제"""
+    result = await db_writer.execute(
+        text(f"DELETE FROM {BLOCK_TIERS[name].table} WHERE block_end < :cutoff"),
+        {"cutoff": cutoff}
+    )
+    return result.rowcount or 0
+
+
+# ── 조회 (블록 → 행) ──
+
+def iter_block_rows(name: str, blocks: list, columns: list[str],
+                    lo: Optional[int], hi: Optional[int]) -> Iterator[dict]:
+    """(server_id, block_start, metric, data) 목록을 행 dict 로 풀어내는 스트리밍 디코더
+
+    blocks 는 (server_id, block_start) 순으로 정렬되어 있어야 한다.
+    """
+    tier = BLOCK_TIERS[name]
+    kinds = TIER_COLUMNS[name]
+    group_key = None
+    group: dict[str, bytes] = {}
+
+    def emit(sid, metrics):
+        names = list(metrics)
+        # 같은 구간 메트릭 블록은 시각이 같으므로 시각은 첫 블록에서만 디코딩
+        times = iter_block_times(metrics[names[0]])
+        streams = [iter_block_values(metrics[m]) for m in names]
+        for ts, *samples in zip(times, *streams):
+            if (lo is not None and ts < lo) or (hi is not None and ts > hi):
+                continue
+            values = dict(zip(names, samples))
+            row = {}
+            for col in columns:
+                if col == tier.time_col:
+                    row[col] = from_epoch(ts)
+                elif col == 'server_id':
+                    row[col] = sid
+                else:
+                    value = values.get(col)
+                    if value is not None and kinds.get(col) == 'i':
+                        value = int(value)
+                    row[col] = value
+            yield row
+
+    for sid, start, metric, data in blocks:
+        if (sid, start) != group_key:
+            if group:
+                yield from emit(group_key[0], group)
+            group_key, group = (sid, start), {}
+        group[metric] = data
+    if group:
+        yield from emit(group_key[0], group)
+
+
+def _metric_condition(name: str, columns: list[str], alias: str = "") -> str:
+    """읽을 메트릭 블록 조건 (시각만 필요한 경우에도 샘플 시각을 얻기 위해 한 메트릭은 읽음)"""
+    kinds = TIER_COLUMNS[name]
+    metrics = [c for c in columns if c in kinds] or [next(iter(kinds))]
+    return f"{alias}metric IN ({', '.join(repr(m) for m in metrics)})"
+
+
+async def fetch_block_rows(name: str, columns: list[str],
+                           server_ids: Optional[list[int]] = None,
+                           date_from=None, date_to=None) -> list[dict]:
+    """블록 테이블에서 범위에 해당하는 행 조회 (시각 순)"""
+    tier = BLOCK_TIERS[name]
+    lo, hi = parse_time_bound(date_from), parse_time_bound(date_to)
+    conditions = [_metric_condition(name, columns)]
+    params = {}
+    if server_ids is not None:
+        conditions.append(f"server_id IN ({','.join(str(int(s)) for s in server_ids) or 'NULL'})")
+    if lo is not None:
+        conditions.append("block_end >= :lo")
+        params["lo"] = from_epoch(lo)
+    if hi is not None:
+        conditions.append("block_start <= :hi")
+        params["hi"] = from_epoch(hi)
+
+    async with async_session() as session:
+        result = await session.execute(
+            text(f"""SELECT server_id, block_start, metric, data FROM {tier.table}
+                 WHERE {' AND '.join(conditions)}
+                 ORDER BY server_id, block_start"""),
+            params
+        )
+        blocks = result.fetchall()
+    if not blocks:
+        return []
+
+    def decode():
+        rows = list(iter_block_rows(name, blocks, columns, lo, hi))
+        if tier.time_col in columns:
+            rows.sort(key=lambda r: r[tier.time_col])
+        return rows
+
+    return await asyncio.get_running_loop().run_in_executor(None, decode)
+
+
+async def fetch_latest_block_rows(name: str, columns: list[str],
+                                  server_ids: Optional[list[int]] = None, conn=None) -> dict[int, dict]:
+    """서버별 마지막 블록의 마지막 샘플 (행이 모두 블록으로 옮겨진 서버의 최신값 조회용)
+
+    conn 을 주면 그 커넥션(초기화 트랜잭션 등)에서 읽는다.
+    """
+    tier = BLOCK_TIERS[name]
+    where = ""
+    if server_ids is not None:
+        where = f"WHERE server_id IN ({','.join(str(int(s)) for s in server_ids) or 'NULL'})"
+    query = text(f"""SELECT b.server_id, b.block_start, b.metric, b.data
+        FROM {tier.table} b
+        JOIN (SELECT server_id, MAX(block_start) AS last_start FROM {tier.table} {where}
+              GROUP BY server_id) m
+        ON b.server_id=m.server_id AND b.block_start=m.last_start
+        WHERE {_metric_condition(name, columns, 'b.')}
+        ORDER BY b.server_id, b.block_start""")
+
+    if conn is not None:
+        blocks = (await conn.execute(query)).fetchall()
+    else:
+        async with async_session() as session:
+            blocks = (await session.execute(query)).fetchall()
+
+    latest = {}
+    for row in iter_block_rows(name, blocks, list(dict.fromkeys(['server_id', *columns])), None, None):
+        # 블록 안의 샘플은 시각 순이므로 서버별 마지막 행이 최신값
+        latest[row['server_id']] = row
+    return latest
+
+
+async def fetch_5min_metrics(columns: list[str], server_ids: Optional[list[int]] = None,
+                             date_from=None, date_to=None) -> list[dict]:
+    """5분 집계 조회: metrics_5min 행과 블록을 합쳐 bucket_time 순으로 반환"""
+    conditions = []
+    params = {}
+    if server_ids is not None:
+        conditions.append(f"server_id IN ({','.join(str(int(s)) for s in server_ids) or 'NULL'})")
+    if date_from:
+        conditions.append("bucket_time >= :df")
+        params["df"] = date_from
+    if date_to:
+        conditions.append("bucket_time <= :dt")
+        params["dt"] = date_to
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+    blocks = await fetch_block_rows('5min', columns, server_ids, date_from, date_to)
+    async with async_session() as session:
+        result = await session.execute(
+            text(f"SELECT {', '.join(columns)} FROM metrics_5min {where} ORDER BY bucket_time"),
+            params
+        )
+        rows = [dict(zip(columns, r)) for r in result.fetchall()]
+
+    if blocks:
+        rows = blocks + rows
+        if 'bucket_time' in columns:
+            rows.sort(key=lambda r: to_epoch(r['bucket_time']))
+    return rows
+
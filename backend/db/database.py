@@ -1,37 +1,190 @@
-"""SQLAlchemy 엔진 및 세션 관리"""
+"""SQLAlchemy 엔진 및 세션 관리
+
+쓰기는 backend.db.writer 의 단일 쓰기 태스크만 수행하고(engine),
+조회는 읽기 전용 WAL 커넥션 풀(read_engine, async_session)을 사용한다.
+"""
+import logging
+import sqlite3
+import time
+from sqlalchemy import event
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
-from backend.config import DATABASE_URL
+from backend.config import DATABASE_URL, DB_READ_POOL_SIZE, TS_DB_PATH, TS_SCHEMA
+from backend.core.log_templates import render_template
+
+logger = logging.getLogger(__name__)
 
+# 쓰기 엔진: DbWriter 가 커넥션 하나를 점유 (초기화/마이그레이션은 DbWriter 시작 전에 사용)
 engine = create_async_engine(
     DATABASE_URL,
     echo=False,
     connect_args={"check_same_thread": False}
 )
 
+# 읽기 엔진: query_only 커넥션 풀 (WAL 이므로 쓰기 트랜잭션과 무관하게 동시 조회 가능)
+read_engine = create_async_engine(
+    DATABASE_URL,
+    echo=False,
+    poolclass=AsyncAdaptedQueuePool,
+    pool_size=DB_READ_POOL_SIZE,
+    max_overflow=DB_READ_POOL_SIZE,
+    connect_args={"check_same_thread": False}
+)
+
 async_session = async_sessionmaker(
-    engine,
+    read_engine,
     class_=AsyncSession,
     expire_on_commit=False
 )
 
+# 스키마별 영구 PRAGMA (DB 파일에 기록됨, 앱 시작 시 1회)
+_SCHEMA_PERSISTENT_PRAGMAS = {
+    "main": ["journal_mode = WAL"],
+    TS_SCHEMA: ["journal_mode = WAL"],
+}
+
+# 스키마별 커넥션 PRAGMA — 설정 DB(main)와 시계열 DB(ts)를 따로 튜닝
+_SCHEMA_PRAGMAS = {
+    "main": [
+        "synchronous = NORMAL",
+        "cache_size = -16000",
+    ],
+    TS_SCHEMA: [
+        "synchronous = NORMAL",
+        "cache_size = -64000",
+        "journal_size_limit = 67108864",
+    ],
+}
+
+# 커넥션 공통 PRAGMA
+_CONNECTION_PRAGMAS = [
+    "temp_store = MEMORY",
+    "mmap_size = 268435456",
+    "busy_timeout = 5000",
+]
+
+
+def _setup_connection(dbapi_connection):
+    """새 커넥션마다 시계열 DB 파일을 ATTACH 하고 커넥션 PRAGMA/SQL 함수 적용"""
+    # 템플릿화된 로그 원문 복원 (로그 파티션 조회 뷰와 FTS 트리거에서 사용)
+    dbapi_connection.create_function("log_render", 2, render_template, deterministic=True)
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f"ATTACH DATABASE ? AS {TS_SCHEMA}", (str(TS_DB_PATH),))
+    for schema, pragmas in _SCHEMA_PRAGMAS.items():
+        for pragma in pragmas:
+            cursor.execute(f"PRAGMA {schema}.{pragma}")
+    for pragma in _CONNECTION_PRAGMAS:
+        cursor.execute(f"PRAGMA {pragma}")
+    cursor.close()
+
+
+@event.listens_for(engine.sync_engine, "connect")
+def _on_write_connect(dbapi_connection, connection_record):
+    _setup_connection(dbapi_connection)
+    # 드라이버의 암시적 BEGIN 을 끄고 아래 begin 이벤트에서 직접 시작 (SAVEPOINT 지원)
+    dbapi_connection.isolation_level = None
+
+
+@event.listens_for(engine.sync_engine, "begin")
+def _on_write_begin(conn):
+    # 쓰기 잠금을 트랜잭션 시작 시점에 확보
+    conn.exec_driver_sql("BEGIN IMMEDIATE")
+
+
+@event.listens_for(read_engine.sync_engine, "connect")
+def _on_read_connect(dbapi_connection, connection_record):
+    _setup_connection(dbapi_connection)
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA query_only = ON")
+    cursor.close()
+
 
 async def get_db():
-    """FastAPI 의존성: 비동기 DB 세션"""
+    """FastAPI 의존성: 비동기 DB 세션 (읽기 전용)"""
     async with async_session() as session:
-        try:
-            yield session
-            await session.commit()
-        except Exception:
-            await session.rollback()
-            raise
+        yield session
+
+
+# 기존 DB 를 auto_vacuum=INCREMENTAL 로 바꾸는 1회 전체 VACUUM 을 다음 시작 시 실행할지 (app_settings)
+AUTO_VACUUM_CONVERT_KEY = 'db_auto_vacuum_convert'
+
+
+async def _auto_vacuum_convert_requested(raw) -> bool:
+    try:
+        cursor = await raw.execute(
+            "SELECT value FROM main.app_settings WHERE key=?", (AUTO_VACUUM_CONVERT_KEY,)
+        )
+        row = await cursor.fetchone()
+    except sqlite3.OperationalError:
+        return False  # 설정 테이블이 아직 없는 새 DB
+    return bool(row) and row[0] == 'true'
+
+
+async def _db_size_mb(raw, schema: str) -> float:
+    cursor = await raw.execute(f"PRAGMA {schema}.page_count")
+    page_count = (await cursor.fetchone())[0]
+    cursor = await raw.execute(f"PRAGMA {schema}.page_size")
+    return page_count * (await cursor.fetchone())[0] / 1048576
 
 
 async def execute_pragmas():
-    """SQLite PRAGMA 설정 (앱 시작 시 실행)"""
-    async with engine.begin() as conn:
-        await conn.exec_driver_sql("PRAGMA journal_mode = WAL")
-        await conn.exec_driver_sql("PRAGMA synchronous = NORMAL")
-        await conn.exec_driver_sql("PRAGMA cache_size = -64000")
-        await conn.exec_driver_sql("PRAGMA temp_store = MEMORY")
-        await conn.exec_driver_sql("PRAGMA mmap_size = 268435456")
-        await conn.exec_driver_sql("PRAGMA busy_timeout = 5000")
+    """SQLite 영구 PRAGMA 설정 (앱 시작 시, 테이블 생성 전에 실행)
+
+    journal_mode 는 트랜잭션 밖에서 실행해야 하므로 드라이버 커넥션을 직접 사용한다.
+    auto_vacuum 은 테이블이 없는 새 DB 파일(처음 설치, 업그레이드로 새로 생긴 시계열 DB)에만
+    VACUUM 없이 적용된다. 데이터가 있는 기존 DB 의 전환은 이관이 끝난 뒤 convert_auto_vacuum 에서 한다.
+    """
+    async with engine.connect() as conn:
+        raw = (await conn.get_raw_connection()).driver_connection
+        for schema, pragmas in _SCHEMA_PERSISTENT_PRAGMAS.items():
+            cursor = await raw.execute(f"PRAGMA {schema}.auto_vacuum")
+            if (await cursor.fetchone())[0] != 2:
+                cursor = await raw.execute(f"SELECT COUNT(*) FROM {schema}.sqlite_master")
+                if (await cursor.fetchone())[0] == 0:
+                    await raw.execute(f"PRAGMA {schema}.auto_vacuum = INCREMENTAL")
+            for pragma in pragmas:
+                await raw.execute(f"PRAGMA {schema}.{pragma}")
+
+
+async def convert_auto_vacuum():
+    """기존 DB 를 auto_vacuum=INCREMENTAL 로 전환 (시작 시 이관 단계 뒤에 실행)
+
+    전체 VACUUM(시작 지연, DB 크기만큼 추가 디스크)이 필요하므로 설정(db_auto_vacuum_convert)을 켠
+    경우에만 전환하고, 아니면 경고만 남긴다. 이미 INCREMENTAL 인 DB 와 빈 DB 는 건너뛴다.
+    시계열 이관 뒤에 실행하므로 설정 DB 는 이관으로 비워진 공간까지 한 번에 정리된다.
+    """
+    async with engine.connect() as conn:
+        raw = (await conn.get_raw_connection()).driver_connection
+        convert = await _auto_vacuum_convert_requested(raw)
+        converted = False
+        for schema in _SCHEMA_PERSISTENT_PRAGMAS:
+            cursor = await raw.execute(f"PRAGMA {schema}.auto_vacuum")
+            auto_vacuum = (await cursor.fetchone())[0]
+            if auto_vacuum == 2:
+                continue
+            cursor = await raw.execute(f"SELECT COUNT(*) FROM {schema}.sqlite_master")
+            if (await cursor.fetchone())[0] == 0:
+                continue
+            size_mb = await _db_size_mb(raw, schema)
+            if not convert:
+                logger.warning(
+                    f"{schema} database uses auto_vacuum={auto_vacuum}, so incremental vacuum is disabled. "
+                    f"Set '{AUTO_VACUUM_CONVERT_KEY}' to true and restart to convert it with a one-time "
+                    f"full VACUUM (blocks startup, needs about {size_mb:.1f} MB free disk)"
+                )
+                continue
+            logger.warning(f"Converting {schema} database ({size_mb:.1f} MB) to "
+                           f"auto_vacuum=INCREMENTAL with a full VACUUM; startup waits until it finishes")
+            started = time.monotonic()
+            await raw.execute(f"PRAGMA {schema}.auto_vacuum = INCREMENTAL")
+            await raw.execute(f"VACUUM {schema}")
+            converted = True
+            logger.info(f"Converted {schema} database in {time.monotonic() - started:.1f}s "
+                        f"({size_mb:.1f} MB -> {await _db_size_mb(raw, schema):.1f} MB)")
+        if convert:
+            # 1회 작업이므로 실행 후 설정을 끔
+            await raw.execute(
+                "UPDATE main.app_settings SET value='false' WHERE key=?", (AUTO_VACUUM_CONVERT_KEY,)
+            )
+            if not converted:
+                logger.info("auto_vacuum conversion requested but all databases are already INCREMENTAL")
@@ -0,0 +1,246 @@
+"""메트릭 이력 스트리밍 조회 (내보내기용)
+
+fetch_raw_metrics / fetch_5min_metrics 는 결과 전체를 목록으로 만들므로 긴 구간에서는
+메모리와 첫 바이트까지의 지연이 커진다. 여기서는 한 서버의 이력을 시각 순으로 하나씩
+넘겨주는 async 제너레이터를 제공한다.
+
+- 행은 DB 커서에서 EXPORT_FETCH_SIZE 행씩 가져온다.
+- 블록은 같은 구간(block_start) 묶음 단위로 디코딩한다.
+- 아카이브 파일은 하루치씩 읽는다.
+동시에 메모리에 올라가는 양은 조회 구간 길이와 무관하게 이 단위 하나로 제한된다.
+"""
+import asyncio
+import json
+from datetime import datetime
+from typing import AsyncIterator, Callable, Optional
+from sqlalchemy import text
+from backend.config import EXPORT_FETCH_SIZE, TS_SCHEMA
+from backend.core.tsblock import from_epoch, parse_time_bound, to_epoch
+from backend.db.archive import raw_day_sources, read_archive_day
+from backend.db.blocks import BLOCK_TIERS, TIER_COLUMNS, iter_block_rows
+from backend.db.database import async_session
+from backend.db.models import Base
+
+_EPOCH = datetime(1970, 1, 1)
+
+# 계층 → (테이블, 시각 컬럼)
+EXPORT_TIERS = {
+    'raw': ('metrics_raw', 'collected_at'),
+    '5min': ('metrics_5min', 'bucket_time'),
+    'hourly': ('metrics_hourly', 'bucket_time'),
+}
+
+# 디스크/인터페이스별 내보내기 컬럼 (SSH/WinRM 수집 JSON 키 차이를 통일)
+DEVICE_COLUMNS = {
+    'disk': ['collected_at', 'device', 'total_gb', 'used_gb', 'free_gb', 'usage_pct'],
+    'net': ['collected_at', 'device', 'recv_bytes', 'sent_bytes'],
+}
+_DEVICE_SOURCE = {'disk': 'disk_json', 'net': 'net_json'}
+_DEVICE_NAME_KEYS = {'disk': ('mount', 'DeviceID'), 'net': ('iface', 'Name')}
+_DEVICE_VALUE_KEYS = {
+    'disk': {'total_gb': ('total_gb',), 'used_gb': ('used_gb',), 'free_gb': ('free_gb',),
+             'usage_pct': ('usage_pct',)},
+    'net': {'recv_bytes': ('recv_bytes', 'ReceivedBytes'), 'sent_bytes': ('sent_bytes', 'SentBytes')},
+}
+
+
+def export_columns(interval: str) -> list[str]:
+    """계층별 내보내기 컬럼 (id/server_id 제외, 시각 컬럼 먼저)"""
+    table, time_col = EXPORT_TIERS[interval]
+    names = [c.name for c in Base.metadata.tables[f"{TS_SCHEMA}.{table}"].columns
+             if c.name not in ('id', 'server_id', time_col)]
+    return [time_col, *names]
+
+
+async def _stream_query(sql: str, params: dict, columns: list[str]) -> AsyncIterator[dict]:
+    """커서에서 EXPORT_FETCH_SIZE 행씩 가져와 dict 로 반환"""
+    async with async_session() as session:
+        result = await session.stream(
+            text(sql).execution_options(yield_per=EXPORT_FETCH_SIZE), params
+        )
+        async for chunk in result.partitions():
+            for r in chunk:
+                yield dict(zip(columns, r))
+
+
+async def _stream_blocks(name: str, columns: list[str], server_id: int,
+                         lo: Optional[int], hi: Optional[int]) -> AsyncIterator[dict]:
+    """블록 테이블을 block_start 순으로 읽어 같은 구간 묶음마다 디코딩"""
+    tier = BLOCK_TIERS[name]
+    metrics = [c for c in columns if c in TIER_COLUMNS[name]] or [next(iter(TIER_COLUMNS[name]))]
+    conditions = ["server_id=:sid", f"metric IN ({', '.join(repr(m) for m in metrics)})"]
+    params = {"sid": server_id}
+    if lo is not None:
+        conditions.append("block_end >= :lo")
+        params["lo"] = from_epoch(lo)
+    if hi is not None:
+        conditions.append("block_start <= :hi")
+        params["hi"] = from_epoch(hi)
+
+    loop = asyncio.get_running_loop()
+
+    def decode(group):
+        return list(iter_block_rows(name, group, columns, lo, hi))
+
+    group = []
+    async for block in _stream_query(
+        f"""SELECT server_id, block_start, metric, data FROM {tier.table}
+            WHERE {' AND '.join(conditions)} ORDER BY block_start""",
+        params, ['server_id', 'block_start', 'metric', 'data']
+    ):
+        if group and block['block_start'] != group[0][1]:
+            for row in await loop.run_in_executor(None, decode, group):
+                yield row
+            group = []
+        group.append((block['server_id'], block['block_start'], block['metric'], block['data']))
+    if group:
+        for row in await loop.run_in_executor(None, decode, group):
+            yield row
+
+
+async def _merge_sorted(left: AsyncIterator[dict], right: AsyncIterator[dict],
+                        key: Callable[[dict], object]) -> AsyncIterator[dict]:
+    """시각 순으로 정렬된 두 스트림 병합"""
+    a = await anext(left, None)
+    b = await anext(right, None)
+    while a is not None and b is not None:
+        if key(b) < key(a):
+            yield b
+            b = await anext(right, None)
+        else:
+            yield a
+            a = await anext(left, None)
+    while a is not None:
+        yield a
+        a = await anext(left, None)
+    while b is not None:
+        yield b
+        b = await anext(right, None)
+
+
+def _time_filter(time_col: str, lo: Optional[int], hi: Optional[int]) -> tuple[str, dict]:
+    conditions = ["server_id=:sid"]
+    params = {}
+    if lo is not None:
+        conditions.append(f"{time_col} >= :df")
+        params["df"] = from_epoch(lo)
+    if hi is not None:
+        conditions.append(f"{time_col} <= :dt")
+        params["dt"] = from_epoch(hi)
+    return " AND ".join(conditions), params
+
+
+async def _iter_raw(columns: list[str], server_id: int, date_from, date_to) -> AsyncIterator[dict]:
+    """Raw: 일자 순으로 아카이브 파일 또는 (살아 있는 파티션 + 블록) 을 차례로 읽음"""
+    lo, hi = parse_time_bound(date_from), parse_time_bound(date_to)
+    where, params = _time_filter('collected_at', lo, hi)
+    params["sid"] = server_id
+
+    live, cold = raw_day_sources(date_from, date_to)
+    for day in sorted(set(cold) | set(live)):
+        if day not in live:
+            for row in await read_archive_day(day, {server_id}, columns, lo, hi):
+                yield row
+            continue
+
+        # 블록은 해당 일자 구간으로 잘라 다른 파티션과 겹치지 않게 함
+        day_start = int((datetime.combine(day, datetime.min.time()) - _EPOCH).total_seconds())
+        block_lo = day_start if lo is None else max(lo, day_start)
+        block_hi = day_start + 86399 if hi is None else min(hi, day_start + 86399)
+        rows = _stream_query(
+            f"SELECT {', '.join(columns)} FROM {live[day]} WHERE {where} ORDER BY collected_at",
+            params, columns
+        )
+        blocks = _stream_blocks('raw', columns, server_id, block_lo, block_hi)
+        async for row in _merge_sorted(rows, blocks, key=lambda r: r['collected_at']):
+            yield row
+
+
+async def _iter_5min(columns: list[str], server_id: int, date_from, date_to) -> AsyncIterator[dict]:
+    """5분 집계: metrics_5min 행 커서와 블록 스트림 병합
+
+    bucket_time 은 분이 0 채움되지 않아('10:5:00') 문자열 순서가 시(hour) 단위까지만 맞다.
+    SQL 경계는 시 단위로 넓히고, 한 시간치(최대 12행)씩 모아 시각 순으로 정렬/필터링한다.
+    """
+    lo, hi = parse_time_bound(date_from), parse_time_bound(date_to)
+    conditions = ["server_id=:sid"]
+    params = {"sid": server_id}
+    if lo is not None:
+        conditions.append("bucket_time >= :df")
+        params["df"] = from_epoch(lo)[:14]
+    if hi is not None:
+        conditions.append("bucket_time <= :dt")
+        params["dt"] = from_epoch(hi)[:14] + '~'
+
+    async def rows():
+        hour, pending = None, []
+        async for row in _stream_query(
+            f"""SELECT {', '.join(columns)} FROM metrics_5min
+                WHERE {' AND '.join(conditions)} ORDER BY bucket_time""",
+            params, columns
+        ):
+            if row['bucket_time'][:14] != hour:
+                for _ts, r in sorted(pending, key=lambda p: p[0]):
+                    yield r
+                hour, pending = row['bucket_time'][:14], []
+            ts = to_epoch(row['bucket_time'])
+            if (lo is None or ts >= lo) and (hi is None or ts <= hi):
+                pending.append((ts, row))
+        for _ts, r in sorted(pending, key=lambda p: p[0]):
+            yield r
+
+    blocks = _stream_blocks('5min', columns, server_id, lo, hi)
+    async for row in _merge_sorted(rows(), blocks, key=lambda r: to_epoch(r['bucket_time'])):
+        yield row
+
+
+async def _iter_hourly(columns: list[str], server_id: int, date_from, date_to) -> AsyncIterator[dict]:
+    lo, hi = parse_time_bound(date_from), parse_time_bound(date_to)
+    where, params = _time_filter('bucket_time', lo, hi)
+    params["sid"] = server_id
+    async for row in _stream_query(
+        f"SELECT {', '.join(columns)} FROM metrics_hourly WHERE {where} ORDER BY bucket_time",
+        params, columns
+    ):
+        yield row
+
+
+_ITERATORS = {'raw': _iter_raw, '5min': _iter_5min, 'hourly': _iter_hourly}
+
+
+def iter_metric_rows(interval: str, server_id: int, date_from=None,
+                     date_to=None) -> AsyncIterator[dict]:
+    """서버 한 대의 계층별 이력을 시각 순으로 스트리밍 (키는 export_columns(interval))"""
+    return _ITERATORS[interval](export_columns(interval), server_id, date_from, date_to)
+
+
+def _pick(item: dict, keys: tuple):
+    for k in keys:
+        if k in item:
+            return item[k]
+    return None
+
+
+async def iter_device_rows(kind: str, server_id: int, date_from=None,
+                           date_to=None) -> AsyncIterator[dict]:
+    """Raw 샘플의 disk_json / net_json 을 디스크/인터페이스별 행으로 펼쳐 스트리밍"""
+    source = _DEVICE_SOURCE[kind]
+    name_keys = _DEVICE_NAME_KEYS[kind]
+    value_keys = _DEVICE_VALUE_KEYS[kind]
+    async for sample in _iter_raw(['collected_at', source], server_id, date_from, date_to):
+        raw = sample[source]
+        if not raw:
+            continue
+        try:
+            items = json.loads(raw) if isinstance(raw, str) else raw
+        except (json.JSONDecodeError, TypeError):
+            continue
+        if isinstance(items, dict):
+            items = [items]
+        for item in items:
+            if not isinstance(item, dict):
+                continue
+            row = {'collected_at': sample['collected_at'], 'device': _pick(item, name_keys)}
+            for col, keys in value_keys.items():
+                row[col] = _pick(item, keys)
+            yield row
@@ -0,0 +1,45 @@
+"""묶음 알림(인시던트) 기록
+
+알림 그룹이 여러 건을 한 번에 알릴 때 인시던트 한 건을 만들고, 서버별 알림 행(alert_history)은
+그대로 두고 incident_id 로 연결한다. 연결된 알림이 모두 해결되면 인시던트도 해결 처리한다.
+모든 함수는 쓰기 트랜잭션 안의 conn 을 받는다.
+"""
+from sqlalchemy import text
+
+
+async def create_incident(conn, group_key: str, group_name, metric_name, rule_id,
+                          severity: str, title: str, alert_ids: list[int], server_count: int) -> int:
+    """인시던트 생성 후 알림 행 연결, 새 incident_id 반환"""
+    result = await conn.execute(
+        text("""INSERT INTO alert_incidents
+            (group_key, group_name, metric_name, rule_id, severity, title,
+             alert_count, server_count)
+            VALUES (:gk, :gn, :mn, :rid, :sev, :title, :ac, :sc)"""),
+        {"gk": group_key, "gn": group_name, "mn": metric_name, "rid": rule_id,
+         "sev": severity, "title": title, "ac": len(alert_ids), "sc": server_count}
+    )
+    incident_id = result.lastrowid
+    await conn.execute(
+        text(f"""UPDATE alert_history SET incident_id=:iid
+             WHERE alert_id IN ({','.join(str(int(a)) for a in alert_ids)})"""),
+        {"iid": incident_id}
+    )
+    await close_resolved_incidents(conn, alert_ids)
+    return incident_id
+
+
+async def close_resolved_incidents(conn, alert_ids: list[int]):
+    """해결된 알림이 속한 인시던트 중 미해결 알림이 남지 않은 것을 해결 처리"""
+    if not alert_ids:
+        return
+    await conn.execute(
+        text(f"""UPDATE alert_incidents SET resolved_at=datetime('now','localtime')
+             WHERE resolved_at IS NULL
+             AND incident_id IN (
+                 SELECT incident_id FROM alert_history
+                 WHERE alert_id IN ({','.join(str(int(a)) for a in alert_ids)})
+                 AND incident_id IS NOT NULL)
+             AND NOT EXISTS (
+                 SELECT 1 FROM alert_history h
+                 WHERE h.incident_id=alert_incidents.incident_id AND h.resolved_at IS NULL)""")
+    )
@@ -1,7 +1,18 @@
 """데이터베이스 초기화 및 시드 데이터"""
+import logging
+from datetime import datetime
 from sqlalchemy import text
-from backend.db.database import engine, execute_pragmas
-from backend.db.models import Base
+from backend.config import TS_SCHEMA
+from backend.core.log_templates import log_miner
+from backend.db.database import convert_auto_vacuum, engine, execute_pragmas
+from backend.db.latest import backfill_server_latest
+from backend.db.models import AlertHistory, Base
+from backend.db.partitions import (
+    PARTITIONED_TABLES, base_columns, ensure_partition, load_partitions,
+    migrate_legacy_rows, parse_partition_name, table_columns, upgrade_partitions
+)
+
+logger = logging.getLogger(__name__)
 
 
 async def init_database():
@@ -11,11 +22,91 @@ async def init_database():
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
 
+    await init_partitions()
+    # 이관으로 비워진 공간까지 정리되도록 이관 뒤에 전환 (설정을 켠 경우에만)
+    await convert_auto_vacuum()
+    await migrate_alert_history()
+    await migrate_alert_rules()
     await seed_app_settings()
     await seed_default_alert_rules()
     await seed_default_admin()
 
 
+async def init_partitions():
+    """일별 파티션 캐시 로드 및 기존 단일 테이블 데이터 이관"""
+    async with engine.begin() as conn:
+        await load_partitions(conn)
+        await upgrade_partitions(conn)
+        await log_miner.load(conn)
+        await migrate_main_timeseries(conn)
+        for base in PARTITIONED_TABLES:
+            await migrate_legacy_rows(conn, base)
+        await backfill_server_latest(conn)
+
+
+async def migrate_alert_history():
+    """알림 이력 인덱스 보강 (기존 DB 는 create_all 이 새 인덱스를 만들지 않음)
+
+    acknowledged/webhook_sent 는 이전에 INSERT 시 값이 비어 NULL 로 남을 수 있었으므로
+    미확인 부분 인덱스(acknowledged=0)와 조건이 맞도록 0 으로 채운다.
+    묶음 알림용 incident_id 컬럼도 없으면 추가한다.
+    """
+    async with engine.begin() as conn:
+        if 'incident_id' not in await table_columns(conn, 'main', 'alert_history'):
+            await conn.execute(text("ALTER TABLE alert_history ADD COLUMN incident_id INTEGER"))
+        await conn.execute(text("UPDATE alert_history SET acknowledged=0 WHERE acknowledged IS NULL"))
+        await conn.execute(text("UPDATE alert_history SET webhook_sent=0 WHERE webhook_sent IS NULL"))
+        for index in AlertHistory.__table__.indexes:
+            await conn.run_sync(lambda sync_conn, idx=index: idx.create(sync_conn, checkfirst=True))
+
+
+async def migrate_alert_rules():
+    """알림 규칙 윈도우 조건 컬럼 추가 (기존 DB 는 create_all 이 새 컬럼을 만들지 않음)"""
+    columns = {
+        'condition_type': "TEXT NOT NULL DEFAULT 'value'",
+        'window_sec': "INTEGER",
+        'percentile': "FLOAT",
+    }
+    async with engine.begin() as conn:
+        existing = set(await table_columns(conn, 'main', 'alert_rules'))
+        for name, ddl in columns.items():
+            if name not in existing:
+                await conn.execute(text(f"ALTER TABLE alert_rules ADD COLUMN {name} {ddl}"))
+
+
+async def migrate_main_timeseries(conn):
+    """이전 버전에서 설정 DB(main)에 만들어진 시계열 테이블을 시계열 DB로 이관 (최초 1회)"""
+    result = await conn.execute(text("SELECT name FROM main.sqlite_master WHERE type='table'"))
+    main_tables = {r[0] for r in result.fetchall()}
+
+    moves = []
+    for table in Base.metadata.sorted_tables:
+        if table.schema == TS_SCHEMA and table.name in main_tables:
+            moves.append((table.name, table.name, [c.name for c in table.columns]))
+    for name in sorted(main_tables):
+        parsed = parse_partition_name(name)
+        if parsed:
+            base, day = parsed
+            target = await ensure_partition(conn, base, datetime.combine(day, datetime.min.time()))
+            moves.append((name, target, base_columns(base)))
+
+    if moves:
+        logger.info(f"Moving {len(moves)} time-series tables from main to {TS_SCHEMA} (one-time upgrade)")
+    for source, target, columns in moves:
+        # 이전 버전 테이블에 없는 컬럼(나중에 추가된 컬럼)은 기본값으로 둠
+        present = set(await table_columns(conn, 'main', source))
+        cols = ", ".join(c for c in columns if c in present)
+        await conn.execute(text(
+            f"INSERT OR IGNORE INTO {TS_SCHEMA}.{target} ({cols}) SELECT {cols} FROM main.{source}"
+        ))
+        await conn.execute(text(f"DROP TABLE main.{source}"))
+        if 'sqlite_sequence' in main_tables:
+            await conn.execute(
+                text("DELETE FROM main.sqlite_sequence WHERE name=:name"), {"name": source}
+            )
+        logger.info(f"Moved main.{source} to {TS_SCHEMA}.{target}")
+
+
 async def seed_app_settings():
     """기본 앱 설정 삽입"""
     settings = [
@@ -27,10 +118,19 @@ async def seed_app_settings():
         ('collect_interval_log', '30', '로그 수집 주기(초)', 'collection', 'number', ''),
         ('collect_process_top_n', '30', '프로세스 수집 개수', 'collection', 'number', ''),
         ('retention_raw_hours', '24', 'Raw 보존(시간)', 'retention', 'number', ''),
+        ('retention_archive_days', '30', 'Raw 아카이브 보존(일)', 'retention', 'number',
+         '보존 기간이 지난 Raw 데이터를 압축 파일로 보관 (0=보관 안 함)'),
         ('retention_5min_days', '30', '5분 집계 보존(일)', 'retention', 'number', ''),
         ('retention_hourly_days', '365', '1시간 집계 보존(일)', 'retention', 'number', ''),
         ('retention_log_days', '7', '로그 보존(일)', 'retention', 'number', ''),
         ('retention_alert_days', '90', '알림 보존(일)', 'retention', 'number', ''),
+        ('storage_mode_raw', 'rows', 'Raw 저장 방식', 'storage', 'string',
+         'rows|blocks (blocks: 2시간 지난 데이터를 서버/메트릭별 압축 블록으로 저장)'),
+        ('storage_mode_5min', 'rows', '5분 집계 저장 방식', 'storage', 'string',
+         'rows|blocks (blocks: 전날까지의 데이터를 서버/메트릭별 압축 블록으로 저장)'),
+        ('db_auto_vacuum_convert', 'false', '증분 VACUUM 전환 (다음 시작 시 1회)', 'storage', 'boolean',
+         '기존 DB 를 auto_vacuum=INCREMENTAL 로 바꾸는 전체 VACUUM 실행. 시작이 수 분 지연되고 '
+         'DB 크기만큼 여유 디스크 필요, 완료 후 자동으로 꺼짐'),
         ('default_cpu_warn', '70', 'CPU 경고(%)', 'threshold', 'number', ''),
         ('default_cpu_crit', '90', 'CPU 위험(%)', 'threshold', 'number', ''),
         ('default_mem_warn', '80', '메모리 경고(%)', 'threshold', 'number', ''),
@@ -60,6 +160,12 @@ async def seed_app_settings():
                 {"key": s[0], "value": s[1], "label": s[2],
                  "category": s[3], "value_type": s[4], "description": s[5]}
             )
+        # 이전 버전에서 보존정책(retention)으로 넣은 저장소 설정을 storage 로 이동
+        await conn.execute(
+            text(f"""UPDATE app_settings SET category='storage'
+                 WHERE key IN ({', '.join(repr(s[0]) for s in settings if s[3] == 'storage')})
+                 AND category='retention'""")
+        )
 
 
 async def seed_default_alert_rules():
@@ -69,6 +175,7 @@ async def seed_default_alert_rules():
         ('메모리 부족', None, None, 'mem_usage_pct', '>=', 80, 95, 60, 300),
         ('디스크 부족', None, None, 'disk_usage_pct', '>=', 80, 95, 0, 300),
         ('수집 실패', None, None, 'collect_timeout', '>=', 15, 60, 0, 300),
+        ('에러 로그 급증', None, None, 'error_log_rate', '>=', 10, 50, 0, 300),
     ]
 
     async with engine.begin() as conn:
@@ -0,0 +1,122 @@
+"""서버별 최신 상태 테이블 (server_latest)
+
+서버 목록/대시보드가 metrics_raw 전체에 윈도 함수를 돌리거나 행마다 alert_history 를
+세지 않도록, 수집기가 샘플마다 최신 메트릭을, 알림 발생/해제 시 미해결 알림 수를 갱신한다.
+모든 함수는 쓰기 트랜잭션 안의 conn 을 받아 같은 트랜잭션에서 함께 반영된다.
+"""
+import json
+import logging
+from typing import Optional
+from sqlalchemy import text
+from backend.db.blocks import fetch_latest_block_rows
+from backend.db.partitions import partitions_for_range, union_source
+
+logger = logging.getLogger(__name__)
+
+
+def disk_max_pct(disk_json: Optional[str]) -> Optional[float]:
+    """디스크 JSON에서 최대 사용률 추출"""
+    if not disk_json:
+        return None
+    try:
+        disks = json.loads(disk_json)
+        if isinstance(disks, dict):
+            disks = [disks]
+        if disks:
+            return max(d.get('usage_pct', 0) for d in disks)
+    except (json.JSONDecodeError, TypeError, AttributeError):
+        pass
+    return None
+
+
+async def upsert_latest_metrics(conn, server_id: int, collected_at: str, metrics: dict):
+    """수집 샘플로 최신 메트릭 갱신"""
+    await conn.execute(
+        text("""INSERT INTO server_latest
+            (server_id, collected_at, cpu_usage_pct, mem_usage_pct, disk_max_pct,
+             net_connections, process_count)
+            VALUES (:sid, :ca, :cpu, :mem, :disk, :nc, :pc)
+            ON CONFLICT(server_id) DO UPDATE SET
+                collected_at=excluded.collected_at,
+                cpu_usage_pct=excluded.cpu_usage_pct,
+                mem_usage_pct=excluded.mem_usage_pct,
+                disk_max_pct=excluded.disk_max_pct,
+                net_connections=excluded.net_connections,
+                process_count=excluded.process_count"""),
+        {
+            "sid": server_id, "ca": collected_at,
+            "cpu": metrics.get('cpu_usage_pct'),
+            "mem": metrics.get('mem_usage_pct'),
+            "disk": disk_max_pct(metrics.get('disk_json')),
+            "nc": metrics.get('net_connections'),
+            "pc": metrics.get('process_count'),
+        }
+    )
+
+
+async def refresh_active_alerts(conn, server_id: Optional[int] = None):
+    """미해결 알림 수 재계산 (server_id 없으면 전체)
+
+    증감 대신 alert_history 에서 다시 세므로 수동 해결/보존 정리와도 어긋나지 않는다.
+    """
+    if server_id is not None:
+        await conn.execute(
+            text("""INSERT INTO server_latest (server_id, active_alerts)
+                SELECT :sid, COUNT(*) FROM alert_history
+                WHERE server_id=:sid AND resolved_at IS NULL
+                ON CONFLICT(server_id) DO UPDATE SET active_alerts=excluded.active_alerts"""),
+            {"sid": server_id}
+        )
+        return
+
+    await conn.execute(
+        text("""UPDATE server_latest SET active_alerts=(
+                SELECT COUNT(*) FROM alert_history a
+                WHERE a.server_id=server_latest.server_id AND a.resolved_at IS NULL)""")
+    )
+    await conn.execute(
+        text("""INSERT OR IGNORE INTO server_latest (server_id, active_alerts)
+            SELECT server_id, COUNT(*) FROM alert_history
+            WHERE resolved_at IS NULL GROUP BY server_id""")
+    )
+
+
+_BACKFILL_COLUMNS = ['collected_at', 'cpu_usage_pct', 'mem_usage_pct', 'disk_json',
+                     'net_connections', 'process_count']
+
+
+async def backfill_server_latest(conn):
+    """server_latest 가 비어 있으면 기존 데이터로 채움 (도입 후 최초 1회)"""
+    result = await conn.execute(text("SELECT COUNT(*) FROM server_latest"))
+    if result.scalar():
+        return
+
+    source = union_source(
+        'metrics_raw', partitions_for_range('metrics_raw'),
+        "server_id, collected_at, cpu_usage_pct, mem_usage_pct, disk_json, "
+        "net_connections, process_count"
+    )
+    result = await conn.execute(
+        text(f"""SELECT server_id, collected_at, cpu_usage_pct, mem_usage_pct, disk_json,
+                net_connections, process_count
+            FROM (
+                SELECT *, ROW_NUMBER() OVER (PARTITION BY server_id ORDER BY collected_at DESC) as rn
+                FROM {source}
+            ) WHERE rn=1""")
+    )
+    rows = result.fetchall()
+    for r in rows:
+        await upsert_latest_metrics(conn, r[0], r[1], {
+            "cpu_usage_pct": r[2], "mem_usage_pct": r[3], "disk_json": r[4],
+            "net_connections": r[5], "process_count": r[6],
+        })
+
+    # 행이 모두 블록으로 옮겨진 서버(블록 저장 모드)는 마지막 블록의 마지막 샘플
+    block_rows = await fetch_latest_block_rows('raw', _BACKFILL_COLUMNS, conn=conn)
+    backfilled = {r[0] for r in rows}
+    for sid, r in block_rows.items():
+        if sid not in backfilled:
+            await upsert_latest_metrics(conn, sid, r['collected_at'], r)
+            backfilled.add(sid)
+    await refresh_active_alerts(conn)
+    logger.info(f"server_latest backfilled for {len(backfilled)} servers")
@@ -0,0 +1,77 @@
+"""로그 패턴별 집계 (템플릿 × 발생 건수)
+
+같은 클러스터의 템플릿 버전은 최신 템플릿 하나로 묶고,
+템플릿화되지 않은 로그는 같은 원문끼리 묶는다.
+"""
+from typing import Optional
+from sqlalchemy import text
+from backend.db.database import async_session
+from backend.db.partitions import partitions_for_range, union_source
+
+
+async def fetch_log_patterns(server_ids: list[int], level: Optional[str] = None,
+                             date_from=None, date_to=None, limit: int = 100) -> list[dict]:
+    """(패턴, 소스, 수준)별 건수/최초·최근 발생 시각, 건수 많은 순"""
+    conditions = [f"server_id IN ({','.join(str(int(s)) for s in server_ids) or 'NULL'})"]
+    params = {}
+    if level:
+        conditions.append("log_level=:level")
+        params["level"] = level
+    if date_from:
+        conditions.append("occurred_at >= :df")
+        params["df"] = date_from
+    if date_to:
+        conditions.append("occurred_at <= :dt")
+        params["dt"] = date_to
+
+    # 원문 복원 없이 파티션을 직접 집계 (템플릿화된 행은 message 가 NULL)
+    source = union_source(
+        'server_logs',
+        partitions_for_range('server_logs', date_from),
+        "template_id, message, log_source, log_level, occurred_at",
+        " AND ".join(conditions)
+    )
+    async with async_session() as session:
+        result = await session.execute(
+            text(f"""SELECT template_id, CASE WHEN template_id IS NULL THEN message END,
+                    log_source, log_level, COUNT(*), MIN(occurred_at), MAX(occurred_at)
+                 FROM {source}
+                 GROUP BY 1, 2, 3, 4"""),
+            params
+        )
+        groups = result.fetchall()
+
+        template_ids = sorted({g[0] for g in groups if g[0] is not None})
+        clusters = {}
+        if template_ids:
+            # 버전 → (클러스터, 클러스터 최신 템플릿)
+            result = await session.execute(
+                text(f"""SELECT t.template_id, t.cluster_id, c.template
+                     FROM log_templates t
+                     JOIN log_templates c ON c.template_id=(
+                         SELECT MAX(template_id) FROM log_templates WHERE cluster_id=t.cluster_id)
+                     WHERE t.template_id IN ({','.join(str(t) for t in template_ids)})""")
+            )
+            clusters = {r[0]: (r[1], r[2]) for r in result.fetchall()}
+
+    patterns: dict[tuple, dict] = {}
+    for template_id, message, log_source, log_level, count, first_seen, last_seen in groups:
+        cluster_id, pattern = clusters.get(template_id, (None, None)) if template_id else (None, message)
+        key = (cluster_id, pattern if cluster_id is None else None, log_source, log_level)
+        entry = patterns.get(key)
+        if entry is None:
+            patterns[key] = {
+                "pattern_id": cluster_id,
+                "pattern": pattern or '',
+                "log_source": log_source or '',
+                "log_level": log_level or '',
+                "count": count,
+                "first_seen": first_seen,
+                "last_seen": last_seen,
+            }
+        else:
+            entry["count"] += count
+            entry["first_seen"] = min(entry["first_seen"], first_seen)
+            entry["last_seen"] = max(entry["last_seen"], last_seen)
+
+    return sorted(patterns.values(), key=lambda p: (p["count"], p["last_seen"]), reverse=True)[:limit]
@@ -0,0 +1,116 @@
+"""로그 건수 5분 집계 조회 (log_rate_5min)
+
+로그의 occurred_at 은 수집 경로마다 형식이 달라(journald epoch μs, Windows TimeGenerated)
+버킷은 수집 시각(collected_at) 기준이다. 로그는 30초마다 수집되므로 발생 시각과의 차이는 작다.
+수준 표기도 경로마다 달라 집계 시 error / warning / info / debug / other 로 정규화한다.
+"""
+from datetime import datetime, timedelta
+from typing import Optional
+from sqlalchemy import text
+from backend.core.tsblock import from_epoch, to_epoch
+from backend.db.database import async_session
+
+BUCKET_SEC = 300
+
+# 정규화 수준 → 원본 표기 (소문자, Windows EntryType 숫자 포함: 1=Error 2=Warning 4=Information)
+LOG_LEVEL_ALIASES = {
+    'error': ('error', 'err', 'critical', 'crit', 'alert', 'emerg', 'fatal', '1'),
+    'warning': ('warning', 'warn', '2'),
+    'info': ('info', 'information', 'notice', '4'),
+    'debug': ('debug', 'trace'),
+}
+LOG_LEVELS = (*LOG_LEVEL_ALIASES, 'other')
+
+# 출처별 계열에서 상위 몇 개 소스만 따로 보여주고 나머지는 합침
+TOP_SOURCES = 10
+OTHER_SOURCES = '(기타)'
+
+
+def level_case(column: str) -> str:
+    """원본 수준 컬럼 → 정규화 수준 SQL 식"""
+    whens = " ".join(
+        f"WHEN LOWER(TRIM({column})) IN ({', '.join(repr(a) for a in aliases)}) THEN '{level}'"
+        for level, aliases in LOG_LEVEL_ALIASES.items()
+    )
+    return f"CASE {whens} ELSE 'other' END"
+
+
+def bucket_case(column: str) -> str:
+    """시각 컬럼 → 5분 버킷 시작 시각 SQL 식 ('YYYY-MM-DD HH:MM:00', 분 0 채움)"""
+    return (f"strftime('%Y-%m-%d %H:', {column}) || "
+            f"printf('%02d:00', CAST(strftime('%M', {column}) AS INTEGER) / 5 * 5)")
+
+
+def bucket_start(when: datetime) -> datetime:
+    """시각이 속한 5분 버킷 시작"""
+    return when.replace(minute=when.minute // 5 * 5, second=0, microsecond=0)
+
+
+async def fetch_log_rate(server_id: int, lo: int, hi: int,
+                         group_by: str = 'level', level: Optional[str] = None) -> dict:
+    """5분 격자에 맞춘 로그 건수 계열 (빈 버킷은 0)
+
+    group_by='level' 이면 정규화 수준별, 'source' 면 건수 상위 TOP_SOURCES 개 소스별(나머지는 합침).
+    반환: {"time": [버킷 시각], "series": {이름: [건수]}, "total": [건수]}
+    """
+    lo = lo // BUCKET_SEC * BUCKET_SEC
+    n = max((hi - lo) // BUCKET_SEC + 1, 0)
+    key = "log_level" if group_by == 'level' else "log_source"
+
+    conditions = ["server_id=:sid", "bucket_time >= :df", "bucket_time <= :dt"]
+    params = {"sid": server_id, "df": from_epoch(lo), "dt": from_epoch(hi)}
+    if level:
+        conditions.append("log_level=:level")
+        params["level"] = level
+
+    async with async_session() as session:
+        result = await session.execute(
+            text(f"""SELECT bucket_time, {key}, SUM(log_count) FROM log_rate_5min
+                 WHERE {' AND '.join(conditions)}
+                 GROUP BY bucket_time, {key}"""),
+            params
+        )
+        rows = result.fetchall()
+
+    if group_by == 'level':
+        names = [lv for lv in LOG_LEVELS if any(r[1] == lv for r in rows)]
+    else:
+        totals: dict[str, int] = {}
+        for _, name, count in rows:
+            totals[name] = totals.get(name, 0) + count
+        names = sorted(totals, key=lambda s: -totals[s])[:TOP_SOURCES]
+        if len(totals) > TOP_SOURCES:
+            names.append(OTHER_SOURCES)
+
+    index = {name: i for i, name in enumerate(names)}
+    series = [[0] * n for _ in names]
+    total = [0] * n
+    for bucket, name, count in rows:
+        slot = (to_epoch(bucket) - lo) // BUCKET_SEC
+        if not 0 <= slot < n:
+            continue
+        total[slot] += count
+        i = index.get(name, index.get(OTHER_SOURCES))
+        if i is not None:
+            series[i][slot] += count
+
+    return {
+        "time": [from_epoch(lo + i * BUCKET_SEC) for i in range(n)],
+        "series": dict(zip(names, series)),
+        "total": total,
+    }
+
+
+async def error_log_rates(now: Optional[datetime] = None) -> dict[int, float]:
+    """서버별 최근 error 로그 분당 건수 (직전 5분 버킷 시작부터 지금까지 평균)"""
+    now = now or datetime.now()
+    start = bucket_start(now) - timedelta(seconds=BUCKET_SEC)
+    minutes = max((now - start).total_seconds() / 60, 1.0)
+    async with async_session() as session:
+        result = await session.execute(
+            text("""SELECT server_id, SUM(log_count) FROM log_rate_5min
+                 WHERE bucket_time >= :start AND log_level='error'
+                 GROUP BY server_id"""),
+            {"start": start.strftime('%Y-%m-%d %H:%M:%S')}
+        )
+        return {r[0]: round(r[1] / minutes, 2) for r in result.fetchall()}
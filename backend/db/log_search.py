@@ -0,0 +1,78 @@
+"""서버 로그 전문 검색 (server_logs 파티션별 FTS5)
+
+검색어는 공백으로 나눈 단어를 모두 포함하는 로그를 찾는다 (단어 끝 '*' 는 접두어 검색).
+조회 범위와 겹치는 파티션마다 FTS 테이블을 MATCH 해 bm25 순으로 상위 limit 건을 뽑고,
+전체를 다시 bm25 순으로 합친다. bm25 는 파티션별 통계로 계산되므로 파티션 간 순위는 근사다.
+"""
+import re
+from typing import Optional
+from sqlalchemy import text
+from backend.db.database import async_session
+from backend.db.partitions import companion_tables, partition_view, partitions_for_range
+
+# 스니펫 강조 표시 (클라이언트는 이 표시 사이를 텍스트로 강조만 하고 HTML 로 해석하지 않음)
+HIGHLIGHT_OPEN = '<mark>'
+HIGHLIGHT_CLOSE = '</mark>'
+SNIPPET_TOKENS = 48
+
+_TERM_RE = re.compile(r'\S+')
+
+
+def fts_query(query: str) -> Optional[str]:
+    """사용자 검색어 → FTS5 MATCH 식 (연산자/특수문자는 모두 따옴표로 감싸 문자 그대로 검색)"""
+    terms = []
+    for term in _TERM_RE.findall(query or ''):
+        prefix = term.endswith('*')
+        term = term.rstrip('*')
+        if not term:
+            continue
+        terms.append('"' + term.replace('"', '""') + '"' + ('*' if prefix else ''))
+    return ' '.join(terms) or None
+
+
+async def search_logs(query: str, server_ids: Optional[list[int]] = None,
+                      level: Optional[str] = None, date_from=None, date_to=None,
+                      limit: int = 100) -> list[dict]:
+    """관련도 순 로그 검색 결과 (각 행에 snippet, score 포함, score(bm25) 가 작을수록 관련도 높음)"""
+    match = fts_query(query)
+    if not match:
+        return []
+
+    conditions = ["{fts} MATCH :q"]
+    params = {"q": match, "lim": limit, "ho": HIGHLIGHT_OPEN, "hc": HIGHLIGHT_CLOSE}
+    if server_ids is not None:
+        conditions.append(f"l.server_id IN ({','.join(str(int(s)) for s in server_ids) or 'NULL'})")
+    if level:
+        conditions.append("l.log_level=:level")
+        params["level"] = level
+    if date_from:
+        conditions.append("l.occurred_at >= :df")
+        params["df"] = date_from
+    if date_to:
+        conditions.append("l.occurred_at <= :dt")
+        params["dt"] = date_to
+    where = " AND ".join(conditions)
+
+    # 로그는 발생 이후에 수집되므로 하한(from)으로만 파티션을 좁힌다
+    selects = []
+    for table in partitions_for_range('server_logs', date_from):
+        fts = companion_tables('server_logs', table)[0]
+        selects.append(f"""SELECT * FROM (
+            SELECT l.id, l.server_id, l.log_source, l.log_level, l.message, l.event_id,
+                   l.occurred_at,
+                   snippet({fts}, 0, :ho, :hc, '…', {SNIPPET_TOKENS}) AS snippet,
+                   bm25({fts}, 1.0, 0.5) AS score
+            FROM {fts} JOIN {partition_view('server_logs', table)} l ON l.id={fts}.rowid
+            WHERE {where.format(fts=fts)}
+            ORDER BY score LIMIT :lim)""")
+    if not selects:
+        return []
+
+    columns = ["id", "server_id", "log_source", "log_level", "message", "event_id",
+               "occurred_at", "snippet", "score"]
+    async with async_session() as session:
+        result = await session.execute(
+            text(f"SELECT * FROM ({' UNION ALL '.join(selects)}) ORDER BY score LIMIT :lim"),
+            params
+        )
+        return [dict(zip(columns, r)) for r in result.fetchall()]
@@ -0,0 +1,117 @@
+"""SQLite 유지보수 (WAL 체크포인트, 증분 VACUUM, 용량 모니터링)
+
+설정 DB(main)와 시계열 DB(ts)는 파일이 분리되어 있어 스키마별로 따로 수행한다.
+"""
+import logging
+import os
+from backend.config import DB_PATH, TS_DB_PATH, TS_SCHEMA
+from backend.db.database import read_engine
+from backend.db.writer import db_writer
+
+logger = logging.getLogger(__name__)
+
+# 스키마명 → DB 파일 경로
+DB_FILES = {
+    "main": DB_PATH,
+    TS_SCHEMA: TS_DB_PATH,
+}
+
+# WAL 파일이 이 크기를 넘으면 TRUNCATE 체크포인트로 파일 자체를 줄임
+WAL_TRUNCATE_THRESHOLD_BYTES = 64 * 1024 * 1024
+# 증분 VACUUM 1회당 반환할 최대 페이지 수 (기본 4KB 페이지 기준 약 80MB)
+INCREMENTAL_VACUUM_PAGES = 20000
+
+
+def _file_size(path) -> int:
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+def wal_path(schema: str = "main") -> str:
+    return f"{DB_FILES[schema]}-wal"
+
+
+async def checkpoint_wal(schema: str = "main") -> dict:
+    """WAL 체크포인트 (평소 PASSIVE, WAL이 임계치를 넘으면 TRUNCATE)"""
+    wal_before = _file_size(wal_path(schema))
+    mode = "TRUNCATE" if wal_before > WAL_TRUNCATE_THRESHOLD_BYTES else "PASSIVE"
+
+    async def op(raw):
+        cursor = await raw.execute(f"PRAGMA {schema}.wal_checkpoint({mode})")
+        return await cursor.fetchone()
+
+    # 체크포인트는 트랜잭션 밖에서 실행해야 하므로 쓰기 태스크의 드라이버 커넥션 사용
+    busy, log_frames, checkpointed = await db_writer.run_raw(op)
+
+    wal_after = _file_size(wal_path(schema))
+    if busy:
+        logger.info(f"WAL checkpoint {schema} ({mode}) partially done: "
+                    f"{checkpointed}/{log_frames} frames")
+    else:
+        logger.debug(f"WAL checkpoint {schema} ({mode}): {checkpointed}/{log_frames} frames, "
+                     f"{wal_before} -> {wal_after} bytes")
+    return {
+        "database": schema,
+        "mode": mode.lower(),
+        "busy": bool(busy),
+        "log_frames": log_frames,
+        "checkpointed_frames": checkpointed,
+        "wal_bytes_before": wal_before,
+        "wal_bytes_after": wal_after,
+    }
+
+
+async def incremental_vacuum(schema: str = "main",
+                             max_pages: int = INCREMENTAL_VACUUM_PAGES) -> int:
+    """freelist 페이지를 파일 시스템에 반환 (auto_vacuum=INCREMENTAL 필요)"""
+    async def freelist_count(raw) -> int:
+        cursor = await raw.execute(f"PRAGMA {schema}.freelist_count")
+        return (await cursor.fetchone())[0] or 0
+
+    async def op(raw):
+        # auto_vacuum=INCREMENTAL 로 전환하지 않은 DB 는 반환할 수 없음 (execute_pragmas 참고)
+        cursor = await raw.execute(f"PRAGMA {schema}.auto_vacuum")
+        if (await cursor.fetchone())[0] != 2:
+            return 0, 0
+        before = await freelist_count(raw)
+        if before == 0:
+            return 0, 0
+        # 페이지마다 한 step씩 진행되는데 sqlite3 execute()는 한 번만 step 하므로
+        # 끝까지 실행되는 executescript() 로 호출
+        await raw.executescript(f"PRAGMA {schema}.incremental_vacuum({int(max_pages)});")
+        return before, await freelist_count(raw)
+
+    before, after = await db_writer.run_raw(op)
+    if before == 0:
+        return 0
+    released = before - after
+    logger.info(f"Incremental vacuum {schema} released {released} pages ({after} free pages left)")
+    return released
+
+
+async def get_db_stats(schema: str = "main") -> dict:
+    """DB/WAL 파일 크기 및 freelist 현황"""
+    async with read_engine.connect() as conn:
+        async def pragma(name):
+            return (await conn.exec_driver_sql(f"PRAGMA {schema}.{name}")).scalar()
+
+        page_size = await pragma("page_size") or 0
+        page_count = await pragma("page_count") or 0
+        freelist_count = await pragma("freelist_count") or 0
+        auto_vacuum = await pragma("auto_vacuum")
+        journal_mode = await pragma("journal_mode")
+
+    return {
+        "database": schema,
+        "db_path": str(DB_FILES[schema]),
+        "db_size_bytes": _file_size(DB_FILES[schema]),
+        "wal_size_bytes": _file_size(wal_path(schema)),
+        "page_size": page_size,
+        "page_count": page_count,
+        "freelist_count": freelist_count,
+        "freelist_bytes": freelist_count * page_size,
+        "auto_vacuum": {0: "none", 1: "full", 2: "incremental"}.get(auto_vacuum, str(auto_vacuum)),
+        "journal_mode": journal_mode,
+    }
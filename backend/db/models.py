@@ -1,8 +1,9 @@
 """SQLAlchemy ORM 모델"""
 from sqlalchemy import (
-    Column, Integer, Text, Float, ForeignKey, Index, text
+    Column, Integer, Text, Float, ForeignKey, Index, LargeBinary, text
 )
 from sqlalchemy.orm import DeclarativeBase, relationship
+from backend.config import TS_SCHEMA
 
 
 class Base(DeclarativeBase):
@@ -57,7 +58,7 @@ class MetricsRaw(Base):
     __tablename__ = 'metrics_raw'
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    server_id = Column(Integer, ForeignKey('servers.server_id'), nullable=False)
+    server_id = Column(Integer, nullable=False)
     collected_at = Column(Text, nullable=False, server_default=text("(datetime('now','localtime'))"))
     cpu_usage_pct = Column(Float)
     cpu_load_1m = Column(Float)
@@ -78,6 +79,7 @@ class MetricsRaw(Base):
 
     __table_args__ = (
         Index('idx_raw_lookup', 'server_id', collected_at.desc()),
+        {'schema': TS_SCHEMA},
     )
 
 
@@ -100,6 +102,7 @@ class Metrics5Min(Base):
 
     __table_args__ = (
         Index('idx_5min_uk', 'server_id', 'bucket_time', unique=True),
+        {'schema': TS_SCHEMA},
     )
 
 
@@ -124,9 +127,77 @@ class MetricsHourly(Base):
 
     __table_args__ = (
         Index('idx_hourly_uk', 'server_id', 'bucket_time', unique=True),
+        {'schema': TS_SCHEMA},
+    )
+
+
+class LogRate5Min(Base):
+    """로그 건수 5분 집계 (수집 시각 기준, 수준은 error/warning/info/debug/other 로 정규화)"""
+    __tablename__ = 'log_rate_5min'
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    server_id = Column(Integer, nullable=False)
+    bucket_time = Column(Text, nullable=False)
+    log_level = Column(Text, nullable=False)
+    log_source = Column(Text, nullable=False)
+    log_count = Column(Integer, nullable=False)
+
+    __table_args__ = (
+        Index('idx_log_rate_uk', 'server_id', 'bucket_time', 'log_level', 'log_source', unique=True),
+        Index('idx_log_rate_time', 'bucket_time', 'log_level'),
+        {'schema': TS_SCHEMA},
     )
 
 
+class MetricsRawBlock(Base):
+    __tablename__ = 'metrics_raw_blocks'
+
+    block_id = Column(Integer, primary_key=True, autoincrement=True)
+    server_id = Column(Integer, nullable=False)
+    metric = Column(Text, nullable=False)
+    block_start = Column(Text, nullable=False)
+    block_end = Column(Text, nullable=False)
+    sample_count = Column(Integer, nullable=False)
+    data = Column(LargeBinary, nullable=False)
+
+    __table_args__ = (
+        Index('idx_raw_blocks_uk', 'server_id', 'block_start', 'metric', unique=True),
+        {'schema': TS_SCHEMA},
+    )
+
+
+class Metrics5MinBlock(Base):
+    __tablename__ = 'metrics_5min_blocks'
+
+    block_id = Column(Integer, primary_key=True, autoincrement=True)
+    server_id = Column(Integer, nullable=False)
+    metric = Column(Text, nullable=False)
+    block_start = Column(Text, nullable=False)
+    block_end = Column(Text, nullable=False)
+    sample_count = Column(Integer, nullable=False)
+    data = Column(LargeBinary, nullable=False)
+
+    __table_args__ = (
+        Index('idx_5min_blocks_uk', 'server_id', 'block_start', 'metric', unique=True),
+        {'schema': TS_SCHEMA},
+    )
+
+
+class ServerLatest(Base):
+    __tablename__ = 'server_latest'
+
+    server_id = Column(Integer, primary_key=True, autoincrement=False)
+    collected_at = Column(Text)
+    cpu_usage_pct = Column(Float)
+    mem_usage_pct = Column(Float)
+    disk_max_pct = Column(Float)
+    net_connections = Column(Integer)
+    process_count = Column(Integer)
+    active_alerts = Column(Integer, nullable=False, server_default=text("0"))
+
+    __table_args__ = {'schema': TS_SCHEMA}
+
+
 class ServiceStatus(Base):
     __tablename__ = 'service_status'
 
@@ -142,6 +213,7 @@ class ServiceStatus(Base):
 
     __table_args__ = (
         Index('idx_svc', 'server_id'),
+        {'schema': TS_SCHEMA},
     )
 
 
@@ -163,6 +235,7 @@ class ProcessSnapshot(Base):
 
     __table_args__ = (
         Index('idx_proc', 'server_id'),
+        {'schema': TS_SCHEMA},
     )
 
 
@@ -177,10 +250,32 @@ class ServerLog(Base):
     event_id = Column(Integer)
     occurred_at = Column(Text, nullable=False)
     collected_at = Column(Text, server_default=text("(datetime('now','localtime'))"))
+    # 템플릿화된 로그: message 는 NULL, 원문은 log_templates.template + params(JSON 배열)
+    template_id = Column(Integer)
+    params = Column(Text)
 
     __table_args__ = (
         Index('idx_log_lookup', 'server_id', occurred_at.desc()),
         Index('idx_log_level', 'log_level', occurred_at.desc()),
+        {'schema': TS_SCHEMA},
+    )
+
+
+class LogTemplate(Base):
+    """로그 메시지 템플릿 (일반화될 때마다 새 버전, 같은 cluster_id 로 묶음)"""
+    __tablename__ = 'log_templates'
+
+    template_id = Column(Integer, primary_key=True, autoincrement=False)
+    cluster_id = Column(Integer, nullable=False)
+    log_source = Column(Text)
+    template = Column(Text, nullable=False)
+    first_seen = Column(Text)
+    last_seen = Column(Text)
+
+    __table_args__ = (
+        Index('idx_log_template_cluster', 'cluster_id'),
+        Index('idx_log_template_seen', 'last_seen'),
+        {'schema': TS_SCHEMA},
     )
 
 
@@ -200,6 +295,10 @@ class AlertRule(Base):
     cooldown_sec = Column(Integer, default=300)
     is_enabled = Column(Integer, default=1)
     sort_order = Column(Integer, default=0)
+    # value(현재값) / avg / min / max / delta / rate(시간당) / percentile — window_sec 초 윈도우 집계
+    condition_type = Column(Text, nullable=False, server_default=text("'value'"))
+    window_sec = Column(Integer)
+    percentile = Column(Float)
     created_at = Column(Text, server_default=text("(datetime('now','localtime'))"))
     updated_at = Column(Text, server_default=text("(datetime('now','localtime'))"))
 
@@ -215,19 +314,64 @@ class AlertHistory(Base):
     metric_value = Column(Float)
     threshold_value = Column(Float)
     message = Column(Text, nullable=False)
-    acknowledged = Column(Integer, default=0)
+    acknowledged = Column(Integer, default=0, server_default=text("0"))
     acknowledged_by = Column(Text)
     acknowledged_at = Column(Text)
     resolved_at = Column(Text)
-    webhook_sent = Column(Integer, default=0)
+    webhook_sent = Column(Integer, default=0, server_default=text("0"))
+    incident_id = Column(Integer)  # 함께 묶여 알린 인시던트 (alert_incidents), 단독 알림은 NULL
     created_at = Column(Text, server_default=text("(datetime('now','localtime'))"))
 
     __table_args__ = (
         Index('idx_alert_active', 'severity'),
         Index('idx_alert_time', 'server_id', created_at.desc()),
+        # 키셋 페이징 (created_at, alert_id) 순서 — alert_id 는 rowid 라 인덱스 끝에 포함되고,
+        # 오름차순 인덱스를 역방향으로 읽으면 두 컬럼 모두 내림차순이 됨
+        Index('idx_alert_created', 'created_at'),
+        # 미해결/미확인 알림만 담는 부분 인덱스 (이력이 쌓여도 크기는 활성 알림 수에 비례)
+        Index('idx_alert_open', 'server_id', 'metric_name',
+              sqlite_where=text("resolved_at IS NULL")),
+        Index('idx_alert_unack', created_at.desc(),
+              sqlite_where=text("resolved_at IS NULL AND acknowledged=0")),
+        Index('idx_alert_incident', 'incident_id',
+              sqlite_where=text("incident_id IS NOT NULL")),
     )
 
 
+class AlertIncident(Base):
+    """묶음 알림 (같은 창 안에 발생한 같은 그룹/메트릭/원인 알림을 한 건으로 알림)"""
+    __tablename__ = 'alert_incidents'
+
+    incident_id = Column(Integer, primary_key=True, autoincrement=True)
+    group_key = Column(Text, nullable=False)
+    group_name = Column(Text)
+    metric_name = Column(Text)
+    rule_id = Column(Integer)
+    severity = Column(Text, nullable=False)
+    title = Column(Text, nullable=False)
+    alert_count = Column(Integer, nullable=False)
+    server_count = Column(Integer, nullable=False)
+    created_at = Column(Text, server_default=text("(datetime('now','localtime'))"))
+    resolved_at = Column(Text)
+
+    __table_args__ = (
+        Index('idx_incident_created', 'created_at'),
+    )
+
+
+class AlertState(Base):
+    """알림 엔진 판단 상태 스냅샷 (재시작 시 지속 시간/쿨다운/발생 여부 복원)"""
+    __tablename__ = 'alert_state'
+
+    server_id = Column(Integer, primary_key=True, autoincrement=False)
+    rule_id = Column(Integer, primary_key=True, autoincrement=False)
+    metric_name = Column(Text, primary_key=True)
+    exceed_since = Column(Text)
+    alerted_warning = Column(Integer, nullable=False, server_default=text("0"))
+    alerted_critical = Column(Integer, nullable=False, server_default=text("0"))
+    last_alert_at = Column(Text)
+
+
 class HealthCheck(Base):
     __tablename__ = 'health_checks'
 
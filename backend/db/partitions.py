@@ -0,0 +1,328 @@
+"""일 단위 파티션 테이블 관리 (metrics_raw, server_logs)
+
+수집 데이터는 `{기준테이블}_pYYYYMMDD` 형태의 일별 테이블에 저장한다.
+ORM의 기준 테이블(metrics_raw, server_logs)은 비어 있는 스키마 템플릿으로만 남고,
+조회는 요청 범위와 겹치는 파티션만 UNION ALL 로 묶어 수행한다.
+보존 기간이 지난 파티션은 DELETE 대신 DROP TABLE 로 제거한다.
+server_logs 는 템플릿화된 행의 message 가 NULL 이므로(backend.core.log_templates),
+원문을 복원한 조회용 뷰({파티션}_view)를 두고 로그 조회는 뷰를 읽는다.
+전문 검색용 FTS5 테이블({파티션}_fts)은 뷰를 외부 콘텐츠로 하며,
+트리거로 INSERT/DELETE/UPDATE 를 동기화한다 (파티션 DROP 시 뷰/FTS 도 함께 DROP).
+파티션은 시계열 DB(TS_SCHEMA)에 생성되며, 조회 SQL에서는 스키마 없이 이름으로 참조한다.
+"""
+import logging
+import re
+from datetime import date, datetime, timedelta
+from typing import Optional
+from sqlalchemy import Column, MetaData, Table, text
+from sqlalchemy.dialects import sqlite
+from sqlalchemy.schema import CreateTable
+from backend.config import TS_SCHEMA
+from backend.db.models import Base
+from backend.db.writer import after_commit
+
+logger = logging.getLogger(__name__)
+
+# 기준 테이블 → 파티션 키 컬럼 (수집 시각 기준)
+PARTITIONED_TABLES = {
+    'metrics_raw': 'collected_at',
+    'server_logs': 'collected_at',
+}
+
+# 트리거에서 원문 메시지 (템플릿화된 행은 log_templates 에서 복원)
+def _rendered_message(row: str) -> str:
+    return (f"COALESCE({row}.message, log_render((SELECT template FROM log_templates "
+            f"WHERE template_id={row}.template_id), {row}.params))")
+
+
+# 파티션별 인덱스/부속 테이블 DDL (객체명은 DB 전역이므로 파티션명을 접두어로 사용)
+_PARTITION_DDL = {
+    'metrics_raw': [
+        "CREATE INDEX IF NOT EXISTS {schema}.{name}_lookup ON {name} (server_id, collected_at DESC)",
+    ],
+    'server_logs': [
+        "CREATE INDEX IF NOT EXISTS {schema}.{name}_lookup ON {name} (server_id, occurred_at DESC)",
+        "CREATE INDEX IF NOT EXISTS {schema}.{name}_level ON {name} (log_level, occurred_at DESC)",
+        # 로그 건수 집계/보존 정리는 수집 시각 범위로 읽음
+        "CREATE INDEX IF NOT EXISTS {schema}.{name}_collected ON {name} (collected_at)",
+        """CREATE VIEW IF NOT EXISTS {schema}.{name}_view AS
+            SELECT l.id, l.server_id, l.log_source, l.log_level,
+                   COALESCE(l.message, log_render(t.template, l.params)) AS message,
+                   l.event_id, l.occurred_at, l.collected_at, l.template_id, l.params
+            FROM {name} l LEFT JOIN log_templates t ON t.template_id=l.template_id""",
+        # 외부 콘텐츠 FTS5: 본문은 파티션(뷰)에만 두고 FTS 에는 역색인만 둠
+        """CREATE VIRTUAL TABLE IF NOT EXISTS {schema}.{name}_fts USING fts5(
+            message, log_source, content='{name}_view', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2')""",
+        """CREATE TRIGGER IF NOT EXISTS {schema}.{name}_fts_ai AFTER INSERT ON {name} BEGIN
+            INSERT INTO {name}_fts(rowid, message, log_source)
+            VALUES (new.id, """ + _rendered_message('new') + """, new.log_source);
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS {schema}.{name}_fts_ad AFTER DELETE ON {name} BEGIN
+            INSERT INTO {name}_fts({name}_fts, rowid, message, log_source)
+            VALUES ('delete', old.id, """ + _rendered_message('old') + """, old.log_source);
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS {schema}.{name}_fts_au AFTER UPDATE ON {name} BEGIN
+            INSERT INTO {name}_fts({name}_fts, rowid, message, log_source)
+            VALUES ('delete', old.id, """ + _rendered_message('old') + """, old.log_source);
+            INSERT INTO {name}_fts(rowid, message, log_source)
+            VALUES (new.id, """ + _rendered_message('new') + """, new.log_source);
+        END""",
+    ],
+}
+
+# 파티션과 함께 만들고 지우는 부속 테이블 (없으면 기존 파티션에도 생성 후 색인 재구성)
+_PARTITION_COMPANIONS = {
+    'server_logs': ['{name}_fts'],
+}
+
+# 파티션 대신 조회하는 뷰 (저장 형식과 무관하게 기준 테이블 컬럼을 그대로 제공)
+_PARTITION_VIEWS = {
+    'server_logs': '{name}_view',
+}
+
+# 파티션 간 id가 겹치지 않도록 AUTOINCREMENT 시작값을 일자 기반으로 지정 (일자당 최대 1억 행)
+_ID_SPAN_PER_DAY = 100_000_000
+
+_NAME_RE = re.compile(r'^(?P<base>\w+)_p(?P<day>\d{8})$')
+
+# 기준 테이블 → 존재하는 파티션 일자(date) 집합 (생성한 트랜잭션이 커밋된 뒤에 추가)
+_partitions: dict[str, set[date]] = {base: set() for base in PARTITIONED_TABLES}
+
+
+def partition_name(base: str, day: date) -> str:
+    """파티션 테이블명 (예: metrics_raw_p20240131)"""
+    return f"{base}_p{day.strftime('%Y%m%d')}"
+
+
+def parse_partition_name(name: str) -> Optional[tuple[str, date]]:
+    """파티션 테이블명 → (기준 테이블, 일자), 파티션이 아니면 None"""
+    m = _NAME_RE.match(name)
+    if not m or m.group('base') not in PARTITIONED_TABLES:
+        return None
+    return m.group('base'), datetime.strptime(m.group('day'), '%Y%m%d').date()
+
+
+def base_columns(base: str) -> list[str]:
+    """기준 테이블 컬럼명 목록"""
+    return [c.name for c in Base.metadata.tables[f"{TS_SCHEMA}.{base}"].columns]
+
+
+def _parse_day(value) -> Optional[date]:
+    """'YYYY-MM-DD...' 문자열/datetime 에서 일자 추출 (실패 시 None)"""
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    try:
+        return datetime.strptime(str(value)[:10], '%Y-%m-%d').date()
+    except ValueError:
+        return None
+
+
+def _partition_ddl(base: str, name: str) -> str:
+    """기준 테이블 컬럼 정의를 복제한 파티션 CREATE TABLE 문"""
+    src = Base.metadata.tables[f"{TS_SCHEMA}.{base}"]
+    columns = [
+        Column(
+            c.name, c.type,
+            primary_key=c.primary_key,
+            nullable=c.nullable,
+            server_default=c.server_default.arg if c.server_default is not None else None,
+        )
+        for c in src.columns
+    ]
+    table = Table(name, MetaData(), *columns, schema=TS_SCHEMA, sqlite_autoincrement=True)
+    return str(CreateTable(table, if_not_exists=True).compile(dialect=sqlite.dialect()))
+
+
+async def load_partitions(conn):
+    """sqlite_master 에서 기존 파티션 목록을 읽어 캐시 초기화"""
+    result = await conn.execute(
+        text(f"SELECT name FROM {TS_SCHEMA}.sqlite_master WHERE type='table'")
+    )
+    for base in _partitions:
+        _partitions[base].clear()
+    for (name,) in result.fetchall():
+        parsed = parse_partition_name(name)
+        if parsed:
+            _partitions[parsed[0]].add(parsed[1])
+
+
+async def ensure_partition(conn, base: str, when: datetime) -> str:
+    """해당 시각이 속한 파티션을 (없으면 생성하고) 반환
+
+    DDL 은 모두 IF NOT EXISTS 라서 커밋 전에 같은 일자로 다시 호출되어도 안전하다.
+    캐시는 커밋 후에만 갱신하므로, 같은 작업의 뒤쪽 문장이 실패해 SAVEPOINT 가 롤백되면
+    다음 호출에서 파티션을 다시 만든다.
+    """
+    day = when.date()
+    name = partition_name(base, day)
+    if day not in _partitions[base]:
+        await conn.execute(text(_partition_ddl(base, name)))
+        for ddl in _PARTITION_DDL[base]:
+            await conn.execute(text(ddl.format(schema=TS_SCHEMA, name=name)))
+        await conn.execute(
+            text(f"""INSERT INTO {TS_SCHEMA}.sqlite_sequence (name, seq)
+                 SELECT :name, :seq WHERE NOT EXISTS
+                 (SELECT 1 FROM {TS_SCHEMA}.sqlite_sequence WHERE name=:name)"""),
+            {"name": name, "seq": int(day.strftime('%Y%m%d')) * _ID_SPAN_PER_DAY}
+        )
+        after_commit(conn, lambda: _partitions[base].add(day))
+        logger.info(f"Partition created: {name}")
+    return name
+
+
+async def table_columns(conn, schema: str, name: str) -> list[str]:
+    """DB 에 실제로 있는 테이블 컬럼명 목록"""
+    result = await conn.execute(text(f"PRAGMA {schema}.table_info({name})"))
+    return [r[1] for r in result.fetchall()]
+
+
+async def _add_missing_columns(conn, base: str, name: str) -> list[str]:
+    """기준 테이블 모델에 추가된 컬럼을 기존 테이블에 ALTER TABLE 로 추가"""
+    existing = set(await table_columns(conn, TS_SCHEMA, name))
+    src = Base.metadata.tables[f"{TS_SCHEMA}.{base}"]
+    added = []
+    for c in src.columns:
+        if c.name not in existing:
+            col_type = c.type.compile(dialect=sqlite.dialect())
+            await conn.execute(text(f"ALTER TABLE {TS_SCHEMA}.{name} ADD COLUMN {c.name} {col_type}"))
+            added.append(c.name)
+    return added
+
+
+async def upgrade_partitions(conn):
+    """이전 버전에서 만든 파티션을 현재 구조로 맞춤
+
+    - 모델에 추가된 컬럼은 기준 테이블과 파티션에 ALTER TABLE 로 추가
+    - 조회 뷰나 부속 테이블(FTS)이 없으면 이전 트리거/FTS 를 지우고 다시 만든 뒤 기존 행으로 색인
+    - 그 밖에 새로 추가된 인덱스 등은 IF NOT EXISTS DDL 로 생성
+    """
+    result = await conn.execute(
+        text(f"SELECT name FROM {TS_SCHEMA}.sqlite_master WHERE type IN ('table', 'view')")
+    )
+    existing = {r[0] for r in result.fetchall()}
+    for base in PARTITIONED_TABLES:
+        for name in [base] + [partition_name(base, d) for d in sorted(_partitions[base])]:
+            added = await _add_missing_columns(conn, base, name)
+            if added:
+                logger.info(f"Partition upgraded: {name} (+{', '.join(added)})")
+
+    for base, companions in _PARTITION_COMPANIONS.items():
+        for day in sorted(_partitions[base]):
+            name = partition_name(base, day)
+            required = companion_tables(base, name)
+            if base in _PARTITION_VIEWS:
+                required.append(partition_view(base, name))
+            missing = [t for t in required if t not in existing]
+            if not missing:
+                for ddl in _PARTITION_DDL[base]:
+                    await conn.execute(text(ddl.format(schema=TS_SCHEMA, name=name)))
+                continue
+            result = await conn.execute(
+                text(f"SELECT name FROM {TS_SCHEMA}.sqlite_master WHERE type='trigger' AND tbl_name=:t"),
+                {"t": name}
+            )
+            for (trigger,) in result.fetchall():
+                await conn.execute(text(f"DROP TRIGGER {TS_SCHEMA}.{trigger}"))
+            for table in companion_tables(base, name):
+                await conn.execute(text(f"DROP TABLE IF EXISTS {TS_SCHEMA}.{table}"))
+            for ddl in _PARTITION_DDL[base]:
+                await conn.execute(text(ddl.format(schema=TS_SCHEMA, name=name)))
+            for table in companion_tables(base, name):
+                await conn.execute(text(f"INSERT INTO {TS_SCHEMA}.{table}({table}) VALUES ('rebuild')"))
+            logger.info(f"Partition upgraded: {name} (+{', '.join(missing)})")
+
+
+def companion_tables(base: str, name: str) -> list[str]:
+    """파티션의 부속 테이블명 목록"""
+    return [c.format(name=name) for c in _PARTITION_COMPANIONS.get(base, [])]
+
+
+def partition_view(base: str, name: str) -> str:
+    """조회에 사용할 이름 (조회 뷰가 있는 기준 테이블이면 뷰, 아니면 파티션 자체)"""
+    view = _PARTITION_VIEWS.get(base)
+    return view.format(name=name) if view else name
+
+
+def has_partition(base: str, day: date) -> bool:
+    """해당 일자 파티션 존재 여부"""
+    return day in _partitions[base]
+
+
+def partitions_for_range(base: str, date_from=None, date_to=None) -> list[str]:
+    """조회 범위와 겹치는 파티션 테이블명 (오래된 순)
+
+    클라이언트가 UTC ISO 문자열을 보내는 경우가 있어 경계는 하루씩 넓게 잡는다.
+    """
+    day_from = _parse_day(date_from)
+    day_to = _parse_day(date_to)
+    days = sorted(_partitions[base])
+    if day_from:
+        days = [d for d in days if d >= day_from - timedelta(days=1)]
+    if day_to:
+        days = [d for d in days if d <= day_to + timedelta(days=1)]
+    return [partition_name(base, d) for d in days]
+
+
+def union_source(base: str, tables: list[str], columns: str, where: str = "") -> str:
+    """파티션들을 UNION ALL 로 묶은 FROM 절용 서브쿼리
+
+    대상 파티션이 없으면 비어 있는 기준 테이블을 사용해 항상 유효한 SQL을 만든다.
+    """
+    where_clause = f"WHERE {where}" if where else ""
+    selects = [f"SELECT {columns} FROM {t} {where_clause}" for t in (tables or [base])]
+    return "(" + " UNION ALL ".join(selects) + ")"
+
+
+async def drop_partitions_before(conn, base: str, cutoff: datetime) -> list[str]:
+    """cutoff 일자 이전 파티션을 DROP (경계 일자 파티션은 호출 측에서 행 단위 정리)
+
+    캐시에서는 커밋 후에만 제거하므로, 롤백되면 다음 정리 때 다시 DROP 을 시도한다.
+    """
+    expired = sorted(d for d in _partitions[base] if d < cutoff.date())
+    dropped = []
+    for day in expired:
+        name = partition_name(base, day)
+        if base in _PARTITION_VIEWS:
+            await conn.execute(text(f"DROP VIEW IF EXISTS {TS_SCHEMA}.{partition_view(base, name)}"))
+        for table in companion_tables(base, name):
+            await conn.execute(text(f"DROP TABLE IF EXISTS {TS_SCHEMA}.{table}"))
+        await conn.execute(text(f"DROP TABLE IF EXISTS {TS_SCHEMA}.{name}"))
+        await conn.execute(
+            text(f"DELETE FROM {TS_SCHEMA}.sqlite_sequence WHERE name=:name"), {"name": name}
+        )
+        after_commit(conn, lambda d=day: _partitions[base].discard(d))
+        dropped.append(name)
+    return dropped
+
+
+async def migrate_legacy_rows(conn, base: str):
+    """파티셔닝 이전에 기준 테이블에 쌓인 행을 일자별 파티션으로 이동 (최초 1회)"""
+    time_col = PARTITIONED_TABLES[base]
+    result = await conn.execute(
+        text(f"SELECT DISTINCT substr({time_col}, 1, 10) FROM {base}")
+    )
+    days = [_parse_day(r[0]) for r in result.fetchall()]
+    if not days:
+        return
+
+    columns = ", ".join(c for c in base_columns(base) if c != 'id')
+    for day in days:
+        if day is None:
+            continue
+        name = await ensure_partition(conn, base, datetime.combine(day, datetime.min.time()))
+        await conn.execute(
+            text(f"""INSERT INTO {name} ({columns})
+                 SELECT {columns} FROM {base}
+                 WHERE substr({time_col}, 1, 10) = :day"""),
+            {"day": day.strftime('%Y-%m-%d')}
+        )
+        await conn.execute(
+            text(f"DELETE FROM {base} WHERE substr({time_col}, 1, 10) = :day"),
+            {"day": day.strftime('%Y-%m-%d')}
+        )
+    logger.info(f"Migrated legacy {base} rows into {len(days)} partitions")
@@ -177,6 +177,30 @@ class ServerLogEntry(BaseModel):
     message: str = ''
     event_id: Optional[int] = None
     occurred_at: str
+    # 전문 검색 시에만: 강조 표시된 발췌문, bm25 점수 (작을수록 관련도 높음)
+    snippet: Optional[str] = None
+    score: Optional[float] = None
+
+
+class LogSearchHit(ServerLogEntry):
+    server_name: str = ''
+
+
+class LogSearchResponse(BaseModel):
+    query: str
+    count: int
+    items: list[LogSearchHit]
+
+
+class LogPatternEntry(BaseModel):
+    # 템플릿 클러스터 ID (템플릿화되지 않은 원문 묶음이면 None)
+    pattern_id: Optional[int] = None
+    pattern: str
+    log_source: str = ''
+    log_level: str = ''
+    count: int
+    first_seen: str
+    last_seen: str
 
 
 # ── 알림 ──
@@ -194,6 +218,10 @@ class ActiveAlert(BaseModel):
     duration_seconds: int = 0
 
 
+# value: 현재값, 나머지: window_sec 초 윈도우 집계 (rate 는 시간당 변화량, percentile 은 percentile 지정)
+ALERT_CONDITION_TYPES = ('value', 'avg', 'min', 'max', 'delta', 'rate', 'percentile')
+
+
 class AlertRuleCreate(BaseModel):
     rule_name: str = Field(..., min_length=1)
     description: Optional[str] = None
@@ -207,6 +235,16 @@ class AlertRuleCreate(BaseModel):
     cooldown_sec: int = 300
     is_enabled: bool = True
     sort_order: int = 0
+    condition_type: str = 'value'
+    window_sec: Optional[int] = Field(default=None, gt=0)
+    percentile: Optional[float] = Field(default=None, gt=0, lt=100)
+
+    @field_validator('condition_type')
+    @classmethod
+    def validate_condition_type(cls, v):
+        if v not in ALERT_CONDITION_TYPES:
+            raise ValueError(f"condition_type must be one of {', '.join(ALERT_CONDITION_TYPES)}")
+        return v
 
 
 class AlertRuleUpdate(BaseModel):
@@ -222,6 +260,16 @@ class AlertRuleUpdate(BaseModel):
     cooldown_sec: Optional[int] = None
     is_enabled: Optional[bool] = None
     sort_order: Optional[int] = None
+    condition_type: Optional[str] = None
+    window_sec: Optional[int] = Field(default=None, gt=0)
+    percentile: Optional[float] = Field(default=None, gt=0, lt=100)
+
+    @field_validator('condition_type')
+    @classmethod
+    def validate_condition_type(cls, v):
+        if v is not None and v not in ALERT_CONDITION_TYPES:
+            raise ValueError(f"condition_type must be one of {', '.join(ALERT_CONDITION_TYPES)}")
+        return v
 
 
 # ── 헬스체크 ──
@@ -285,6 +333,41 @@ class MaintenanceRequest(BaseModel):
     maintenance_until: Optional[str] = None
 
 
+# ── 시스템 ──
+class DatabaseStats(BaseModel):
+    database: str
+    db_path: str
+    db_size_bytes: int
+    wal_size_bytes: int
+    page_size: int
+    page_count: int
+    freelist_count: int
+    freelist_bytes: int
+    auto_vacuum: str
+    journal_mode: str
+
+
+class DbWriterStats(BaseModel):
+    running: bool
+    queue_depth: int
+    peak_queue_depth: int
+    ops_committed: int
+    ops_failed: int
+    batches: int
+    avg_batch_size: Optional[float] = None
+    latency_p50_ms: Optional[float] = None
+    latency_p95_ms: Optional[float] = None
+    latency_max_ms: Optional[float] = None
+    commit_avg_ms: Optional[float] = None
+
+
+class ArchiveStats(BaseModel):
+    files: int
+    total_bytes: int
+    first_day: Optional[str] = None
+    last_day: Optional[str] = None
+
+
 # ── 공통 ──
 class PaginatedResponse(BaseModel):
     items: list
@@ -0,0 +1,282 @@
+"""단일 쓰기 태스크 (DbWriter)
+
+SQLite 는 파일 단위로 쓰기를 직렬화하므로 여러 코루틴이 각자 커넥션으로 쓰면
+잠금 대기와 'database is locked' 오류가 생긴다. 모든 쓰기 작업은 큐에 넣고,
+쓰기 커넥션 하나를 점유한 태스크가 큐에 쌓인 작업을 한 트랜잭션으로 묶어 커밋한다.
+작업마다 SAVEPOINT 를 두어 한 작업이 실패해도 같은 배치의 나머지는 커밋된다.
+작업 안에서 after_commit 으로 등록한 콜백(메모리 캐시 갱신 등)은 배치가 커밋된 뒤에만 실행하고,
+작업의 SAVEPOINT 가 롤백되면 버린다.
+"""
+import asyncio
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Optional
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+from backend.config import DB_WRITE_BATCH_MAX
+from backend.db.database import engine
+
+logger = logging.getLogger(__name__)
+
+# 지연 시간 통계에 사용할 최근 작업 수
+LATENCY_WINDOW = 1000
+
+# conn.info 에 둘 커밋 후 콜백 목록 키
+_AFTER_COMMIT = 'servereye_after_commit'
+
+
+def after_commit(conn, callback: Callable[[], Any]):
+    """쓰기 트랜잭션이 커밋된 뒤 실행할 콜백 등록
+
+    DbWriter 가 실행하는 작업이 아닌 커넥션(초기화 단계의 engine.begin() 등)이면 바로 실행한다.
+    """
+    hooks = conn.info.get(_AFTER_COMMIT)
+    if hooks is None:
+        callback()
+    else:
+        hooks.append(callback)
+
+
+def _run_hooks(hooks: list):
+    for callback in hooks:
+        try:
+            callback()
+        except Exception as e:
+            logger.error(f"DB writer after-commit callback failed: {e}")
+
+
+@dataclass
+class WriteResult:
+    """단일 SQL 쓰기 결과"""
+    rowcount: int
+    lastrowid: Optional[int]
+
+
+@dataclass
+class _WriteOp:
+    fn: Callable[[Any], Awaitable[Any]]
+    future: asyncio.Future
+    enqueued_at: float
+    # False 면 트랜잭션 밖에서 드라이버 커넥션으로 실행 (체크포인트/VACUUM)
+    transactional: bool = True
+
+
+class DbWriter:
+    """쓰기 커넥션을 단독으로 소유하는 쓰기 태스크"""
+
+    def __init__(self, batch_max: int = DB_WRITE_BATCH_MAX):
+        self.batch_max = batch_max
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._conn: Optional[AsyncConnection] = None
+        # 통계
+        self._latencies_ms: deque = deque(maxlen=LATENCY_WINDOW)
+        self._commit_ms: deque = deque(maxlen=LATENCY_WINDOW)
+        self.peak_queue_depth = 0
+        self.ops_committed = 0
+        self.ops_failed = 0
+        self.batches = 0
+        self._batched_ops = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self):
+        """쓰기 태스크 시작"""
+        if self.running:
+            return
+        self._queue = asyncio.Queue()
+        self._conn = await engine.connect()
+        self._task = asyncio.create_task(self._run())
+        logger.info("DB writer started")
+
+    async def stop(self):
+        """큐에 남은 작업을 모두 처리한 뒤 종료"""
+        if not self.running:
+            return
+        await self._queue.put(None)
+        await self._task
+        self._task = None
+        await self._conn.close()
+        self._conn = None
+        logger.info("DB writer stopped")
+
+    async def execute(self, statement, params=None) -> WriteResult:
+        """SQL 한 문장 실행 (str 또는 text())"""
+        if isinstance(statement, str):
+            statement = text(statement)
+
+        async def op(conn):
+            result = await conn.execute(statement, params or {})
+            return WriteResult(result.rowcount, result.lastrowid)
+
+        return await self.run(op)
+
+    async def executemany(self, statement, params_list: list[dict]) -> int:
+        """같은 SQL을 여러 파라미터로 실행, 처리 행 수 반환"""
+        if not params_list:
+            return 0
+        if isinstance(statement, str):
+            statement = text(statement)
+
+        async def op(conn):
+            result = await conn.execute(statement, params_list)
+            return result.rowcount
+
+        return await self.run(op)
+
+    async def run(self, fn: Callable[[AsyncConnection], Awaitable[Any]]) -> Any:
+        """fn(conn) 을 쓰기 트랜잭션 안에서 실행하고 커밋 후 결과 반환
+
+        fn 안의 문장들은 하나의 SAVEPOINT 로 묶여 원자적으로 적용된다.
+        """
+        return await self._submit(fn, transactional=True)
+
+    async def run_raw(self, fn: Callable[[Any], Awaitable[Any]]) -> Any:
+        """fn(driver_connection) 을 트랜잭션 밖에서 실행 (체크포인트/VACUUM 등)"""
+        return await self._submit(fn, transactional=False)
+
+    async def _submit(self, fn, transactional: bool):
+        if not self.running:
+            # 쓰기 태스크 시작 전(초기화/스크립트)에는 직접 실행
+            return await self._run_direct(fn, transactional)
+
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put(_WriteOp(fn, future, time.monotonic(), transactional))
+        depth = self._queue.qsize()
+        if depth > self.peak_queue_depth:
+            self.peak_queue_depth = depth
+        return await future
+
+    async def _run_direct(self, fn, transactional: bool):
+        async with engine.connect() as conn:
+            if not transactional:
+                return await fn((await conn.get_raw_connection()).driver_connection)
+            hooks = conn.info[_AFTER_COMMIT] = []
+            try:
+                async with conn.begin():
+                    value = await fn(conn)
+            finally:
+                del conn.info[_AFTER_COMMIT]
+            _run_hooks(hooks)
+            return value
+
+    async def _run(self):
+        """큐 소비 루프"""
+        while True:
+            op = await self._queue.get()
+            if op is None:
+                return
+
+            batch = [op]
+            stop = False
+            while len(batch) < self.batch_max:
+                try:
+                    nxt = self._queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    break
+                if nxt is None:
+                    stop = True
+                    break
+                batch.append(nxt)
+
+            # 트랜잭션 밖에서 실행할 작업은 앞뒤 배치와 분리
+            pending = []
+            for item in batch:
+                if item.transactional:
+                    pending.append(item)
+                    continue
+                await self._execute_batch(pending)
+                pending = []
+                await self._execute_raw(item)
+            await self._execute_batch(pending)
+
+            if stop:
+                return
+
+    async def _execute_batch(self, batch: list):
+        """작업 묶음을 한 트랜잭션으로 실행 (작업별 SAVEPOINT)"""
+        if not batch:
+            return
+        results = []
+        hooks = self._conn.info[_AFTER_COMMIT] = []
+        try:
+            async with self._conn.begin():
+                for op in batch:
+                    mark = len(hooks)
+                    try:
+                        async with self._conn.begin_nested():
+                            value = await op.fn(self._conn)
+                        results.append((op, value, None))
+                    except Exception as e:
+                        # SAVEPOINT 롤백: 이 작업이 등록한 콜백은 버림
+                        del hooks[mark:]
+                        results.append((op, None, e))
+                commit_started = time.monotonic()
+            self._commit_ms.append((time.monotonic() - commit_started) * 1000)
+        except Exception as e:
+            logger.error(f"DB writer commit failed ({len(batch)} ops): {e}")
+            results = [(op, None, e) for op in batch]
+            hooks.clear()
+        finally:
+            del self._conn.info[_AFTER_COMMIT]
+        _run_hooks(hooks)
+
+        self.batches += 1
+        self._batched_ops += len(batch)
+        done_at = time.monotonic()
+        for op, value, error in results:
+            self._latencies_ms.append((done_at - op.enqueued_at) * 1000)
+            if error is not None:
+                self.ops_failed += 1
+                if not op.future.done():
+                    op.future.set_exception(error)
+            else:
+                self.ops_committed += 1
+                if not op.future.done():
+                    op.future.set_result(value)
+
+    async def _execute_raw(self, op: _WriteOp):
+        try:
+            raw = (await self._conn.get_raw_connection()).driver_connection
+            value = await op.fn(raw)
+        except Exception as e:
+            self.ops_failed += 1
+            if not op.future.done():
+                op.future.set_exception(e)
+            return
+        self.ops_committed += 1
+        self._latencies_ms.append((time.monotonic() - op.enqueued_at) * 1000)
+        if not op.future.done():
+            op.future.set_result(value)
+
+    def get_stats(self) -> dict:
+        """큐 깊이 및 쓰기 지연 통계"""
+        latencies = sorted(self._latencies_ms)
+
+        def percentile(p: float) -> Optional[float]:
+            if not latencies:
+                return None
+            return round(latencies[min(len(latencies) - 1, int(len(latencies) * p))], 2)
+
+        return {
+            "running": self.running,
+            "queue_depth": self._queue.qsize() if self._queue else 0,
+            "peak_queue_depth": self.peak_queue_depth,
+            "ops_committed": self.ops_committed,
+            "ops_failed": self.ops_failed,
+            "batches": self.batches,
+            "avg_batch_size": round(self._batched_ops / self.batches, 2)
+            if self.batches else None,
+            "latency_p50_ms": percentile(0.5),
+            "latency_p95_ms": percentile(0.95),
+            "latency_max_ms": round(latencies[-1], 2) if latencies else None,
+            "commit_avg_ms": round(sum(self._commit_ms) / len(self._commit_ms), 2)
+            if self._commit_ms else None,
+        }
+
+
+db_writer = DbWriter()
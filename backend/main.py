@@ -16,10 +16,13 @@ import uvicorn
 
 from backend.config import HOST, DEFAULT_PORT, FRONTEND_DIR, LOG_PATH, DATA_DIR
 from backend.db.init_db import init_database
+from backend.db.database import read_engine
+from backend.db.writer import db_writer
 from backend.core.collector import collector_engine
 from backend.core.alert_engine import alert_engine
+from backend.core.alert_grouper import alert_grouper
 from backend.core.notifier import notifier
-from backend.scheduler.jobs import setup_scheduler
+from backend.scheduler.jobs import scheduler, setup_scheduler
 
 # 로깅 설정
 logging.basicConfig(
@@ -42,9 +45,13 @@ async def lifespan(app: FastAPI):
     await init_database()
     logger.info("Database initialized")
 
-    # 알림 엔진-수집 엔진 연결
-    alert_engine.notifier = notifier
+    # 단일 쓰기 태스크 시작 (이후 모든 쓰기는 쓰기 큐를 거침)
+    await db_writer.start()
+
+    # 알림 엔진-수집 엔진 연결 (판단 상태는 수집 시작 전에 복원)
+    alert_grouper.notifier = notifier
     collector_engine.alert_engine = alert_engine
+    await alert_engine.load_state()
 
     # 스케줄러 시작
     setup_scheduler()
@@ -55,8 +62,16 @@ async def lifespan(app: FastAPI):
 
     yield
 
-    # 종료
+    # 종료 (스케줄러 작업이 멈춘 쓰기 태스크나 해제된 읽기 풀을 쓰지 않도록 먼저 중지)
+    scheduler.shutdown(wait=False)
     await collector_engine.stop()
+    try:
+        await alert_grouper.flush_all()
+        await alert_engine.save_state()
+    except Exception as e:
+        logger.error(f"Alert state save failed: {e}")
+    await db_writer.stop()
+    await read_engine.dispose()
     logger.info("ServerEye stopped")
 
 
@@ -89,6 +104,7 @@ from backend.api.reports import router as reports_router
 from backend.api.settings import router as settings_router
 from backend.api.users import router as users_router
 from backend.api.websocket import router as ws_router
+from backend.api.system import router as system_router
 
 app.include_router(auth_router)
 app.include_router(servers_router)
@@ -101,6 +117,7 @@ app.include_router(reports_router)
 app.include_router(settings_router)
 app.include_router(users_router)
 app.include_router(ws_router)
+app.include_router(system_router)
 
 # 프론트엔드 정적 파일 서빙
 frontend_dist = FRONTEND_DIR
@@ -2,7 +2,17 @@
 import asyncio
 import logging
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
-from backend.core.aggregator import aggregate_5min, aggregate_hourly, cleanup_old_data
+from backend.core.aggregator import (
+    aggregate_5min, aggregate_hourly, aggregate_log_rate_5min, cleanup_old_data
+)
+from backend.core.alert_engine import alert_engine
+from backend.config import (
+    ALERT_BATCH_EVALUATION, ALERT_BATCH_INTERVAL_SEC, ALERT_STATE_SAVE_SEC,
+    COLLECT_DEADLINE_TICK_SEC, DASHBOARD_SUMMARY_INTERVAL_SEC, TS_SCHEMA
+)
+from backend.core.dashboard_summary import dashboard_summary
+from backend.db.blocks import compact_blocks
+from backend.db.maintenance import DB_FILES, checkpoint_wal, incremental_vacuum
 
 logger = logging.getLogger(__name__)
 
@@ -19,6 +29,43 @@ def setup_scheduler():
         name='5분 메트릭 집계'
     )
 
+    # 로그 건수 5분 집계 + error_log_rate 알림 평가 (매분, 진행 중인 버킷 갱신)
+    scheduler.add_job(
+        _run_aggregate_log_rate,
+        'interval', minutes=1,
+        id='aggregate_log_rate',
+        name='로그 건수 집계',
+        max_instances=1, coalesce=True
+    )
+
+    # 알림 일괄 평가 (수집 틱마다 모아 둔 값으로 전체 서버 × 규칙 판단)
+    if ALERT_BATCH_EVALUATION:
+        scheduler.add_job(
+            _run_evaluate_alerts,
+            'interval', seconds=ALERT_BATCH_INTERVAL_SEC,
+            id='evaluate_alerts',
+            name='알림 일괄 평가',
+            max_instances=1, coalesce=True
+        )
+
+    # 수집 타임아웃 판단 (마감 타이머 휠 진행, 마감이 지난 서버만 평가)
+    scheduler.add_job(
+        _run_check_collect_deadlines,
+        'interval', seconds=COLLECT_DEADLINE_TICK_SEC,
+        id='check_collect_deadlines',
+        name='수집 타임아웃 판단',
+        max_instances=1, coalesce=True
+    )
+
+    # 알림 엔진 판단 상태 스냅샷 저장 (바뀐 항목만)
+    scheduler.add_job(
+        _run_save_alert_state,
+        'interval', seconds=ALERT_STATE_SAVE_SEC,
+        id='save_alert_state',
+        name='알림 상태 저장',
+        max_instances=1, coalesce=True
+    )
+
     # 1시간 집계 (1시간마다)
     scheduler.add_job(
         _run_aggregate_hourly,
@@ -35,8 +82,55 @@ def setup_scheduler():
         name='오래된 데이터 정리'
     )
 
+    # 블록 저장 모드 압축 (1시간마다, 정시 집계/정리와 겹치지 않게 45분)
+    scheduler.add_job(
+        _run_compact_blocks,
+        'cron', minute=45,
+        id='compact_blocks',
+        name='시계열 블록 압축',
+        max_instances=1, coalesce=True
+    )
+
+    # 설정 DB WAL 체크포인트 (5분 집계 사이 한가한 시점: 매 5분 중 2분째)
+    scheduler.add_job(
+        _run_wal_checkpoint,
+        'cron', minute='2-59/5',
+        args=['main'],
+        id='wal_checkpoint',
+        name='WAL 체크포인트',
+        max_instances=1, coalesce=True
+    )
+
+    # 시계열 DB WAL 체크포인트 (쓰기량이 많아 매분, 30초 지점)
+    scheduler.add_job(
+        _run_wal_checkpoint,
+        'cron', second=30,
+        args=[TS_SCHEMA],
+        id='wal_checkpoint_ts',
+        name='시계열 DB WAL 체크포인트',
+        max_instances=1, coalesce=True
+    )
+
+    # 증분 VACUUM (1시간마다, 정시 작업과 겹치지 않게 30분)
+    scheduler.add_job(
+        _run_incremental_vacuum,
+        'cron', minute=30,
+        id='incremental_vacuum',
+        name='증분 VACUUM',
+        max_instances=1, coalesce=True
+    )
+
+    # 대시보드 요약 갱신/WebSocket 전송 (수집 틱마다)
+    scheduler.add_job(
+        _run_dashboard_summary,
+        'interval', seconds=DASHBOARD_SUMMARY_INTERVAL_SEC,
+        id='dashboard_summary',
+        name='대시보드 요약 갱신',
+        max_instances=1, coalesce=True
+    )
+
     scheduler.start()
-    logger.info("Scheduler started with 3 jobs")
+    logger.info(f"Scheduler started with {len(scheduler.get_jobs())} jobs")
 
 
 async def _run_aggregate_5min():
@@ -46,6 +140,35 @@ async def _run_aggregate_5min():
         logger.error(f"5min aggregation failed: {e}")
 
 
+async def _run_aggregate_log_rate():
+    try:
+        await aggregate_log_rate_5min()
+        await alert_engine.evaluate_log_rates()
+    except Exception as e:
+        logger.error(f"Log rate aggregation failed: {e}")
+
+
+async def _run_evaluate_alerts():
+    try:
+        await alert_engine.evaluate_batch()
+    except Exception as e:
+        logger.error(f"Alert batch evaluation failed: {e}")
+
+
+async def _run_check_collect_deadlines():
+    try:
+        await alert_engine.check_collect_deadlines()
+    except Exception as e:
+        logger.error(f"Collect deadline check failed: {e}")
+
+
+async def _run_save_alert_state():
+    try:
+        await alert_engine.save_state()
+    except Exception as e:
+        logger.error(f"Alert state save failed: {e}")
+
+
 async def _run_aggregate_hourly():
     try:
         await aggregate_hourly()
@@ -58,3 +181,32 @@ async def _run_cleanup():
         await cleanup_old_data()
     except Exception as e:
         logger.error(f"Data cleanup failed: {e}")
+
+
+async def _run_compact_blocks():
+    try:
+        await compact_blocks()
+    except Exception as e:
+        logger.error(f"Block compaction failed: {e}")
+
+
+async def _run_wal_checkpoint(schema: str):
+    try:
+        await checkpoint_wal(schema)
+    except Exception as e:
+        logger.error(f"WAL checkpoint ({schema}) failed: {e}")
+
+
+async def _run_dashboard_summary():
+    try:
+        await dashboard_summary.refresh()
+    except Exception as e:
+        logger.error(f"Dashboard summary refresh failed: {e}")
+
+
+async def _run_incremental_vacuum():
+    for schema in DB_FILES:
+        try:
+            await incremental_vacuum(schema)
+        except Exception as e:
+            logger.error(f"Incremental vacuum ({schema}) failed: {e}")
@@ -0,0 +1,137 @@
+"""알림 슬라이딩 윈도우 테스트 (증분 집계가 윈도우 샘플 전수 계산과 같은지)"""
+import random
+import numpy as np
+import pytest
+from backend.core.alert_windows import SlidingWindow, WindowStore, condition_label, window_label
+from backend.core.rule_cache import CompiledRule
+
+
+def _rule(condition_type: str, window_sec: int, percentile=None, metric='cpu_usage_pct') -> CompiledRule:
+    return CompiledRule.from_row({
+        'rule_id': 1, 'rule_name': 'r', 'server_id': None, 'group_name': None,
+        'metric_name': metric, 'condition_op': '>=', 'warning_value': 70, 'critical_value': 90,
+        'duration_sec': 0, 'cooldown_sec': 300, 'condition_type': condition_type,
+        'window_sec': window_sec, 'percentile': percentile,
+    })
+
+
+def _expected(samples, window_sec, condition_type, percentile=None):
+    """윈도우 안 샘플(마지막 시각 - window_sec 초과)로 전수 계산"""
+    last = samples[-1][0]
+    kept = [(t, v) for t, v in samples if t > last - window_sec]
+    values = [v for _, v in kept]
+    if condition_type == 'avg':
+        return sum(values) / len(values)
+    if condition_type == 'min':
+        return min(values)
+    if condition_type == 'max':
+        return max(values)
+    if condition_type in ('delta', 'rate'):
+        span = kept[-1][0] - kept[0][0]
+        if len(kept) < 2 or span < window_sec / 2:
+            return None
+        delta = kept[-1][1] - kept[0][1]
+        return delta if condition_type == 'delta' else delta / span * 3600
+    return float(np.percentile(values, percentile))
+
+
+@pytest.mark.parametrize("condition_type,percentile", [
+    ('avg', None), ('min', None), ('max', None), ('delta', None), ('rate', None),
+    ('percentile', 50), ('percentile', 95), ('percentile', 0), ('percentile', 100),
+])
+@pytest.mark.parametrize("seed", range(3))
+def test_matches_brute_force(condition_type, percentile, seed):
+    rng = random.Random(seed)
+    window_sec = rng.choice([30, 60, 300])
+    window = SlidingWindow(window_sec, track_sorted=condition_type == 'percentile')
+    samples, t = [], 0.0
+    for _ in range(3000):
+        # 일정 주기 + 가끔 수집 공백(윈도우 전체가 비워지는 경우 포함), 중복 값 많음
+        t += rng.choice([3, 3, 3, 2.5, 4, 10, window_sec * 2 if rng.random() < 0.01 else 3])
+        value = float(rng.choice([rng.randint(0, 5), round(rng.uniform(-50, 150), 1)]))
+        window.push(t, value)
+        samples.append((t, value))
+        want = _expected(samples, window_sec, condition_type, percentile)
+        got = window.aggregate(condition_type, percentile)
+        if want is None:
+            assert got is None
+        else:
+            assert got == pytest.approx(want, rel=1e-9, abs=1e-6)
+
+
+def test_duplicate_and_out_of_order_samples_ignored():
+    window = SlidingWindow(60)
+    window.push(10, 1.0)
+    window.push(10, 99.0)
+    window.push(5, 99.0)
+    assert len(window) == 1
+    assert window.aggregate('max') == 1.0
+
+
+def test_delta_and_rate_need_half_window():
+    window = SlidingWindow(60)
+    window.push(0, 10.0)
+    window.push(20, 20.0)
+    assert window.aggregate('delta') is None
+    window.push(30, 40.0)
+    assert window.aggregate('delta') == 30.0
+    assert window.aggregate('rate') == pytest.approx(30.0 / 30 * 3600)
+
+
+def test_empty_and_unknown():
+    window = SlidingWindow(60)
+    assert window.aggregate('avg') is None
+    window.push(0, 1.0)
+    assert window.aggregate('percentile', 95) is None  # 정렬 목록 미사용
+    assert window.aggregate('bogus') is None
+
+
+def test_track_sorted_enabled_later():
+    window = SlidingWindow(100)
+    for t, v in enumerate([5.0, 1.0, 3.0, 9.0, 7.0]):
+        window.push(t, v)
+    window.track_sorted()
+    assert window.aggregate('percentile', 50) == 5.0
+    for t in range(5, 200):
+        window.push(t, float(t))
+    assert window.aggregate('percentile', 0) == 100.0  # 윈도우: 100 < t <= 199
+
+
+def test_expiry_resets_sum():
+    window = SlidingWindow(10)
+    for t in range(100):
+        window.push(t, 0.1)
+    window.push(1000, 5.0)
+    assert len(window) == 1
+    assert window.aggregate('avg') == 5.0
+
+
+def test_window_store_shares_and_retains():
+    store = WindowStore()
+    avg, p95 = _rule('avg', 60), _rule('percentile', 60, 95)
+    other = _rule('max', 300)
+    for t in range(1, 21):
+        store.push(1, (avg, p95, other, _rule('value', 0)), {'cpu_usage_pct': float(t)}, float(t))
+    assert store.value(1, avg) == pytest.approx(10.5)
+    assert store.value(1, p95) == pytest.approx(float(np.percentile(range(1, 21), 95)))
+    assert store.value(1, other) == 20.0
+    assert store.value(2, avg) is None
+    assert len(store._windows) == 2  # 같은 (서버, 메트릭, 길이)는 윈도우 하나
+
+    store.retain({(1, 'cpu_usage_pct', 300)})
+    assert store.value(1, avg) is None
+    assert store.value(1, other) == 20.0
+
+
+def test_value_rule_without_window_is_coerced():
+    assert _rule('avg', 0).condition_type == 'value'
+
+
+def test_labels():
+    assert window_label(300) == '5분'
+    assert window_label(3600) == '1시간'
+    assert window_label(45) == '45초'
+    assert condition_label(_rule('value', 0)) == ''
+    assert condition_label(_rule('avg', 300)) == ' 5분 평균'
+    assert condition_label(_rule('percentile', 3600, 95)) == ' 1시간 p95'
+    assert condition_label(_rule('percentile', 60, 99.5)) == ' 1분 p99.5'
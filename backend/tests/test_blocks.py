@@ -0,0 +1,54 @@
+"""블록 저장 모드 최신값 조회 테스트 (서버별 마지막 블록의 마지막 샘플)"""
+import asyncio
+import sqlite3
+from sqlalchemy.ext.asyncio import create_async_engine
+from backend.db.blocks import BLOCK_TIERS, TIER_COLUMNS, _build_blocks, fetch_latest_block_rows
+
+
+def _sample(minute: int, cpu: float) -> tuple:
+    values = {c: None for c in TIER_COLUMNS['raw']}
+    values['cpu_usage_pct'] = cpu
+    values['process_count'] = 100 + minute
+    values['disk_json'] = f'[{{"usage_pct": {minute}}}]'
+    return (f"2026-01-01 {minute // 60:02d}:{minute % 60:02d}:00", *values.values())
+
+
+def test_latest_sample_from_last_block(tmp_path):
+    path = tmp_path / "blocks.db"
+    tier = BLOCK_TIERS['raw']
+    with sqlite3.connect(path) as conn:
+        conn.execute("""CREATE TABLE metrics_raw_blocks (block_id INTEGER PRIMARY KEY,
+                     server_id INTEGER, metric TEXT, block_start TEXT, block_end TEXT,
+                     sample_count INTEGER, data BLOB)""")
+        # 서버 1: 두 구간(00시, 01시), 서버 2: 한 구간
+        samples = {1: [_sample(m, float(m)) for m in range(0, 120, 7)],
+                   2: [_sample(m, 50.0 + m) for m in range(0, 40, 10)]}
+        for sid, rows in samples.items():
+            for b in _build_blocks(tier, TIER_COLUMNS['raw'], sid, rows):
+                conn.execute(
+                    """INSERT INTO metrics_raw_blocks
+                    (server_id, metric, block_start, block_end, sample_count, data)
+                    VALUES (?, ?, ?, ?, ?, ?)""",
+                    (b["sid"], b["metric"], b["start"], b["end"], b["count"], b["data"])
+                )
+
+    columns = ['collected_at', 'cpu_usage_pct', 'process_count', 'disk_json']
+
+    async def main():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+        try:
+            async with engine.connect() as conn:
+                every = await fetch_latest_block_rows('raw', columns, conn=conn)
+                one = await fetch_latest_block_rows('raw', ['cpu_usage_pct'], [2], conn=conn)
+        finally:
+            await engine.dispose()
+        return every, one
+
+    every, one = asyncio.run(main())
+    assert set(every) == {1, 2}
+    assert every[1] == {"server_id": 1, "collected_at": "2026-01-01 01:59:00",
+                        "cpu_usage_pct": 119.0, "process_count": 219,
+                        "disk_json": '[{"usage_pct": 119}]'}
+    assert every[2]["collected_at"] == "2026-01-01 00:30:00"
+    assert every[2]["cpu_usage_pct"] == 80.0
+    assert one == {2: {"server_id": 2, "cpu_usage_pct": 80.0}}
@@ -0,0 +1,209 @@
+"""단일 쓰기 태스크 테스트 (임시 SQLite 파일에서 배치/SAVEPOINT/커밋 후 콜백/run_raw/종료 처리)"""
+import asyncio
+import sqlite3
+import pytest
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import create_async_engine
+from backend.db import writer as writer_module
+from backend.db.writer import DbWriter, after_commit
+
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    """쓰기 엔진을 임시 파일 엔진으로 교체 (backend.db.database 의 쓰기 엔진과 같은 BEGIN 처리)"""
+    path = tmp_path / "writer.db"
+    with sqlite3.connect(path) as conn:
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("CREATE TABLE parent (id INTEGER PRIMARY KEY)")
+        conn.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT UNIQUE)")
+        conn.execute("""CREATE TABLE child (id INTEGER PRIMARY KEY, parent_id INTEGER
+                     REFERENCES parent(id) DEFERRABLE INITIALLY DEFERRED)""")
+
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}", connect_args={"check_same_thread": False})
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA foreign_keys = ON")
+        cursor.close()
+
+    @event.listens_for(engine.sync_engine, "begin")
+    def _on_begin(conn):
+        conn.exec_driver_sql("BEGIN IMMEDIATE")
+
+    monkeypatch.setattr(writer_module, "engine", engine)
+    yield path
+    asyncio.run(engine.dispose())
+
+
+def _names(path) -> list[str]:
+    """쓰기 커넥션과 별개인 커넥션에서 커밋된 행 조회"""
+    with sqlite3.connect(path) as conn:
+        return [r[0] for r in conn.execute("SELECT name FROM items ORDER BY id")]
+
+
+def _insert(name: str):
+    async def op(conn):
+        await conn.execute(text("INSERT INTO items (name) VALUES (:n)"), {"n": name})
+        return name
+    return op
+
+
+def test_concurrent_ops_share_one_batch(db_path):
+    async def main():
+        writer = DbWriter(batch_max=100)
+        await writer.start()
+        results = await asyncio.gather(*(writer.run(_insert(f"n{i}")) for i in range(20)))
+        stats = writer.get_stats()
+        await writer.stop()
+        return results, stats
+
+    results, stats = asyncio.run(main())
+    assert results == [f"n{i}" for i in range(20)]
+    assert _names(db_path) == [f"n{i}" for i in range(20)]
+    assert stats["ops_committed"] == 20
+    assert stats["batches"] < 20
+
+
+def test_batch_max_splits_batches(db_path):
+    async def main():
+        writer = DbWriter(batch_max=4)
+        await writer.start()
+        await asyncio.gather(*(writer.run(_insert(f"n{i}")) for i in range(10)))
+        stats = writer.get_stats()
+        await writer.stop()
+        return stats
+
+    stats = asyncio.run(main())
+    assert stats["batches"] >= 3
+    assert _names(db_path) == [f"n{i}" for i in range(10)]
+
+
+def test_failing_op_rolls_back_only_its_savepoint(db_path):
+    async def failing(conn):
+        await conn.execute(text("INSERT INTO items (name) VALUES ('partial')"))
+        # UNIQUE 위반: 이 작업의 앞 문장까지 함께 롤백되어야 함
+        await conn.execute(text("INSERT INTO items (name) VALUES ('a')"))
+
+    async def main():
+        writer = DbWriter()
+        await writer.start()
+        results = await asyncio.gather(
+            writer.run(_insert("a")), writer.run(failing), writer.run(_insert("b")),
+            return_exceptions=True
+        )
+        stats = writer.get_stats()
+        await writer.stop()
+        return results, stats
+
+    results, stats = asyncio.run(main())
+    assert results[0] == "a" and results[2] == "b"
+    assert isinstance(results[1], Exception)
+    assert _names(db_path) == ["a", "b"]
+    assert stats["ops_committed"] == 2
+    assert stats["ops_failed"] == 1
+    assert stats["batches"] == 1
+
+
+def test_after_commit_runs_after_commit_only_for_successful_ops(db_path):
+    calls = []
+
+    def op_with_hook(name: str, fail: bool = False):
+        async def op(conn):
+            await conn.execute(text("INSERT INTO items (name) VALUES (:n)"), {"n": name})
+            # 커밋 시점에 다른 커넥션에서 행이 보이는지 기록
+            after_commit(conn, lambda: calls.append((name, name in _names(db_path))))
+            if fail:
+                raise RuntimeError("boom")
+        return op
+
+    async def main():
+        writer = DbWriter()
+        await writer.start()
+        results = await asyncio.gather(
+            writer.run(op_with_hook("ok1")), writer.run(op_with_hook("bad", fail=True)),
+            writer.run(op_with_hook("ok2")), return_exceptions=True
+        )
+        await writer.stop()
+        return results
+
+    results = asyncio.run(main())
+    assert isinstance(results[1], RuntimeError)
+    assert calls == [("ok1", True), ("ok2", True)]
+
+
+def test_after_commit_skipped_when_commit_fails(db_path):
+    calls = []
+
+    async def orphan(conn):
+        # 지연 외래키: 문장은 성공하지만 COMMIT 에서 실패
+        await conn.execute(text("INSERT INTO child (parent_id) VALUES (999)"))
+        after_commit(conn, lambda: calls.append("orphan"))
+
+    async def main():
+        writer = DbWriter()
+        await writer.start()
+        results = await asyncio.gather(
+            writer.run(_insert("a")), writer.run(orphan), return_exceptions=True
+        )
+        stats = writer.get_stats()
+        await writer.stop()
+        return results, stats
+
+    results, stats = asyncio.run(main())
+    assert all(isinstance(r, Exception) for r in results)
+    assert calls == []
+    assert _names(db_path) == []
+    assert stats["ops_failed"] == 2
+
+
+def test_after_commit_runs_immediately_outside_writer(db_path):
+    calls = []
+
+    async def main():
+        async with writer_module.engine.connect() as conn:
+            after_commit(conn, lambda: calls.append("now"))
+
+    asyncio.run(main())
+    assert calls == ["now"]
+
+
+def test_run_raw_executes_outside_transaction_in_queue_order(db_path):
+    async def raw_op(raw):
+        cursor = await raw.execute("SELECT COUNT(*) FROM items")
+        count = (await cursor.fetchone())[0]
+        await cursor.close()
+        return raw.in_transaction, count
+
+    async def main():
+        writer = DbWriter()
+        await writer.start()
+        results = await asyncio.gather(
+            writer.run(_insert("a")), writer.run_raw(raw_op), writer.run(_insert("b"))
+        )
+        await writer.stop()
+        return results
+
+    results = asyncio.run(main())
+    # 앞 배치는 커밋된 뒤, 뒤 작업은 아직 실행되기 전
+    assert results[1] == (False, 1)
+    assert _names(db_path) == ["a", "b"]
+
+
+def test_stop_drains_queued_ops(db_path):
+    async def main():
+        writer = DbWriter(batch_max=3)
+        await writer.start()
+        tasks = [asyncio.create_task(writer.run(_insert(f"n{i}"))) for i in range(10)]
+        await asyncio.sleep(0)  # 작업들이 큐에 들어갈 때까지 양보
+        await writer.stop()
+        assert all(t.done() for t in tasks)
+        assert not writer.running
+        # 종료 후에는 직접 실행
+        await writer.run(_insert("after"))
+        return [t.result() for t in tasks]
+
+    results = asyncio.run(main())
+    assert results == [f"n{i}" for i in range(10)]
+    assert _names(db_path) == [f"n{i}" for i in range(10)] + ["after"]
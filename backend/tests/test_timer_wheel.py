@@ -0,0 +1,114 @@
+"""해시 타이머 휠 테스트 (전수 비교 기준 구현과 같은 키를 같은 틱에 만료하는지)"""
+import math
+import random
+import pytest
+from backend.core.timer_wheel import TimerWheel
+
+
+class _Reference:
+    """기준 구현: 키 → 마감 틱, advance 마다 전체 비교"""
+
+    def __init__(self, start: float, tick_sec: float):
+        self.tick_sec = tick_sec
+        self.tick = math.floor(start / tick_sec)
+        self.due: dict = {}
+
+    def schedule(self, key, deadline: float):
+        self.due[key] = max(math.ceil(deadline / self.tick_sec), self.tick + 1)
+
+    def cancel(self, key):
+        self.due.pop(key, None)
+
+    def advance(self, now: float) -> set:
+        target = math.floor(now / self.tick_sec)
+        if target <= self.tick:
+            return set()
+        self.tick = target
+        expired = {k for k, t in self.due.items() if t <= target}
+        for k in expired:
+            del self.due[k]
+        return expired
+
+
+@pytest.mark.parametrize("slots,tick_sec,seed", [
+    (8, 1.0, 0), (64, 1.0, 1), (512, 1.0, 2), (16, 0.5, 3), (32, 2.0, 4),
+])
+def test_matches_reference(slots, tick_sec, seed):
+    rng = random.Random(seed)
+    now = 1000.0
+    wheel, ref = TimerWheel(now, tick_sec, slots), _Reference(now, tick_sec)
+    for _ in range(20000):
+        op = rng.random()
+        key = rng.randrange(300)
+        if op < 0.5:
+            # 대부분 가까운 마감, 일부는 한 바퀴 넘게 먼 마감이나 이미 지난 마감
+            deadline = now + rng.choice([rng.uniform(0, 40), rng.uniform(0, 3000), -rng.uniform(0, 10)])
+            wheel.schedule(key, deadline)
+            ref.schedule(key, deadline)
+        elif op < 0.6:
+            wheel.cancel(key)
+            ref.cancel(key)
+        else:
+            now += rng.choice([0.01, 0.3, 1, 1, 2.7, 5, 900 if rng.random() < 0.01 else 1])
+            assert set(wheel.advance(now)) == ref.advance(now)
+        assert len(wheel) == len(ref.due)
+
+
+def test_never_early_and_at_most_one_tick_late():
+    wheel = TimerWheel(0.0, 1.0, 16)
+    wheel.schedule('a', 5.2)
+    t = 0.0
+    while t < 20:
+        t = round(t + 0.1, 1)
+        if wheel.advance(t):
+            break
+    assert 5.2 <= t < 5.2 + 1.0
+
+
+def test_reschedule_moves_key():
+    wheel = TimerWheel(0.0)
+    wheel.schedule('a', 3)
+    wheel.schedule('a', 10)
+    assert len(wheel) == 1
+    assert wheel.advance(5) == []
+    assert wheel.advance(10) == ['a']
+    assert 'a' not in wheel
+
+
+def test_cancel_and_unknown_cancel():
+    wheel = TimerWheel(0.0)
+    wheel.schedule('a', 3)
+    wheel.cancel('a')
+    wheel.cancel('missing')
+    assert wheel.advance(100) == []
+    assert len(wheel) == 0
+
+
+def test_past_deadline_fires_on_next_tick():
+    wheel = TimerWheel(100.0)
+    wheel.schedule('late', 50.0)
+    assert wheel.advance(100.5) == []
+    assert wheel.advance(101.0) == ['late']
+
+
+def test_deadline_beyond_one_revolution():
+    wheel = TimerWheel(0.0, 1.0, 8)
+    wheel.schedule('far', 20)
+    for t in range(1, 20):
+        assert wheel.advance(t) == [], t
+    assert wheel.advance(20) == ['far']
+
+
+def test_long_gap_expires_everything_once():
+    wheel = TimerWheel(0.0, 1.0, 8)
+    for i in range(50):
+        wheel.schedule(i, i + 1)
+    assert sorted(wheel.advance(10_000)) == list(range(50))
+    assert wheel.advance(20_000) == []
+
+
+def test_time_going_backwards_is_ignored():
+    wheel = TimerWheel(10.0)
+    wheel.schedule('a', 12)
+    assert wheel.advance(5) == []
+    assert wheel.advance(12) == ['a']
@@ -0,0 +1,204 @@
+"""시계열 블록 코덱 왕복 테스트 (encode_block → decode_block 이 원래 샘플을 그대로 돌려주는지)
+
+    python -m pytest backend/tests
+"""
+import math
+import random
+import pytest
+from backend.core.tsblock import (
+    CODEC_FLOAT, CODEC_JSON, MAX_DECIMAL_SCALE, block_count, decode_block, encode_block,
+    from_epoch, iter_block, iter_block_times, iter_block_values, parse_time_bound, to_epoch
+)
+
+START = to_epoch('2024-03-01 00:00:00')
+
+
+def _scale(block: bytes) -> int:
+    return block[2]  # 헤더 '<BBBI' 의 십진 배율
+
+
+def _same(a, b) -> bool:
+    """값 비교: None 은 None, -0.0 은 부호까지"""
+    if a is None or b is None:
+        return a is None and b is None
+    if isinstance(a, float) and isinstance(b, (int, float)):
+        return a == b and math.copysign(1, a) == math.copysign(1, b)
+    return a == b
+
+
+def _roundtrip(timestamps, values, codec=CODEC_FLOAT) -> bytes:
+    block = encode_block(timestamps, values, codec)
+    got_ts, got_values = decode_block(block)
+    expected = [None if isinstance(v, float) and math.isnan(v) else v for v in values]
+    assert got_ts == timestamps
+    assert len(got_values) == len(expected)
+    for i, (got, want) in enumerate(zip(got_values, expected)):
+        assert _same(got, want), f"index {i}: {got!r} != {want!r}"
+    assert block_count(block) == len(timestamps)
+    assert list(iter_block(block)) == list(zip(got_ts, got_values))
+    assert list(iter_block_times(block)) == got_ts
+    return block
+
+
+def _regular(n: int, step: int = 3) -> list[int]:
+    return [START + i * step for i in range(n)]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_random_floats(seed):
+    rng = random.Random(seed)
+    values = [rng.uniform(-1e6, 1e6) for _ in range(500)]
+    block = _roundtrip(_regular(500), values)
+    assert _scale(block) == 0
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_random_walk_decimals(seed):
+    rng = random.Random(seed)
+    value, values = 50.0, []
+    for _ in range(1200):
+        value = min(100.0, max(0.0, value + rng.uniform(-2, 2)))
+        values.append(round(value, 1))
+    block = _roundtrip(_regular(1200), values)
+    assert _scale(block) == 1
+
+
+def test_constant_block():
+    block = _roundtrip(_regular(1000), [42.5] * 1000)
+    # 헤더 + 시각/값 스트림 각각 첫 값(8바이트) + 샘플당 1비트
+    assert len(block) <= 7 + 4 + 2 * (8 + 1000 // 8 + 1)
+
+
+def test_all_zero_and_integers():
+    _roundtrip(_regular(100), [0.0] * 100)
+    block = _roundtrip(_regular(100), [float(i % 7) for i in range(100)])
+    assert _scale(block) == 0
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_nan_heavy(seed):
+    rng = random.Random(seed)
+    values = [round(rng.uniform(0, 100), 2) if rng.random() < 0.1 else None for _ in range(400)]
+    _roundtrip(_regular(400), values)
+
+
+def test_all_none_and_nan():
+    _roundtrip(_regular(50), [None] * 50)
+    _roundtrip(_regular(50), [float('nan')] * 50)
+    _roundtrip(_regular(4), [None, float('nan'), 1.5, None])
+
+
+def test_negative_values():
+    _roundtrip(_regular(6), [-1.5, -0.25, -100.0, -3.75, 2.5, -0.5])
+    block = _roundtrip(_regular(5), [-12.34, -0.01, 5.67, -99.99, 0.0])
+    assert _scale(block) == 2
+
+
+def test_negative_zero_kept():
+    block = _roundtrip(_regular(3), [-0.0, 1.5, -0.0])
+    assert _scale(block) == 0
+
+
+def test_non_decimal_values():
+    values = [1 / 3, 2 / 3, math.pi, math.e, 1e-300, 1.7976931348623157e308, 5e-324]
+    block = _roundtrip(_regular(len(values)), values)
+    assert _scale(block) == 0
+
+
+def test_infinities():
+    _roundtrip(_regular(4), [float('inf'), 1.0, float('-inf'), 2.5])
+
+
+def test_single_row():
+    _roundtrip([START], [12.5])
+    _roundtrip([START], [None])
+    _roundtrip([0], [-7.25])
+    _roundtrip([START], ['{"C:": 50}'], CODEC_JSON)
+
+
+@pytest.mark.parametrize("scale", range(MAX_DECIMAL_SCALE + 1))
+def test_decimal_scale_levels(scale):
+    rng = random.Random(scale)
+    values = [round(rng.uniform(-1000, 1000), scale) for _ in range(300)]
+    values[0] = round(0.5 + 10 ** -scale, scale) if scale else 3.0  # 해당 자릿수를 반드시 포함
+    block = _roundtrip(_regular(300), values)
+    assert _scale(block) == scale
+
+
+def test_decimal_scale_fallback_beyond_max():
+    # MAX_DECIMAL_SCALE 보다 한 자리 더 있으면 배율 없이 그대로 XOR
+    digits = MAX_DECIMAL_SCALE + 1
+    values = [round(1 + i * 10 ** -digits, digits) for i in range(1, 50)]
+    block = _roundtrip(_regular(len(values)), values)
+    assert _scale(block) == 0
+
+
+def test_decimal_scale_fallback_one_value_spoils_block():
+    values = [round(i * 0.1, 1) for i in range(100)]
+    values[57] = 1 / 3
+    block = _roundtrip(_regular(100), values)
+    assert _scale(block) == 0
+
+
+def test_decimal_scale_magnitude_boundary():
+    below = 2.0 ** 39 - 1.5
+    block = _roundtrip(_regular(3), [below, 0.5, 1.5])
+    assert _scale(block) == 1
+    at = 2.0 ** 39 + 0.5
+    block = _roundtrip(_regular(3), [at, 0.5, 1.5])
+    assert _scale(block) == 0
+
+
+def test_int_values_decode_as_equal_floats():
+    _roundtrip(_regular(5), [1, 2, 3, 1000000, -5])
+
+
+def test_timestamp_delta_of_delta_buckets():
+    # 모든 delta-of-delta 구간(0, 7/9/12 비트, 32비트)과 음수 dod, 역행 시각
+    deltas = [3, 3, 3, 60, 3, -2, 3, 300, 3, 4000, 3, 1_000_000, 3, 3, 2, 1, 0, 0, 5]
+    timestamps = [START]
+    for d in deltas:
+        timestamps.append(timestamps[-1] + d)
+    _roundtrip(timestamps, [float(i) for i in range(len(timestamps))])
+
+
+def test_timestamp_random_jitter():
+    rng = random.Random(7)
+    timestamps = [START]
+    for _ in range(2000):
+        timestamps.append(timestamps[-1] + rng.choice([3, 3, 3, 3, 2, 4, 6, 0, 90, 3600]))
+    _roundtrip(timestamps, [0.1] * len(timestamps))
+
+
+def test_json_codec_roundtrip():
+    values = [
+        '[{"mount": "C:", "usage_pct": 51.2}]', None, '한글 디스크 "D:"', '', '{"a": [1, 2, {"b": null}]}',
+    ]
+    _roundtrip(_regular(len(values)), values, CODEC_JSON)
+
+
+def test_values_stream_independent_of_times():
+    block = encode_block(_regular(10), [float(i) / 4 for i in range(10)])
+    assert list(iter_block_values(block)) == [float(i) / 4 for i in range(10)]
+
+
+def test_invalid_input():
+    with pytest.raises(ValueError):
+        encode_block([], [])
+    with pytest.raises(ValueError):
+        encode_block([START, START + 3], [1.0])
+
+
+def test_unknown_version_rejected():
+    block = bytearray(encode_block([START], [1.0]))
+    block[0] = 99
+    with pytest.raises(ValueError):
+        decode_block(bytes(block))
+
+
+def test_epoch_helpers():
+    assert from_epoch(to_epoch('2024-02-29 23:59:58')) == '2024-02-29 23:59:58'
+    assert parse_time_bound('2024-02-29') == to_epoch('2024-02-29 00:00:00')
+    assert parse_time_bound('2024-02-29T12:00:00') == to_epoch('2024-02-29 12:00:00')
+    assert parse_time_bound('garbage') is None
+    assert parse_time_bound(None) is None
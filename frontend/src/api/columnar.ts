@@ -0,0 +1,101 @@
+// ── 컬럼형 바이너리 응답 디코더 (backend/core/columnar.py 형식) ──
+//
+// MAGIC 'SEC1' | 헤더 길이(uint32 LE) | 헤더 JSON | 8바이트 정렬 패딩 | 컬럼 데이터
+// time 컬럼은 Uint32Array(초), f64 컬럼은 Float64Array(NULL=NaN) 로 버퍼를 복사 없이 감싸고,
+// i32 컬럼(값 × 10^scale, NULL=INT32_MIN)은 Float64Array 로 한 번에 복원한다.
+
+export const COLUMNAR_BINARY_TYPE = 'application/vnd.servereye.columns';
+
+type ColumnType = 'time' | 'i32' | 'f64' | 'json';
+
+interface ColumnHeader {
+  name: string;
+  type: ColumnType;
+  offset?: number;
+  scale?: number;
+  values?: unknown[];
+}
+
+interface SeriesHeader {
+  name: string;
+  count: number;
+  columns: ColumnHeader[];
+}
+
+export type ColumnArray = Uint32Array | Float64Array | unknown[];
+
+export interface ColumnarSeries {
+  name: string;
+  count: number;
+  columns: Record<string, ColumnArray>;
+}
+
+export interface ColumnarPayload {
+  meta: Record<string, unknown>;
+  series: ColumnarSeries[];
+}
+
+const MAGIC = 'SEC1';
+const I32_NULL = -2147483648;
+
+export function decodeColumnar(buffer: ArrayBuffer): ColumnarPayload {
+  const view = new DataView(buffer);
+  const magic = String.fromCharCode(...new Uint8Array(buffer, 0, 4));
+  if (magic !== MAGIC) {
+    throw new Error('Invalid columnar payload');
+  }
+  const headerLen = view.getUint32(4, true);
+  const header = JSON.parse(
+    new TextDecoder().decode(new Uint8Array(buffer, 8, headerLen)),
+  ) as { meta: Record<string, unknown>; series: SeriesHeader[] };
+  const base = Math.ceil((8 + headerLen) / 8) * 8;
+
+  const series = header.series.map((s) => {
+    const columns: Record<string, ColumnArray> = {};
+    for (const col of s.columns) {
+      if (col.type === 'time') {
+        columns[col.name] = new Uint32Array(buffer, base + (col.offset ?? 0), s.count);
+      } else if (col.type === 'i32') {
+        const ints = new Int32Array(buffer, base + (col.offset ?? 0), s.count);
+        const divisor = 10 ** (col.scale ?? 0);
+        const values = new Float64Array(s.count);
+        for (let i = 0; i < s.count; i++) {
+          values[i] = ints[i] === I32_NULL ? NaN : ints[i] / divisor;
+        }
+        columns[col.name] = values;
+      } else if (col.type === 'f64') {
+        columns[col.name] = new Float64Array(buffer, base + (col.offset ?? 0), s.count);
+      } else {
+        columns[col.name] = col.values ?? [];
+      }
+    }
+    return { name: s.name, count: s.count, columns };
+  });
+  return { meta: header.meta, series };
+}
+
+// 초 단위 시각 → 'YYYY-MM-DD HH:mm:ss' (서버가 보낸 로컬 시각 문자열과 동일)
+function epochToTimeString(seconds: number): string {
+  return new Date(seconds * 1000).toISOString().slice(0, 19).replace('T', ' ');
+}
+
+// 차트 라이브러리용 행 배열로 변환 (time 컬럼은 문자열, NaN 은 null)
+export function columnsToRows<T>(series: ColumnarSeries): T[] {
+  const entries = Object.entries(series.columns);
+  const rows = new Array<T>(series.count);
+  for (let i = 0; i < series.count; i++) {
+    const row: Record<string, unknown> = {};
+    for (const [name, values] of entries) {
+      const v = values[i];
+      if (values instanceof Uint32Array) {
+        row[name] = epochToTimeString(v as number);
+      } else if (typeof v === 'number' && Number.isNaN(v)) {
+        row[name] = null;
+      } else {
+        row[name] = v;
+      }
+    }
+    rows[i] = row as T;
+  }
+  return rows;
+}
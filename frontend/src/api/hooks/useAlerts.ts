@@ -12,6 +12,9 @@ export interface AlertListParams {
   server_id?: number;
   from?: string;
   to?: string;
+  // 이전 응답의 next_cursor (지정 시 page 대신 키셋 페이징)
+  cursor?: string;
+  count?: 'exact' | 'approx' | 'none';
 }
 
 export function useAlerts(params?: AlertListParams) {
@@ -1,5 +1,6 @@
 import { useQuery } from '@tanstack/react-query';
 import apiClient from '../client';
+import { columnsToRows, decodeColumnar } from '../columnar';
 import type { MetricLatest, MetricHistory } from '../../types';
 
 // ── 최신 메트릭 (5초 자동 갱신) ──
@@ -20,13 +21,23 @@ export function useLatestMetrics(serverId: number | undefined) {
 
 // ── 메트릭 히스토리 ──
 
+// 차트 폭 기준 최대 점 수 (서버에서 LTTB 로 축소)
+const HISTORY_MAX_POINTS = 1000;
+
 export interface MetricHistoryParams {
   range?: string;
   from?: string;
   to?: string;
   metric?: string;
+  maxPoints?: number;
 }
 
+// 집계 계층은 버킷 경계로 from 을 내려 URL 을 고정 (새 버킷이 없으면 브라우저 캐시 재검증이 304)
+const INTERVAL_BUCKET_MS: Record<string, number> = {
+  '5min': 5 * 60 * 1000,
+  hourly: 3600 * 1000,
+};
+
 function rangeToApiParams(range?: string): { from: string; interval: string } {
   const now = new Date();
   let hoursBack = 1;
@@ -54,7 +65,9 @@ function rangeToApiParams(range?: string): { from: string; interval: string } {
       interval = 'raw';
   }
 
-  const from = new Date(now.getTime() - hoursBack * 3600 * 1000).toISOString();
+  const bucketMs = INTERVAL_BUCKET_MS[interval] ?? 1;
+  const fromMs = now.getTime() - hoursBack * 3600 * 1000;
+  const from = new Date(Math.floor(fromMs / bucketMs) * bucketMs).toISOString();
   return { from, interval };
 }
 
@@ -70,14 +83,18 @@ export function useMetricHistory(
       const apiParams: Record<string, string> = {
         from: params?.from || rangeFrom,
         interval,
+        max_points: String(params?.maxPoints ?? HISTORY_MAX_POINTS),
+        encoding: 'binary',
       };
       if (params?.to) apiParams.to = params.to;
 
-      const { data } = await apiClient.get<{ data: MetricHistory[] }>(
+      // 컬럼형 바이너리로 받아 typed array 를 그대로 행으로 변환 (JSON 파싱 생략)
+      const { data } = await apiClient.get<ArrayBuffer>(
         `/servers/${serverId}/metrics/history`,
-        { params: apiParams },
+        { params: apiParams, responseType: 'arraybuffer' },
       );
-      return data.data;
+      const [series] = decodeColumnar(data).series;
+      return series ? columnsToRows<MetricHistory>(series) : [];
     },
     enabled: !!serverId,
   });
@@ -0,0 +1,60 @@
+import React, { useMemo } from 'react';
+import {
+  ResponsiveContainer,
+  BarChart,
+  Bar,
+  XAxis,
+  YAxis,
+  Tooltip,
+  CartesianGrid,
+} from 'recharts';
+import type { LogRateResponse } from '../../types';
+import { CHART_COLORS } from '../../utils/constants';
+
+interface LogRateChartProps {
+  data: LogRateResponse;
+  height?: number;
+}
+
+// 정규화 수준별 막대 색 (아래에서 위로 쌓이는 순서)
+const LEVEL_BARS: Array<{ key: string; name: string; color: string }> = [
+  { key: 'error', name: 'Error', color: CHART_COLORS.danger },
+  { key: 'warning', name: 'Warning', color: CHART_COLORS.warning },
+  { key: 'info', name: 'Info', color: CHART_COLORS.primary },
+  { key: 'debug', name: 'Debug', color: '#9CA3AF' },
+  { key: 'other', name: '기타', color: '#D1D5DB' },
+];
+
+const formatBucket = (time: string): string => time.slice(11, 16);
+
+/** 로그 건수 5분 막대 차트 (수준별 누적) */
+const LogRateChart: React.FC<LogRateChartProps> = ({ data, height = 120 }) => {
+  const rows = useMemo(
+    () =>
+      data.time.map((time, i) => {
+        const row: Record<string, string | number> = { time };
+        for (const [name, counts] of Object.entries(data.series)) {
+          row[name] = counts[i];
+        }
+        return row;
+      }),
+    [data],
+  );
+  const bars = LEVEL_BARS.filter((b) => b.key in data.series);
+
+  return (
+    <ResponsiveContainer width="100%" height={height}>
+      <BarChart data={rows} margin={{ top: 4, right: 8, left: -16, bottom: 0 }}>
+        <CartesianGrid strokeDasharray="3 3" stroke={CHART_COLORS.grid} vertical={false} />
+        <XAxis dataKey="time" tickFormatter={formatBucket} tick={{ fontSize: 10 }} minTickGap={24} />
+        <YAxis allowDecimals={false} tick={{ fontSize: 10 }} />
+        <Tooltip labelFormatter={(label) => String(label)} />
+        {bars.map((b) => (
+          <Bar key={b.key} dataKey={b.key} name={b.name} stackId="level" fill={b.color} isAnimationActive={false} />
+        ))}
+      </BarChart>
+    </ResponsiveContainer>
+  );
+};
+
+export default LogRateChart;
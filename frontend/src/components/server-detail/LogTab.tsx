@@ -1,9 +1,10 @@
 import React, { useState, useMemo, useRef, useEffect, useCallback } from 'react';
 import { Search, Pause, Play, RefreshCw, ChevronDown } from 'lucide-react';
-import type { ServerLogEntry } from '../../types';
+import type { LogPatternEntry, LogRateResponse, ServerLogEntry } from '../../types';
 import apiClient from '../../api/client';
 import { useQuery, useQueryClient } from '@tanstack/react-query';
 import { formatDateTime } from '../../utils/format';
+import LogRateChart from '../charts/LogRateChart';
 
 interface LogTabProps {
   serverId: number;
@@ -13,6 +14,7 @@ interface LogQueryParams {
   level?: string;
   from?: string;
   to?: string;
+  q?: string;
 }
 
 /** 로그 조회 훅 */
@@ -30,7 +32,39 @@ function useLogs(serverId: number, params?: LogQueryParams) {
   });
 }
 
+/** 로그 패턴별 건수 조회 훅 */
+function useLogPatterns(serverId: number, params: LogQueryParams, enabled: boolean) {
+  return useQuery<LogPatternEntry[]>({
+    queryKey: ['logs', serverId, 'patterns', params],
+    queryFn: async () => {
+      const { data } = await apiClient.get<LogPatternEntry[]>(
+        `/servers/${serverId}/logs/patterns`,
+        { params },
+      );
+      return data;
+    },
+    enabled,
+    refetchInterval: 30000,
+  });
+}
+
+/** 로그 건수 5분 이력 조회 훅 (기본 최근 24시간) */
+function useLogRate(serverId: number, params: Pick<LogQueryParams, 'from' | 'to'>) {
+  return useQuery<LogRateResponse>({
+    queryKey: ['logs', serverId, 'rate', params],
+    queryFn: async () => {
+      const { data } = await apiClient.get<LogRateResponse>(
+        `/servers/${serverId}/logs/rate`,
+        { params },
+      );
+      return data;
+    },
+    refetchInterval: 60000,
+  });
+}
+
 type LogLevel = '' | 'error' | 'warning' | 'info';
+type ViewMode = 'lines' | 'patterns';
 
 const LEVEL_COLORS: Record<string, { bg: string; text: string; dot: string }> = {
   error: { bg: 'bg-red-50 dark:bg-red-900/20', text: 'text-red-700 dark:text-red-400', dot: 'bg-red-500' },
@@ -43,34 +77,78 @@ function getLevelColor(level: string) {
   return LEVEL_COLORS[level.toLowerCase()] || LEVEL_COLORS.debug;
 }
 
+/** 검색 발췌문의 <mark> 구간 강조 (HTML 로 해석하지 않고 텍스트로만 렌더링) */
+function Highlighted({ text }: { text: string }) {
+  const parts = text.split(/<mark>|<\/mark>/);
+  return (
+    <>
+      {parts.map((part, i) =>
+        i % 2 === 1 ? (
+          <mark key={i} className="bg-yellow-200 dark:bg-yellow-700/60 text-inherit rounded-sm">
+            {part}
+          </mark>
+        ) : (
+          <React.Fragment key={i}>{part}</React.Fragment>
+        ),
+      )}
+    </>
+  );
+}
+
+/** 패턴의 변수 자리(<*>) 표시 */
+function PatternText({ pattern }: { pattern: string }) {
+  const parts = pattern.split('<*>');
+  return (
+    <>
+      {parts.map((part, i) => (
+        <React.Fragment key={i}>
+          {part}
+          {i < parts.length - 1 && (
+            <span className="px-1 rounded bg-gray-200 dark:bg-gray-600 text-gray-500 dark:text-gray-300">*</span>
+          )}
+        </React.Fragment>
+      ))}
+    </>
+  );
+}
+
 const LogTab: React.FC<LogTabProps> = ({ serverId }) => {
   const queryClient = useQueryClient();
   const logContainerRef = useRef<HTMLDivElement>(null);
 
+  const [viewMode, setViewMode] = useState<ViewMode>('lines');
   const [levelFilter, setLevelFilter] = useState<LogLevel>('');
   const [searchText, setSearchText] = useState('');
+  const [debouncedSearch, setDebouncedSearch] = useState('');
   const [dateFrom, setDateFrom] = useState('');
   const [dateTo, setDateTo] = useState('');
   const [autoScroll, setAutoScroll] = useState(true);
   const [isRefreshing, setIsRefreshing] = useState(false);
 
+  // 입력이 멈춘 뒤 서버 전문 검색 (관련도 순)
+  useEffect(() => {
+    const timer = setTimeout(() => setDebouncedSearch(searchText.trim()), 300);
+    return () => clearTimeout(timer);
+  }, [searchText]);
+
   const queryParams: LogQueryParams = {};
   if (levelFilter) queryParams.level = levelFilter;
   if (dateFrom) queryParams.from = dateFrom;
   if (dateTo) queryParams.to = dateTo;
+  if (debouncedSearch) queryParams.q = debouncedSearch;
 
   const { data: logs, isLoading } = useLogs(serverId, queryParams);
 
-  const filteredLogs = useMemo(() => {
-    if (!logs) return [];
-    if (!searchText.trim()) return logs;
-    const lower = searchText.toLowerCase();
-    return logs.filter(
-      (log) =>
-        log.message.toLowerCase().includes(lower) ||
-        log.log_source.toLowerCase().includes(lower),
-    );
-  }, [logs, searchText]);
+  const filteredLogs = useMemo(() => logs ?? [], [logs]);
+
+  // 패턴 보기: 검색어 없이 기간/레벨 조건으로 같은 템플릿끼리 묶은 건수
+  const { level, from, to } = queryParams;
+  const { data: logRate } = useLogRate(serverId, { from, to });
+  const { data: patterns, isLoading: patternsLoading } = useLogPatterns(
+    serverId,
+    { level, from, to },
+    viewMode === 'patterns',
+  );
 
   // 자동 스크롤
   useEffect(() => {
@@ -101,14 +179,42 @@ const LogTab: React.FC<LogTabProps> = ({ serverId }) => {
       <div className="flex flex-col sm:flex-row items-start sm:items-center justify-between gap-3">
         <h3 className="text-sm font-semibold text-gray-900 dark:text-white">
           서버 로그
-          {logs && (
+          {viewMode === 'lines' && logs && (
             <span className="ml-2 text-xs font-normal text-gray-500 dark:text-gray-400">
               ({filteredLogs.length}건)
             </span>
           )}
+          {viewMode === 'patterns' && patterns && (
+            <span className="ml-2 text-xs font-normal text-gray-500 dark:text-gray-400">
+              ({patterns.length}개 패턴)
+            </span>
+          )}
         </h3>
 
         <div className="flex items-center gap-2 flex-wrap">
+          {/* 원문 / 패턴 보기 */}
+          <div className="flex items-center gap-1">
+            {(
+              [
+                { key: 'lines' as ViewMode, label: '원문' },
+                { key: 'patterns' as ViewMode, label: '패턴' },
+              ] as const
+            ).map((item) => (
+              <button
+                key={item.key}
+                type="button"
+                onClick={() => setViewMode(item.key)}
+                className={`px-2.5 py-1 text-xs font-medium rounded-lg transition-colors ${
+                  viewMode === item.key
+                    ? 'bg-indigo-600 text-white'
+                    : 'text-gray-600 dark:text-gray-400 hover:bg-gray-100 dark:hover:bg-gray-700'
+                }`}
+              >
+                {item.label}
+              </button>
+            ))}
+          </div>
+
           {/* 레벨 필터 */}
           <div className="flex items-center gap-1">
             {(
@@ -152,19 +258,21 @@ const LogTab: React.FC<LogTabProps> = ({ serverId }) => {
           />
 
           {/* 검색 */}
-          <div className="relative">
-            <Search
-              size={14}
-              className="absolute left-2.5 top-1/2 -translate-y-1/2 text-gray-400 pointer-events-none"
-            />
-            <input
-              type="text"
-              value={searchText}
-              onChange={(e) => setSearchText(e.target.value)}
-              placeholder="메시지 검색..."
-              className="h-8 w-44 rounded-lg border border-gray-300 dark:border-gray-600 bg-white dark:bg-gray-700 pl-8 pr-3 text-xs text-gray-700 dark:text-gray-200 placeholder:text-gray-400 focus:outline-none focus:ring-2 focus:ring-indigo-500 transition-colors"
-            />
-          </div>
+          {viewMode === 'lines' && (
+            <div className="relative">
+              <Search
+                size={14}
+                className="absolute left-2.5 top-1/2 -translate-y-1/2 text-gray-400 pointer-events-none"
+              />
+              <input
+                type="text"
+                value={searchText}
+                onChange={(e) => setSearchText(e.target.value)}
+                placeholder="메시지 검색..."
+                className="h-8 w-44 rounded-lg border border-gray-300 dark:border-gray-600 bg-white dark:bg-gray-700 pl-8 pr-3 text-xs text-gray-700 dark:text-gray-200 placeholder:text-gray-400 focus:outline-none focus:ring-2 focus:ring-indigo-500 transition-colors"
+              />
+            </div>
+          )}
 
           {/* 자동 스크롤 토글 */}
           <button
@@ -194,92 +302,167 @@ const LogTab: React.FC<LogTabProps> = ({ serverId }) => {
         </div>
       </div>
 
+      {/* 로그 건수 추이 (5분 집계) */}
+      {logRate && logRate.total.some((n) => n > 0) && (
+        <div className="bg-white dark:bg-gray-800 rounded-xl shadow-sm border border-gray-200 dark:border-gray-700 px-2 pt-3 pb-1">
+          <LogRateChart data={logRate} />
+        </div>
+      )}
+
+      {/* 패턴 리스트 */}
+      {viewMode === 'patterns' && (
+        <div className="bg-white dark:bg-gray-800 rounded-xl shadow-sm border border-gray-200 dark:border-gray-700 overflow-hidden">
+          {patternsLoading ? (
+            <div className="flex items-center justify-center py-16">
+              <RefreshCw size={24} className="text-gray-400 animate-spin" />
+            </div>
+          ) : !patterns || patterns.length === 0 ? (
+            <div className="text-center py-16">
+              <p className="text-sm text-gray-500 dark:text-gray-400">로그 기록이 없습니다.</p>
+            </div>
+          ) : (
+            <div className="max-h-[600px] overflow-y-auto">
+              <table className="w-full text-left">
+                <thead className="sticky top-0 z-10">
+                  <tr className="bg-gray-50 dark:bg-gray-700/50 border-b border-gray-200 dark:border-gray-700">
+                    <th className="px-4 py-2.5 text-xs font-semibold text-gray-500 dark:text-gray-400 uppercase tracking-wider w-20 text-right">
+                      건수
+                    </th>
+                    <th className="px-4 py-2.5 text-xs font-semibold text-gray-500 dark:text-gray-400 uppercase tracking-wider w-20">
+                      레벨
+                    </th>
+                    <th className="px-4 py-2.5 text-xs font-semibold text-gray-500 dark:text-gray-400 uppercase tracking-wider w-32">
+                      소스
+                    </th>
+                    <th className="px-4 py-2.5 text-xs font-semibold text-gray-500 dark:text-gray-400 uppercase tracking-wider">
+                      패턴
+                    </th>
+                    <th className="px-4 py-2.5 text-xs font-semibold text-gray-500 dark:text-gray-400 uppercase tracking-wider w-44">
+                      최근 발생
+                    </th>
+                  </tr>
+                </thead>
+                <tbody className="divide-y divide-gray-100 dark:divide-gray-700 font-mono text-xs">
+                  {patterns.map((p, i) => {
+                    const levelColor = getLevelColor(p.log_level);
+                    return (
+                      <tr key={`${p.pattern_id ?? 'raw'}-${i}`} className={levelColor.bg}>
+                        <td className="px-4 py-2 text-right font-semibold text-gray-900 dark:text-white tabular-nums">
+                          {p.count.toLocaleString()}
+                        </td>
+                        <td className="px-4 py-2">
+                          <span className={`inline-flex items-center gap-1.5 font-semibold uppercase ${levelColor.text}`}>
+                            <span className={`w-1.5 h-1.5 rounded-full ${levelColor.dot}`} />
+                            {p.log_level}
+                          </span>
+                        </td>
+                        <td className="px-4 py-2 text-gray-600 dark:text-gray-300 truncate max-w-[140px]">
+                          {p.log_source}
+                        </td>
+                        <td className="px-4 py-2 text-gray-700 dark:text-gray-200 break-all">
+                          {p.pattern_id !== null ? <PatternText pattern={p.pattern} /> : p.pattern}
+                        </td>
+                        <td className="px-4 py-2 text-gray-500 dark:text-gray-400 whitespace-nowrap tabular-nums">
+                          {formatDateTime(p.last_seen)}
+                        </td>
+                      </tr>
+                    );
+                  })}
+                </tbody>
+              </table>
+            </div>
+          )}
+        </div>
+      )}
+
       {/* 로그 리스트 */}
-      <div className="bg-white dark:bg-gray-800 rounded-xl shadow-sm border border-gray-200 dark:border-gray-700 overflow-hidden">
-        {isLoading ? (
-          <div className="flex items-center justify-center py-16">
-            <RefreshCw size={24} className="text-gray-400 animate-spin" />
-          </div>
-        ) : filteredLogs.length === 0 ? (
-          <div className="text-center py-16">
-            <p className="text-sm text-gray-500 dark:text-gray-400">
-              {searchText || levelFilter || dateFrom || dateTo
-                ? '조건에 맞는 로그가 없습니다.'
-                : '로그 기록이 없습니다.'}
-            </p>
-          </div>
-        ) : (
-          <div
-            ref={logContainerRef}
-            onScroll={handleScroll}
-            className="max-h-[600px] overflow-y-auto"
-          >
-            <table className="w-full text-left">
-              <thead className="sticky top-0 z-10">
-                <tr className="bg-gray-50 dark:bg-gray-700/50 border-b border-gray-200 dark:border-gray-700">
-                  <th className="px-4 py-2.5 text-xs font-semibold text-gray-500 dark:text-gray-400 uppercase tracking-wider w-44">
-                    시간
-                  </th>
-                  <th className="px-4 py-2.5 text-xs font-semibold text-gray-500 dark:text-gray-400 uppercase tracking-wider w-20">
-                    레벨
-                  </th>
-                  <th className="px-4 py-2.5 text-xs font-semibold text-gray-500 dark:text-gray-400 uppercase tracking-wider w-32">
-                    소스
-                  </th>
-                  <th className="px-4 py-2.5 text-xs font-semibold text-gray-500 dark:text-gray-400 uppercase tracking-wider">
-                    메시지
-                  </th>
-                </tr>
-              </thead>
-              <tbody className="divide-y divide-gray-100 dark:divide-gray-700 font-mono text-xs">
-                {filteredLogs.map((log) => {
-                  const levelColor = getLevelColor(log.log_level);
-                  return (
-                    <tr
-                      key={log.id}
-                      className={`${levelColor.bg} hover:opacity-80 transition-opacity`}
-                    >
-                      <td className="px-4 py-2 text-gray-500 dark:text-gray-400 whitespace-nowrap tabular-nums">
-                        {formatDateTime(log.occurred_at)}
-                      </td>
-                      <td className="px-4 py-2">
-                        <span className={`inline-flex items-center gap-1.5 font-semibold uppercase ${levelColor.text}`}>
-                          <span className={`w-1.5 h-1.5 rounded-full ${levelColor.dot}`} />
-                          {log.log_level}
-                        </span>
-                      </td>
-                      <td className="px-4 py-2 text-gray-600 dark:text-gray-300 truncate max-w-[140px]">
-                        {log.log_source}
-                      </td>
-                      <td className="px-4 py-2 text-gray-700 dark:text-gray-200 break-all">
-                        {log.message}
-                      </td>
-                    </tr>
-                  );
-                })}
-              </tbody>
-            </table>
-
-            {/* 하단으로 이동 버튼 (자동 스크롤 해제 시 표시) */}
-            {!autoScroll && (
-              <button
-                type="button"
-                onClick={() => {
-                  setAutoScroll(true);
-                  if (logContainerRef.current) {
-                    logContainerRef.current.scrollTop =
-                      logContainerRef.current.scrollHeight;
-                  }
-                }}
-                className="sticky bottom-4 left-1/2 -translate-x-1/2 inline-flex items-center gap-1 px-3 py-1.5 rounded-full bg-indigo-600 text-white text-xs font-medium shadow-lg hover:bg-indigo-700 transition-colors"
-              >
-                <ChevronDown size={14} />
-                최신 로그로 이동
-              </button>
-            )}
-          </div>
-        )}
-      </div>
+      {viewMode === 'lines' && (
+        <div className="bg-white dark:bg-gray-800 rounded-xl shadow-sm border border-gray-200 dark:border-gray-700 overflow-hidden">
+          {isLoading ? (
+            <div className="flex items-center justify-center py-16">
+              <RefreshCw size={24} className="text-gray-400 animate-spin" />
+            </div>
+          ) : filteredLogs.length === 0 ? (
+            <div className="text-center py-16">
+              <p className="text-sm text-gray-500 dark:text-gray-400">
+                {searchText || levelFilter || dateFrom || dateTo
+                  ? '조건에 맞는 로그가 없습니다.'
+                  : '로그 기록이 없습니다.'}
+              </p>
+            </div>
+          ) : (
+            <div
+              ref={logContainerRef}
+              onScroll={handleScroll}
+              className="max-h-[600px] overflow-y-auto"
+            >
+              <table className="w-full text-left">
+                <thead className="sticky top-0 z-10">
+                  <tr className="bg-gray-50 dark:bg-gray-700/50 border-b border-gray-200 dark:border-gray-700">
+                    <th className="px-4 py-2.5 text-xs font-semibold text-gray-500 dark:text-gray-400 uppercase tracking-wider w-44">
+                      시간
+                    </th>
+                    <th className="px-4 py-2.5 text-xs font-semibold text-gray-500 dark:text-gray-400 uppercase tracking-wider w-20">
+                      레벨
+                    </th>
+                    <th className="px-4 py-2.5 text-xs font-semibold text-gray-500 dark:text-gray-400 uppercase tracking-wider w-32">
+                      소스
+                    </th>
+                    <th className="px-4 py-2.5 text-xs font-semibold text-gray-500 dark:text-gray-400 uppercase tracking-wider">
+                      메시지
+                    </th>
+                  </tr>
+                </thead>
+                <tbody className="divide-y divide-gray-100 dark:divide-gray-700 font-mono text-xs">
+                  {filteredLogs.map((log) => {
+                    const levelColor = getLevelColor(log.log_level);
+                    return (
+                      <tr
+                        key={log.id}
+                        className={`${levelColor.bg} hover:opacity-80 transition-opacity`}
+                      >
+                        <td className="px-4 py-2 text-gray-500 dark:text-gray-400 whitespace-nowrap tabular-nums">
+                          {formatDateTime(log.occurred_at)}
+                        </td>
+                        <td className="px-4 py-2">
+                          <span className={`inline-flex items-center gap-1.5 font-semibold uppercase ${levelColor.text}`}>
+                            <span className={`w-1.5 h-1.5 rounded-full ${levelColor.dot}`} />
+                            {log.log_level}
+                          </span>
+                        </td>
+                        <td className="px-4 py-2 text-gray-600 dark:text-gray-300 truncate max-w-[140px]">
+                          {log.log_source}
+                        </td>
+                        <td className="px-4 py-2 text-gray-700 dark:text-gray-200 break-all">
+                          {log.snippet ? <Highlighted text={log.snippet} /> : log.message}
+                        </td>
+                      </tr>
+                    );
+                  })}
+                </tbody>
+              </table>
+
+              {/* 하단으로 이동 버튼 (자동 스크롤 해제 시 표시) */}
+              {!autoScroll && (
+                <button
+                  type="button"
+                  onClick={() => {
+                    setAutoScroll(true);
+                    if (logContainerRef.current) {
+                      logContainerRef.current.scrollTop =
+                        logContainerRef.current.scrollHeight;
+                    }
+                  }}
+                  className="sticky bottom-4 left-1/2 -translate-x-1/2 inline-flex items-center gap-1 px-3 py-1.5 rounded-full bg-indigo-600 text-white text-xs font-medium shadow-lg hover:bg-indigo-700 transition-colors"
+                >
+                  <ChevronDown size={14} />
+                  최신 로그로 이동
+                </button>
+              )}
+            </div>
+          )}
+        </div>
+      )}
     </div>
   );
 };
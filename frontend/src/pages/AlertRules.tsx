@@ -8,7 +8,7 @@ import {
 } from 'lucide-react';
 import { useQuery, useMutation, useQueryClient } from '@tanstack/react-query';
 import apiClient from '../api/client';
-import type { AlertRule } from '../types';
+import type { AlertConditionType, AlertRule } from '../types';
 import { METRIC_LABELS } from '../utils/constants';
 import Button from '../components/ui/Button';
 import Input from '../components/ui/Input';
@@ -84,6 +84,9 @@ interface RuleForm {
   duration_sec: string;
   cooldown_sec: string;
   is_enabled: boolean;
+  condition_type: AlertConditionType;
+  window_sec: string;
+  percentile: string;
 }
 
 const EMPTY_FORM: RuleForm = {
@@ -98,6 +101,9 @@ const EMPTY_FORM: RuleForm = {
   duration_sec: '60',
   cooldown_sec: '300',
   is_enabled: true,
+  condition_type: 'value',
+  window_sec: '300',
+  percentile: '95',
 };
 
 const METRIC_OPTIONS = [
@@ -105,9 +111,36 @@ const METRIC_OPTIONS = [
   { label: '메모리 사용률', value: 'mem_usage_pct' },
   { label: '디스크 사용률', value: 'disk_usage_pct' },
   { label: '수집 타임아웃', value: 'collect_timeout' },
+  { label: '에러 로그 발생률', value: 'error_log_rate' },
   { label: '서비스 중지', value: 'service_stopped' },
 ];
 
+const CONDITION_TYPE_OPTIONS: { label: string; value: AlertConditionType }[] = [
+  { label: '현재값', value: 'value' },
+  { label: '구간 평균', value: 'avg' },
+  { label: '구간 최소', value: 'min' },
+  { label: '구간 최대', value: 'max' },
+  { label: '구간 변화량', value: 'delta' },
+  { label: '시간당 증가율', value: 'rate' },
+  { label: '구간 백분위', value: 'percentile' },
+];
+
+function formatWindow(sec: number): string {
+  if (sec % 3600 === 0) return `${sec / 3600}시간`;
+  if (sec % 60 === 0) return `${sec / 60}분`;
+  return `${sec}초`;
+}
+
+// 규칙 조건 요약 (예: '5분 평균', '1시간 p95'), 현재값 규칙은 빈 문자열
+function conditionSummary(rule: AlertRule): string {
+  if (rule.condition_type === 'value' || !rule.window_sec) return '';
+  const kind =
+    rule.condition_type === 'percentile'
+      ? `p${rule.percentile ?? ''}`
+      : CONDITION_TYPE_OPTIONS.find((o) => o.value === rule.condition_type)?.label.replace('구간 ', '') ?? rule.condition_type;
+  return `${formatWindow(rule.window_sec)} ${kind}`;
+}
+
 const CONDITION_OPTIONS = [
   { label: '>= (이상)', value: '>=' },
   { label: '> (초과)', value: '>' },
@@ -149,6 +182,9 @@ export default function AlertRules() {
       duration_sec: rule.duration_sec.toString(),
       cooldown_sec: rule.cooldown_sec.toString(),
       is_enabled: rule.is_enabled,
+      condition_type: rule.condition_type || 'value',
+      window_sec: rule.window_sec?.toString() || '300',
+      percentile: rule.percentile?.toString() || '95',
     });
     setEditingId(rule.rule_id);
     setModalOpen(true);
@@ -159,6 +195,11 @@ export default function AlertRules() {
       toast.error('규칙 이름과 메트릭을 입력하세요.');
       return;
     }
+    const windowed = form.condition_type !== 'value';
+    if (windowed && !(Number(form.window_sec) > 0)) {
+      toast.error('구간 길이(초)를 입력하세요.');
+      return;
+    }
 
     const body: Partial<AlertRule> = {
       rule_name: form.rule_name,
@@ -172,6 +213,9 @@ export default function AlertRules() {
       duration_sec: Number(form.duration_sec) || 60,
       cooldown_sec: Number(form.cooldown_sec) || 300,
       is_enabled: form.is_enabled,
+      condition_type: form.condition_type,
+      window_sec: windowed ? Number(form.window_sec) : undefined,
+      percentile: form.condition_type === 'percentile' ? Number(form.percentile) || 95 : undefined,
     };
 
     try {
@@ -283,6 +327,9 @@ export default function AlertRules() {
                   </td>
                   <td className="px-4 py-3 text-gray-700 dark:text-gray-300">
                     {METRIC_LABELS[rule.metric_name] || rule.metric_name}
+                    {conditionSummary(rule) && (
+                      <span className="ml-1 text-xs text-gray-500 dark:text-gray-400">· {conditionSummary(rule)}</span>
+                    )}
                   </td>
                   <td className="px-4 py-3 text-center">
                     {rule.warning_value != null ? (
@@ -425,6 +472,34 @@ export default function AlertRules() {
             />
           </div>
 
+          <div className="grid grid-cols-3 gap-4">
+            <Select
+              label="판단 값"
+              value={form.condition_type}
+              onChange={(e) => updateForm({ condition_type: e.target.value as AlertConditionType })}
+              options={CONDITION_TYPE_OPTIONS}
+            />
+            {form.condition_type !== 'value' && (
+              <Input
+                label="구간 (초)"
+                type="number"
+                value={form.window_sec}
+                onChange={(e) => updateForm({ window_sec: e.target.value })}
+                placeholder="300"
+                helperText={form.condition_type === 'rate' ? '임계값은 시간당 변화량' : '최근 구간의 값으로 판단'}
+              />
+            )}
+            {form.condition_type === 'percentile' && (
+              <Input
+                label="백분위"
+                type="number"
+                value={form.percentile}
+                onChange={(e) => updateForm({ percentile: e.target.value })}
+                placeholder="95"
+              />
+            )}
+          </div>
+
           <div className="grid grid-cols-2 gap-4">
             <Input
               label="경고 임계값"
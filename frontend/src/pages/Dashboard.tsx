@@ -110,6 +110,7 @@ export default function Dashboard() {
           status: msg.status,
         });
       } else if (msg.type === 'alert_fired') {
+        if (msg.resolved_at) return;
         addAlert({
           alert_id: msg.alert_id,
           server_id: msg.server_id,
@@ -120,15 +121,35 @@ export default function Dashboard() {
           created_at: msg.timestamp,
           duration_seconds: 0,
         });
+      } else if (msg.type === 'alert_grouped') {
+        for (const alert of msg.alerts) {
+          if (alert.resolved_at) continue;
+          addAlert({
+            alert_id: alert.alert_id,
+            server_id: alert.server_id,
+            server_name: alert.server_name,
+            severity: alert.severity,
+            metric_name: alert.metric_name,
+            metric_value: alert.metric_value,
+            threshold_value: alert.threshold_value,
+            message: alert.message,
+            acknowledged: false,
+            created_at: alert.timestamp,
+            duration_seconds: 0,
+          });
+        }
       } else if (msg.type === 'alert_resolved') {
         removeAlert(msg.alert_id);
       } else if (msg.type === 'status_change') {
         updateServerMetrics(msg.server_id, {
           status: msg.new_status,
         });
+      } else if (msg.type === 'summary') {
+        // 서버가 틱마다 계산한 요약을 그대로 사용 (폴링 불필요)
+        setSummary(msg.data);
       }
     },
-    [updateServerMetrics, addAlert, removeAlert],
+    [updateServerMetrics, addAlert, removeAlert, setSummary],
   );
 
   useWebSocket('/ws/dashboard', handleWsMessage, true);
@@ -9,6 +9,7 @@ import {
   Shield,
   Bell,
   Webhook,
+  HardDrive,
 } from 'lucide-react';
 import { useSettings, useUpdateSettings } from '../api/hooks/useSettings';
 import type { AppSetting } from '../types';
@@ -25,6 +26,7 @@ const CATEGORIES = [
   { key: 'general', label: '일반', icon: <Globe size={15} /> },
   { key: 'collection', label: '수집', icon: <Database size={15} /> },
   { key: 'retention', label: '보존정책', icon: <Shield size={15} /> },
+  { key: 'storage', label: '저장소', icon: <HardDrive size={15} /> },
   { key: 'threshold', label: '기본임계치', icon: <Bell size={15} /> },
   { key: 'integration', label: '외부연동', icon: <Webhook size={15} /> },
 ];
@@ -149,8 +149,13 @@ export interface AlertRule {
   cooldown_sec: number;
   is_enabled: boolean;
   sort_order: number;
+  condition_type: AlertConditionType;
+  window_sec?: number;
+  percentile?: number;
 }
 
+export type AlertConditionType = 'value' | 'avg' | 'min' | 'max' | 'delta' | 'rate' | 'percentile';
+
 // ── 프로세스 & 서비스 ──
 export interface ProcessInfo {
   pid: number;
@@ -182,6 +187,30 @@ export interface ServerLogEntry {
   message: string;
   event_id?: number;
   occurred_at: string;
+  // 전문 검색 시: <mark>…</mark> 로 강조된 발췌문, bm25 점수
+  snippet?: string | null;
+  score?: number | null;
+}
+
+// 로그 건수 5분 이력 (series: 수준 또는 소스 → 버킷별 건수)
+export interface LogRateResponse {
+  server_id: number;
+  group_by: 'level' | 'source';
+  step: number;
+  time: string[];
+  series: Record<string, number[]>;
+  total: number[];
+}
+
+// 로그 패턴 (템플릿 × 건수), pattern 의 <*> 는 변수 자리
+export interface LogPatternEntry {
+  pattern_id: number | null;
+  pattern: string;
+  log_source: string;
+  log_level: string;
+  count: number;
+  first_seen: string;
+  last_seen: string;
 }
 
 // ── 헬스체크 ──
@@ -262,6 +291,39 @@ export interface WSAlertMessage {
   server_name: string;
   severity?: string;
   message: string;
+  // 묶음 창 안에서 이미 해결된 뒤 전달된 알림
+  resolved_at?: string | null;
+  timestamp: string;
+}
+
+// 같은 그룹/메트릭/심각도 알림을 묶은 인시던트
+// (alerts 는 새로 알리는 후속 알림만, 첫 알림은 이미 alert_fired 로 전달됨,
+//  창 안에서 해결된 알림은 resolved_at 이 채워짐)
+export interface WSAlertGroupedMessage {
+  type: 'alert_grouped';
+  incident_id: number;
+  severity: 'warning' | 'critical';
+  title: string;
+  message: string;
+  server_name: string;
+  group_name: string | null;
+  metric_name: string | null;
+  alert_count: number;
+  server_count: number;
+  alert_ids: number[];
+  resolved_count: number;
+  alerts: {
+    alert_id: number;
+    server_id: number;
+    server_name: string;
+    severity: 'warning' | 'critical';
+    message: string;
+    metric_name: string;
+    metric_value: number;
+    threshold_value: number;
+    resolved_at: string | null;
+    timestamp: string;
+  }[];
   timestamp: string;
 }
 
@@ -274,7 +336,18 @@ export interface WSStatusMessage {
   timestamp: string;
 }
 
-export type WSMessage = WSMetricsMessage | WSAlertMessage | WSStatusMessage;
+export interface WSSummaryMessage {
+  type: 'summary';
+  data: DashboardSummary;
+  timestamp: string;
+}
+
+export type WSMessage =
+  | WSMetricsMessage
+  | WSAlertMessage
+  | WSAlertGroupedMessage
+  | WSStatusMessage
+  | WSSummaryMessage;
 
 // ── 디스크 ──
 export interface DiskInfo {
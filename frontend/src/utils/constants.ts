@@ -31,6 +31,7 @@ export const METRIC_LABELS: Record<string, string> = {
   mem_usage_pct: '메모리 사용률',
   disk_usage_pct: '디스크 사용률',
   collect_timeout: '수집 타임아웃',
+  error_log_rate: '에러 로그 (건/분)',
   service_stopped: '서비스 중지',
 };
 
@@ -43,9 +43,20 @@ hidden += [
     'backend.main',
     'backend.config',
     'backend.tray',
+    'backend.db.archive',
+    'backend.db.blocks',
+    'backend.db.latest',
+    'backend.db.export',
+    'backend.db.incidents',
     'backend.db.database',
     'backend.db.init_db',
+    'backend.db.maintenance',
+    'backend.db.writer',
     'backend.db.models',
+    'backend.db.partitions',
+    'backend.db.log_search',
+    'backend.db.log_patterns',
+    'backend.db.log_rate',
     'backend.db.schemas',
     'backend.api.auth',
     'backend.api.servers',
@@ -58,17 +69,31 @@ hidden += [
     'backend.api.settings',
     'backend.api.users',
     'backend.api.websocket',
+    'backend.api.system',
+    'backend.core.columnar',
+    'backend.core.compare',
     'backend.core.collector',
     'backend.core.collector_ssh',
     'backend.core.collector_winrm',
     'backend.core.connection_pool',
+    'backend.core.alert_batch',
     'backend.core.alert_engine',
+    'backend.core.alert_grouper',
+    'backend.core.alert_windows',
+    'backend.core.rule_cache',
     'backend.core.anomaly',
     'backend.core.aggregator',
     'backend.core.crypto',
+    'backend.core.dashboard_summary',
+    'backend.core.downsample',
     'backend.core.health_checker',
+    'backend.core.log_templates',
+    'backend.core.http_cache',
     'backend.core.notifier',
     'backend.core.report_gen',
+    'backend.core.ring_buffer',
+    'backend.core.timer_wheel',
+    'backend.core.tsblock',
     'backend.core.ws_manager',
     'backend.scheduler.jobs',
 ]